@@ -0,0 +1,56 @@
+# Load packages
+import argparse  # choosing benchmark to run
+from pathlib import Path  # handling file paths
+
+# Local imports
+from timesheet import benchmark_functions  # core timesheet benchmark suite
+from timesheet import benchmark_write_functions  # adding times and records
+from timesheet import benchmark_storage_functions  # storing and reading timesheets
+from timesheet import benchmark_report_functions  # summarising timesheets
+from timesheet import benchmark_server_functions  # in-memory and asyncio timesheets
+
+# Benchmarks that can be run on their own, by name
+BENCHMARKS = {
+    "punch_latency": benchmark_write_functions.benchmark_punch_latency,
+    "concurrent_punches": benchmark_write_functions.benchmark_concurrent_punches,
+    "import_records": benchmark_write_functions.benchmark_import_records,
+    "storage_formats": benchmark_storage_functions.benchmark_storage_formats,
+    "partitioned_storage": benchmark_storage_functions.benchmark_partitioned_storage,
+    "parse_cache": benchmark_storage_functions.benchmark_parse_cache,
+    "load_paths": benchmark_storage_functions.benchmark_load_paths,
+    "team_report": benchmark_report_functions.benchmark_team_report,
+    "streaming_summary": benchmark_report_functions.benchmark_streaming_summary,
+    "session_store_memory": benchmark_server_functions.benchmark_session_store_memory,
+    "async_loop_latency": benchmark_server_functions.benchmark_async_loop_latency,
+}
+
+
+def main():
+
+    # Get name of benchmark to run
+    parser = argparse.ArgumentParser(
+        description="Benchmark timesheet. Runs the core benchmark suite (results written to outputs/benchmark_results.json) unless a benchmark is named."
+    )
+    parser.add_argument("benchmark", nargs="?", choices=sorted(BENCHMARKS))
+    args = parser.parse_args()
+
+    # Run named benchmark and report results
+    if args.benchmark != None:
+        results = BENCHMARKS[args.benchmark]()
+        print(results.to_string(index=False))
+        return
+
+    # Benchmark core timesheet operations at 1k, 100k and 1M rows
+    results = benchmark_functions.run_benchmark_suite()
+
+    # Report results
+    print(results.to_string(index=False))
+
+    # Write results to JSON so runs can be compared between versions
+    results_file = Path("outputs/benchmark_results.json")
+    benchmark_functions.write_benchmark_results_json(results, results_file)
+    print(f"Benchmark results written to: {results_file}")
+
+
+if __name__ == "__main__":
+    main()
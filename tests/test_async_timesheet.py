@@ -0,0 +1,69 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import asyncio  # running async timesheet
+
+# Local imports
+from timesheet import async_timesheet  # asyncio timesheet class
+from timesheet import timesheet  # timesheet class
+from timesheet import totals_functions  # daily totals files
+from timesheet import data_functions  # functions for working with data
+
+
+class TestAsyncTimesheet(unittest.TestCase):
+    def test_async_timesheet(self):
+        """Test tasks add times to different timesheets at once"""
+
+        # Create the dummy data for two people
+        file_names = [
+            Path("outputs/test_timesheet.csv"),
+            Path("outputs/test_timesheet_2.csv"),
+        ]
+        for file_name in file_names:
+            data_functions.create_dummy_timesheet(file_name=file_name)
+
+        async def add_session(file_name: Path, start_time: str, end_time: str):
+            """Add session to timesheet (each task uses its own AsyncTimesheet)"""
+            my_timesheet = await async_timesheet.AsyncTimesheet(
+                file_name=file_name
+            ).load()
+            await my_timesheet.add_start_time(start_time)
+            await my_timesheet.add_end_time(end_time)
+
+        async def add_sessions():
+            """Add sessions to both timesheets at once, then another to first and summarise"""
+            await asyncio.gather(
+                add_session(file_names[0], "01:00", "02:00"),
+                add_session(file_names[1], "01:00", "02:00"),
+            )
+            await add_session(file_names[0], "03:00", "04:00")
+            return await async_timesheet.AsyncTimesheet(
+                file_name=file_names[0]
+            ).summarise()
+
+        # Run tasks
+        summary = asyncio.run(add_sessions())
+
+        # Check sessions added to each timesheet
+        self.assertEqual(
+            [
+                timesheet.Timesheet(file_name=file_name).timesheet.shape[0]
+                for file_name in file_names
+            ],
+            [10, 9],
+            "Check sessions added by tasks",
+        )
+        self.assertEqual(
+            summary.hours.iloc[-1], 2, "Check summary includes sessions added by tasks"
+        )
+
+        # Remove timesheets and daily totals
+        for file_name in file_names:
+            Path.unlink(file_name)
+            totals_functions.get_daily_totals_file_name(file_name).unlink(
+                missing_ok=True
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
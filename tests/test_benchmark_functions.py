@@ -0,0 +1,38 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import json  # reading benchmark results
+
+# Local imports
+from timesheet import benchmark_functions  # functions for benchmarking timesheet
+
+
+class TestBenchmarkFunctions(unittest.TestCase):
+    def test_run_benchmark_suite(self):
+        """Test benchmark suite runs on small timesheets and results written to JSON"""
+
+        # Run benchmark suite on small timesheets
+        results = benchmark_functions.run_benchmark_suite(
+            row_counts=[10, 100], n_repeats=1
+        )
+
+        # Check a result for each operation and timesheet size
+        self.assertEqual(
+            results.shape[0], 14, "Check result for each operation and size"
+        )
+
+        # Write results to JSON and check they can be read back
+        results_file = Path("outputs/test_benchmark_results.json")
+        benchmark_functions.write_benchmark_results_json(results, results_file)
+        with open(results_file) as file:
+            benchmark_run = json.load(file)
+        self.assertEqual(
+            len(benchmark_run["results"]), 14, "Check results written to JSON"
+        )
+
+        # Remove results
+        Path.unlink(results_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
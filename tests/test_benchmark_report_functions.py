@@ -0,0 +1,38 @@
+# Load packages
+import unittest  # running tests
+
+# Local imports
+from timesheet import benchmark_report_functions  # benchmarking summarising timesheets
+
+
+class TestBenchmarkReportFunctions(unittest.TestCase):
+    def test_benchmark_team_report(self):
+        """Test team report benchmark runs on small timesheets"""
+
+        # Run benchmark on small timesheets
+        results = benchmark_report_functions.benchmark_team_report(
+            worker_counts=[1, 2], n_files=2, n_sessions=10, n_repeats=1
+        )
+
+        # Check a result for each number of workers
+        self.assertEqual(
+            list(results.n_workers), [1, 2], "Check result for each number of workers"
+        )
+
+    def test_benchmark_streaming_summary(self):
+        """Test whole and streamed summaries measured in new processes"""
+
+        # Run benchmark on small timesheet
+        results = benchmark_report_functions.benchmark_streaming_summary(
+            row_counts=[1000], chunk_bytes=1000
+        )
+
+        # Check both summaries found the same weeks and peak memory measured
+        self.assertEqual(
+            results.n_weeks.nunique(), 1, "Check same weeks summarised by each mode"
+        )
+        self.assertTrue((results.peak_rss_mb > 0).all(), "Check peak memory measured")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# Load packages
+import unittest  # running tests
+
+# Local imports
+from timesheet import benchmark_server_functions  # benchmarking asyncio timesheets
+
+
+class TestBenchmarkServerFunctions(unittest.TestCase):
+    def test_benchmark_async_loop_latency(self):
+        """Test event loop latency benchmark runs on small timesheets"""
+
+        # Run benchmark on small timesheets
+        results = benchmark_server_functions.benchmark_async_loop_latency(
+            n_timesheets=2, n_sessions=10
+        )
+
+        # Check a result for blocking and async calls
+        self.assertEqual(
+            list(results["mode"]), ["blocking", "async"], "Check result for each mode"
+        )
+
+    def test_benchmark_session_store_memory(self):
+        """Test session store uses less memory per row than dataframe"""
+
+        # Run benchmark on small timesheet
+        results = benchmark_server_functions.benchmark_session_store_memory(
+            row_counts=[1000]
+        )
+
+        # Check session store smaller than dataframe
+        self.assertLess(
+            results.store_bytes_per_row[0],
+            results.dataframe_bytes_per_row[0],
+            "Check session store uses less memory than dataframe",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+
+# Local imports
+from timesheet import benchmark_storage_functions  # benchmarking storage
+
+
+class TestBenchmarkStorageFunctions(unittest.TestCase):
+    def test_benchmark_parse_cache(self):
+        """Test reads with and without cache timed and temporary files removed"""
+
+        # Run benchmark on small timesheet
+        results = benchmark_storage_functions.benchmark_parse_cache(
+            n_rows=1000, n_repeats=1
+        )
+
+        # Check snapshot written and temporary cache removed
+        self.assertGreater(results.snapshot_mb.iloc[0], 0, "Check snapshot written")
+        self.assertFalse(
+            Path("outputs/benchmark_cache").exists(), "Check cache directory removed"
+        )
+
+    def test_benchmark_load_paths(self):
+        """Test pandas and parse_functions load paths timed and timesheet removed"""
+
+        # Run benchmark on small timesheet
+        results = benchmark_storage_functions.benchmark_load_paths(
+            row_counts=[1000], n_repeats=1
+        )
+
+        # Check both paths timed and temporary timesheet removed
+        self.assertGreater(results.speedup.iloc[0], 0, "Check speedup calculated")
+        self.assertFalse(
+            Path("outputs/benchmark_timesheet.csv").exists(), "Check timesheet removed"
+        )
+
+    def test_benchmark_partitioned_storage(self):
+        """Test single file and partitioned timesheets benchmarked and removed"""
+
+        # Run benchmark on small timesheet
+        results = benchmark_storage_functions.benchmark_partitioned_storage(
+            n_rows=2000, n_repeats=1
+        )
+
+        # Check both layouts timed and temporary timesheets removed
+        self.assertEqual(
+            list(results.layout), ["single_file", "partitioned"], "Check layouts timed"
+        )
+        self.assertFalse(
+            Path("outputs/benchmark_partitioned").exists(),
+            "Check partitioned timesheet removed",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
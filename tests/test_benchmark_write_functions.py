@@ -0,0 +1,58 @@
+# Load packages
+import unittest  # running tests
+
+# Local imports
+from timesheet import benchmark_write_functions  # benchmarking adding times and records
+
+
+class TestBenchmarkWriteFunctions(unittest.TestCase):
+    def test_benchmark_punch_latency(self):
+        """Test punch latency benchmark runs on small timesheets"""
+
+        # Run benchmark on small timesheets
+        results = benchmark_write_functions.benchmark_punch_latency(
+            row_counts=[10, 100], n_repeats=1
+        )
+
+        # Check a result for each timesheet size
+        self.assertEqual(
+            list(results.n_rows), [10, 100], "Check result for each timesheet size"
+        )
+        self.assertTrue(
+            (results.drop(columns="n_rows") > 0).all().all(),
+            "Check all timings are positive",
+        )
+
+    def test_benchmark_concurrent_punches(self):
+        """Test processes adding times at once to the same timesheet don't lose records"""
+
+        # Run benchmark with a few processes (raises if records or daily totals lost)
+        results = benchmark_write_functions.benchmark_concurrent_punches(
+            n_processes=4, n_operations=6
+        )
+
+        # Check every operation accounted for
+        self.assertEqual(
+            (
+                results.n_accepted_starts + results.n_accepted_ends + results.n_rejected
+            ).item(),
+            24,
+            "Check every operation accepted or rejected",
+        )
+
+    def test_benchmark_import_records(self):
+        """Test sessions imported into CSV and Feather timesheets"""
+
+        # Run benchmark on small timesheets
+        results = benchmark_write_functions.benchmark_import_records(
+            n_existing=100, n_imported=50
+        )
+
+        # Check all sessions imported for each format
+        self.assertEqual(
+            list(results.n_imported), [50, 50], "Check all sessions imported"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
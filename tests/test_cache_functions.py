@@ -0,0 +1,185 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from datetime import datetime  # creating start and end times
+import shutil  # removing cache directory
+import os  # setting when snapshots were last used
+import pandas as pd  # comparing timesheets
+
+# Local imports
+from timesheet import cache_functions  # caching parsed timesheets
+from timesheet import parse_functions  # parsing timesheet CSV files
+from timesheet import punch_functions  # adding start and end times
+from timesheet import profile_functions  # counting rows parsed
+from timesheet import data_functions  # functions for working with data
+
+
+def read_and_count_parsed_rows(timesheet_file: Path, cache_directory: Path) -> tuple:
+    """Read timesheet through cache, counting rows parsed"""
+
+    metrics_file = Path("outputs/test_metrics.jsonl")
+    profile_functions.start_profile()
+    timesheet = cache_functions.read_timesheet_csv(timesheet_file, cache_directory)
+    metrics = profile_functions.finish_profile(metrics_file)
+    Path.unlink(metrics_file)
+    n_parsed = sum(
+        phase["rows"] for phase in metrics["phases"] if phase["name"] == "parse"
+    )
+
+    return timesheet, n_parsed
+
+
+class TestCacheFunctions(unittest.TestCase):
+    def test_read_timesheet_csv(self):
+        """Test unchanged timesheets not parsed again and only new records parsed"""
+
+        # Create synthetic timesheet
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        cache_directory = Path("outputs/test_cache")
+        data_functions.create_synthetic_timesheet(
+            timesheet_file, n_sessions=100, notes=["a", "b"]
+        )
+
+        # Check whole file parsed first, then read from snapshot
+        timesheet, n_parsed = read_and_count_parsed_rows(
+            timesheet_file, cache_directory
+        )
+        self.assertEqual(n_parsed, 100, "Check whole file parsed")
+        timesheet, n_parsed = read_and_count_parsed_rows(
+            timesheet_file, cache_directory
+        )
+        self.assertEqual(n_parsed, 0, "Check snapshot used")
+        pd.testing.assert_frame_equal(
+            timesheet, parse_functions.parse_timesheet_csv(timesheet_file.read_bytes())
+        )
+
+        # Add end time to last record and new start time
+        punch_functions.commit_operation(
+            timesheet_file, "start", datetime(2000, 3, 1, 9, 0)
+        )
+        timesheet, n_parsed = read_and_count_parsed_rows(
+            timesheet_file, cache_directory
+        )
+        self.assertEqual(n_parsed, 2, "Check only last and new records parsed")
+        punch_functions.commit_operation(
+            timesheet_file, "end", datetime(2000, 3, 1, 10, 0)
+        )
+        timesheet, n_parsed = read_and_count_parsed_rows(
+            timesheet_file, cache_directory
+        )
+        self.assertEqual(n_parsed, 1, "Check only last record parsed")
+        pd.testing.assert_frame_equal(
+            timesheet, parse_functions.parse_timesheet_csv(timesheet_file.read_bytes())
+        )
+
+        # Check new records written to tail snapshot (snapshot itself not rewritten)
+        snapshot_file = cache_functions.get_snapshot_file_name(
+            cache_directory, timesheet_file
+        )
+        tail_file = cache_functions.get_tail_file_name(snapshot_file)
+        self.assertEqual(
+            cache_functions.read_snapshot_description(snapshot_file)["prefix_records"],
+            99,
+            "Check snapshot not rewritten",
+        )
+        self.assertEqual(
+            cache_functions.read_snapshot(tail_file).shape[0], 2, "Check tail records"
+        )
+        timesheet, n_parsed = read_and_count_parsed_rows(
+            timesheet_file, cache_directory
+        )
+        self.assertEqual(n_parsed, 0, "Check snapshot and tail used")
+        pd.testing.assert_frame_equal(
+            timesheet, parse_functions.parse_timesheet_csv(timesheet_file.read_bytes())
+        )
+
+        # Add records until tail is over an eighth of snapshot (whole snapshot rewritten)
+        with open(timesheet_file, "a") as file:
+            for day in range(2, 15):
+                file.write(f"2000-03-{day:02d},09:00,10:00,01:00,\n")
+        timesheet, n_parsed = read_and_count_parsed_rows(
+            timesheet_file, cache_directory
+        )
+        self.assertEqual(n_parsed, 14, "Check only records after snapshot parsed")
+        self.assertFalse(tail_file.exists(), "Check tail removed")
+        self.assertEqual(
+            cache_functions.read_snapshot(snapshot_file).shape[0],
+            114,
+            "Check snapshot rewritten",
+        )
+
+        # Check malformed new record reported with line number in file
+        with open(timesheet_file, "a") as file:
+            file.write("2000-03-02,9am,10:00,01:00,\n")
+        with self.assertRaises(parse_functions.TimesheetFormatError) as context:
+            cache_functions.read_timesheet_csv(timesheet_file, cache_directory)
+        self.assertEqual(
+            context.exception.errors.line.tolist(), [116], "Check line number in file"
+        )
+
+        # Remove timesheet and cache
+        Path.unlink(timesheet_file)
+        shutil.rmtree(cache_directory)
+
+    def test_get_cache_directory(self):
+        """Test cache only turned on by environment variable"""
+
+        # Check cache off by default
+        variable = cache_functions.CACHE_ENVIRONMENT_VARIABLE
+        os.environ.pop(variable, None)
+        self.assertIsNone(cache_functions.get_cache_directory(), "Check cache off")
+
+        # Check default and other cache directories
+        os.environ[variable] = "1"
+        self.assertEqual(
+            cache_functions.get_cache_directory(),
+            cache_functions.DEFAULT_CACHE_DIRECTORY,
+            "Check default cache directory",
+        )
+        os.environ[variable] = "outputs/test_cache"
+        self.assertEqual(
+            cache_functions.get_cache_directory(),
+            Path("outputs/test_cache"),
+            "Check cache directory from environment variable",
+        )
+        del os.environ[variable]
+
+    def test_evict_snapshots(self):
+        """Test least recently used snapshots removed beyond size limit"""
+
+        # Read three timesheets into cache
+        cache_directory = Path("outputs/test_cache")
+        timesheet_files = [
+            Path(f"outputs/test_timesheet_{index}.csv") for index in range(3)
+        ]
+        for timesheet_file in timesheet_files:
+            data_functions.create_dummy_timesheet(file_name=timesheet_file)
+            cache_functions.read_timesheet_csv(timesheet_file, cache_directory)
+
+        # Mark first snapshot as most recently used, then second as least
+        snapshot_files = [
+            cache_functions.get_snapshot_file_name(cache_directory, timesheet_file)
+            for timesheet_file in timesheet_files
+        ]
+        for snapshot_file, used in zip(snapshot_files, [3, 1, 2]):
+            os.utime(snapshot_file, ns=(used * 10**9, used * 10**9))
+
+        # Limit cache to two snapshots
+        snapshot_bytes = max(path.stat().st_size for path in snapshot_files)
+        cache_functions.evict_snapshots(cache_directory, max_bytes=2 * snapshot_bytes)
+
+        # Check least recently used snapshot removed
+        self.assertEqual(
+            [snapshot_file.exists() for snapshot_file in snapshot_files],
+            [True, False, True],
+            "Check second snapshot removed",
+        )
+
+        # Remove timesheets and cache
+        for timesheet_file in timesheet_files:
+            Path.unlink(timesheet_file)
+        shutil.rmtree(cache_directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
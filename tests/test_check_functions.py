@@ -0,0 +1,122 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import numpy as np  # building session intervals
+import pandas as pd  # setting gap thresholds
+
+# Local imports
+from timesheet import check_functions  # checking whole timesheet for problems
+from timesheet import parse_functions  # parsing timesheet CSV files
+from timesheet import timesheet  # timesheet class
+from timesheet import data_functions  # functions for working with data
+
+
+class TestCheckFunctions(unittest.TestCase):
+    def test_find_overlaps(self):
+        """Test each overlapping session found against the earlier session ending latest"""
+
+        # Define sessions (second inside first, third touches first, fourth overlaps third)
+        starts = np.array([0, 10, 60, 90, 200])
+        ends = np.array([60, 20, 120, 100, 210])
+
+        # Check overlaps found
+        positions, other_positions = check_functions.find_overlaps(starts, ends)
+        self.assertEqual(positions.tolist(), [1, 3], "Check overlapping sessions")
+        self.assertEqual(other_positions.tolist(), [0, 2], "Check sessions overlapped")
+
+    def test_check_timesheet(self):
+        """Test every problem in timesheet reported with its row"""
+
+        # Define timesheet with problems
+        content = (
+            "date,start_time,end_time,time_worked,notes\n"
+            "2023-03-13,08:24,12:00,03:36,\n"
+            "2023-03-13,11:00,13:00,02:00,overlaps row 0\n"
+            "2023-03-13,14:00,,00:00,open before last session\n"
+            "2023-03-14,15:00,14:00,01:00,ends before start\n"
+            "2023-03-12,09:00,10:00,01:30,out of order and wrong time worked\n"
+            "2023-03-15,09:00,,00:00,last session open\n"
+        )
+        timesheet_data = parse_functions.parse_timesheet_csv(content.encode())
+
+        # Check problems reported
+        report = check_functions.check_timesheet(timesheet_data)
+        self.assertEqual(
+            report[["row", "check"]].values.tolist(),
+            [
+                [1, "overlap"],
+                [2, "open_session"],
+                [3, "negative_duration"],
+                [4, "time_worked"],
+                [4, "out_of_order"],
+            ],
+            "Check problems reported",
+        )
+        self.assertEqual(
+            report.problem[4],
+            "date 2023-03-12 is before date of row 3",
+            "Check out of order row described",
+        )
+
+        # Check session ending next day allowed if sessions cross midnight
+        report = check_functions.check_timesheet(timesheet_data, overnight=True)
+        self.assertEqual(
+            report.check[report.row == 3].tolist(),
+            ["crosses_midnight", "time_worked"],
+            "Check overnight session only crosses midnight and has wrong time worked",
+        )
+
+    def test_long_gaps(self):
+        """Test long gaps between sessions on the same day reported"""
+
+        # Define timesheet with long gaps (one after a session crossing midnight)
+        content = (
+            "date,start_time,end_time,time_worked,notes\n"
+            "2023-03-13,08:00,09:00,01:00,\n"
+            "2023-03-13,14:00,15:00,01:00,long gap after row 0\n"
+            "2023-03-14,22:00,01:00,03:00,crosses midnight\n"
+            "2023-03-15,06:00,07:00,01:00,long gap after row 2\n"
+        )
+        timesheet_data = parse_functions.parse_timesheet_csv(content.encode())
+
+        # Check gaps reported
+        report = check_functions.check_timesheet(timesheet_data, overnight=True)
+        self.assertEqual(
+            report[["row", "check"]].values.tolist(),
+            [[1, "long_gap"], [2, "crosses_midnight"], [3, "long_gap"]],
+            "Check long gaps and session crossing midnight reported",
+        )
+        self.assertEqual(
+            report.problem[0], "starts 05:00 after row 0 ends", "Check gap described"
+        )
+
+        # Check gaps shorter than threshold allowed
+        report = check_functions.check_timesheet(
+            timesheet_data, overnight=True, max_gap=pd.Timedelta(hours=6)
+        )
+        self.assertEqual(
+            report.check.tolist(), ["crosses_midnight"], "Check no long gaps"
+        )
+
+    def test_validate(self):
+        """Test valid timesheet has no problems"""
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Check no problems found
+        report = timesheet.Timesheet(file_name=timesheet_file, lazy=True).validate()
+        self.assertEqual(report.shape[0], 0, "Check no problems found")
+        self.assertEqual(
+            check_functions.format_check_report(report, timesheet_file),
+            f"No problems found in {timesheet_file}",
+            "Check report formatted",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,11 +3,18 @@ import unittest  # running tests
 from pathlib import Path  # handling file paths
 import pandas as pd  # working with dummy data
 from datetime import date  # working with dates
+import io  # capturing printed output
+import contextlib  # redirecting printed output
+import shutil  # removing partitioned timesheets
+import json  # reading metrics lines
 
 # Local imports
+from timesheet import benchmark_functions  # functions for benchmarking timesheet
 from timesheet import command_line_interface_functions  # cli functions
 from timesheet import data_functions  # functions for working with data
 from timesheet import timesheet  # timesheet class
+from timesheet import totals_functions  # daily totals files
+from timesheet import search_functions  # notes index files
 
 
 class TestCommandLineInterfaceFunctions(unittest.TestCase):
@@ -71,6 +78,419 @@ class TestCommandLineInterfaceFunctions(unittest.TestCase):
         # Remove timesheet
         Path.unlink(timesheet_file)
 
+    def test_convert_timesheet(self):
+        """Test converting timesheet to binary format from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Convert timesheet to Feather format
+        feather_file = Path("outputs/test_timesheet.feather")
+        command_line_interface_functions.parse_command_line_arguments(
+            parser, ["--file", str(timesheet_file), "--convert", str(feather_file)]
+        )
+
+        # Check converted timesheet loaded
+        my_timesheet = timesheet.Timesheet(file_name=feather_file)
+        self.assertEqual(
+            my_timesheet.timesheet.shape[0], 8, "Check all records converted"
+        )
+
+        # Remove timesheets
+        Path.unlink(timesheet_file)
+        Path.unlink(feather_file)
+
+    def test_summary(self):
+        """Test printing hours worked per day from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Print summary
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, ["--file", str(timesheet_file), "--summary"]
+            )
+
+        # Check first day's hours printed
+        self.assertIn(
+            "2023-03-13       07:36", output.getvalue(), "Check hours per day printed"
+        )
+
+        # Remove timesheet and daily totals
+        Path.unlink(timesheet_file)
+        Path.unlink(totals_functions.get_daily_totals_file_name(timesheet_file))
+
+    def test_import(self):
+        """Test importing sessions from CSV file from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data and records to import
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        records_file = Path("outputs/test_records.csv")
+        with open(records_file, "w") as file:
+            file.write("date,start_time,end_time\n2023-03-17,08:00,12:00\n")
+
+        # Import sessions
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, ["--file", str(timesheet_file), "--import", str(records_file)]
+            )
+
+        # Check session imported
+        self.assertIn("Imported 1 sessions", output.getvalue(), "Check import reported")
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        self.assertEqual(
+            my_timesheet.timesheet.shape[0], 9, "Check session added to timesheet"
+        )
+
+        # Remove timesheet and records
+        Path.unlink(timesheet_file)
+        Path.unlink(records_file)
+
+    def test_check(self):
+        """Test checking timesheet for problems from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data with an overlapping session and a long gap added by hand
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        with open(timesheet_file, "a") as file:
+            file.write("2023-03-16,16:00,18:00,02:00,\n")
+            file.write("2023-03-16,23:00,23:30,00:30,\n")
+
+        # Check timesheet
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, ["--file", str(timesheet_file), "--check"]
+            )
+
+        # Check overlap and long gap reported
+        self.assertIn("overlaps row 7", output.getvalue(), "Check overlap reported")
+        self.assertIn(
+            "starts 05:00 after row 8 ends", output.getvalue(), "Check gap reported"
+        )
+
+        # Check gap allowed with longer threshold
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, ["--file", str(timesheet_file), "--check", "--max-gap", "6"]
+            )
+        self.assertNotIn("long_gap", output.getvalue(), "Check gap not reported")
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_punch_check(self):
+        """Test sessions added with start and end times from command line pass checks"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        for timesheet_file, file_format in [
+            (Path("outputs/test_timesheet.csv"), []),
+            (Path("outputs/test_timesheet.fwf"), []),
+            (Path("outputs/test_partitioned"), ["--format", "partitioned"]),
+        ]:
+
+            # Add two sessions
+            for arguments in [
+                ["-s", "00:01"],
+                ["-e", "00:02"],
+                ["-s", "00:03"],
+                ["-e", "01:33"],
+            ]:
+                command_line_interface_functions.parse_command_line_arguments(
+                    parser, ["--file", str(timesheet_file)] + file_format + arguments
+                )
+
+            # Check timesheet
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                command_line_interface_functions.parse_command_line_arguments(
+                    parser, ["--file", str(timesheet_file)] + file_format + ["--check"]
+                )
+
+            # Check no problems reported
+            self.assertIn(
+                "No problems found",
+                output.getvalue(),
+                f"Check no problems reported ({file_format})",
+            )
+
+            # Remove timesheet
+            if timesheet_file.is_dir():
+                shutil.rmtree(timesheet_file)
+            else:
+                Path.unlink(timesheet_file)
+
+    def test_stream(self):
+        """Test streaming summary and conversion from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Print streamed summary
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, ["--file", str(timesheet_file), "--stream", "--summary"]
+            )
+        self.assertIn(
+            "2023-03-13       07:36", output.getvalue(), "Check hours per day printed"
+        )
+
+        # Check streamed conversion to binary format rejected
+        with self.assertRaises(Exception):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser,
+                [
+                    "--file",
+                    str(timesheet_file),
+                    "--stream",
+                    "--convert",
+                    "outputs/test_timesheet.feather",
+                ],
+            )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_partitioned(self):
+        """Test converting to partitioned timesheet, adding times and compacting from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data and convert to partitioned timesheet
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        timesheet_directory = Path("outputs/test_partitioned")
+        command_line_interface_functions.parse_command_line_arguments(
+            parser,
+            ["--file", str(timesheet_file), "--convert", f"{timesheet_directory}/"],
+        )
+
+        # Add start time (today) and compact old months
+        command_line_interface_functions.parse_command_line_arguments(
+            parser, ["--file", str(timesheet_directory), "-s", "00:01", "--compact"]
+        )
+
+        # Check shards and records
+        self.assertEqual(
+            sorted(path.name for path in timesheet_directory.glob("*.csv")),
+            ["2023.csv", f"{date.today().strftime('%Y-%m')}.csv"],
+            "Check yearly shard and shard for current month",
+        )
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_directory)
+        self.assertEqual(
+            my_timesheet.timesheet.shape[0], 9, "Check all records in shards"
+        )
+
+        # Remove timesheets
+        Path.unlink(timesheet_file)
+        shutil.rmtree(timesheet_directory)
+
+    def test_occupancy(self):
+        """Test minutes worked per day of the week and hour printed from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data (Monday to Thursday of one week)
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Print minutes worked per 15 minutes from Wednesday
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser,
+                ["--file", str(timesheet_file), "--occupancy", "15min"]
+                + ["--from", "2023-03-15"],
+            )
+
+        # Check one row per 15 minutes with minutes worked on each day
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2 + 96, "Check header and row per 15 minutes")
+        self.assertEqual(
+            lines[2 + 4 * 8 + 1].split(),
+            ["08:15", "0", "0", "8", "0", "0", "0", "0"],
+            "Check minutes worked from Wednesday 08:22",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_grep(self):
+        """Test records with notes containing words printed from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Search notes up to Wednesday
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser,
+                ["--file", str(timesheet_file), "--grep", "of NOTE"]
+                + ["--to", "2023-03-15"],
+            )
+
+        # Check header and matching records printed
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 1 + 5, "Check header and matching records")
+        self.assertEqual(
+            lines[-1].split(),
+            ["2023-03-15", "12:15", "17:05", "04:50", "nothing", "of", "note"],
+            "Check last matching record",
+        )
+
+        # Remove timesheet and notes index
+        Path.unlink(timesheet_file)
+        Path.unlink(search_functions.get_notes_index_file_name(timesheet_file))
+
+    def test_fixed_width(self):
+        """Test adding times to and editing fixed width timesheet from command line"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Add start and end times then change note and end time of session
+        timesheet_file = Path("outputs/test_timesheet.fwf")
+        for arguments in [
+            ["-s", "00:01"],
+            ["-e", "00:02"],
+            ["--edit", "-1", "notes=a, b", "end_time=00:03"],
+        ]:
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, ["--file", str(timesheet_file)] + arguments
+            )
+
+        # Check record changed in place
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        self.assertEqual(
+            my_timesheet.timesheet.notes.iloc[-1], "a, b", "Check note changed"
+        )
+        self.assertEqual(
+            my_timesheet.timesheet.end_time.iloc[-1],
+            pd.Timestamp("1900-01-01 00:03:00"),
+            "Check end time changed",
+        )
+
+        # Check edit without column=value rejected
+        with self.assertRaises(Exception):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser, ["--file", str(timesheet_file), "--edit", "0"]
+            )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_profile(self):
+        """Test phases of profiled runs appended to metrics file"""
+
+        # Build the command line interface parser
+        parser = command_line_interface_functions.build_command_line_interface()
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Check timesheet and add start time with profiling on
+        metrics_file = Path("outputs/test_metrics.jsonl")
+        with contextlib.redirect_stdout(io.StringIO()):
+            command_line_interface_functions.parse_command_line_arguments(
+                parser,
+                [
+                    "--file",
+                    str(timesheet_file),
+                    "--check",
+                    "--profile",
+                    str(metrics_file),
+                ],
+            )
+        command_line_interface_functions.parse_command_line_arguments(
+            parser,
+            [
+                "--file",
+                str(timesheet_file),
+                "-s",
+                "00:01",
+                "--profile",
+                str(metrics_file),
+            ],
+        )
+
+        # Check one line per run with phases of each
+        runs = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+        phases = [{phase["name"]: phase for phase in run["phases"]} for run in runs]
+        self.assertEqual(len(runs), 2, "Check one line per run")
+        self.assertEqual(phases[0]["check"]["rows"], 8, "Check checked rows counted")
+        self.assertGreater(
+            phases[0]["read_file"]["bytes_read"], 0, "Check bytes read counted"
+        )
+        self.assertIn("commit", phases[1], "Check punch committed")
+
+        # Remove timesheet and metrics file
+        Path.unlink(timesheet_file)
+        Path.unlink(metrics_file)
+
+    def test_cold_punch_import_time(self):
+        """Test adding a start time from the command line doesn't import pandas and starts quickly"""
+
+        # Set import time budget for a cold punch (pandas import alone takes longer than this)
+        import_time_budget_seconds = 0.25
+
+        # Measure import times when adding a start time
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        import_times = benchmark_functions.measure_command_line_import_times(
+            ["--file", str(timesheet_file), "--start", "09:00"]
+        )
+
+        # Check pandas wasn't imported
+        self.assertNotIn(
+            "pandas", list(import_times.module), "Check pandas not imported for punch"
+        )
+
+        # Check total import time within budget
+        total_import_seconds = import_times[
+            import_times.top_level
+        ].cumulative_seconds.sum()
+        self.assertLess(
+            total_import_seconds,
+            import_time_budget_seconds,
+            f"Check punch imports take less than {import_time_budget_seconds} seconds",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
 
 if __name__ == "__main__":
     unittest.main()
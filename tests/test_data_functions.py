@@ -2,6 +2,8 @@
 import unittest  # running tests
 from pathlib import Path  # handling file paths
 from datetime import datetime  # working with dates and times
+import numpy as np  # comparing time differences
+import pandas as pd  # reading synthetic timesheets
 
 # Local imports
 from timesheet import data_functions  # functions for working with data
@@ -63,6 +65,116 @@ class TestDataFunctions(unittest.TestCase):
             "Check time difference calculation",
         )
 
+    def test_calculate_time_difference_array(self):
+        """Test time differences calculated for arrays with invalid pairs reported together"""
+
+        # Create start and end times (overnight, valid, missing and negative)
+        start_times = pd.to_datetime(["22:00", "08:00", None, "10:00"], format="%H:%M")
+        end_times = pd.to_datetime(["02:00", "09:00", "10:00", "09:30"], format="%H:%M")
+
+        # Check invalid pairs marked
+        differences, invalid = data_functions.calculate_time_difference_array(
+            start_times, end_times
+        )
+        self.assertEqual(
+            invalid.tolist(), [True, False, True, True], "Check invalid pairs marked"
+        )
+        self.assertEqual(
+            differences[1], np.timedelta64(1, "h"), "Check time difference calculation"
+        )
+
+        # Check sessions crossing midnight moved to next day
+        differences, invalid = data_functions.calculate_time_difference_array(
+            start_times, end_times, overnight=True
+        )
+        self.assertEqual(
+            invalid.tolist(),
+            [False, False, True, False],
+            "Check overnight sessions valid",
+        )
+        self.assertEqual(
+            differences[0], np.timedelta64(4, "h"), "Check overnight time difference"
+        )
+
+        # Check list version reports all invalid pairs
+        with self.assertRaisesRegex(Exception, r"\[0, 2, 3\]"):
+            data_functions.calculate_time_differences(
+                list(start_times), list(end_times)
+            )
+
+    def test_create_synthetic_timesheet(self):
+        """Test that synthetic timesheet written with requested number of sessions"""
+
+        # Create the synthetic data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_synthetic_timesheet(
+            file_name=timesheet_file, n_sessions=5
+        )
+
+        # Check number of lines (header plus sessions)
+        with open(timesheet_file) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 6, "Check header and sessions written")
+        self.assertEqual(
+            lines[-1],
+            "2000-01-03,08:00,11:45,03:45,nothing of note",
+            "Check last session written",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_create_synthetic_timesheet_options(self):
+        """Test synthetic timesheet with days, notes and open sessions options"""
+
+        # Create the synthetic data with every session open
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_synthetic_timesheet(
+            file_name=timesheet_file,
+            n_days=3,
+            sessions_per_day=4,
+            notes=["meeting, with team", "coding"],
+            open_session_fraction=1,
+        )
+
+        # Check sessions written for each day, with notes quoted and no end times
+        timesheet = pd.read_csv(timesheet_file, keep_default_na=False)
+        self.assertEqual(timesheet.shape[0], 12, "Check sessions for each day written")
+        self.assertTrue(
+            timesheet.notes.isin(["meeting, with team", "coding"]).all(),
+            "Check notes chosen from those provided",
+        )
+        self.assertTrue((timesheet.end_time == "").all(), "Check sessions left open")
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_concat_timesheets(self):
+        """Test notes stay dictionary-encoded when timesheets with different notes joined"""
+
+        # Create timesheets with different notes
+        first = pd.DataFrame({"date": ["2023-03-13"], "notes": ["b"]})
+        second = pd.DataFrame(
+            {"date": ["2023-03-14", "2023-03-15"], "notes": ["a", None]}
+        )
+
+        # Check notes categories merged and missing notes empty
+        timesheet = data_functions.concat_timesheets([first, second])
+        self.assertIsInstance(
+            timesheet.notes.dtype, pd.CategoricalDtype, "Check notes categorical"
+        )
+        self.assertEqual(
+            timesheet.notes.cat.categories.tolist(),
+            ["", "a", "b"],
+            "Check categories merged",
+        )
+        self.assertEqual(
+            timesheet.notes.tolist(), ["b", "a", ""], "Check notes in order"
+        )
+        self.assertEqual(
+            timesheet.columns.tolist(), ["date", "notes"], "Check column order kept"
+        )
+
     def test_check_string_pattern_match(self):
 
         # Check raises exception when string format wrong
@@ -0,0 +1,129 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+
+# Local imports
+from timesheet import file_functions  # functions for working with files
+
+
+class TestFileFunctions(unittest.TestCase):
+    def test_find_last_line_offset(self):
+        """Test start of last line found when reading file backwards"""
+
+        # Create temporary file
+        temporary_file_path = Path("outputs/test_file.txt")
+        with open(temporary_file_path, "w") as file:
+            file.write("first line\nsecond line\nthird line\n")
+
+        # Check last line offset found with small and large blocks
+        for block_size in [3, 4096]:
+            self.assertEqual(
+                file_functions.find_last_line_offset(
+                    temporary_file_path, block_size=block_size
+                ),
+                len("first line\nsecond line\n"),
+                f"Check last line offset found with block size {block_size}",
+            )
+
+        # Remove temporary file
+        Path.unlink(temporary_file_path)
+
+    def test_read_header_and_lines_between(self):
+        """Test reading lines between keys of sorted file"""
+
+        # Create temporary file with lines sorted by date
+        temporary_file_path = Path("outputs/test_file.txt")
+        with open(temporary_file_path, "w") as file:
+            file.write("date\n2023-03-13,a\n2023-03-13,b\n2023-03-14,c\n2023-03-16,d\n")
+
+        # Check offset of first line on or after date
+        self.assertEqual(
+            file_functions.find_first_line_offset(
+                temporary_file_path, "2023-03-15", start_offset=5
+            ),
+            len("date\n2023-03-13,a\n2023-03-13,b\n2023-03-14,c\n"),
+            "Check offset of first line on or after key",
+        )
+
+        # Check header and lines between keys read
+        self.assertEqual(
+            file_functions.read_header_and_lines_between(
+                temporary_file_path, start_key="2023-03-13", end_key="2023-03-16"
+            ),
+            b"date\n2023-03-13,a\n2023-03-13,b\n2023-03-14,c\n",
+            "Check lines between keys read",
+        )
+        self.assertEqual(
+            file_functions.read_header_and_lines_between(
+                temporary_file_path, start_key="2023-03-17"
+            ),
+            b"date\n",
+            "Check only header read when no lines after key",
+        )
+
+        # Remove temporary file
+        Path.unlink(temporary_file_path)
+
+    def test_append_and_replace_last_line(self):
+        """Test appending a line and replacing the last line of a file"""
+
+        # Create temporary file without trailing newline
+        temporary_file_path = Path("outputs/test_file.txt")
+        with open(temporary_file_path, "w") as file:
+            file.write("header\nfirst")
+
+        # Append line and check newline added before it
+        file_functions.append_line(temporary_file_path, "second\n")
+        with open(temporary_file_path) as file:
+            self.assertEqual(
+                file.read(), "header\nfirst\nsecond\n", "Check line appended"
+            )
+
+        # Replace last line and check rest of file unchanged
+        file_functions.replace_last_line(temporary_file_path, "replaced\n")
+        with open(temporary_file_path) as file:
+            self.assertEqual(
+                file.read(), "header\nfirst\nreplaced\n", "Check last line replaced"
+            )
+
+        # Remove temporary file
+        Path.unlink(temporary_file_path)
+
+    def test_read_header_and_last_line(self):
+        """Test header and last line of CSV file read"""
+
+        # Create temporary CSV file
+        temporary_file_path = Path("outputs/test_file.csv")
+        with open(temporary_file_path, "w") as file:
+            file.write('a,b,c\n1,2,3\n4,"five, six",\n')
+
+        # Read header and last line
+        header, last_line = file_functions.read_header_and_last_line(
+            temporary_file_path
+        )
+        self.assertEqual(header, ["a", "b", "c"], "Check header read")
+        self.assertEqual(last_line, ["4", "five, six", ""], "Check last line read")
+
+        # Check no last line when file only has header
+        with open(temporary_file_path, "w") as file:
+            file.write("a,b,c\n")
+        header, last_line = file_functions.read_header_and_last_line(
+            temporary_file_path
+        )
+        self.assertIsNone(last_line, "Check no last line in header only file")
+
+        # Remove temporary file
+        Path.unlink(temporary_file_path)
+
+    def test_format_csv_line(self):
+        """Test values formatted as CSV line"""
+
+        self.assertEqual(
+            file_functions.format_csv_line(["2023-03-13", "08:24", "", "a, note"]),
+            '2023-03-13,08:24,,"a, note"\n',
+            "Check CSV line formatted with quoting",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
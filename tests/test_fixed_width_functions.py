@@ -0,0 +1,141 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from datetime import datetime  # creating start and end times
+import pandas as pd  # comparing timesheets
+
+# Local imports
+from timesheet import fixed_width_functions  # fixed width timesheets
+from timesheet import timesheet  # timesheet class
+
+# Sessions with notes of different lengths
+RECORDS = [
+    {"date": "2023-11-06", "start_time": "09:00", "end_time": "12:00", "notes": ""},
+    {"date": "2023-11-07", "start_time": "13:00", "end_time": "17:30", "notes": "a, b"},
+    {"date": "2023-12-04", "start_time": "08:30", "end_time": "10:00", "notes": "call"},
+]
+
+
+class TestFixedWidthFunctions(unittest.TestCase):
+    def test_format_line(self):
+        """Test records formatted to fixed width lines and parsed back"""
+
+        # Format record with missing end time
+        line_width = fixed_width_functions.get_line_width(8)
+        record = {
+            "date": "2023-11-06",
+            "start_time": "09:00",
+            "end_time": "",
+            "time_worked": "00:00",
+            "notes": "a, b",
+        }
+        line = fixed_width_functions.format_line(record, line_width)
+        self.assertEqual(
+            line, b"2023-11-06,09:00,     ,00:00,a, b    \n", "Check fields padded"
+        )
+        self.assertEqual(len(line), line_width, "Check line width")
+        self.assertEqual(
+            fixed_width_functions.parse_line(line), record, "Check padding removed"
+        )
+
+        # Check note longer than notes field raises
+        with self.assertRaises(Exception):
+            fixed_width_functions.format_field("notes", "a long note", line_width)
+
+    def test_commit_operation(self):
+        """Test start times append records and end times patch last record in place"""
+
+        # Create fixed width timesheet with sessions
+        timesheet_file = Path("outputs/test_timesheet.fwf")
+        fixed_width_functions.create_timesheet(timesheet_file)
+        timesheet.Timesheet(file_name=timesheet_file, lazy=True).add_records(RECORDS)
+        line_width = fixed_width_functions.read_line_width(timesheet_file)
+        old_content = timesheet_file.read_bytes()
+
+        # Add start time then end time
+        fixed_width_functions.commit_operation(
+            timesheet_file, "start", datetime(2024, 1, 8, 9, 0)
+        )
+        self.assertEqual(
+            fixed_width_functions.count_records(timesheet_file, line_width),
+            4,
+            "Check start time appended record",
+        )
+        file_stamp = fixed_width_functions.totals_functions.get_file_stamp(
+            timesheet_file
+        )
+        new_file_stamp = fixed_width_functions.commit_operation(
+            timesheet_file, "end", datetime(2024, 1, 8, 10, 30), file_stamp
+        )
+        self.assertNotEqual(new_file_stamp, None, "Check new stamp returned")
+
+        # Check end time patched without changing earlier records or file size
+        content = timesheet_file.read_bytes()
+        self.assertEqual(
+            content[: len(old_content)], old_content, "Check earlier records unchanged"
+        )
+        self.assertEqual(len(content), len(old_content) + line_width, "Check file size")
+        last_record = fixed_width_functions.read_last_record(timesheet_file)
+        self.assertEqual(
+            (last_record["end_time"], last_record["time_worked"]),
+            ("10:30", "01:30"),
+            "Check end time and time worked added",
+        )
+
+        # Check end time before start time, and end time of ended session, rejected
+        with self.assertRaises(Exception):
+            fixed_width_functions.commit_operation(
+                timesheet_file, "end", datetime(2024, 1, 8, 8, 0)
+            )
+        with self.assertRaisesRegex(Exception, "already ended"):
+            fixed_width_functions.commit_operation(
+                timesheet_file, "end", datetime(2024, 1, 8, 11, 0)
+            )
+
+        # Check records read back as timesheet
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        self.assertEqual(my_timesheet.timesheet.shape[0], 4, "Check records read")
+        self.assertEqual(
+            my_timesheet.timesheet.notes.astype(str).tolist(),
+            ["", "a, b", "call", ""],
+            "Check notes read",
+        )
+
+        # Clean up
+        Path.unlink(timesheet_file)
+
+    def test_patch_record(self):
+        """Test one record changed in place and rows counted back from last record"""
+
+        # Create fixed width timesheet with sessions
+        timesheet_file = Path("outputs/test_timesheet.fwf")
+        fixed_width_functions.create_timesheet(timesheet_file)
+        timesheet.Timesheet(file_name=timesheet_file, lazy=True).add_records(RECORDS)
+
+        # Change note and start time of first record
+        fixed_width_functions.patch_record(
+            timesheet_file, -3, {"notes": "planning", "start_time": "08:45"}
+        )
+        record = fixed_width_functions.read_record(timesheet_file, 0)
+        self.assertEqual(record["notes"], "planning", "Check note changed")
+        self.assertEqual(record["start_time"], "08:45", "Check start time changed")
+        self.assertEqual(
+            fixed_width_functions.read_record(timesheet_file, 1)["notes"],
+            "a, b",
+            "Check next record unchanged",
+        )
+
+        # Check value too long and row outside timesheet change nothing
+        content = timesheet_file.read_bytes()
+        with self.assertRaises(Exception):
+            fixed_width_functions.patch_record(timesheet_file, 0, {"notes": "x" * 100})
+        with self.assertRaises(Exception):
+            fixed_width_functions.patch_record(timesheet_file, 3, {"notes": "x"})
+        self.assertEqual(timesheet_file.read_bytes(), content, "Check file unchanged")
+
+        # Clean up
+        Path.unlink(timesheet_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
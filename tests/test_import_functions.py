@@ -0,0 +1,150 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import json  # writing JSON lines records
+import pandas as pd  # building records
+
+# Local imports
+from timesheet import import_functions  # validating and merging imported sessions
+from timesheet import timesheet  # timesheet class
+from timesheet import storage  # reading timesheet files
+from timesheet import data_functions  # functions for working with data
+
+
+class TestImportFunctions(unittest.TestCase):
+    def test_convert_records_to_timesheet(self):
+        """Test malformed records all reported together"""
+
+        # Define records with problems
+        records = pd.DataFrame(
+            {
+                "date": ["2023-03-17", "17/03/2023", "2023-03-18", "2023-03-18"],
+                "start_time": ["08:00", "08:00", "9am", "14:00"],
+                "end_time": ["12:00", "12:00", "12:00", "13:00"],
+            }
+        )
+
+        # Check each problem reported
+        with self.assertRaises(import_functions.TimesheetImportError) as context:
+            import_functions.convert_records_to_timesheet(records)
+        self.assertEqual(
+            context.exception.errors.values.tolist(),
+            [
+                [1, "date isn't formatted as %Y-%m-%d"],
+                [2, "start_time isn't formatted as %H:%M"],
+                [3, "start_time isn't before end_time"],
+            ],
+            "Check malformed records reported",
+        )
+
+        # Check valid records converted (notes optional)
+        new_timesheet = import_functions.convert_records_to_timesheet(records.iloc[:1])
+        self.assertEqual(
+            new_timesheet.time_worked[0], pd.Timedelta(hours=4), "Check time worked"
+        )
+        self.assertEqual(new_timesheet.notes[0], "", "Check empty notes")
+
+    def test_check_overlaps(self):
+        """Test overlaps between new sessions and with existing sessions reported"""
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        existing_timesheet = storage.get_storage(timesheet_file).read()
+
+        # Define new sessions (second overlaps existing session, last two overlap)
+        new_timesheet = import_functions.convert_records_to_timesheet(
+            pd.DataFrame(
+                {
+                    "date": ["2023-03-13", "2023-03-14", "2023-03-17", "2023-03-17"],
+                    "start_time": ["12:00", "12:00", "13:00", "08:00"],
+                    "end_time": ["12:24", "12:50", "14:00", "13:30"],
+                }
+            )
+        )
+
+        # Check overlaps reported
+        with self.assertRaises(import_functions.TimesheetImportError) as context:
+            import_functions.check_overlaps(new_timesheet, existing_timesheet)
+        self.assertEqual(
+            context.exception.errors.values.tolist(),
+            [
+                [1, "overlaps a session already in timesheet"],
+                [2, "overlaps record 3"],
+            ],
+            "Check overlaps reported",
+        )
+
+        # Check sessions touching existing sessions allowed
+        import_functions.check_overlaps(new_timesheet.iloc[:1], existing_timesheet)
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_add_records(self):
+        """Test records added to CSV and Feather timesheets in date order"""
+
+        # Define records (JSON lines) between and after existing sessions
+        records = [
+            {"date": "2023-03-17", "start_time": "08:00", "end_time": "12:00"},
+            {
+                "date": "2023-03-14",
+                "start_time": "17:00",
+                "end_time": "18:15",
+                "notes": "backfilled",
+            },
+        ]
+        records_file = Path("outputs/test_records.jsonl")
+        with open(records_file, "w") as file:
+            file.writelines(json.dumps(record) + "\n" for record in records)
+
+        for file_format in ["csv", "feather"]:
+
+            # Create the dummy data
+            timesheet_file = Path(f"outputs/test_timesheet.{file_format}")
+            data_functions.create_dummy_timesheet(file_name=Path("outputs/dummy.csv"))
+            storage.get_storage(timesheet_file).write(
+                storage.get_storage(Path("outputs/dummy.csv")).read()
+            )
+            Path.unlink(Path("outputs/dummy.csv"))
+
+            # Add records
+            my_timesheet = timesheet.Timesheet(file_name=timesheet_file, lazy=True)
+            n_sessions = my_timesheet.add_records(
+                import_functions.read_import_file(records_file)
+            )
+
+            # Check records added in date order
+            timesheet_data = storage.get_storage(timesheet_file).read()
+            self.assertEqual(n_sessions, 2, "Check number of sessions added")
+            self.assertEqual(timesheet_data.shape[0], 10, "Check sessions added")
+            self.assertEqual(
+                timesheet_data.notes[4], "backfilled", "Check session merged by date"
+            )
+            self.assertEqual(
+                timesheet_data.time_worked[4],
+                pd.Timedelta(hours=1, minutes=15),
+                "Check time worked calculated",
+            )
+            self.assertEqual(
+                my_timesheet.timesheet.shape[0], 10, "Check timesheet object updated"
+            )
+
+            # Check overlapping records rejected (nothing added)
+            with self.assertRaises(import_functions.TimesheetImportError):
+                my_timesheet.add_records(records)
+            self.assertEqual(
+                storage.get_storage(timesheet_file).read().shape[0],
+                10,
+                "Check nothing added",
+            )
+
+            # Remove timesheet
+            Path.unlink(timesheet_file)
+
+        # Remove records
+        Path.unlink(records_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
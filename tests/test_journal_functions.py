@@ -0,0 +1,155 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from datetime import datetime  # working with dates and times
+import threading  # checking nested locks don't wait forever
+
+# Local imports
+from timesheet import journal_functions  # locking and journalling changes to timesheet
+from timesheet import punch_functions  # adding start and end times without pandas
+from timesheet import file_functions  # formatting CSV lines
+from timesheet import data_functions  # functions for working with data
+
+
+class TestJournalFunctions(unittest.TestCase):
+    def test_parse_operations(self):
+        """Test operations parsed from journal with partial lines ignored"""
+
+        content = (
+            b"1-1,start,2023-03-17T08:00:00\n"
+            b"1-2,end,2023-03-17T09:30:00\n"
+            b"1-3,end,2023-03-1"
+        )
+        operations = journal_functions.parse_operations(content)
+        self.assertEqual(
+            [operation["operation_id"] for operation in operations],
+            ["1-1", "1-2"],
+            "Check complete operations parsed",
+        )
+        self.assertEqual(
+            operations[1]["time"], datetime(2023, 3, 17, 9, 30), "Check time parsed"
+        )
+
+    def test_apply_redo(self):
+        """Test change left in redo record by a crash completed at next commit"""
+
+        # Create the dummy data and journal an end time
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        operation_id = journal_functions.append_operation(
+            timesheet_file, "start", datetime(2023, 3, 17, 8, 0)
+        )
+
+        # Write redo record, then crash before applying it (half the tail written)
+        last_record, offset = punch_functions.read_last_record_and_offset(
+            timesheet_file
+        )
+        last_line = file_functions.format_csv_line(["2023-03-17", "08:00", "", "", ""])
+        tail = file_functions.format_csv_line(last_record.values()) + last_line
+        journal_functions.write_redo(
+            timesheet_file,
+            offset=offset,
+            tail=tail,
+            operation_ids=[operation_id],
+            rejected={},
+        )
+        with open(timesheet_file, "r+") as file:
+            file.seek(offset)
+            file.write(tail[: len(tail) // 2])
+            file.truncate()
+
+        # Check change completed and journal emptied by next commit
+        with journal_functions.commit_lock(timesheet_file):
+            pass
+        with open(timesheet_file) as file:
+            self.assertEqual(
+                file.read().splitlines()[-1],
+                last_line.strip(),
+                "Check redo record applied",
+            )
+        self.assertEqual(
+            journal_functions.read_operations(timesheet_file),
+            [],
+            "Check journalled operations removed",
+        )
+        for journal_file_name in journal_functions.get_journal_file_names(
+            timesheet_file
+        ).values():
+            self.assertFalse(
+                Path.exists(journal_file_name),
+                f"Check {journal_file_name} removed",
+            )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_commit_lock(self):
+        """Test commit lock taken again by the thread holding it doesn't wait for itself"""
+
+        # Take commit lock inside commit lock in another thread
+        timesheet_file = Path("outputs/test_timesheet.csv")
+
+        def take_nested_lock():
+            with journal_functions.commit_lock(timesheet_file):
+                with journal_functions.commit_lock(timesheet_file):
+                    pass
+
+        thread = threading.Thread(target=take_nested_lock, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), "Check nested lock taken")
+
+        # Check lock released once outer lock finished
+        with journal_functions.commit_lock(timesheet_file):
+            pass
+        self.assertFalse(
+            Path.exists(
+                journal_functions.get_journal_file_names(timesheet_file)["lock"]
+            ),
+            "Check lock file removed",
+        )
+
+    def test_commit_operation(self):
+        """Test journalled operations added to timesheet and rejections reported"""
+
+        # Create the dummy data (last session ends 17:00)
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Journal a start time another process hasn't committed yet, then commit end time
+        journal_functions.append_operation(
+            timesheet_file, "start", datetime(2023, 3, 17, 18, 0)
+        )
+        punch_functions.commit_operation(
+            timesheet_file, "end", datetime(2023, 3, 17, 19, 0)
+        )
+        self.assertEqual(
+            punch_functions.read_last_record(timesheet_file),
+            {
+                "date": "2023-03-17",
+                "start_time": "18:00",
+                "end_time": "19:00",
+                "time_worked": "01:00",
+                "notes": "",
+            },
+            "Check both journalled operations added",
+        )
+
+        # Check start time before current end time rejected
+        with self.assertRaisesRegex(Exception, "not after the current end_time"):
+            punch_functions.commit_operation(
+                timesheet_file, "start", datetime(2023, 3, 17, 18, 30)
+            )
+        rejected_file_name = journal_functions.get_journal_file_names(timesheet_file)[
+            "rejected"
+        ]
+        self.assertFalse(
+            Path.exists(rejected_file_name), "Check rejection removed once reported"
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
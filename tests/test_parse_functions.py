@@ -0,0 +1,147 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import numpy as np  # building character arrays
+import pandas as pd  # comparing timesheets
+
+# Local imports
+from timesheet import parse_functions  # parsing timesheet CSV files
+from timesheet import data_functions  # functions for working with data
+
+
+class TestParseFunctions(unittest.TestCase):
+    def test_decode_dates(self):
+        """Test decoding dates checks format and that day exists"""
+
+        # Convert example dates to characters
+        characters, lengths = parse_functions.convert_strings_to_characters(
+            pd.Series(["2024-02-29", "2023-02-29", "2023-1-01", "2023-13-01"]), 10
+        )
+        dates, valid = parse_functions.decode_dates(characters, lengths)
+
+        # Check decoded dates
+        self.assertEqual(
+            valid.tolist(),
+            [True, False, False, False],
+            "Check only existing dates in YYYY-mm-dd format valid",
+        )
+        self.assertEqual(
+            dates[0], np.datetime64("2024-02-29"), "Check leap day decoded correctly"
+        )
+
+    def test_decode_times(self):
+        """Test decoding times checks format and allows missing times"""
+
+        # Convert example times to characters
+        characters, lengths = parse_functions.convert_strings_to_characters(
+            pd.Series(["09:05", "", "9:05", "24:00"]), 5
+        )
+        minutes, valid = parse_functions.decode_times(characters, lengths)
+
+        # Check decoded times
+        self.assertEqual(
+            valid.tolist(),
+            [True, True, False, False],
+            "Check only hh:mm times (or missing times) valid",
+        )
+        self.assertEqual(minutes[:2].tolist(), [545, -1], "Check minutes decoded")
+
+    def test_gather_characters_past_end(self):
+        """Test characters past the end of the buffer gathered as zeros"""
+
+        # Gather characters from buffer shorter than width
+        buffer = np.frombuffer(b"ab", dtype=np.uint8)
+        characters = parse_functions.gather_characters(buffer, np.array([0, 1]), 3)
+
+        # Check characters past end are zero
+        self.assertEqual(
+            characters.tolist(),
+            [[97, 98, 0], [98, 0, 0]],
+            "Check characters past end of buffer are zero",
+        )
+
+    def test_parse_timesheet_csv_empty(self):
+        """Test parsing timesheet with only a header gives empty timesheet"""
+
+        # Parse header only
+        timesheet = parse_functions.parse_timesheet_csv(
+            b"date,start_time,end_time,time_worked,notes\n"
+        )
+
+        # Check empty timesheet with every column
+        self.assertEqual(timesheet.shape, (0, 5), "Check empty timesheet")
+
+    def test_parse_timesheet_csv(self):
+        """Test parsing timesheet matches parsing with pandas"""
+
+        # Create a dummy timesheet
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_synthetic_timesheet(timesheet_file, n_sessions=50)
+        with open(timesheet_file, "a") as file:
+            file.write("2000-01-26,08:00,,00:00,\n")
+
+        # Parse timesheet
+        timesheet = parse_functions.parse_timesheet_csv(timesheet_file.read_bytes())
+
+        # Parse timesheet with pandas
+        expected_timesheet = pd.read_csv(timesheet_file, keep_default_na=False)
+        expected_timesheet["date"] = pd.to_datetime(expected_timesheet["date"])
+        for column in ["start_time", "end_time"]:
+            expected_timesheet[column] = pd.to_datetime(
+                expected_timesheet[column], format="%H:%M"
+            )
+        expected_timesheet["time_worked"] = pd.to_timedelta(
+            expected_timesheet["time_worked"] + ":00"
+        )
+        expected_timesheet["notes"] = expected_timesheet["notes"].astype("category")
+
+        # Check timesheets match
+        pd.testing.assert_frame_equal(timesheet, expected_timesheet, check_dtype=False)
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_parse_timesheet_csv_quoted_notes(self):
+        """Test parsing timesheet with notes containing commas"""
+
+        content = (
+            b"date,start_time,end_time,time_worked,notes\n"
+            b'2023-03-02,08:00,09:30,01:30,"meeting, then emails"\n'
+        )
+        timesheet = parse_functions.parse_timesheet_csv(content)
+
+        # Check notes and times
+        self.assertEqual(
+            timesheet.notes[0], "meeting, then emails", "Check quoted notes kept"
+        )
+        self.assertEqual(
+            timesheet.time_worked[0],
+            pd.Timedelta(minutes=90),
+            "Check time worked decoded",
+        )
+
+    def test_parse_timesheet_csv_malformed(self):
+        """Test malformed records reported with their line numbers"""
+
+        content = (
+            b"date,start_time,end_time,time_worked,notes\n"
+            b"2023-02-28,08:00,,00:00,\n"
+            b"2023-02-30,08:00,,00:00,\n"
+            b"2023-03-01,8:00,09:00,01:00,\n"
+            b"broken\n"
+        )
+
+        # Check error raised
+        with self.assertRaises(parse_functions.TimesheetFormatError) as context:
+            parse_functions.parse_timesheet_csv(content)
+
+        # Check errors reported
+        errors = context.exception.errors
+        self.assertEqual(
+            errors.line.tolist(), [3, 4, 5, 5], "Check line numbers of malformed values"
+        )
+        self.assertEqual(
+            errors.column.tolist(),
+            ["date", "start_time", "date", "start_time"],
+            "Check columns of malformed values",
+        )
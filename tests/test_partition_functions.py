@@ -0,0 +1,133 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from datetime import datetime  # creating start and end times
+import shutil  # removing partitioned timesheets
+import pandas as pd  # comparing timesheets
+
+# Local imports
+from timesheet import partition_functions  # partitioned timesheets
+from timesheet import timesheet  # timesheet class
+
+# Sessions spread over three months of two years
+RECORDS = [
+    {"date": "2023-11-06", "start_time": "09:00", "end_time": "12:00", "notes": ""},
+    {"date": "2023-11-07", "start_time": "13:00", "end_time": "17:30", "notes": ""},
+    {"date": "2023-12-04", "start_time": "08:30", "end_time": "10:00", "notes": "a"},
+    {"date": "2024-01-08", "start_time": "09:15", "end_time": "11:45", "notes": ""},
+]
+
+
+class TestPartitionFunctions(unittest.TestCase):
+    def test_find_shard_key(self):
+        """Test records go in existing shard covering their date or new period shard"""
+
+        # Check existing yearly and monthly shards used
+        shard_keys = ["2023", "2024-01"]
+        self.assertEqual(
+            partition_functions.find_shard_key(shard_keys, "2023-12-04", "month"),
+            "2023",
+            "Check yearly shard used",
+        )
+        self.assertEqual(
+            partition_functions.find_shard_key(shard_keys, "2024-01-31", "month"),
+            "2024-01",
+            "Check monthly shard used",
+        )
+
+        # Check new shard for partition period
+        self.assertEqual(
+            partition_functions.find_shard_key(shard_keys, "2024-02-01", "month"),
+            "2024-02",
+            "Check new monthly shard",
+        )
+        self.assertEqual(
+            partition_functions.find_shard_key(shard_keys, "2025-02-01", "year"),
+            "2025",
+            "Check new yearly shard",
+        )
+
+    def test_commit_operation(self):
+        """Test start and end times only change latest shard and manifest"""
+
+        # Create partitioned timesheet with sessions in three months
+        timesheet_directory = Path("outputs/test_partitioned")
+        partition_functions.create_timesheet(timesheet_directory)
+        timesheet.Timesheet(file_name=timesheet_directory, lazy=True).add_records(
+            RECORDS
+        )
+        old_shard = timesheet_directory / "2023-11.csv"
+        old_content = old_shard.read_bytes()
+
+        # Add start and end times in new month
+        partition_functions.commit_operation(
+            timesheet_directory, "start", datetime(2024, 2, 5, 9, 0)
+        )
+        partition_functions.commit_operation(
+            timesheet_directory, "end", datetime(2024, 2, 5, 10, 30)
+        )
+
+        # Check new shard added and described in manifest
+        manifest = partition_functions.read_manifest(timesheet_directory)
+        self.assertEqual(
+            list(manifest["shards"]),
+            ["2023-11", "2023-12", "2024-01", "2024-02"],
+            "Check new monthly shard",
+        )
+        self.assertEqual(
+            manifest["shards"]["2023-11"]["rows"], 2, "Check records counted"
+        )
+        self.assertEqual(
+            manifest["last_record"]["end_time"], "10:30", "Check last record kept"
+        )
+        self.assertEqual(
+            old_shard.read_bytes(), old_content, "Check old shard unchanged"
+        )
+
+        # Check start time before latest shard rejected
+        with self.assertRaises(Exception):
+            partition_functions.commit_operation(
+                timesheet_directory, "start", datetime(2024, 1, 9, 9, 0)
+            )
+
+        # Remove timesheet
+        shutil.rmtree(timesheet_directory)
+
+    def test_read_range_and_compact(self):
+        """Test records between dates read from shards and old months compacted"""
+
+        # Create partitioned timesheet with sessions in three months
+        timesheet_directory = Path("outputs/test_partitioned")
+        my_timesheet = timesheet.Timesheet(
+            file_name=timesheet_directory, lazy=True, file_format="partitioned"
+        )
+        my_timesheet.add_records(RECORDS)
+
+        # Check records read across shards
+        records = my_timesheet.read_range("2023-11-07", "2024-01-08")
+        self.assertEqual(
+            records.date.dt.strftime("%Y-%m-%d").tolist(),
+            ["2023-11-07", "2023-12-04", "2024-01-08"],
+            "Check records between dates",
+        )
+
+        # Compact and check finished years merged into yearly shards
+        full_timesheet = my_timesheet.timesheet.copy()
+        summary = my_timesheet.summarise(period="month")
+        self.assertEqual(
+            my_timesheet.compact(), ["2023", "2024"], "Check years compacted"
+        )
+        self.assertEqual(
+            sorted(path.name for path in timesheet_directory.glob("*.csv")),
+            ["2023.csv", "2024.csv"],
+            "Check only yearly shards left",
+        )
+        pd.testing.assert_frame_equal(my_timesheet.timesheet, full_timesheet)
+        pd.testing.assert_frame_equal(my_timesheet.summarise(period="month"), summary)
+
+        # Remove timesheet
+        shutil.rmtree(timesheet_directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
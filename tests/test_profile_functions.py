@@ -0,0 +1,113 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import json  # reading metrics lines
+import os  # setting profiling environment variable
+import asyncio  # running profiled tasks concurrently
+import threading  # making phases overlap
+
+# Local imports
+from timesheet import profile_functions  # timing phases of runs
+
+
+class TestProfileFunctions(unittest.TestCase):
+    def test_phase(self):
+        """Test phases only recorded while profiling and appended as one line per run"""
+
+        # Check phases do nothing when profiling is off
+        self.assertIs(
+            profile_functions.phase("parse"),
+            profile_functions.DISABLED_PHASE,
+            "Check shared disabled phase used",
+        )
+        self.assertIsNone(
+            profile_functions.finish_profile(), "Check nothing written when off"
+        )
+
+        # Profile two runs with nested phases
+        metrics_file = Path("outputs/test_metrics.jsonl")
+        for rows in [10, 20]:
+            profile_functions.start_profile(["--check"])
+            with profile_functions.phase("read") as read_phase:
+                with profile_functions.phase("parse") as parse_phase:
+                    parse_phase.count(rows=rows)
+                read_phase.count(bytes_read=100)
+            profile_functions.finish_profile(metrics_file)
+
+        # Check one line per run with phases in order finished
+        runs = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+        self.assertEqual(len(runs), 2, "Check one line per run")
+        self.assertEqual(
+            [phase["name"] for phase in runs[1]["phases"]],
+            ["parse", "read"],
+            "Check nested phases recorded",
+        )
+        self.assertEqual(runs[1]["phases"][0]["rows"], 20, "Check rows counted")
+        self.assertEqual(runs[1]["phases"][1]["bytes_read"], 100, "Check bytes counted")
+        self.assertFalse(profile_functions.is_profiling(), "Check profiling stopped")
+
+        # Remove metrics file
+        Path.unlink(metrics_file)
+
+    def test_concurrent_profiles(self):
+        """Test concurrent tasks profiling phases in threads keep their own runs"""
+
+        # Both tasks wait in their phase until the other has started its phase
+        barrier = threading.Barrier(2, timeout=5)
+
+        def work(name):
+            with profile_functions.phase(name):
+                barrier.wait()
+
+        async def profile_task(name):
+            profile_functions.start_profile([name])
+            await asyncio.to_thread(work, name)
+            return profile_functions.finish_profile(metrics_file)
+
+        async def profile_tasks():
+            return await asyncio.gather(profile_task("first"), profile_task("second"))
+
+        # Check each run only has its own phase
+        metrics_file = Path("outputs/test_metrics.jsonl")
+        runs = asyncio.run(profile_tasks())
+        for run in runs:
+            self.assertEqual(
+                [phase["name"] for phase in run["phases"]],
+                run["command"],
+                "Check phases not mixed between runs",
+            )
+        self.assertFalse(profile_functions.is_profiling(), "Check profiling stopped")
+
+        # Remove metrics file
+        Path.unlink(metrics_file)
+
+    def test_get_metrics_file(self):
+        """Test profiling turned on by argument or environment variable"""
+
+        # Check argument used before environment variable
+        variable = profile_functions.PROFILE_ENVIRONMENT_VARIABLE
+        os.environ[variable] = "outputs/other_metrics.jsonl"
+        self.assertEqual(
+            profile_functions.get_metrics_file("outputs/test_metrics.jsonl"),
+            Path("outputs/test_metrics.jsonl"),
+            "Check argument used",
+        )
+        self.assertEqual(
+            profile_functions.get_metrics_file(),
+            Path("outputs/other_metrics.jsonl"),
+            "Check environment variable used",
+        )
+
+        # Check default file and profiling off
+        os.environ[variable] = "1"
+        self.assertEqual(
+            profile_functions.get_metrics_file(),
+            profile_functions.DEFAULT_METRICS_FILE,
+            "Check default metrics file",
+        )
+        del os.environ[variable]
+        self.assertIsNone(profile_functions.get_metrics_file(), "Check profiling off")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from datetime import datetime  # working with dates and times
+
+# Local imports
+from timesheet import punch_functions  # adding start and end times without pandas
+from timesheet import data_functions  # functions for working with data
+
+
+class TestPunchFunctions(unittest.TestCase):
+    def test_parse_time_string(self):
+        """Test time strings converted to datetimes on current date"""
+
+        # Check time string combined with current date
+        current_datetime = datetime(year=2023, month=3, day=13, hour=10, minute=5)
+        self.assertEqual(
+            punch_functions.parse_time_string("08:24", current_datetime),
+            datetime(year=2023, month=3, day=13, hour=8, minute=24),
+            "Check time string converted to datetime",
+        )
+
+        # Check current time used when no time string provided
+        self.assertEqual(
+            punch_functions.parse_time_string(None, current_datetime),
+            current_datetime,
+            "Check current time used when no time provided",
+        )
+
+        # Check raises exception when time string format wrong
+        with self.assertRaises(Exception):
+            punch_functions.parse_time_string("8.24", current_datetime)
+
+    def test_get_current_times(self):
+        """Test current start and end times taken from last record"""
+
+        # Check start time only for open record
+        last_record = punch_functions.create_start_record(
+            datetime(year=2023, month=3, day=13, hour=8, minute=24)
+        )
+        self.assertEqual(
+            punch_functions.get_current_times(last_record),
+            (datetime(year=2023, month=3, day=13, hour=8, minute=24), None),
+            "Check current times for open record",
+        )
+
+        # Check no times when timesheet empty
+        self.assertEqual(
+            punch_functions.get_current_times(None),
+            (None, None),
+            "Check no current times for empty timesheet",
+        )
+
+    def test_add_start_and_end_time(self):
+        """Test adding start and end times straight to timesheet file"""
+
+        # Create a dummy timesheet
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Add start and end times
+        punch_functions.add_start_time(timesheet_file, "23:58")
+        punch_functions.add_end_time(timesheet_file, "23:59")
+
+        # Check last record
+        last_record = punch_functions.read_last_record(timesheet_file)
+        self.assertEqual(
+            (last_record["start_time"], last_record["end_time"]),
+            ("23:58", "23:59"),
+            "Check start and end times written to file",
+        )
+        self.assertEqual(
+            last_record["time_worked"], "00:01", "Check time worked written to file"
+        )
+
+        # Check raises exception when end time isn't after start time
+        with self.assertRaises(Exception):
+            punch_functions.add_end_time(timesheet_file, "23:57")
+
+        # Check raises exception when session already ended
+        with self.assertRaisesRegex(Exception, "already ended"):
+            punch_functions.add_end_time(timesheet_file, "23:59")
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
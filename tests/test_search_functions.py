@@ -0,0 +1,180 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import numpy as np  # comparing rows
+import pandas as pd  # building test notes
+
+# Local imports
+from timesheet import search_functions  # searching notes
+from timesheet import data_functions  # functions for working with data
+
+# Timesheet content with a quoted note spanning two lines and a blank line
+CONTENT = (
+    b"date,start_time,end_time,time_worked,notes\n"
+    b"2023-03-13,08:00,12:00,04:00,Client migration\n"
+    b'2023-03-13,13:00,17:00,04:00,"migration, part\n2"\n'
+    b"\n"
+    b"2023-03-14,08:00,,00:00,\n"
+)
+
+
+class TestSearchFunctions(unittest.TestCase):
+    def test_tokenise(self):
+        """Test text split into distinct lowercase words"""
+
+        self.assertEqual(
+            search_functions.tokenise("Client migration: client call (v2)"),
+            ["client", "migration", "call", "v2"],
+            "Check distinct lowercase words",
+        )
+
+    def test_find_record_offsets(self):
+        """Test records found after newlines outside quotes, skipping blank lines"""
+
+        self.assertEqual(
+            search_functions.find_record_offsets(CONTENT).tolist(),
+            [43, 89, 139],
+            "Check offset of each record",
+        )
+
+    def test_find_rows(self):
+        """Test rows found for notes containing every word of query"""
+
+        # Index notes (including a missing note)
+        notes = pd.Series(
+            ["client migration", "client call", None, "Migration", "client migration"],
+            dtype="category",
+        )
+        token_rows = search_functions.index_notes(notes)
+        self.assertEqual(
+            token_rows["migration"].tolist(), [0, 3, 4], "Check rows of token"
+        )
+
+        # Build index as stored in notes index file
+        tokens = sorted(token_rows)
+        notes_index = {
+            "tokens": np.array(tokens),
+            "pointers": np.cumsum([0] + [len(token_rows[token]) for token in tokens]),
+            "rows": np.concatenate([token_rows[token] for token in tokens]),
+            "offsets": np.arange(5),
+        }
+
+        # Check rows in every token found (between rows if provided)
+        self.assertEqual(
+            search_functions.find_rows(notes_index, "Migration client").tolist(),
+            [0, 4],
+            "Check rows with every word",
+        )
+        self.assertEqual(
+            search_functions.find_rows(
+                notes_index, "migration", start_row=1, end_row=4
+            ).tolist(),
+            [3],
+            "Check rows between start and end rows",
+        )
+        self.assertEqual(
+            search_functions.find_rows(notes_index, "client meeting").tolist(),
+            [],
+            "Check unknown word matches nothing",
+        )
+
+        # Check query without words raises exception
+        with self.assertRaises(Exception):
+            search_functions.find_rows(notes_index, "  ,")
+
+    def test_update_notes_index(self):
+        """Test notes index updated with new records and rebuilt when file changed"""
+
+        # Index timesheet with quoted notes
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        timesheet_file.write_bytes(CONTENT)
+        notes_index = search_functions.update_notes_index(timesheet_file)
+        rows = search_functions.find_rows(notes_index, "migration")
+        self.assertEqual(
+            search_functions.read_records(timesheet_file, notes_index, rows)
+            .notes.astype(str)
+            .tolist(),
+            ["Client migration", "migration, part\n2"],
+            "Check matching records read",
+        )
+
+        # Complete last record and add new record (only records from last record indexed)
+        with open(timesheet_file, "r+b") as file:
+            file.seek(139)
+            file.write(b"2023-03-14,08:00,09:00,01:00,migration\n")
+            file.write(b"2023-03-15,08:00,,00:00,\n")
+        notes_index = search_functions.update_notes_index(timesheet_file)
+        self.assertTrue(
+            search_functions.is_notes_index_current(timesheet_file),
+            "Check index matches file",
+        )
+        self.assertEqual(
+            search_functions.find_rows(notes_index, "migration").tolist(),
+            [0, 1, 2],
+            "Check new record indexed",
+        )
+
+        # Change first record (index rebuilt)
+        timesheet_file.write_bytes(CONTENT.replace(b"Client migration", b"Client call"))
+        notes_index = search_functions.update_notes_index(timesheet_file)
+        self.assertEqual(
+            search_functions.find_rows(notes_index, "migration").tolist(),
+            [1],
+            "Check index rebuilt",
+        )
+
+        # Change note of first record (5 bytes longer) then in index
+        content = CONTENT.replace(b"Client migration", b"client migration")
+        timesheet_file.write_bytes(content)
+        search_functions.update_note(
+            timesheet_file, 0, "Client call", "client migration", length_change=5
+        )
+        notes_index = search_functions.read_notes_index(timesheet_file)
+        self.assertEqual(
+            search_functions.find_rows(notes_index, "migration").tolist(),
+            [0, 1],
+            "Check note changed in index",
+        )
+        self.assertEqual(
+            search_functions.find_rows(notes_index, "call").tolist(),
+            [],
+            "Check old note removed from index",
+        )
+        self.assertEqual(
+            notes_index["offsets"].tolist(),
+            search_functions.find_record_offsets(content).tolist(),
+            "Check offsets of later records moved",
+        )
+
+        # Check index removed elsewhere rebuilt when note changed
+        Path.unlink(search_functions.get_notes_index_file_name(timesheet_file))
+        search_functions.update_note(timesheet_file, 0, "client migration", "call")
+        self.assertTrue(
+            search_functions.is_notes_index_current(timesheet_file),
+            "Check index rebuilt",
+        )
+
+        # Remove timesheet and notes index
+        Path.unlink(timesheet_file)
+        Path.unlink(search_functions.get_notes_index_file_name(timesheet_file))
+
+    def test_search_timesheet(self):
+        """Test timesheet without notes index searched in memory"""
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        my_timesheet = pd.read_csv(timesheet_file, dtype={"notes": "category"})
+
+        # Check matching records found
+        records = search_functions.search_timesheet(my_timesheet, "Simple note")
+        self.assertEqual(
+            records.notes.tolist(), ["a simple note"], "Check record found"
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import threading  # running daemon alongside tests
+import io  # capturing printed output
+import contextlib  # redirecting printed output
+import os  # setting environment variables and permissions
+import shutil  # removing socket directories
+
+# Local imports
+from timesheet import server_functions  # daemon serving command line interface
+from timesheet import command_line_interface_functions  # cli functions
+from timesheet import punch_functions  # reading last records
+from timesheet import totals_functions  # daily totals files
+from timesheet import data_functions  # functions for working with data
+
+
+@unittest.skipUnless(
+    server_functions.is_daemon_supported(), "Unix domain sockets not available"
+)
+class TestServerFunctions(unittest.TestCase):
+    def test_forward_arguments(self):
+        """Test command line arguments run in daemon, which re-reads timesheets edited elsewhere"""
+
+        # Create the dummy data and start daemon
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        socket_path = Path("outputs/test_timesheet.sock")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        server = server_functions.create_server(socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def run_in_daemon(arguments: list[str]) -> str:
+            """Run command line arguments (forwarded to daemon) and return printed output"""
+            parser = command_line_interface_functions.build_command_line_interface()
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                command_line_interface_functions.parse_command_line_arguments(
+                    parser,
+                    ["--file", str(timesheet_file), "--socket", str(socket_path)]
+                    + arguments,
+                )
+            return output.getvalue()
+
+        try:
+
+            # Add start and end times in daemon
+            run_in_daemon(["--start", "09:00", "--end", "11:45"])
+            self.assertEqual(
+                punch_functions.read_last_record(timesheet_file)["end_time"],
+                "11:45",
+                "Check times added by daemon",
+            )
+            self.assertEqual(
+                len(server.timesheets), 1, "Check timesheet kept in memory by daemon"
+            )
+
+            # Check errors in daemon raised in command line interface
+            with self.assertRaisesRegex(Exception, "not after the current start_time"):
+                run_in_daemon(["--start", "12:00", "--end", "10:00"])
+
+            # Check edits made elsewhere picked up by daemon
+            with open(timesheet_file, "a") as file:
+                file.write("2099-01-01,08:00,09:00,01:00,\n")
+            self.assertIn(
+                "2099-01-01      08:00",
+                run_in_daemon(["--from", "2099-01-01"]),
+                "Check daemon re-reads edited timesheet",
+            )
+
+        finally:
+
+            # Stop daemon
+            server.shutdown()
+            server.server_close()
+            thread.join()
+            Path.unlink(socket_path)
+
+        # Check arguments run in this process when daemon not running
+        self.assertFalse(
+            server_functions.forward_arguments({}, socket_path),
+            "Check no daemon found",
+        )
+
+        # Remove timesheet and daily totals
+        Path.unlink(timesheet_file)
+        totals_functions.get_daily_totals_file_name(timesheet_file).unlink(
+            missing_ok=True
+        )
+
+    def test_get_default_socket_path(self):
+        """Test default socket kept in runtime directory or directory for current user"""
+
+        # Check runtime directory used if set
+        environment = dict(os.environ)
+        os.environ.pop("TIMESHEET_SOCKET", None)
+        try:
+            os.environ["XDG_RUNTIME_DIR"] = "/run/user/1000"
+            self.assertEqual(
+                server_functions.get_default_socket_path(),
+                Path("/run/user/1000/timesheet.sock"),
+                "Check socket in runtime directory",
+            )
+
+            # Check directory for current user in temporary directory used otherwise
+            del os.environ["XDG_RUNTIME_DIR"]
+            os.environ["TMPDIR"] = "/tmp"
+            self.assertEqual(
+                server_functions.get_default_socket_path(),
+                Path(f"/tmp/timesheet-{os.getuid()}/timesheet.sock"),
+                "Check socket in directory for current user",
+            )
+        finally:
+            os.environ.clear()
+            os.environ.update(environment)
+
+    def test_socket_permissions(self):
+        """Test only sockets owned by current user in directories others can't change used"""
+
+        # Start daemon in new socket directory
+        socket_directory = Path("outputs/test_sockets")
+        socket_path = socket_directory / "timesheet.sock"
+        server = server_functions.create_server(socket_path)
+        self.assertEqual(
+            socket_directory.stat().st_mode & 0o777,
+            0o700,
+            "Check socket directory only accessible by current user",
+        )
+        self.assertTrue(
+            server_functions.is_socket_owned(socket_path), "Check socket owned"
+        )
+        server.server_close()
+        Path.unlink(socket_path)
+
+        # Check daemon not started in directory other users can write to
+        os.chmod(socket_directory, 0o777)
+        with self.assertRaisesRegex(Exception, "can be changed by other users"):
+            server_functions.create_server(socket_path)
+
+        # Check arguments not forwarded to a path that isn't a socket owned by current user
+        socket_path.write_text("")
+        with self.assertWarnsRegex(UserWarning, "isn't a socket owned"):
+            self.assertFalse(
+                server_functions.forward_arguments({}, socket_path),
+                "Check arguments not forwarded",
+            )
+
+        # Remove socket directory
+        shutil.rmtree(socket_directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
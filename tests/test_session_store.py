@@ -0,0 +1,85 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from datetime import date, time, timedelta  # working with dates and times
+import pandas as pd  # comparing timesheets
+
+# Local imports
+from timesheet import session_store  # compact in-memory sessions
+from timesheet import storage  # reading timesheet files
+from timesheet import summary_functions  # calculating session durations
+from timesheet import data_functions  # functions for working with data
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_read(self):
+        """Test session store read from timesheet file matches timesheet dataframe"""
+
+        # Create the dummy data and read into session store
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        store = session_store.SessionStore.read(timesheet_file)
+
+        # Check sessions viewed as written in file
+        self.assertEqual(len(store), 8, "Check all sessions read")
+        self.assertEqual(
+            store[-1].to_record(),
+            {
+                "date": "2023-03-16",
+                "start_time": "12:56",
+                "end_time": "17:03",
+                "time_worked": "04:07",
+                "notes": "nothing off note",
+            },
+            "Check last session viewed",
+        )
+
+        # Check dataframe built from session store matches timesheet
+        pd.testing.assert_frame_equal(
+            store.to_dataframe(), storage.get_storage(timesheet_file).read()
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_append(self):
+        """Test sessions added to session store and changed through views"""
+
+        # Add sessions (growing past initial capacity)
+        store = session_store.SessionStore(capacity=1)
+        store.append(date(2023, 3, 13), time(8, 0), time(12, 30), notes="coding")
+        session = store.append(date(2023, 3, 13), time(22, 0))
+
+        # Check open session, then end it before it starts (counts as zero, as in
+        # summaries), then after it starts
+        self.assertEqual(session.time_worked, timedelta(0), "Check open session")
+        session.end_time = time(1, 15)
+        self.assertEqual(
+            session.time_worked, timedelta(0), "Check session ending before start"
+        )
+        self.assertEqual(
+            store.calculate_worked_minutes().tolist(),
+            (
+                summary_functions.calculate_session_seconds(store.to_dataframe()) // 60
+            ).tolist(),
+            "Check minutes worked match summaries",
+        )
+        session.end_time = time(23, 15)
+        session.notes = "coding"
+        self.assertEqual(
+            session.time_worked, timedelta(hours=1, minutes=15), "Check ended session"
+        )
+
+        # Check notes stored once
+        self.assertEqual(store.notes, ["", "coding"], "Check notes interned")
+        self.assertEqual(
+            [view.start_time for view in store],
+            [time(8, 0), time(22, 0)],
+            "Check sessions viewed in order",
+        )
+        with self.assertRaises(IndexError):
+            store[2]
+
+
+if __name__ == "__main__":
+    unittest.main()
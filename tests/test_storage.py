@@ -0,0 +1,78 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import pandas as pd  # comparing timesheets
+
+# Local imports
+from timesheet import storage  # reading and writing timesheet files
+from timesheet import data_functions  # functions for working with data
+
+
+class TestStorage(unittest.TestCase):
+    def test_get_storage(self):
+        """Test storage backend chosen by file extension or format provided"""
+
+        self.assertIsInstance(
+            storage.get_storage(Path("outputs/timesheet.parquet")),
+            storage.ParquetStorage,
+            "Check Parquet backend chosen by extension",
+        )
+        self.assertIsInstance(
+            storage.get_storage(Path("outputs/timesheet.txt")),
+            storage.CSVStorage,
+            "Check CSV backend used for unknown extension",
+        )
+        self.assertIsInstance(
+            storage.get_storage(Path("outputs/timesheet.csv"), file_format="feather"),
+            storage.FeatherStorage,
+            "Check format provided used over extension",
+        )
+
+    def test_storage_interface(self):
+        """Test storage backends must provide read and write"""
+
+        # Define backend missing write
+        class ReadOnlyStorage(storage.Storage):
+            def read(self) -> pd.DataFrame:
+                return storage.create_empty_timesheet()
+
+        # Check backend missing write can't be created
+        with self.assertRaises(TypeError):
+            ReadOnlyStorage(Path("outputs/timesheet.csv"))
+        with self.assertRaises(TypeError):
+            storage.Storage(Path("outputs/timesheet.csv"))
+
+    def test_convert_timesheet(self):
+        """Test converting timesheet between CSV and binary or fixed width formats keeps data"""
+
+        # Create a dummy timesheet
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        original_timesheet = storage.get_storage(timesheet_file).read()
+
+        for file_format in ["feather", "parquet", "fwf"]:
+
+            # Convert to binary or fixed width format and back
+            binary_file = timesheet_file.with_suffix(f".{file_format}")
+            storage.convert_timesheet(timesheet_file, binary_file)
+            converted_timesheet = storage.get_storage(binary_file).read()
+
+            # Check column types kept and values match
+            self.assertEqual(
+                converted_timesheet.time_worked.dtype,
+                "timedelta64[ns]",
+                f"Check time_worked stored as duration in {file_format}",
+            )
+            pd.testing.assert_frame_equal(
+                original_timesheet, converted_timesheet, check_dtype=False
+            )
+
+            # Remove binary timesheet
+            Path.unlink(binary_file)
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import pandas as pd  # comparing summaries
+
+# Local imports
+from timesheet import stream_functions  # streaming timesheets in chunks
+from timesheet import storage  # reading timesheet files
+from timesheet import summary_functions  # summarising whole timesheets
+from timesheet import parse_functions  # reporting malformed records
+from timesheet import data_functions  # functions for working with data
+
+
+class TestStreamFunctions(unittest.TestCase):
+    def test_read_csv_chunks(self):
+        """Test chunks hold whole lines (including notes with quoted newlines)"""
+
+        # Create the dummy data with a note containing a newline
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        with open(timesheet_file, "a") as file:
+            file.write('2023-03-17,08:00,09:00,01:00,"two\nlines"\n')
+
+        # Read in small chunks
+        chunks = list(stream_functions.read_csv_chunks(timesheet_file, chunk_bytes=50))
+
+        # Check each chunk starts with header and records split between chunks once
+        self.assertTrue(
+            all(chunk.startswith(b"date,start_time") for chunk in chunks),
+            "Check header added to each chunk",
+        )
+        timesheets = list(stream_functions.parse_chunks(chunks))
+        self.assertEqual(
+            sum(timesheet.shape[0] for timesheet in timesheets),
+            9,
+            "Check every record read once",
+        )
+        self.assertEqual(
+            timesheets[-1].notes.iloc[-1], "two\nlines", "Check quoted newline kept"
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_parse_chunks_malformed(self):
+        """Test malformed records reported with line number in file"""
+
+        # Create the dummy data with a malformed record
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        with open(timesheet_file, "a") as file:
+            file.write("2023-03-17,8am,09:00,01:00,\n")
+
+        # Check line number counted from start of file
+        with self.assertRaises(parse_functions.TimesheetFormatError) as context:
+            list(stream_functions.stream_timesheet(timesheet_file, chunk_bytes=100))
+        self.assertEqual(
+            context.exception.errors.line.tolist(), [10], "Check line number in file"
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_summarise_chunks(self):
+        """Test streamed summary and conversion match whole timesheet"""
+
+        # Create synthetic timesheet
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_synthetic_timesheet(
+            timesheet_file, n_sessions=1000, sessions_per_day=7
+        )
+        timesheet_data = storage.get_storage(timesheet_file).read()
+
+        # Check streamed summary between dates matches whole timesheet
+        summary = stream_functions.summarise_chunks(
+            stream_functions.stream_timesheet(
+                timesheet_file, "2000-01-10", "2000-03-31", chunk_bytes=1000
+            ),
+            period="week",
+        )
+        in_range = timesheet_data[
+            (timesheet_data.date >= "2000-01-10")
+            & (timesheet_data.date <= "2000-03-31")
+        ]
+        pd.testing.assert_frame_equal(
+            summary, summary_functions.summarise_timesheet(in_range, period="week")
+        )
+
+        # Check streamed copy matches file
+        copy_file = Path("outputs/test_timesheet_copy.csv")
+        n_records = stream_functions.write_chunks(
+            stream_functions.stream_timesheet(timesheet_file, chunk_bytes=1000),
+            copy_file,
+        )
+        self.assertEqual(n_records, 1000, "Check all records written")
+        self.assertEqual(
+            copy_file.read_bytes(),
+            timesheet_file.read_bytes(),
+            "Check streamed copy matches file",
+        )
+
+        # Remove timesheets
+        Path.unlink(timesheet_file)
+        Path.unlink(copy_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
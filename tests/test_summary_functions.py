@@ -0,0 +1,135 @@
+# Load packages
+import unittest  # running tests
+import numpy as np  # building test dates
+import pandas as pd  # building test timesheets
+
+# Local imports
+from timesheet import summary_functions  # summarising hours worked
+
+
+class TestSummaryFunctions(unittest.TestCase):
+    def test_calculate_session_seconds(self):
+        """Test session durations calculated from start and end times"""
+
+        # Create timesheet with complete, open and invalid sessions
+        my_timesheet = pd.DataFrame(
+            {
+                "start_time": pd.to_datetime(
+                    ["08:00", "09:00", "10:00"], format="%H:%M"
+                ),
+                "end_time": pd.to_datetime(["08:30", None, "09:00"], format="%H:%M"),
+            }
+        )
+
+        # Check durations
+        self.assertEqual(
+            summary_functions.calculate_session_seconds(my_timesheet).tolist(),
+            [1800, 0, 0],
+            "Check open and invalid sessions count as zero seconds",
+        )
+
+    def test_calculate_period_codes(self):
+        """Test weeks start on Monday and months group by calendar month"""
+
+        # Sunday, Monday and following Sunday
+        dates = np.array(
+            ["2023-03-12", "2023-03-13", "2023-03-19"], dtype="datetime64[ns]"
+        )
+
+        # Check week codes
+        week_codes = summary_functions.calculate_period_codes(dates, "week")
+        self.assertEqual(
+            [week_codes[0] == week_codes[1], week_codes[1] == week_codes[2]],
+            [False, True],
+            "Check week starts on Monday",
+        )
+        self.assertEqual(
+            summary_functions.convert_period_codes_to_dates(week_codes[1:2], "week")[0],
+            np.datetime64("2023-03-13"),
+            "Check week start date",
+        )
+
+        # Check unknown period raises exception
+        with self.assertRaises(Exception):
+            summary_functions.calculate_period_codes(dates, "year")
+
+    def test_summarise_timesheet(self):
+        """Test hours summed per day"""
+
+        # Create timesheet with two sessions on one day and one on the next
+        my_timesheet = pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2023-03-13", "2023-03-13", "2023-03-15"]),
+                "start_time": pd.to_datetime(
+                    ["08:00", "13:00", "09:00"], format="%H:%M"
+                ),
+                "end_time": pd.to_datetime(["12:00", "14:30", "10:15"], format="%H:%M"),
+            }
+        )
+
+        # Summarise by day
+        summary = summary_functions.summarise_timesheet(my_timesheet, "day")
+
+        # Check summary
+        self.assertEqual(
+            summary.period_start.dt.strftime("%Y-%m-%d").tolist(),
+            ["2023-03-13", "2023-03-15"],
+            "Check only days with sessions included",
+        )
+        self.assertEqual(summary.hours.tolist(), [5.5, 1.25], "Check hours per day")
+        self.assertEqual(summary.sessions.tolist(), [2, 1], "Check sessions per day")
+
+    def test_calculate_occupancy_matrix(self):
+        """Test minutes worked summed per day of the week and time of day"""
+
+        # Create timesheet with sessions on two Mondays, a Wednesday and an open session
+        my_timesheet = pd.DataFrame(
+            {
+                "date": pd.to_datetime(
+                    ["2023-03-13", "2023-03-20", "2023-03-15", "2023-03-16"]
+                ),
+                "start_time": pd.to_datetime(
+                    ["08:30", "08:45", "23:50", "09:00"], format="%H:%M"
+                ),
+                "end_time": pd.to_datetime(
+                    ["10:00", "09:15", "23:59", None], format="%H:%M"
+                ),
+            }
+        )
+
+        # Check minutes per hour
+        occupancy_matrix = summary_functions.calculate_occupancy_matrix(my_timesheet)
+        self.assertEqual(occupancy_matrix.shape, (7, 24), "Check days and hours")
+        self.assertEqual(
+            occupancy_matrix.loc["Monday", ["08:00", "09:00", "10:00"]].tolist(),
+            [45, 75, 0],
+            "Check Monday sessions summed across weeks",
+        )
+        self.assertEqual(
+            occupancy_matrix.loc["Wednesday", "23:00"],
+            9,
+            "Check session up to midnight",
+        )
+        self.assertEqual(
+            occupancy_matrix.values.sum(), 90 + 30 + 9, "Check open session ignored"
+        )
+
+        # Check minutes per 15 minutes
+        occupancy_matrix = summary_functions.calculate_occupancy_matrix(
+            my_timesheet, resolution="15min"
+        )
+        self.assertEqual(
+            occupancy_matrix.loc[
+                "Monday", ["08:15", "08:30", "08:45", "09:00"]
+            ].tolist(),
+            [0, 15, 30, 30],
+            "Check minutes per 15 minutes",
+        )
+
+        # Check unknown resolution raises exception
+        with self.assertRaises(Exception):
+            summary_functions.calculate_occupancy_matrix(my_timesheet, "minute")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+from datetime import date  # working with dates
+import pandas as pd  # comparing summaries
+
+# Local imports
+from timesheet import team_functions  # summarising directories of timesheets
+from timesheet import totals_functions  # daily totals files
+from timesheet import journal_functions  # naming journal files
+from timesheet import data_functions  # functions for working with data
+from timesheet import timesheet  # timesheet class
+
+
+class TestTeamFunctions(unittest.TestCase):
+    def test_summarise_team(self):
+        """Test timesheets in directory summarised in worker processes"""
+
+        # Create timesheets for two people
+        directory = Path("outputs/test_team")
+        Path.mkdir(directory, exist_ok=True)
+        file_names = [directory / "alice.csv", directory / "bob.csv"]
+        data_functions.create_dummy_timesheet(file_name=file_names[0])
+        data_functions.create_synthetic_timesheet(
+            file_names[1], n_sessions=4, start_date=date(2023, 3, 13)
+        )
+
+        # Summarise by week in worker processes and in current process
+        team_summary = team_functions.summarise_team(
+            directory, period="week", n_workers=2
+        )
+        pd.testing.assert_frame_equal(
+            team_summary,
+            team_functions.summarise_team(directory, period="week", n_workers=1),
+        )
+
+        # Check hours for each person
+        self.assertEqual(
+            team_summary.name.tolist(), ["alice", "bob"], "Check person for each file"
+        )
+        self.assertEqual(
+            team_summary.hours.tolist(), [31.2, 15.0], "Check hours worked in week"
+        )
+
+        # Check no daily totals files written next to timesheets
+        self.assertEqual(
+            sorted(directory.iterdir()), file_names, "Check no daily totals files"
+        )
+
+        # Check current daily totals file kept by timesheet gives same summary
+        timesheet.Timesheet(file_name=file_names[0]).summarise("day")
+        pd.testing.assert_frame_equal(
+            team_functions.summarise_team(directory, period="week", n_workers=1),
+            team_summary,
+        )
+
+        # Check daily totals and journal files ignored when finding timesheets
+        journal_file_name = journal_functions.get_journal_file_names(file_names[0])[
+            "journal"
+        ]
+        journal_file_name.touch()
+        self.assertEqual(
+            team_functions.find_timesheet_files(directory),
+            file_names,
+            "Check daily totals and journal files ignored",
+        )
+        Path.unlink(journal_file_name)
+
+        # Remove timesheets and daily totals
+        for file_name in file_names:
+            Path.unlink(file_name)
+            totals_functions.get_daily_totals_file_name(file_name).unlink(
+                missing_ok=True
+            )
+        Path.rmdir(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
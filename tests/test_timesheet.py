@@ -7,6 +7,10 @@ from datetime import time, datetime  # working with dates and times
 # Local imports
 from timesheet import timesheet  # timesheet class
 from timesheet import data_functions  # functions for working with data
+from timesheet import totals_functions  # daily totals files
+from timesheet import storage  # converting timesheet files
+from timesheet import parse_functions  # checking malformed values rejected
+from timesheet import search_functions  # notes index files
 
 
 class TestTimesheet(unittest.TestCase):
@@ -228,6 +232,388 @@ class TestTimesheet(unittest.TestCase):
         # Remove timesheet
         Path.unlink(timesheet_file)
 
+    def test_punches_only_touch_end_of_file(self):
+        """Test adding start and end times leaves earlier records untouched"""
+
+        # Create a dummy timesheet and record its content
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        with open(timesheet_file, "rb") as file:
+            original_content = file.read()
+
+        # Add start time and check original content is a prefix of file
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        my_timesheet.add_start_time("23:58")
+        with open(timesheet_file, "rb") as file:
+            content = file.read()
+        self.assertTrue(
+            content.startswith(original_content),
+            "Check start time appended to file",
+        )
+        self.assertEqual(
+            content.count(b"\n"),
+            original_content.count(b"\n") + 1,
+            "Check one line added for start time",
+        )
+
+        # Add end time and check only last line changed
+        my_timesheet.add_end_time("23:59")
+        with open(timesheet_file, "rb") as file:
+            content = file.read()
+        self.assertTrue(
+            content.startswith(original_content),
+            "Check end time only changed last line",
+        )
+        self.assertTrue(
+            content.endswith(b",23:58,23:59,00:01,\n"), "Check end time written"
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_rejected_punch_leaves_timesheet_unchanged(self):
+        """Test start time rejected by the file doesn't change the timesheet in memory"""
+
+        # Create a dummy timesheet and load it twice
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        first_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        second_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        records = len(second_timesheet.timesheet)
+        last_record = dict(second_timesheet.last_record)
+        start_time, end_time = second_timesheet.start_time, second_timesheet.end_time
+
+        # Add a session with the first timesheet, then a start time during it with the second
+        first_timesheet.add_start_time("23:50")
+        first_timesheet.add_end_time("23:55")
+        with self.assertRaisesRegex(Exception, "is not after the current end_time"):
+            second_timesheet.add_start_time("23:52")
+
+        # Check second timesheet still holds what it had before the rejected start time
+        self.assertEqual(
+            len(second_timesheet.timesheet), records, "Check no record added"
+        )
+        self.assertEqual(
+            second_timesheet.last_record, last_record, "Check last record unchanged"
+        )
+        self.assertEqual(
+            (second_timesheet.start_time, second_timesheet.end_time),
+            (start_time, end_time),
+            "Check current times unchanged",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_punches_from_out_of_date_timesheet(self):
+        """Test times added from a timesheet loaded before other changes don't overwrite them"""
+
+        # Add a session and start another with the first timesheet, then load it again
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        first_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        first_timesheet.add_start_time("09:00")
+        first_timesheet.add_end_time("10:00")
+        first_timesheet.add_start_time("11:00")
+        second_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+
+        # End session with the first timesheet, then try to end it with the second
+        first_timesheet.add_end_time("12:00")
+        with self.assertRaisesRegex(Exception, "already ended"):
+            second_timesheet.add_end_time("12:30")
+        self.assertEqual(
+            storage.get_storage(timesheet_file).read().end_time.iloc[-1].time(),
+            time(12, 0),
+            "Check end time from first timesheet kept",
+        )
+
+        # Add start times with both timesheets and check second re-reads the timesheet
+        first_timesheet.add_start_time("13:00")
+        with self.assertWarns(UserWarning):
+            second_timesheet.add_start_time("13:30")
+        self.assertEqual(
+            len(second_timesheet.timesheet), 4, "Check timesheet re-read from file"
+        )
+        self.assertEqual(
+            second_timesheet.last_record["start_time"],
+            "13:30",
+            "Check last record re-read from file",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_punched_sessions_validate(self):
+        """Test sessions added with start and end times pass the timesheet checks"""
+
+        for file_name in [
+            Path("outputs/test_timesheet.csv"),
+            Path("outputs/test_timesheet.fwf"),
+            Path("outputs/test_timesheet.parquet"),
+        ]:
+
+            # Add two sessions
+            my_timesheet = timesheet.Timesheet(file_name=file_name)
+            my_timesheet.add_start_time("00:01")
+            my_timesheet.add_end_time("00:02")
+            my_timesheet.add_start_time("00:03")
+            my_timesheet.add_end_time("01:33")
+
+            # Check time worked filled in and no problems found
+            self.assertEqual(
+                my_timesheet.last_record["time_worked"],
+                "01:30",
+                f"Check time worked filled in ({file_name.suffix})",
+            )
+            self.assertEqual(
+                len(my_timesheet.validate()),
+                0,
+                f"Check no problems in memory ({file_name.suffix})",
+            )
+            self.assertEqual(
+                len(timesheet.Timesheet(file_name=file_name).validate()),
+                0,
+                f"Check no problems in file ({file_name.suffix})",
+            )
+
+            # Remove timesheet
+            Path.unlink(file_name)
+
+    def test_lazy_timesheet_loading(self):
+        """Test lazy mode reads current state from last record only"""
+
+        # Create a dummy timesheet
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+
+        # Load dummy timesheet lazily
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file, lazy=True)
+
+        # Check full timesheet not loaded but current times set
+        self.assertIsNone(my_timesheet._timesheet, "Check timesheet not loaded")
+        self.assertEqual(
+            my_timesheet.start_time,
+            datetime(year=2023, month=3, day=16, hour=12, minute=56),
+            "Check current start time read from last record",
+        )
+        self.assertEqual(
+            my_timesheet.end_time,
+            datetime(year=2023, month=3, day=16, hour=17, minute=3),
+            "Check current end time read from last record",
+        )
+
+        # Add start and end times without loading full timesheet
+        my_timesheet.add_start_time("23:58")
+        my_timesheet.add_end_time("23:59")
+        self.assertIsNone(my_timesheet._timesheet, "Check timesheet still not loaded")
+
+        # Check full timesheet loaded on use and includes new record
+        self.assertEqual(
+            my_timesheet.timesheet.shape[0], 9, "Check timesheet loaded on first use"
+        )
+        self.assertEqual(
+            my_timesheet.timesheet.end_time.iloc[-1],
+            pd.Timestamp("1900-01-01 23:59:00"),
+            "Check new end time in loaded timesheet",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_timesheet_in_binary_format(self):
+        """Test adding start and end times to timesheet stored as Parquet"""
+
+        # Create timesheet in Parquet format
+        timesheet_file = Path("outputs/test_timesheet.parquet")
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+
+        # Add start and end times
+        my_timesheet.add_start_time("23:58")
+        my_timesheet.add_end_time("23:59")
+
+        # Check record read back with native column types
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+        self.assertEqual(
+            my_timesheet.timesheet.end_time.iloc[-1],
+            pd.Timestamp("1900-01-01 23:59:00"),
+            "Check end time read from Parquet file",
+        )
+        self.assertEqual(
+            my_timesheet.timesheet.date.dtype,
+            "datetime64[ns]",
+            "Check date column contains datetimes",
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_edit_record(self):
+        """Test changing fields of a record in CSV and fixed width timesheets"""
+
+        csv_file = Path("outputs/test_timesheet.csv")
+        for timesheet_file in [csv_file, Path("outputs/test_timesheet.fwf")]:
+
+            # Create the dummy data (converted to fixed width)
+            data_functions.create_dummy_timesheet(file_name=csv_file)
+            if timesheet_file != csv_file:
+                storage.convert_timesheet(csv_file, timesheet_file)
+                Path.unlink(csv_file)
+            my_timesheet = timesheet.Timesheet(file_name=timesheet_file, lazy=True)
+
+            # Change note of first record and end time of last record
+            my_timesheet.edit_record(0, {"notes": "planning"})
+            my_timesheet.edit_record(-1, {"end_time": "18:00"})
+            self.assertEqual(
+                my_timesheet.end_time.strftime("%H:%M"),
+                "18:00",
+                "Check current end time changed",
+            )
+
+            # Check changes read back
+            my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+            self.assertEqual(
+                my_timesheet.timesheet.notes.iloc[0], "planning", "Check note changed"
+            )
+            self.assertEqual(
+                my_timesheet.timesheet.end_time.iloc[-1],
+                pd.Timestamp("1900-01-01 18:00:00"),
+                "Check end time changed",
+            )
+            self.assertEqual(
+                my_timesheet.timesheet.time_worked.iloc[-1],
+                my_timesheet.timesheet.end_time.iloc[-1]
+                - my_timesheet.timesheet.start_time.iloc[-1],
+                "Check time worked changed to match end time",
+            )
+
+            # Check malformed value and unknown column rejected
+            with self.assertRaises(parse_functions.TimesheetFormatError):
+                my_timesheet.edit_record(1, {"start_time": "9am"})
+            with self.assertRaises(Exception):
+                my_timesheet.edit_record(1, {"client": "a"})
+
+            # Check timesheet removed elsewhere is recreated (without waiting on the commit
+            # lock already held by the edit) and row then rejected
+            Path.unlink(timesheet_file)
+            with self.assertRaisesRegex(Exception, "isn't in timesheet"):
+                my_timesheet.edit_record(0, {"notes": "x"})
+
+            # Remove timesheet and daily totals
+            Path.unlink(timesheet_file)
+            Path.unlink(
+                totals_functions.get_daily_totals_file_name(timesheet_file),
+                missing_ok=True,
+            )
+
+    def test_read_range(self):
+        """Test reading records between two dates"""
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file, lazy=True)
+
+        # Read records between dates
+        records = my_timesheet.read_range("2023-03-14", "2023-03-15")
+
+        # Check only records between dates read
+        self.assertEqual(
+            records.date.dt.strftime("%Y-%m-%d").tolist(),
+            ["2023-03-14", "2023-03-14", "2023-03-15", "2023-03-15"],
+            "Check records between dates read",
+        )
+        self.assertIsNone(my_timesheet._timesheet, "Check full timesheet not loaded")
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
+    def test_search_notes(self):
+        """Test records found by words in notes through notes index"""
+
+        # Create the dummy data
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file, lazy=True)
+
+        # Search notes between dates
+        records = my_timesheet.search_notes("Nothing", "2023-03-14", "2023-03-15")
+        self.assertEqual(
+            records.date.dt.strftime("%Y-%m-%d").tolist(),
+            ["2023-03-14", "2023-03-14", "2023-03-15", "2023-03-15"],
+            "Check matching records between dates found",
+        )
+        self.assertIsNone(my_timesheet._timesheet, "Check full timesheet not loaded")
+
+        # Edit note (notes index updated) and search again
+        my_timesheet.edit_record(1, {"notes": "client migration"})
+        self.assertTrue(
+            search_functions.is_notes_index_current(timesheet_file),
+            "Check notes index updated with edit",
+        )
+        records = my_timesheet.search_notes("migration client")
+        self.assertEqual(
+            records.start_time.iloc[0],
+            pd.Timestamp("1900-01-01 12:24:00"),
+            "Check edited record found",
+        )
+        self.assertEqual(
+            search_functions.read_notes_index(timesheet_file)["offsets"].tolist(),
+            search_functions.find_record_offsets(timesheet_file.read_bytes()).tolist(),
+            "Check offsets of records after edited record moved",
+        )
+
+        # Remove timesheet and notes index
+        Path.unlink(timesheet_file)
+        Path.unlink(search_functions.get_notes_index_file_name(timesheet_file))
+
+    def test_summarise(self):
+        """Test hours worked summarised per week"""
+
+        # Create the dummy data (Monday to Thursday of one week)
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file)
+
+        # Summarise by week
+        summary = my_timesheet.summarise(period="week")
+
+        # Check hours summed from start and end times
+        self.assertEqual(summary.shape[0], 1, "Check one week summarised")
+        self.assertEqual(
+            summary.time_worked[0],
+            pd.Timedelta(hours=31, minutes=12),
+            "Check time worked in week",
+        )
+
+        # Remove timesheet and daily totals
+        Path.unlink(timesheet_file)
+        Path.unlink(totals_functions.get_daily_totals_file_name(timesheet_file))
+
+    def test_occupancy_matrix(self):
+        """Test minutes worked per day of the week and hour between dates"""
+
+        # Create the dummy data (Monday to Thursday of one week)
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        my_timesheet = timesheet.Timesheet(file_name=timesheet_file, lazy=True)
+
+        # Calculate minutes worked on Tuesday only
+        occupancy_matrix = my_timesheet.occupancy_matrix(
+            start_date="2023-03-14", end_date="2023-03-14"
+        )
+
+        # Check only sessions between dates counted
+        self.assertEqual(
+            occupancy_matrix.sum(axis=1).tolist(),
+            [0, 210 + 250, 0, 0, 0, 0, 0],
+            "Check minutes worked on Tuesday",
+        )
+        self.assertEqual(
+            occupancy_matrix.loc["Tuesday", "08:00"], 25, "Check minutes from 08:35"
+        )
+
+        # Remove timesheet
+        Path.unlink(timesheet_file)
+
     def test_add_end_time_with_empty_timesheet(self):
 
         # Create empty timesheet
@@ -0,0 +1,73 @@
+# Load packages
+import unittest  # running tests
+from pathlib import Path  # handling file paths
+import pandas as pd  # comparing summaries
+
+# Local imports
+from timesheet import totals_functions  # daily totals files
+from timesheet import punch_functions  # adding start and end times without pandas
+from timesheet import summary_functions  # summarising hours worked
+from timesheet import storage  # reading timesheet files
+from timesheet import timesheet  # timesheet class
+from timesheet import data_functions  # functions for working with data
+
+
+class TestTotalsFunctions(unittest.TestCase):
+    def test_calculate_record_seconds(self):
+        """Test seconds worked calculated from record start and end times"""
+
+        record = {"start_time": "08:24", "end_time": "12:00"}
+        self.assertEqual(
+            totals_functions.calculate_record_seconds(record),
+            12960,
+            "Check seconds worked",
+        )
+        record["end_time"] = ""
+        self.assertEqual(
+            totals_functions.calculate_record_seconds(record),
+            0,
+            "Check open record counts as zero seconds",
+        )
+
+    def test_update_daily_totals(self):
+        """Test daily totals kept up to date as start and end times added"""
+
+        # Create the dummy data and build daily totals
+        timesheet_file = Path("outputs/test_timesheet.csv")
+        totals_file = totals_functions.get_daily_totals_file_name(timesheet_file)
+        data_functions.create_dummy_timesheet(file_name=timesheet_file)
+        timesheet.Timesheet(file_name=timesheet_file, lazy=True).summarise()
+
+        # Add start and end times
+        punch_functions.add_start_time(timesheet_file, "23:50")
+        punch_functions.add_end_time(timesheet_file, "23:55")
+
+        # Check daily totals still current and match summary of full timesheet
+        self.assertTrue(
+            totals_functions.is_daily_totals_current(timesheet_file),
+            "Check daily totals updated with timesheet",
+        )
+        pd.testing.assert_frame_equal(
+            summary_functions.summarise_daily_totals(
+                summary_functions.read_daily_totals(timesheet_file)
+            ),
+            summary_functions.summarise_timesheet(
+                storage.get_storage(timesheet_file).read()
+            ),
+        )
+
+        # Check daily totals out of date when timesheet changed elsewhere
+        with open(timesheet_file, "a") as file:
+            file.write("2023-03-17,08:00,09:00,01:00,\n")
+        self.assertFalse(
+            totals_functions.is_daily_totals_current(timesheet_file),
+            "Check daily totals out of date after timesheet edited",
+        )
+
+        # Remove timesheet and daily totals
+        Path.unlink(timesheet_file)
+        Path.unlink(totals_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import asyncio  # running blocking timesheet operations off the event loop
+import weakref  # keeping file locks for each event loop
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import timesheet  # timesheet class
+
+# Locks for each timesheet file, kept separately for each event loop (asyncio locks can only
+# be used in the loop they were first used in)
+FILE_LOCKS = weakref.WeakKeyDictionary()
+
+
+def get_file_lock(file_name: Path) -> asyncio.Lock:
+    """Get asyncio lock for timesheet file, shared by every AsyncTimesheet in running loop
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        asyncio.Lock: lock for file
+    """
+
+    file_locks = FILE_LOCKS.setdefault(asyncio.get_running_loop(), {})
+
+    return file_locks.setdefault(Path(file_name).absolute(), asyncio.Lock())
+
+
+class AsyncTimesheet:
+    def __init__(
+        self,
+        file_name: Path = Path("outputs/timesheet.csv"),
+        lazy: bool = False,
+        file_format: str = None,
+    ):
+        """Create AsyncTimesheet object for use in asyncio code
+
+        The timesheet isn't read until load() is awaited (or first used). Reading, writing and
+        parsing run in worker threads so the event loop isn't blocked, and changes to each
+        file are made one at a time (in the running loop).
+
+        Args:
+            file_name (Path, optional): path to timesheet file.
+                Defaults to Path("outputs/timesheet.csv").
+            lazy (bool, optional): only read the header and last record of the timesheet file
+                (see timesheet.Timesheet). Defaults to False.
+            file_format (str, optional): format of timesheet file (csv, feather or parquet).
+                Defaults to None (format chosen by file extension).
+        """
+        self.file_name = Path(file_name)
+        self.lazy = lazy
+        self.file_format = file_format
+        self.timesheet = None
+
+    def read_timesheet(self) -> timesheet.Timesheet:
+        """Read timesheet (or re-read if file changed since last read), blocks
+
+        Returns:
+            timesheet.Timesheet: timesheet
+        """
+
+        if self.timesheet is None:
+            self.timesheet = timesheet.Timesheet(
+                file_name=self.file_name, lazy=self.lazy, file_format=self.file_format
+            )
+        else:
+            self.timesheet.refresh()
+
+        return self.timesheet
+
+    async def run(self, function):
+        """Run function on timesheet in a worker thread, holding the file's lock
+
+        Args:
+            function (callable): function taking timesheet.Timesheet
+
+        Returns:
+            object: value returned by function
+        """
+
+        async with get_file_lock(self.file_name):
+            return await asyncio.to_thread(lambda: function(self.read_timesheet()))
+
+    async def load(self):
+        """Read timesheet from file
+
+        Returns:
+            AsyncTimesheet: self (so can be used as `await AsyncTimesheet(file_name).load()`)
+        """
+
+        await self.run(lambda my_timesheet: None)
+
+        return self
+
+    async def add_start_time(self, start_time_string: str = None):
+        """Add start time to timesheet
+
+        Args:
+            start_time_string (str, optional): time (format: hh:mm) to use for start time
+                Defaults to None (will use current time).
+        """
+
+        await self.run(
+            lambda my_timesheet: my_timesheet.add_start_time(start_time_string)
+        )
+
+    async def add_end_time(self, end_time_string: str = None):
+        """Add end time to timesheet
+
+        Args:
+            end_time_string (str, optional): time (format: hh:mm) to use for end time
+                Defaults to None (will use current time).
+        """
+
+        await self.run(lambda my_timesheet: my_timesheet.add_end_time(end_time_string))
+
+    async def reset(self):
+        """Reset and empty timesheet"""
+
+        await self.run(lambda my_timesheet: my_timesheet.reset_timesheet())
+
+    async def summarise(self, period: str = "day") -> pd.DataFrame:
+        """Summarise hours worked per day, week or month (see timesheet.Timesheet.summarise())
+
+        Args:
+            period (str, optional): period to summarise over (day, week or month). Weeks start
+                on Monday. Defaults to "day".
+
+        Returns:
+            pd.DataFrame: one row per period with sessions (period_start, time_worked, hours and
+                sessions columns)
+        """
+
+        return await self.run(lambda my_timesheet: my_timesheet.summarise(period))
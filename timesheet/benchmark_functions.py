@@ -0,0 +1,204 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import time  # timing functions
+import statistics  # summarising timings
+import subprocess  # running command line interface in new process
+import sys  # getting python executable
+import json  # writing benchmark results
+import os  # counting CPUs
+import platform  # recording machine details
+from datetime import date, datetime, timedelta  # working with dates and times
+import pandas as pd  # storing benchmark results
+
+# Local imports
+from timesheet import __version__  # package version
+from timesheet import timesheet  # timesheet class
+from timesheet import data_functions  # creating synthetic timesheets
+
+
+def time_function(function, n_repeats: int = 5) -> float:
+    """Time how long a function takes to run
+
+    Args:
+        function (callable): function (with no arguments) to time
+        n_repeats (int, optional): number of times to run function. Defaults to 5.
+
+    Returns:
+        float: median run time in seconds
+    """
+
+    run_times = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        function()
+        run_times.append(time.perf_counter() - start)
+
+    return statistics.median(run_times)
+
+
+def measure_command_line_import_times(arguments: list[str]) -> pd.DataFrame:
+    """Measure module import times when running command line interface in a new process
+
+    Runs `python -X importtime -m timesheet <arguments>` and parses the import times it
+    reports (written to stderr).
+
+    Args:
+        arguments (list[str]): command line arguments passed to timesheet
+
+    Returns:
+        pd.DataFrame: import times with columns module, self_seconds, cumulative_seconds
+            and top_level (whether module imported directly rather than by another module)
+    """
+
+    # Run command line interface with import time reporting
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "timesheet"] + arguments,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Parse import time lines (format: "import time: self [us] | cumulative | module")
+    import_times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        import_times.append(
+            {
+                "module": module.strip(),
+                "self_seconds": int(self_us) / 1e6,
+                "cumulative_seconds": int(cumulative_us) / 1e6,
+                "top_level": not module[1:].startswith(" "),
+            }
+        )
+
+    return pd.DataFrame(import_times)
+
+
+def measure_peak_memory() -> int:
+    """Measure peak resident set size (RSS) of current process
+
+    Returns:
+        int: peak RSS (bytes)
+    """
+
+    import resource
+
+    # Peak RSS is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_benchmark_suite(
+    row_counts: list[int] = [1_000, 100_000, 1_000_000],
+    file_name: Path = Path("outputs/benchmark_timesheet.csv"),
+    n_repeats: int = 3,
+) -> pd.DataFrame:
+    """Benchmark core timesheet operations on synthetic timesheets of different sizes
+
+    Times reading and writing the timesheet, adding start and end times (with the timesheet
+    loaded), formatting the date and time columns as strings, checking the whole
+    timesheet for problems and calculating its occupancy matrix. Synthetic timesheets end
+    the day before today so start and end times can be added.
+
+    Args:
+        row_counts (list[int], optional): numbers of rows in timesheets to benchmark.
+            Defaults to [1_000, 100_000, 1_000_000].
+        file_name (Path, optional): path for temporary timesheet file.
+            Defaults to Path("outputs/benchmark_timesheet.csv").
+        n_repeats (int, optional): number of times each operation is timed (at most 29).
+            Defaults to 3.
+
+    Returns:
+        pd.DataFrame: median run time (seconds) of each operation (benchmark column) for
+            each timesheet size
+    """
+
+    results = []
+    for n_rows in row_counts:
+
+        # Create and load synthetic timesheet ending yesterday
+        sessions_per_day = 20
+        n_days = -(-n_rows // sessions_per_day)
+        data_functions.create_synthetic_timesheet(
+            file_name,
+            n_sessions=n_rows,
+            sessions_per_day=sessions_per_day,
+            start_date=date.today() - timedelta(days=n_days),
+        )
+        my_timesheet = timesheet.Timesheet(file_name=file_name)
+
+        # Time reading, writing and formatting timesheet
+        timings = {
+            "read_timesheet": time_function(my_timesheet.read_timesheet, n_repeats),
+            "write_timesheet": time_function(my_timesheet.write_timesheet, n_repeats),
+            "format_datetime_columns_to_strings": time_function(
+                lambda: data_functions.format_datetime_columns_to_strings(
+                    my_timesheet.timesheet.copy()
+                ),
+                n_repeats,
+            ),
+            "validate": time_function(my_timesheet.validate, n_repeats),
+            "occupancy_matrix": time_function(
+                lambda: my_timesheet.occupancy_matrix(resolution="15min"), n_repeats
+            ),
+        }
+
+        # Time adding start and end times (minutes after midnight so each follows the last)
+        start_seconds, end_seconds = [], []
+        for repeat in range(n_repeats):
+            start_seconds.append(
+                time_function(
+                    lambda: my_timesheet.add_start_time(f"00:{2 * repeat + 1:02d}"), 1
+                )
+            )
+            end_seconds.append(
+                time_function(
+                    lambda: my_timesheet.add_end_time(f"00:{2 * repeat + 2:02d}"), 1
+                )
+            )
+        timings["add_start_time"] = statistics.median(start_seconds)
+        timings["add_end_time"] = statistics.median(end_seconds)
+
+        # Record results
+        for benchmark, median_seconds in timings.items():
+            results.append(
+                {
+                    "benchmark": benchmark,
+                    "n_rows": n_rows,
+                    "median_seconds": median_seconds,
+                    "n_repeats": n_repeats,
+                }
+            )
+
+        # Remove timesheet
+        Path.unlink(file_name)
+
+    return pd.DataFrame(results)
+
+
+def write_benchmark_results_json(results: pd.DataFrame, file_name: Path):
+    """Write benchmark results to JSON file, with package version and machine details
+
+    Args:
+        results (pd.DataFrame): benchmark results (e.g. from run_benchmark_suite())
+        file_name (Path): path to JSON file
+    """
+
+    # Record results with details needed to compare runs
+    benchmark_run = {
+        "timesheet_version": __version__,
+        "python_version": platform.python_version(),
+        "pandas_version": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "results": results.to_dict(orient="records"),
+    }
+
+    # Write to file
+    with open(file_name, "w") as file:
+        json.dump(benchmark_run, file, indent=2)
@@ -0,0 +1,174 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import time  # timing functions
+import multiprocessing  # measuring memory in new processes
+import pandas as pd  # storing benchmark results
+
+# Local imports
+from timesheet import data_functions  # creating synthetic timesheets
+from timesheet import storage  # reading and writing timesheet files
+from timesheet import team_functions  # summarising directories of timesheets
+from timesheet import totals_functions  # naming daily totals files
+from timesheet import summary_functions  # reading daily totals
+from timesheet import stream_functions  # summarising timesheets in chunks
+from timesheet import benchmark_functions  # timing functions
+
+
+def benchmark_team_report(
+    worker_counts: list[int] = [1, 2, 4, 8],
+    n_files: int = 32,
+    n_sessions: int = 100_000,
+    directory: Path = Path("outputs/benchmark_team"),
+    n_repeats: int = 3,
+) -> pd.DataFrame:
+    """Benchmark summarising a directory of timesheet files with different numbers of workers
+
+    Daily totals files are removed before each run so every timesheet is read in full.
+
+    Args:
+        worker_counts (list[int], optional): numbers of worker processes to benchmark.
+            Defaults to [1, 2, 4, 8].
+        n_files (int, optional): number of timesheet files. Defaults to 32.
+        n_sessions (int, optional): number of sessions in each timesheet. Defaults to 100_000.
+        directory (Path, optional): directory for temporary timesheet files.
+            Defaults to Path("outputs/benchmark_team").
+        n_repeats (int, optional): number of times each report is timed. Defaults to 3.
+
+    Returns:
+        pd.DataFrame: median time (seconds) to summarise timesheets for each number of workers
+    """
+
+    # Create synthetic timesheets
+    Path.mkdir(directory, exist_ok=True)
+    file_names = [directory / f"person_{index}.csv" for index in range(n_files)]
+    for file_name in file_names:
+        data_functions.create_synthetic_timesheet(
+            file_name, n_sessions=n_sessions, sessions_per_day=20
+        )
+
+    def summarise_team_without_daily_totals(n_workers: int):
+        """Remove daily totals files and summarise timesheets"""
+        for file_name in file_names:
+            totals_functions.get_daily_totals_file_name(file_name).unlink(
+                missing_ok=True
+            )
+        team_functions.summarise_team(directory, n_workers=n_workers)
+
+    # Time team report with each number of workers
+    results = []
+    for n_workers in worker_counts:
+        results.append(
+            {
+                "n_workers": n_workers,
+                "report_seconds": benchmark_functions.time_function(
+                    lambda: summarise_team_without_daily_totals(n_workers), n_repeats
+                ),
+            }
+        )
+
+    # Remove timesheets and daily totals
+    for file_name in file_names:
+        totals_functions.get_daily_totals_file_name(file_name).unlink(missing_ok=True)
+        Path.unlink(file_name)
+    Path.rmdir(directory)
+
+    return pd.DataFrame(results)
+
+
+def summarise_in_new_process(
+    file_name: Path, stream: bool, chunk_bytes: int, results_queue
+):
+    """Summarise timesheet by week (worker for benchmark_streaming_summary())
+
+    Args:
+        file_name (Path): path to timesheet CSV file
+        stream (bool): read timesheet in chunks (otherwise read whole timesheet)
+        chunk_bytes (int): number of bytes read at a time if streaming
+        results_queue (multiprocessing.Queue): seconds taken, peak RSS before and after
+            summarising (bytes) and number of weeks are put on this queue
+    """
+
+    # Measure memory used after imports
+    baseline_rss = benchmark_functions.measure_peak_memory()
+
+    # Summarise timesheet
+    start = time.perf_counter()
+    if stream:
+        summary = stream_functions.summarise_chunks(
+            stream_functions.stream_timesheet(file_name, chunk_bytes=chunk_bytes),
+            period="week",
+        )
+    else:
+        summary = summary_functions.summarise_timesheet(
+            storage.get_storage(file_name).read(), period="week"
+        )
+    seconds = time.perf_counter() - start
+
+    results_queue.put(
+        (
+            seconds,
+            baseline_rss,
+            benchmark_functions.measure_peak_memory(),
+            summary.shape[0],
+        )
+    )
+
+
+def benchmark_streaming_summary(
+    row_counts: list[int] = [1_000_000, 4_000_000],
+    chunk_bytes: int = stream_functions.DEFAULT_CHUNK_BYTES,
+    file_name: Path = Path("outputs/benchmark_timesheet.csv"),
+) -> pd.DataFrame:
+    """Benchmark peak memory of summarising whole timesheets and streaming them in chunks
+
+    Each summary runs in a new process so its peak resident set size (RSS) is measured
+    separately.
+
+    Args:
+        row_counts (list[int], optional): numbers of sessions in synthetic timesheets.
+            Defaults to [1_000_000, 4_000_000].
+        chunk_bytes (int, optional): number of bytes read at a time when streaming.
+            Defaults to stream_functions.DEFAULT_CHUNK_BYTES (16MB).
+        file_name (Path, optional): path to temporary timesheet file.
+            Defaults to Path("outputs/benchmark_timesheet.csv").
+
+    Returns:
+        pd.DataFrame: file size, seconds taken, peak RSS and increase in peak RSS while
+            summarising (MB) for each timesheet size, with and without streaming
+    """
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for n_rows in row_counts:
+
+        # Create synthetic timesheet (many sessions per day so dates stay in range)
+        data_functions.create_synthetic_timesheet(
+            file_name, n_sessions=n_rows, sessions_per_day=100
+        )
+
+        # Summarise in new process, with and without streaming
+        for mode in ["whole", "stream"]:
+            results_queue = context.Queue()
+            process = context.Process(
+                target=summarise_in_new_process,
+                args=(file_name, mode == "stream", chunk_bytes, results_queue),
+            )
+            process.start()
+            seconds, baseline_rss, peak_rss, n_weeks = results_queue.get()
+            process.join()
+            results.append(
+                {
+                    "mode": mode,
+                    "n_rows": n_rows,
+                    "file_mb": file_name.stat().st_size / 2**20,
+                    "n_weeks": n_weeks,
+                    "seconds": seconds,
+                    "peak_rss_mb": peak_rss / 2**20,
+                    "rss_increase_mb": (peak_rss - baseline_rss) / 2**20,
+                }
+            )
+
+        # Remove timesheet
+        Path.unlink(file_name)
+
+    return pd.DataFrame(results)
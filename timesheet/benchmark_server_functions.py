@@ -0,0 +1,200 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import time  # timing functions
+import asyncio  # measuring event loop latency
+import pandas as pd  # storing benchmark results
+
+# Local imports
+from timesheet import timesheet  # timesheet class
+from timesheet import async_timesheet  # asyncio timesheet class
+from timesheet import session_store  # compact in-memory sessions
+from timesheet import data_functions  # creating synthetic timesheets
+from timesheet import storage  # reading and writing timesheet files
+from timesheet import totals_functions  # naming daily totals files
+from timesheet import benchmark_functions  # timing functions
+
+
+def benchmark_session_store_memory(
+    row_counts: list[int] = [1_000, 100_000, 1_000_000],
+    file_name: Path = Path("outputs/benchmark_timesheet.csv"),
+) -> pd.DataFrame:
+    """Benchmark memory used per session by timesheet dataframes and session stores
+
+    Args:
+        row_counts (list[int], optional): numbers of sessions in synthetic timesheets.
+            Defaults to [1_000, 100_000, 1_000_000].
+        file_name (Path, optional): path to temporary timesheet file.
+            Defaults to Path("outputs/benchmark_timesheet.csv").
+
+    Returns:
+        pd.DataFrame: bytes per session for dataframe and session store, and time (seconds)
+            to build a dataframe from the session store, for each timesheet size
+    """
+
+    results = []
+    for n_rows in row_counts:
+
+        # Create and load synthetic timesheet (a few different notes)
+        data_functions.create_synthetic_timesheet(
+            file_name,
+            n_sessions=n_rows,
+            sessions_per_day=20,
+            notes=["nothing of note", "meeting", "coding, reviewing"],
+        )
+        timesheet_data = storage.get_storage(file_name).read()
+        store = session_store.SessionStore.from_dataframe(timesheet_data)
+
+        # Measure memory used by each
+        results.append(
+            {
+                "n_rows": n_rows,
+                "dataframe_bytes_per_row": timesheet_data.memory_usage(deep=True).sum()
+                / n_rows,
+                "store_bytes_per_row": store.memory_usage() / n_rows,
+                "to_dataframe_seconds": benchmark_functions.time_function(
+                    store.to_dataframe, 3
+                ),
+            }
+        )
+
+    # Remove timesheet
+    Path.unlink(file_name)
+
+    return pd.DataFrame(results)
+
+
+async def monitor_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> list[float]:
+    """Measure how late the event loop wakes a task that sleeps repeatedly
+
+    Args:
+        stop (asyncio.Event): set to stop measuring
+        interval (float, optional): seconds slept between measurements. Defaults to 0.001.
+
+    Returns:
+        list[float]: seconds each wake up was late by
+    """
+
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+    return lags
+
+
+async def use_timesheet_blocking(file_name: Path):
+    """Load timesheet, add start and end times and summarise, blocking the event loop
+
+    Args:
+        file_name (Path): path to timesheet file
+    """
+
+    my_timesheet = timesheet.Timesheet(file_name=file_name)
+    await asyncio.sleep(0)
+    my_timesheet.add_start_time()
+    await asyncio.sleep(0)
+    my_timesheet.add_end_time()
+    await asyncio.sleep(0)
+    my_timesheet.summarise("week")
+
+
+async def use_timesheet_async(file_name: Path):
+    """Load timesheet, add start and end times and summarise with AsyncTimesheet
+
+    Args:
+        file_name (Path): path to timesheet file
+    """
+
+    my_timesheet = await async_timesheet.AsyncTimesheet(file_name=file_name).load()
+    await my_timesheet.add_start_time()
+    await my_timesheet.add_end_time()
+    await my_timesheet.summarise("week")
+
+
+async def measure_loop_lag_under_load(use_timesheet, file_names: list[Path]) -> dict:
+    """Use timesheets concurrently (one task per file) while measuring event loop lag
+
+    Args:
+        use_timesheet (callable): coroutine function taking path to timesheet file
+        file_names (list[Path]): paths to timesheet files
+
+    Returns:
+        dict: seconds taken and median, 99th percentile and maximum loop lag (milliseconds)
+    """
+
+    # Start measuring loop lag
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(stop))
+    await asyncio.sleep(0)
+
+    # Use timesheets concurrently
+    start = time.perf_counter()
+    await asyncio.gather(*[use_timesheet(file_name) for file_name in file_names])
+    seconds = time.perf_counter() - start
+
+    # Stop measuring loop lag
+    stop.set()
+    lags = pd.Series(await lag_task) * 1000
+
+    return {
+        "seconds": seconds,
+        "median_lag_ms": lags.median(),
+        "p99_lag_ms": lags.quantile(0.99),
+        "max_lag_ms": lags.max(),
+    }
+
+
+def benchmark_async_loop_latency(
+    n_timesheets: int = 20,
+    n_sessions: int = 100_000,
+    directory: Path = Path("outputs/benchmark_async"),
+) -> pd.DataFrame:
+    """Benchmark event loop latency while many tasks update different timesheets at once
+
+    Each task loads a timesheet, adds start and end times and summarises it by week, either
+    calling Timesheet directly (blocking the loop) or through AsyncTimesheet. Meanwhile a task
+    sleeping for 1ms at a time measures how late the loop wakes it.
+
+    Args:
+        n_timesheets (int, optional): number of timesheets (and tasks). Defaults to 20.
+        n_sessions (int, optional): number of sessions in each timesheet. Defaults to 100_000.
+        directory (Path, optional): directory for temporary timesheet files.
+            Defaults to Path("outputs/benchmark_async").
+
+    Returns:
+        pd.DataFrame: seconds taken and loop lag (milliseconds) for blocking and async calls
+    """
+
+    # Create synthetic timesheets
+    Path.mkdir(directory, exist_ok=True)
+    file_names = [directory / f"person_{index}.csv" for index in range(n_timesheets)]
+    for file_name in file_names:
+        data_functions.create_synthetic_timesheet(
+            file_name, n_sessions=n_sessions, sessions_per_day=20
+        )
+
+    # Measure loop lag with blocking and async calls (daily totals rebuilt by each)
+    results = []
+    for mode, use_timesheet in [
+        ("blocking", use_timesheet_blocking),
+        ("async", use_timesheet_async),
+    ]:
+        for file_name in file_names:
+            totals_functions.get_daily_totals_file_name(file_name).unlink(
+                missing_ok=True
+            )
+        results.append(
+            {
+                "mode": mode,
+                **asyncio.run(measure_loop_lag_under_load(use_timesheet, file_names)),
+            }
+        )
+
+    # Remove timesheets and daily totals
+    for file_name in file_names:
+        totals_functions.get_daily_totals_file_name(file_name).unlink(missing_ok=True)
+        Path.unlink(file_name)
+    Path.rmdir(directory)
+
+    return pd.DataFrame(results)
@@ -0,0 +1,339 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from datetime import date, datetime, timedelta  # working with dates and times
+from io import BytesIO  # reading file contents with pandas
+import pandas as pd  # storing benchmark results
+
+# Local imports
+from timesheet import timesheet  # timesheet class
+from timesheet import data_functions  # creating synthetic timesheets
+from timesheet import storage  # reading and writing timesheet files
+from timesheet import totals_functions  # naming daily totals files
+from timesheet import punch_functions  # adding times to benchmarked timesheets
+from timesheet import partition_functions  # adding times to partitioned timesheets
+from timesheet import cache_functions  # caching parsed timesheets
+from timesheet import parse_functions  # parsing timesheets without cache
+from timesheet import benchmark_functions  # timing functions
+
+
+def benchmark_storage_formats(
+    row_counts: list[int] = [100_000, 1_000_000],
+    file_formats: list[str] = ["csv", "feather", "parquet"],
+    file_stem: Path = Path("outputs/benchmark_timesheet"),
+    n_repeats: int = 3,
+) -> pd.DataFrame:
+    """Benchmark load time and file size of timesheets stored in different file formats
+
+    Args:
+        row_counts (list[int], optional): numbers of rows in timesheets to benchmark.
+            Defaults to [100_000, 1_000_000].
+        file_formats (list[str], optional): file formats to compare.
+            Defaults to ["csv", "feather", "parquet"].
+        file_stem (Path, optional): path (without extension) for temporary timesheet files.
+            Defaults to Path("outputs/benchmark_timesheet").
+        n_repeats (int, optional): number of times each load is timed. Defaults to 3.
+
+    Returns:
+        pd.DataFrame: median load time (seconds) and file size (bytes) for each timesheet
+            size and file format
+    """
+
+    results = []
+    for n_rows in row_counts:
+
+        # Create synthetic timesheet
+        csv_file_name = file_stem.with_suffix(".csv")
+        data_functions.create_synthetic_timesheet(
+            csv_file_name, n_sessions=n_rows, sessions_per_day=20
+        )
+
+        for file_format in file_formats:
+
+            # Convert timesheet to format
+            file_name = file_stem.with_suffix(f".{file_format}")
+            if file_format != "csv":
+                storage.get_storage(file_name).write(
+                    storage.get_storage(csv_file_name).read()
+                )
+
+            # Time loading timesheet
+            file_storage = storage.get_storage(file_name)
+            results.append(
+                {
+                    "n_rows": n_rows,
+                    "file_format": file_format,
+                    "load_seconds": benchmark_functions.time_function(
+                        file_storage.read, n_repeats
+                    ),
+                    "file_size_bytes": file_name.stat().st_size,
+                }
+            )
+
+        # Remove timesheets
+        for file_format in file_formats:
+            Path.unlink(file_stem.with_suffix(f".{file_format}"))
+
+    return pd.DataFrame(results)
+
+
+def benchmark_partitioned_storage(
+    n_rows: int = 1_000_000,
+    directory: Path = Path("outputs"),
+    n_repeats: int = 3,
+) -> pd.DataFrame:
+    """Benchmark single CSV file against partitioned timesheet (see partition_functions)
+
+    The partitioned copy of the synthetic timesheet is compacted, so years before the
+    current year are yearly shards and recent months monthly shards. Times adding a start
+    and end time from the command line (without loading the timesheet), reading one month
+    of records, reading the whole timesheet and summarising after the latest file was
+    changed elsewhere (daily totals rebuilt).
+
+    Args:
+        n_rows (int, optional): number of rows in timesheet. Defaults to 1_000_000.
+        directory (Path, optional): directory for temporary timesheets.
+            Defaults to Path("outputs").
+        n_repeats (int, optional): number of times each operation is timed. Defaults to 3.
+
+    Returns:
+        pd.DataFrame: median run time (seconds) of each operation for each layout
+    """
+
+    # Create synthetic timesheet ending yesterday
+    sessions_per_day = 100
+    n_days = -(-n_rows // sessions_per_day)
+    file_name = directory / "benchmark_partitioned.csv"
+    data_functions.create_synthetic_timesheet(
+        file_name,
+        n_sessions=n_rows,
+        sessions_per_day=sessions_per_day,
+        start_date=date.today() - timedelta(days=n_days),
+    )
+
+    # Write compacted partitioned copy
+    partitioned_directory = directory / "benchmark_partitioned"
+    timesheet_data = storage.get_storage(file_name).read()
+    partitioned_storage = storage.get_storage(partitioned_directory, "partitioned")
+    partitioned_storage.write(timesheet_data)
+    partitioned_storage.compact()
+
+    # Month of records in middle of timesheet
+    month_start = timesheet_data.date.iloc[n_rows // 2].replace(day=1)
+    month_end = month_start + pd.offsets.MonthEnd(0)
+    shard_files = list(
+        partition_functions.find_shard_files(partitioned_directory).values()
+    )
+
+    # Timesheet, module adding times and latest file for each layout
+    results = []
+    layouts = {
+        "single_file": (file_name, punch_functions, file_name),
+        "partitioned": (partitioned_directory, partition_functions, shard_files[-1]),
+    }
+    for layout, (path, punch_module, latest_file_name) in layouts.items():
+
+        # Start and end times (today, each after the last)
+        today = datetime.combine(date.today(), datetime.min.time())
+        new_times = iter(
+            today + timedelta(minutes=minute) for minute in range(1, 24 * 60)
+        )
+
+        def punch():
+            punch_module.commit_operation(path, "start", next(new_times))
+            punch_module.commit_operation(path, "end", next(new_times))
+
+        def summarise_changed():
+            Path.unlink(
+                totals_functions.get_daily_totals_file_name(latest_file_name),
+                missing_ok=True,
+            )
+            timesheet.Timesheet(file_name=path, lazy=True).summarise()
+
+        # Time operations
+        results.append(
+            {
+                "layout": layout,
+                "n_rows": n_rows,
+                "n_files": len(shard_files) if layout == "partitioned" else 1,
+                "punch_seconds": benchmark_functions.time_function(punch, n_repeats),
+                "month_range_seconds": benchmark_functions.time_function(
+                    lambda: timesheet.Timesheet(file_name=path, lazy=True).read_range(
+                        month_start, month_end
+                    ),
+                    n_repeats,
+                ),
+                "full_read_seconds": benchmark_functions.time_function(
+                    lambda: timesheet.Timesheet(file_name=path).timesheet,
+                    n_repeats,
+                ),
+                "summary_rebuild_seconds": benchmark_functions.time_function(
+                    summarise_changed, n_repeats
+                ),
+            }
+        )
+
+    # Remove timesheets
+    for temporary_file_name in list(directory.glob("benchmark_partitioned*")) + list(
+        partitioned_directory.glob("*")
+    ):
+        if temporary_file_name.is_file():
+            Path.unlink(temporary_file_name)
+    partitioned_directory.rmdir()
+
+    return pd.DataFrame(results)
+
+
+def benchmark_parse_cache(
+    n_rows: int = 1_000_000,
+    file_name: Path = Path("outputs/benchmark_timesheet.csv"),
+    cache_directory: Path = Path("outputs/benchmark_cache"),
+    n_repeats: int = 5,
+) -> pd.DataFrame:
+    """Benchmark reading CSV timesheet with and without cached snapshot of parsed columns
+    (see cache_functions)
+
+    Times parsing the whole file without the cache, parsing it and writing its snapshot,
+    reading the unchanged file from its snapshot and reading after a start and end time
+    were added (only the last records parsed).
+
+    Args:
+        n_rows (int, optional): number of rows in timesheet. Defaults to 1_000_000.
+        file_name (Path, optional): path to temporary timesheet file.
+            Defaults to Path("outputs/benchmark_timesheet.csv").
+        cache_directory (Path, optional): path to temporary cache directory.
+            Defaults to Path("outputs/benchmark_cache").
+        n_repeats (int, optional): number of times each read is timed. Defaults to 5.
+
+    Returns:
+        pd.DataFrame: median run time (seconds) of each read and snapshot size (MB)
+    """
+
+    # Create synthetic timesheet (many sessions per day so dates stay in range)
+    data_functions.create_synthetic_timesheet(
+        file_name, n_sessions=n_rows, sessions_per_day=100
+    )
+    snapshot_file_name = cache_functions.get_snapshot_file_name(
+        cache_directory, file_name
+    )
+
+    def read_cached():
+        return cache_functions.read_timesheet_csv(file_name, cache_directory)
+
+    def read_without_snapshot():
+        Path.unlink(snapshot_file_name, missing_ok=True)
+        read_cached()
+
+    # Start and end times (each after the last)
+    last_record = punch_functions.read_last_record(file_name)
+    last_time = datetime.strptime(
+        f"{last_record['date']} {last_record['end_time']}", "%Y-%m-%d %H:%M"
+    )
+    new_times = iter(
+        last_time + timedelta(minutes=minute) for minute in range(1, 24 * 60)
+    )
+
+    def read_after_punch():
+        punch_functions.commit_operation(file_name, "start", next(new_times))
+        punch_functions.commit_operation(file_name, "end", next(new_times))
+        read_cached()
+
+    # Time reads
+    results = {
+        "n_rows": n_rows,
+        "parse_seconds": benchmark_functions.time_function(
+            lambda: parse_functions.parse_timesheet_csv(file_name.read_bytes()),
+            n_repeats,
+        ),
+        "parse_and_snapshot_seconds": benchmark_functions.time_function(
+            read_without_snapshot, n_repeats
+        ),
+        "snapshot_seconds": benchmark_functions.time_function(read_cached, n_repeats),
+        "punch_and_read_seconds": benchmark_functions.time_function(
+            read_after_punch, n_repeats
+        ),
+        "snapshot_mb": snapshot_file_name.stat().st_size / 2**20,
+    }
+
+    # Remove timesheet and cache
+    for temporary_file_name in file_name.parent.glob(f"{file_name.stem}*"):
+        Path.unlink(temporary_file_name)
+    Path.unlink(snapshot_file_name)
+    Path.unlink(cache_functions.get_tail_file_name(snapshot_file_name), missing_ok=True)
+    cache_directory.rmdir()
+
+    return pd.DataFrame([results])
+
+
+def read_timesheet_csv_with_pandas(content: bytes) -> pd.DataFrame:
+    """Read CSV timesheet the way it was read before parse_functions (pd.read_csv then
+    converting date and time columns), to compare load paths
+
+    Args:
+        content (bytes): contents of timesheet file
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    timesheet_data = pd.read_csv(BytesIO(content))
+    timesheet_data["date"] = pd.to_datetime(timesheet_data["date"])
+    for column in ["start_time", "end_time"]:
+        timesheet_data[column] = pd.to_datetime(timesheet_data[column], format="%H:%M")
+    timesheet_data["time_worked"] = pd.to_timedelta(
+        timesheet_data["time_worked"] + ":00"
+    )
+
+    return timesheet_data
+
+
+def benchmark_load_paths(
+    row_counts: list[int] = [100_000, 1_000_000],
+    file_name: Path = Path("outputs/benchmark_timesheet.csv"),
+    n_repeats: int = 5,
+) -> pd.DataFrame:
+    """Benchmark loading CSV timesheet with pandas (old path) and parse_functions (new
+    path)
+
+    Both paths parse file contents already read into memory, so only parsing is timed.
+
+    Args:
+        row_counts (list[int], optional): numbers of rows in timesheets to benchmark.
+            Defaults to [100_000, 1_000_000].
+        file_name (Path, optional): path to temporary timesheet file.
+            Defaults to Path("outputs/benchmark_timesheet.csv").
+        n_repeats (int, optional): number of times each load is timed. Defaults to 5.
+
+    Returns:
+        pd.DataFrame: median load time (seconds) of each path and speedup of new path for
+            each timesheet size
+    """
+
+    results = []
+    for n_rows in row_counts:
+
+        # Create synthetic timesheet (many sessions per day so dates stay in range)
+        data_functions.create_synthetic_timesheet(
+            file_name, n_sessions=n_rows, sessions_per_day=100
+        )
+        content = file_name.read_bytes()
+
+        # Time loading timesheet with each path
+        pandas_seconds = benchmark_functions.time_function(
+            lambda: read_timesheet_csv_with_pandas(content), n_repeats
+        )
+        parse_seconds = benchmark_functions.time_function(
+            lambda: parse_functions.parse_timesheet_csv(content), n_repeats
+        )
+        results.append(
+            {
+                "n_rows": n_rows,
+                "pandas_seconds": pandas_seconds,
+                "parse_seconds": parse_seconds,
+                "speedup": pandas_seconds / parse_seconds,
+            }
+        )
+
+    # Remove timesheet
+    Path.unlink(file_name)
+
+    return pd.DataFrame(results)
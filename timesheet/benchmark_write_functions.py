@@ -0,0 +1,284 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import time  # timing functions
+import statistics  # summarising timings
+import multiprocessing  # adding times from many processes at once
+import warnings  # ignoring warnings from worker processes
+from datetime import date, datetime, timedelta  # working with dates and times
+import pandas as pd  # storing benchmark results
+
+# Local imports
+from timesheet import timesheet  # timesheet class
+from timesheet import data_functions  # creating synthetic timesheets
+from timesheet import storage  # reading and writing timesheet files
+from timesheet import totals_functions  # naming daily totals files
+from timesheet import punch_functions  # creating records and adding times concurrently
+from timesheet import summary_functions  # reading daily totals
+from timesheet import benchmark_functions  # timing functions
+
+
+def benchmark_punch_latency(
+    row_counts: list[int] = [1_000, 10_000, 100_000, 1_000_000],
+    file_name: Path = Path("outputs/benchmark_timesheet.csv"),
+    n_repeats: int = 3,
+) -> pd.DataFrame:
+    """Benchmark writing a punch (start or end time) to timesheets of different sizes
+
+    Compares appending a record (start time) and rewriting the last record (end time)
+    against rewriting the whole file, and loading only the last record (lazy mode) against
+    loading the whole file.
+
+    Args:
+        row_counts (list[int], optional): numbers of rows in timesheets to benchmark.
+            Defaults to [1_000, 10_000, 100_000, 1_000_000].
+        file_name (Path, optional): path to temporary timesheet file.
+            Defaults to Path("outputs/benchmark_timesheet.csv").
+        n_repeats (int, optional): number of times each write is timed. Defaults to 3.
+
+    Returns:
+        pd.DataFrame: median write and load times (seconds) for each timesheet size
+    """
+
+    results = []
+    for n_rows in row_counts:
+
+        # Create and load synthetic timesheet
+        data_functions.create_synthetic_timesheet(
+            file_name, n_sessions=n_rows, sessions_per_day=20
+        )
+        my_timesheet = timesheet.Timesheet(file_name=file_name)
+
+        # Start and end times for new records (each after the last, on day after timesheet)
+        next_date = date.fromisoformat(my_timesheet.last_record["date"]) + timedelta(
+            days=1
+        )
+        new_times = iter(
+            datetime.combine(next_date, datetime.min.time()) + timedelta(minutes=minute)
+            for minute in range(24 * 60)
+        )
+
+        def append_record():
+            my_timesheet.last_record = punch_functions.create_start_record(
+                next(new_times)
+            )
+            my_timesheet.append_last_record()
+
+        def update_record():
+            my_timesheet.last_record["end_time"] = next(new_times).strftime("%H:%M")
+            my_timesheet.update_last_record()
+
+        # Time appending a record then rewriting it (so each end time closes the record
+        # just started, as end times can't be added to records already ended)
+        append_seconds, update_seconds = [], []
+        for _ in range(n_repeats):
+            append_seconds.append(benchmark_functions.time_function(append_record, 1))
+            update_seconds.append(benchmark_functions.time_function(update_record, 1))
+
+        # Time the different write paths
+        results.append(
+            {
+                "n_rows": n_rows,
+                "append_seconds": statistics.median(append_seconds),
+                "update_seconds": statistics.median(update_seconds),
+                "full_rewrite_seconds": benchmark_functions.time_function(
+                    my_timesheet.write_timesheet, n_repeats
+                ),
+                "lazy_load_seconds": benchmark_functions.time_function(
+                    lambda: timesheet.Timesheet(file_name=file_name, lazy=True),
+                    n_repeats,
+                ),
+                "full_load_seconds": benchmark_functions.time_function(
+                    lambda: timesheet.Timesheet(file_name=file_name), n_repeats
+                ),
+            }
+        )
+
+        # Remove timesheet
+        Path.unlink(file_name)
+
+    return pd.DataFrame(results)
+
+
+def add_times_concurrently(file_name: Path, n_operations: int, barrier, results_queue):
+    """Alternately add start and end times to timesheet file (run in a worker process)
+
+    Args:
+        file_name (Path): path to timesheet file
+        n_operations (int): number of start and end times to add
+        barrier (multiprocessing.Barrier): waited on before adding times, so every process
+            starts together
+        results_queue (multiprocessing.Queue): number of accepted start times, accepted end
+            times and rejected operations are put on queue when finished
+    """
+
+    accepted = {"start": 0, "end": 0}
+    n_rejected = 0
+    barrier.wait()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for index in range(n_operations):
+            operation = "start" if index % 2 == 0 else "end"
+            try:
+                if operation == "start":
+                    punch_functions.add_start_time(file_name)
+                else:
+                    punch_functions.add_end_time(file_name)
+                accepted[operation] += 1
+            except Exception:
+                n_rejected += 1
+    results_queue.put((accepted["start"], accepted["end"], n_rejected))
+
+
+def benchmark_concurrent_punches(
+    n_processes: int = 50,
+    n_operations: int = 20,
+    file_name: Path = Path("outputs/benchmark_concurrent.csv"),
+) -> pd.DataFrame:
+    """Benchmark many processes adding start and end times to the same timesheet at once
+
+    Each process alternately adds start and end times (current time) through the timesheet's
+    journal. Afterwards the timesheet is checked: it must contain one record per accepted
+    start time and match its daily totals file.
+
+    Args:
+        n_processes (int, optional): number of processes adding times. Defaults to 50.
+        n_operations (int, optional): number of times added by each process. Defaults to 20.
+        file_name (Path, optional): path to temporary timesheet file.
+            Defaults to Path("outputs/benchmark_concurrent.csv").
+
+    Raises:
+        Exception: if timesheet doesn't match accepted operations or daily totals
+
+    Returns:
+        pd.DataFrame: numbers of processes and operations (accepted and rejected), time
+            taken (seconds) and operations per second
+    """
+
+    # Create empty timesheet and daily totals
+    punch_functions.create_timesheet(file_name)
+    timesheet.Timesheet(file_name=file_name, lazy=True).summarise()
+
+    # Start processes and wait for them to be ready
+    barrier = multiprocessing.Barrier(n_processes + 1)
+    results_queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=add_times_concurrently,
+            args=(file_name, n_operations, barrier, results_queue),
+        )
+        for _ in range(n_processes)
+    ]
+    for process in processes:
+        process.start()
+
+    # Time processes adding times
+    barrier.wait()
+    start = time.perf_counter()
+    process_results = [results_queue.get() for _ in processes]
+    seconds = time.perf_counter() - start
+    for process in processes:
+        process.join()
+    n_starts, n_ends, n_rejected = [sum(counts) for counts in zip(*process_results)]
+
+    # Check a record written for each accepted start time
+    timesheet_data = storage.get_storage(file_name).read()
+    if timesheet_data.shape[0] != n_starts:
+        raise Exception(
+            f"Timesheet has {timesheet_data.shape[0]} records but {n_starts} start times were accepted"
+        )
+
+    # Check daily totals kept up to date
+    if not totals_functions.is_daily_totals_current(file_name):
+        raise Exception("Daily totals file out of date after adding times")
+    daily_totals = summary_functions.read_daily_totals(file_name)
+    if daily_totals.sessions.sum() != n_starts:
+        raise Exception(
+            f"Daily totals have {daily_totals.sessions.sum()} sessions but {n_starts} start times were accepted"
+        )
+
+    # Remove timesheet and daily totals
+    totals_functions.get_daily_totals_file_name(file_name).unlink(missing_ok=True)
+    Path.unlink(file_name)
+
+    n_total = n_processes * n_operations
+    return pd.DataFrame(
+        [
+            {
+                "n_processes": n_processes,
+                "n_operations": n_total,
+                "n_accepted_starts": n_starts,
+                "n_accepted_ends": n_ends,
+                "n_rejected": n_rejected,
+                "seconds": seconds,
+                "operations_per_second": n_total / seconds,
+            }
+        ]
+    )
+
+
+def benchmark_import_records(
+    n_existing: int = 100_000,
+    n_imported: int = 100_000,
+    file_formats: list[str] = ["csv", "feather"],
+    directory: Path = Path("outputs"),
+) -> pd.DataFrame:
+    """Benchmark importing many sessions at once into a timesheet (see Timesheet.add_records())
+
+    Sessions in a synthetic timesheet are split alternately between the timesheet and the
+    records to import, so every imported session is validated against and merged between
+    existing sessions.
+
+    Args:
+        n_existing (int, optional): number of sessions already in timesheet.
+            Defaults to 100_000.
+        n_imported (int, optional): number of sessions imported. Defaults to 100_000.
+        file_formats (list[str], optional): timesheet file formats to benchmark.
+            Defaults to ["csv", "feather"].
+        directory (Path, optional): directory for temporary timesheet files.
+            Defaults to Path("outputs").
+
+    Returns:
+        pd.DataFrame: seconds taken to import sessions for each file format
+    """
+
+    # Create synthetic sessions (as written in timesheet file)
+    sessions_file_name = directory / "benchmark_import_sessions.csv"
+    data_functions.create_synthetic_timesheet(
+        sessions_file_name, n_sessions=n_existing + n_imported, sessions_per_day=20
+    )
+    sessions = pd.read_csv(sessions_file_name, dtype=str, keep_default_na=False)
+
+    # Split sessions between timesheet and records to import
+    imported = sessions.index % 2 == 1
+    imported[2 * min(n_existing, n_imported) :] = n_imported > n_existing
+    sessions[~imported].to_csv(sessions_file_name, index=False)
+    records = sessions.loc[imported, ["date", "start_time", "end_time", "notes"]]
+    existing_sessions = storage.get_storage(sessions_file_name).read()
+    Path.unlink(sessions_file_name)
+
+    results = []
+    for file_format in file_formats:
+
+        # Write existing sessions
+        file_name = directory / f"benchmark_import.{file_format}"
+        storage.get_storage(file_name).write(existing_sessions)
+        my_timesheet = timesheet.Timesheet(file_name=file_name, lazy=True)
+
+        # Import records
+        start = time.perf_counter()
+        n_sessions = my_timesheet.add_records(records)
+        seconds = time.perf_counter() - start
+        results.append(
+            {
+                "file_format": file_format,
+                "n_existing": n_existing,
+                "n_imported": n_sessions,
+                "seconds": seconds,
+                "sessions_per_second": n_sessions / seconds,
+            }
+        )
+
+        # Remove timesheet
+        Path.unlink(file_name)
+
+    return pd.DataFrame(results)
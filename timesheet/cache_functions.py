@@ -0,0 +1,537 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import hashlib  # hashing blocks of timesheet files
+import json  # storing snapshot details
+import os  # reading cache environment variable and file details
+import zipfile  # catching unreadable snapshots
+import numpy as np  # storing parsed columns
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import parse_functions  # parsing timesheet CSV files
+from timesheet import data_functions  # joining cached and new records
+from timesheet import profile_functions  # timing cache reads and writes
+
+# Parsing a large CSV timesheet takes much longer than reading its parsed columns back
+# from a binary snapshot, so if the cache is turned on the parsed columns of each CSV
+# timesheet read are kept in a cache directory (one snapshot per timesheet file). A
+# snapshot is used when the file's size, modification time, inode and a hash of its last
+# block match. If the file only changed after its last record (e.g. start and end times
+# added), only the new end of the file is parsed and the new records are written to a
+# small tail snapshot, so the whole snapshot is only rewritten once the tail grows
+
+# Environment variable turning on cache (1 for default directory or path to directory)
+CACHE_ENVIRONMENT_VARIABLE = "TIMESHEET_CACHE"
+
+# Default cache directory
+DEFAULT_CACHE_DIRECTORY = Path.home() / ".cache" / "timesheet"
+
+# Fraction of records in snapshot that can be kept in its tail snapshot before the whole
+# snapshot is rewritten
+MAX_TAIL_FRACTION = 1 / 8
+
+# Default size limit of cache directory (oldest snapshots removed once exceeded)
+DEFAULT_CACHE_BYTES = 256 * 2**20
+
+# Number of bytes hashed to check a block of the timesheet file is unchanged
+BLOCK_BYTES = 4096
+
+
+def get_cache_directory() -> Path:
+    """Get cache directory for parsed timesheets (set by TIMESHEET_CACHE environment
+    variable, cache is off if it isn't set)
+
+    Returns:
+        Path: path to cache directory, None if cache is turned off
+    """
+
+    cache_directory = os.environ.get(CACHE_ENVIRONMENT_VARIABLE)
+    if cache_directory in [None, "", "0"]:
+        return None
+    if cache_directory == "1":
+        return DEFAULT_CACHE_DIRECTORY
+
+    return Path(cache_directory)
+
+
+def get_snapshot_file_name(cache_directory: Path, file_name: Path) -> Path:
+    """Get path of snapshot of timesheet file in cache directory (named by hash of
+    timesheet file's absolute path)
+
+    Args:
+        cache_directory (Path): path to cache directory
+        file_name (Path): path to timesheet file
+
+    Returns:
+        Path: path to snapshot file
+    """
+
+    key = hashlib.blake2b(
+        str(Path(file_name).absolute()).encode(), digest_size=16
+    ).hexdigest()
+
+    return Path(cache_directory) / f"{key}.npz"
+
+
+def get_tail_file_name(snapshot_file_name: Path) -> Path:
+    """Get path of tail snapshot holding records added to timesheet file after its
+    snapshot was written
+
+    Args:
+        snapshot_file_name (Path): path to snapshot file
+
+    Returns:
+        Path: path to tail snapshot file
+    """
+
+    snapshot_file_name = Path(snapshot_file_name)
+
+    return snapshot_file_name.with_name(f"{snapshot_file_name.stem}.tail.npz")
+
+
+def hash_block(file, end: int) -> str:
+    """Hash block of file ending at offset (up to BLOCK_BYTES bytes)
+
+    Args:
+        file (file): file opened in binary mode
+        end (int): offset of end of block
+
+    Returns:
+        str: hash of block
+    """
+
+    start = max(end - BLOCK_BYTES, 0)
+    file.seek(start)
+
+    return hashlib.blake2b(file.read(end - start), digest_size=16).hexdigest()
+
+
+def find_last_record_offset(content: bytes) -> int:
+    """Find offset of start of last record in timesheet CSV content
+
+    Records before this offset are unchanged when start and end times are added (only the
+    last record is rewritten). If the last line contains a quote it may be the end of a
+    record spanning several lines (e.g. notes containing newlines), so the end of the
+    content is used instead.
+
+    Args:
+        content (bytes): timesheet file content (including header)
+
+    Returns:
+        int: offset of start of last record, length of content if there are no records or
+            the last line may not be a whole record
+    """
+
+    end = len(content.rstrip(b"\r\n"))
+    start = content.rfind(b"\n", 0, end) + 1
+    if start == 0 or content.find(parse_functions.QUOTE, start, end) != -1:
+        return len(content)
+
+    return start
+
+
+def describe_file(file, stat, last_record_offset: int, n_records: int) -> dict:
+    """Describe timesheet file for checking its snapshot is still valid
+
+    Args:
+        file (file): timesheet file opened in binary mode
+        stat (os.stat_result): details of timesheet file when it was read
+        last_record_offset (int): offset of start of last record in file (see
+            find_last_record_offset())
+        n_records (int): number of records in file
+
+    Returns:
+        dict: size, modification time, inode and hash of last block of file, and offset,
+            hash of block ending at and number of records before last record
+    """
+
+    return {
+        "file_name": str(Path(file.name).absolute()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "inode": stat.st_ino,
+        "hash": hash_block(file, stat.st_size),
+        "prefix_size": last_record_offset,
+        "prefix_hash": hash_block(file, last_record_offset),
+        "prefix_records": n_records - (last_record_offset < stat.st_size),
+    }
+
+
+def write_snapshot(
+    snapshot_file_name: Path, timesheet: pd.DataFrame, description: dict
+):
+    """Write parsed timesheet columns to snapshot file
+
+    Categorical columns (notes) are stored as codes plus their categories joined into one
+    UTF-8 buffer, so no python objects are pickled.
+
+    Args:
+        snapshot_file_name (Path): path to snapshot file
+        timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        description (dict): description of timesheet file (see describe_file())
+    """
+
+    # Store columns as numpy arrays
+    arrays = {}
+    categorical = []
+    for column in timesheet.columns:
+        values = timesheet[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = [category.encode() for category in values.cat.categories]
+            arrays[f"{column}.codes"] = values.cat.codes.to_numpy()
+            arrays[f"{column}.categories"] = np.frombuffer(
+                b"".join(categories), dtype=np.uint8
+            )
+            arrays[f"{column}.offsets"] = np.cumsum(
+                [0] + [len(category) for category in categories], dtype=np.int64
+            )
+            categorical.append(column)
+        else:
+            arrays[column] = values.to_numpy()
+
+    # Add description of file and columns
+    description = {
+        **description,
+        "columns": timesheet.columns.tolist(),
+        "categorical": categorical,
+    }
+    arrays["description"] = np.array(json.dumps(description))
+
+    # Write snapshot via temporary file so readers never see a partial snapshot (not
+    # synced to disk, a lost snapshot only means the timesheet is parsed again)
+    snapshot_file_name = Path(snapshot_file_name)
+    snapshot_file_name.parent.mkdir(parents=True, exist_ok=True)
+    temporary_file_name = snapshot_file_name.with_name(
+        f".{snapshot_file_name.name}.{os.getpid()}.tmp"
+    )
+    with open(temporary_file_name, "wb") as file:
+        np.savez(file, **arrays)
+    os.replace(temporary_file_name, snapshot_file_name)
+
+
+def read_snapshot_description(snapshot_file_name: Path) -> dict:
+    """Read description of timesheet file stored with snapshot
+
+    Args:
+        snapshot_file_name (Path): path to snapshot file
+
+    Returns:
+        dict: description (see describe_file()), None if snapshot missing or unreadable
+    """
+
+    try:
+        with np.load(snapshot_file_name) as snapshot:
+            return json.loads(str(snapshot["description"]))
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def read_snapshot(snapshot_file_name: Path, n_records: int = None) -> pd.DataFrame:
+    """Read parsed timesheet columns from snapshot file
+
+    Args:
+        snapshot_file_name (Path): path to snapshot file
+        n_records (int, optional): number of records to keep (from start). Defaults to None
+            (all records).
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    with np.load(snapshot_file_name) as snapshot:
+        description = json.loads(str(snapshot["description"]))
+        columns = {}
+        for column in description["columns"]:
+            if column in description["categorical"]:
+                buffer = snapshot[f"{column}.categories"].tobytes()
+                offsets = snapshot[f"{column}.offsets"]
+                categories = [
+                    buffer[start:end].decode()
+                    for start, end in zip(offsets[:-1], offsets[1:])
+                ]
+                columns[column] = pd.Categorical.from_codes(
+                    snapshot[f"{column}.codes"][:n_records], categories=categories
+                )
+            else:
+                columns[column] = snapshot[column][:n_records]
+
+    return pd.DataFrame(columns)
+
+
+def read_tail_description(snapshot_file_name: Path, snapshot_description: dict) -> dict:
+    """Read description of timesheet file stored with tail snapshot
+
+    Args:
+        snapshot_file_name (Path): path to snapshot file
+        snapshot_description (dict): description stored with snapshot (see
+            read_snapshot_description())
+
+    Returns:
+        dict: description (see describe_file()) with the snapshot it follows and number of
+            records kept from it, None if tail snapshot missing, unreadable or doesn't
+            follow the snapshot
+    """
+
+    if snapshot_description is None:
+        return None
+    description = read_snapshot_description(get_tail_file_name(snapshot_file_name))
+    if description is None or description["snapshot"] != [
+        snapshot_description["size"],
+        snapshot_description["mtime_ns"],
+        snapshot_description["hash"],
+    ]:
+        return None
+
+    return description
+
+
+def read_cached_records(
+    snapshot_file_name: Path, description: dict, n_records: int = None
+) -> pd.DataFrame:
+    """Read parsed timesheet columns from snapshot file and its tail snapshot (if
+    described)
+
+    Args:
+        snapshot_file_name (Path): path to snapshot file
+        description (dict): description of snapshot or tail snapshot
+        n_records (int, optional): number of records to keep (from start). Defaults to None
+            (all records).
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    if "snapshot_records" not in description:
+        return read_snapshot(snapshot_file_name, n_records)
+
+    snapshot_records = description["snapshot_records"]
+    return data_functions.concat_timesheets(
+        [
+            read_snapshot(snapshot_file_name, snapshot_records),
+            read_snapshot(
+                get_tail_file_name(snapshot_file_name),
+                None if n_records is None else n_records - snapshot_records,
+            ),
+        ]
+    )
+
+
+def evict_snapshots(cache_directory: Path, max_bytes: int = DEFAULT_CACHE_BYTES):
+    """Remove least recently used snapshots until cache directory is within size limit
+
+    Args:
+        cache_directory (Path): path to cache directory
+        max_bytes (int, optional): size limit of cache directory (bytes).
+            Defaults to DEFAULT_CACHE_BYTES (256MB).
+    """
+
+    # Find snapshots, most recently used first
+    snapshots = []
+    for snapshot_file_name in Path(cache_directory).glob("*.npz"):
+        try:
+            stat = snapshot_file_name.stat()
+        except FileNotFoundError:
+            continue
+        snapshots.append((stat.st_mtime_ns, stat.st_size, snapshot_file_name))
+    snapshots.sort(reverse=True)
+
+    # Remove snapshots beyond size limit
+    total_bytes = 0
+    for _, size, snapshot_file_name in snapshots:
+        total_bytes += size
+        if total_bytes > max_bytes:
+            Path.unlink(snapshot_file_name, missing_ok=True)
+
+
+def read_new_records(
+    file, description: dict, snapshot_file_name: Path
+) -> tuple[pd.DataFrame, int]:
+    """Read cached records before last record of snapshot and parse rest of file
+
+    Args:
+        file (file): timesheet file opened in binary mode
+        description (dict): description of file when snapshot or tail snapshot written
+            (see describe_file())
+        snapshot_file_name (Path): path to snapshot file
+
+    Returns:
+        tuple[pd.DataFrame, int]: timesheet and offset of start of its last record in file,
+            (None, None) if rest of file has malformed records (the whole file is parsed
+            so errors are reported with line numbers)
+    """
+
+    # Read header and rest of file from last record of snapshot
+    prefix_size = description["prefix_size"]
+    file.seek(0)
+    header = file.readline()
+    file.seek(prefix_size)
+    with profile_functions.phase("read_file") as read_phase:
+        content = header + file.read()
+        read_phase.count(bytes_read=len(content))
+
+    # Parse rest of file
+    try:
+        with profile_functions.phase("parse") as parse_phase:
+            new_records = parse_functions.parse_timesheet_csv(content)
+            parse_phase.count(rows=new_records.shape[0])
+    except parse_functions.TimesheetFormatError:
+        return None, None
+
+    # Join cached and new records (dropping notes no longer used)
+    with profile_functions.phase("read_cache") as cache_phase:
+        cached_records = read_cached_records(
+            snapshot_file_name, description, description["prefix_records"]
+        )
+        cache_phase.count(rows=cached_records.shape[0])
+    timesheet = data_functions.concat_timesheets([cached_records, new_records])
+    notes_counts = np.bincount(
+        timesheet.notes.cat.codes, minlength=timesheet.notes.cat.categories.size
+    )
+    if (notes_counts == 0).any():
+        timesheet["notes"] = timesheet.notes.cat.remove_unused_categories()
+
+    return timesheet, prefix_size + find_last_record_offset(content) - len(header)
+
+
+def read_timesheet_csv(
+    file_name: Path, cache_directory: Path, max_bytes: int = DEFAULT_CACHE_BYTES
+) -> pd.DataFrame:
+    """Read timesheet CSV file, using cached snapshot of its parsed columns if valid
+
+    The snapshot is used as is if the file's size, modification time, inode and last block
+    are unchanged. If the file only changed from its last record onwards (e.g. start and
+    end times added), the cached records before it are kept and only the rest of the file
+    is parsed. Otherwise the whole file is parsed. The snapshot (or only its tail, see
+    update_snapshot()) is rewritten after parsing.
+
+    Args:
+        file_name (Path): path to timesheet CSV file
+        cache_directory (Path): path to cache directory
+        max_bytes (int, optional): size limit of cache directory (bytes).
+            Defaults to DEFAULT_CACHE_BYTES (256MB).
+
+    Raises:
+        parse_functions.TimesheetFormatError: if any records are malformed
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    # Read description of snapshot (or its tail if written since)
+    snapshot_file_name = get_snapshot_file_name(cache_directory, file_name)
+    snapshot_description = read_snapshot_description(snapshot_file_name)
+    description = read_tail_description(snapshot_file_name, snapshot_description)
+    if description is None:
+        description = snapshot_description
+
+    with open(file_name, "rb") as file:
+        stat = os.fstat(file.fileno())
+        timesheet = None
+
+        # Check if snapshot matches file (or file only changed from its last record)
+        if description != None and description["inode"] == stat.st_ino:
+            if (
+                description["size"] == stat.st_size
+                and description["mtime_ns"] == stat.st_mtime_ns
+                and description["hash"] == hash_block(file, stat.st_size)
+            ):
+                with profile_functions.phase("read_cache") as cache_phase:
+                    timesheet = read_cached_records(snapshot_file_name, description)
+                    cache_phase.count(rows=timesheet.shape[0])
+                os.utime(snapshot_file_name)
+                if description is not snapshot_description:
+                    os.utime(get_tail_file_name(snapshot_file_name))
+                return timesheet
+            if stat.st_size >= description["prefix_size"] and description[
+                "prefix_hash"
+            ] == hash_block(file, description["prefix_size"]):
+                timesheet, last_record_offset = read_new_records(
+                    file, description, snapshot_file_name
+                )
+
+        # Read and parse whole file (snapshot rewritten rather than adding to its tail)
+        if timesheet is None:
+            snapshot_description = None
+            file.seek(0)
+            with profile_functions.phase("read_file") as read_phase:
+                content = file.read()
+                read_phase.count(bytes_read=len(content))
+            with profile_functions.phase("parse") as parse_phase:
+                timesheet = parse_functions.parse_timesheet_csv(content)
+                parse_phase.count(rows=timesheet.shape[0])
+            last_record_offset = find_last_record_offset(content)
+
+        # Describe file for next read
+        description = describe_file(file, stat, last_record_offset, timesheet.shape[0])
+
+    update_snapshot(
+        snapshot_file_name, timesheet, description, snapshot_description, max_bytes
+    )
+
+    return timesheet
+
+
+def update_snapshot(
+    snapshot_file_name: Path,
+    timesheet: pd.DataFrame,
+    description: dict,
+    snapshot_description: dict = None,
+    max_bytes: int = DEFAULT_CACHE_BYTES,
+):
+    """Write snapshot of parsed timesheet and remove old snapshots beyond size limit
+
+    If the timesheet was read from the snapshot plus new records, only the records after
+    the last record of the snapshot are written to its tail snapshot, until they are more
+    than MAX_TAIL_FRACTION of the records in the snapshot. Then the whole snapshot is
+    rewritten (and the tail removed), so adding start and end times doesn't rewrite the
+    whole snapshot each time it is read.
+
+    Args:
+        snapshot_file_name (Path): path to snapshot file
+        timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        description (dict): description of timesheet file (see describe_file())
+        snapshot_description (dict, optional): description stored with current snapshot
+            if timesheet was read from it. Defaults to None (whole snapshot rewritten).
+        max_bytes (int, optional): size limit of cache directory (bytes).
+            Defaults to DEFAULT_CACHE_BYTES (256MB).
+    """
+
+    tail_file_name = get_tail_file_name(snapshot_file_name)
+    with profile_functions.phase("write_cache") as write_phase:
+
+        # Write records after last record of snapshot to tail snapshot while tail is small
+        snapshot_records = (
+            None
+            if snapshot_description is None
+            else snapshot_description["prefix_records"]
+        )
+        if snapshot_records != None and (
+            timesheet.shape[0] - snapshot_records
+            <= snapshot_records * MAX_TAIL_FRACTION
+        ):
+            tail = timesheet.iloc[snapshot_records:].copy()
+            tail["notes"] = tail.notes.cat.remove_unused_categories()
+            description = {
+                **description,
+                "snapshot": [
+                    snapshot_description["size"],
+                    snapshot_description["mtime_ns"],
+                    snapshot_description["hash"],
+                ],
+                "snapshot_records": snapshot_records,
+            }
+            write_snapshot(tail_file_name, tail, description)
+            os.utime(snapshot_file_name)
+            write_phase.count(
+                rows=tail.shape[0], bytes_written=tail_file_name.stat().st_size
+            )
+
+        # Rewrite whole snapshot
+        else:
+            write_snapshot(snapshot_file_name, timesheet, description)
+            Path.unlink(tail_file_name, missing_ok=True)
+            write_phase.count(
+                rows=timesheet.shape[0],
+                bytes_written=snapshot_file_name.stat().st_size,
+            )
+    evict_snapshots(snapshot_file_name.parent, max_bytes)
@@ -0,0 +1,326 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import numpy as np  # checking sessions in vectorised passes
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import data_functions  # calculating and formatting times
+
+# Columns of check reports
+REPORT_COLUMNS = ["row", "check", "problem"]
+
+# Nanoseconds in a day (for finding the day sessions start and end on)
+DAY_NANOSECONDS = 24 * 60 * 60 * 10**9
+
+
+def sort_sessions(starts: np.ndarray, ends: np.ndarray) -> tuple:
+    """Sort sessions by start time and find the latest ending session before each
+
+    Args:
+        starts (np.ndarray): start of each session (int64, e.g. nanoseconds)
+        ends (np.ndarray): end of each session (int64)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: order of sessions by start
+            time, sorted starts, latest end of the sessions up to each sorted session and
+            sorted position of the session ending latest
+    """
+
+    # Sort by start time
+    order = np.lexsort((ends, starts))
+    sorted_starts, sorted_ends = starts[order], ends[order]
+
+    # Find latest ending session up to each session
+    latest_end = np.maximum.accumulate(sorted_ends)
+    latest_position = np.maximum.accumulate(
+        np.where(sorted_ends == latest_end, np.arange(sorted_ends.shape[0]), 0)
+    )
+
+    return order, sorted_starts, latest_end, latest_position
+
+
+def find_overlaps(
+    starts: np.ndarray, ends: np.ndarray, sorted_sessions: tuple = None
+) -> tuple:
+    """Find sessions that start before an earlier starting session ends
+
+    Sessions are sorted by start time once, then each is compared with the latest end of the
+    sessions before it, so every overlapping session is found in a single pass (O(n log n)).
+    Each is reported against the earlier session ending latest, rather than against every
+    session it overlaps. Sessions that touch (one ends as the next starts) don't overlap.
+
+    Args:
+        starts (np.ndarray): start of each session (int64, e.g. nanoseconds)
+        ends (np.ndarray): end of each session (int64)
+        sorted_sessions (tuple, optional): sessions already sorted (see sort_sessions()).
+            Defaults to None (sorted here).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: positions of overlapping sessions and of the earlier
+            session each overlaps
+    """
+
+    # Sort by start time
+    if sorted_sessions is None:
+        sorted_sessions = sort_sessions(starts, ends)
+    order, sorted_starts, latest_end, latest_position = sorted_sessions
+
+    # Find sessions starting before an earlier session ends
+    overlapping = np.flatnonzero(sorted_starts[1:] < latest_end[:-1]) + 1
+
+    return order[overlapping], order[latest_position[overlapping - 1]]
+
+
+def find_long_gaps(
+    starts: np.ndarray, ends: np.ndarray, max_gap: int, sorted_sessions: tuple = None
+) -> tuple:
+    """Find sessions that start more than max_gap after every earlier session ended that day
+
+    Uses the same sort as find_overlaps(), comparing each session with the latest end of
+    the sessions before it. Gaps after a session that ended on an earlier day (e.g. between
+    working days) aren't reported, but the gap after a session that crossed midnight is
+    (it ended on the day the next session starts).
+
+    Args:
+        starts (np.ndarray): start of each session (int64 nanoseconds since 1970-01-01)
+        ends (np.ndarray): end of each session (int64 nanoseconds since 1970-01-01)
+        max_gap (int): longest gap expected between sessions (nanoseconds)
+        sorted_sessions (tuple, optional): sessions already sorted (see sort_sessions()).
+            Defaults to None (sorted here).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: positions of sessions starting after a
+            long gap, of the earlier session ending latest and length of each gap
+    """
+
+    # Sort by start time
+    if sorted_sessions is None:
+        sorted_sessions = sort_sessions(starts, ends)
+    order, sorted_starts, latest_end, latest_position = sorted_sessions
+
+    # Find sessions starting long after the latest earlier end on the same day
+    gaps = sorted_starts[1:] - latest_end[:-1]
+    same_day = (
+        sorted_starts[1:] // DAY_NANOSECONDS == latest_end[:-1] // DAY_NANOSECONDS
+    )
+    long_gaps = np.flatnonzero(same_day & (gaps > max_gap)) + 1
+
+    return (
+        order[long_gaps],
+        order[latest_position[long_gaps - 1]],
+        gaps[long_gaps - 1],
+    )
+
+
+def build_report(rows: np.ndarray, check: str, problems) -> pd.DataFrame:
+    """Build check report for rows failing one check
+
+    Args:
+        rows (np.ndarray): positions of rows failing check
+        check (str): name of check
+        problems (list[str] | str): description of each problem (or one for all rows)
+
+    Returns:
+        pd.DataFrame: report (row, check and problem columns)
+    """
+
+    return pd.DataFrame(
+        {"row": np.asarray(rows, dtype=np.int64), "check": check, "problem": problems},
+        columns=REPORT_COLUMNS,
+    )
+
+
+def check_timesheet(
+    timesheet: pd.DataFrame,
+    overnight: bool = False,
+    max_gap: pd.Timedelta = pd.Timedelta(hours=4),
+) -> pd.DataFrame:
+    """Check whole timesheet for problems, in vectorised passes over all rows
+
+    The following checks are made:
+    - missing_start_time: session has no start time
+    - open_session: session has no end time (only the last session should be open)
+    - negative_duration: session ends before it starts
+    - crosses_midnight: session ends on the next day (only if overnight)
+    - time_worked: time_worked (if set) doesn't match end_time - start_time
+    - out_of_order: row dated before an earlier row (timesheets are kept in date order)
+    - overlap: session starts before an earlier session ends (sessions sorted once)
+    - long_gap: session starts more than max_gap after the earlier sessions of the day
+      ended (e.g. a forgotten start time), using the same sort
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        overnight (bool, optional): treat end times before their start time as being on the
+            next day, for sessions that cross midnight. Defaults to False.
+        max_gap (pd.Timedelta, optional): longest gap expected between sessions on the
+            same day. Defaults to pd.Timedelta(hours=4) (None to not check gaps).
+
+    Returns:
+        pd.DataFrame: one row per problem with the position of the row in the timesheet
+            (from 0, in file order), the check failed and a description of the problem,
+            sorted by row (empty if no problems found)
+    """
+
+    n_rows = timesheet.shape[0]
+    dates = timesheet.date.to_numpy(dtype="datetime64[ns]")
+    start_times = timesheet.start_time.to_numpy(dtype="datetime64[ns]")
+    end_times = timesheet.end_time.to_numpy(dtype="datetime64[ns]")
+    time_worked = timesheet.time_worked.to_numpy(dtype="timedelta64[ns]")
+    reports = []
+
+    # Find sessions missing start or end times (last session can still be open)
+    missing_start = np.isnat(start_times)
+    open_session = np.isnat(end_times) & ~missing_start
+    reports.append(
+        build_report(
+            np.flatnonzero(missing_start),
+            "missing_start_time",
+            "session has no start time",
+        )
+    )
+    reports.append(
+        build_report(
+            np.flatnonzero(open_session[:-1]),
+            "open_session",
+            "session has no end time (only the last session can be open)",
+        )
+    )
+
+    # Find sessions ending before they start
+    durations, invalid = data_functions.calculate_time_difference_array(
+        start_times, end_times, overnight=overnight
+    )
+    negative = invalid & ~missing_start & ~open_session
+    rows = np.flatnonzero(negative)
+    reports.append(
+        build_report(
+            rows,
+            "negative_duration",
+            [
+                f"end_time {end} is before start_time {start}"
+                for start, end in zip(
+                    data_functions.format_times_of_day(start_times[rows]),
+                    data_functions.format_times_of_day(end_times[rows]),
+                )
+            ],
+        )
+    )
+
+    # Find sessions ending on the next day (only valid if sessions can cross midnight)
+    rows = np.flatnonzero(~invalid & (end_times < start_times))
+    reports.append(
+        build_report(
+            rows,
+            "crosses_midnight",
+            [
+                f"session ends on the next day at {end}"
+                for end in data_functions.format_times_of_day(end_times[rows])
+            ],
+        )
+    )
+
+    # Find stored time worked not matching start and end times (zero if session open),
+    # missing or 00:00 time worked is unset (written by older versions when session started)
+    durations[open_session] = np.timedelta64(0, "ns")
+    unset = np.isnat(time_worked) | (time_worked == np.timedelta64(0, "ns"))
+    rows = np.flatnonzero(
+        ~missing_start & ~negative & ~unset & (time_worked != durations)
+    )
+    reports.append(
+        build_report(
+            rows,
+            "time_worked",
+            [
+                f"time_worked {stored_time} doesn't match "
+                f"end_time - start_time ({expected_time})"
+                for stored_time, expected_time in zip(
+                    data_functions.format_times_of_day(time_worked[rows], missing=""),
+                    data_functions.format_times_of_day(durations[rows]),
+                )
+            ],
+        )
+    )
+
+    # Find rows dated before an earlier row (compared with the latest date so far)
+    date_numbers = dates.view(np.int64)
+    latest_date = np.maximum.accumulate(date_numbers)
+    latest_row = np.maximum.accumulate(
+        np.where(date_numbers == latest_date, np.arange(n_rows), 0)
+    )
+    rows = np.flatnonzero(date_numbers[1:] < latest_date[:-1]) + 1
+    reports.append(
+        build_report(
+            rows,
+            "out_of_order",
+            [
+                f"date {row_date} is before date of row {other_row}"
+                for row_date, other_row in zip(
+                    data_functions.format_dates(pd.Series(dates[rows])),
+                    latest_row[rows - 1],
+                )
+            ],
+        )
+    )
+
+    # Find overlapping sessions (open sessions take no time, negative durations ignored)
+    checked = np.flatnonzero(~missing_start & ~negative)
+    day_start = np.datetime64("1900-01-01", "ns")
+    starts = (dates[checked] + (start_times[checked] - day_start)).view(np.int64)
+    ends = starts + durations[checked].view(np.int64)
+    sorted_sessions = sort_sessions(starts, ends)
+    positions, other_positions = find_overlaps(starts, ends, sorted_sessions)
+    reports.append(
+        build_report(
+            checked[positions],
+            "overlap",
+            [f"overlaps row {other_row}" for other_row in checked[other_positions]],
+        )
+    )
+
+    # Find long gaps between sessions on the same day (using the same sort)
+    if max_gap is not None:
+        positions, other_positions, gaps = find_long_gaps(
+            starts, ends, pd.Timedelta(max_gap).value, sorted_sessions
+        )
+        reports.append(
+            build_report(
+                checked[positions],
+                "long_gap",
+                [
+                    f"starts {gap} after row {other_row} ends"
+                    for gap, other_row in zip(
+                        data_functions.format_times_of_day(
+                            gaps.astype("timedelta64[ns]")
+                        ),
+                        checked[other_positions],
+                    )
+                ],
+            )
+        )
+
+    # Combine reports
+    report = pd.concat(reports, ignore_index=True)
+
+    return report.sort_values("row", kind="stable").reset_index(drop=True)
+
+
+def format_check_report(report: pd.DataFrame, file_name: Path) -> str:
+    """Format check report for printing
+
+    Args:
+        report (pd.DataFrame): check report (see check_timesheet())
+        file_name (Path): path to timesheet file checked
+
+    Returns:
+        str: formatted report (number of problems of each check then each problem)
+    """
+
+    if report.shape[0] == 0:
+        return f"No problems found in {file_name}"
+
+    counts = report["check"].value_counts().sort_index()
+    lines = [f"{report.shape[0]} problem(s) found in {file_name}:"]
+    lines += [f"  {check}: {count}" for check, count in counts.items()]
+    lines += ["", report.to_string(index=False)]
+
+    return "\n".join(lines)
@@ -1,11 +1,24 @@
 # Load packages
 import argparse  # parsing command line arguments
 from pathlib import Path  # handling file paths
-from datetime import datetime  # working with dates and times
+from datetime import datetime, timedelta  # working with dates and times
 import sys  # accessing command line arguments
 
 # Local imports
-from timesheet import timesheet
+from timesheet import punch_functions  # adding start and end times without pandas
+from timesheet import (
+    partition_functions,
+)  # adding times to partitioned timesheets without pandas
+from timesheet import (
+    fixed_width_functions,
+)  # adding times to fixed width timesheets without pandas
+from timesheet import file_functions  # detecting timesheet file formats
+from timesheet import server_functions  # forwarding arguments to daemon
+from timesheet import profile_functions  # timing phases of run
+
+# Note timesheet.timesheet (which imports pandas) is imported only when needed so that
+# simple punches (-s/--start, -e/--end, -r/--reset) start quickly. When a daemon is running
+# (--serve) arguments are forwarded to it instead, which keeps timesheets in memory
 
 
 def build_command_line_interface() -> argparse.ArgumentParser:
@@ -16,6 +29,20 @@ def build_command_line_interface() -> argparse.ArgumentParser:
     - Reset: -r/--reset
     - Add start time: -s/--start
     - Add end time: -s/--end
+    - Change fields of a record: --edit
+    - Timesheet file format: --format
+    - Convert timesheet to another file: --convert
+    - Merge old monthly shards of partitioned timesheet into yearly shards: --compact
+    - Summarise hours worked: --summary
+    - Records between dates: --from/--to
+    - Minutes worked per day of the week and hour (or 15 minutes): --occupancy
+    - Records with notes containing words: --grep
+    - Import sessions from file: --import
+    - Check timesheet for problems: --check (with --max-gap)
+    - Stream records in chunks for files larger than memory: --stream
+    - Team report for directory of timesheets: --team-report (with --workers and --chunk-size)
+    - Run daemon keeping timesheets in memory: --serve (with --socket and --no-daemon)
+    - Record time taken by each phase of run: --profile
 
     Returns:
         argparse.ArgumentParser: argument parser
@@ -67,6 +94,134 @@ def build_command_line_interface() -> argparse.ArgumentParser:
         type=str,
         help="Add end time (hh:mm) to timesheet file provided with file (-f/--file) argument.",
     )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "feather", "parquet", "partitioned", "fixed"],
+        default=None,
+        help="Format of timesheet file provided with file (-f/--file) argument. If not provided directories are partitioned (one CSV file per month or year) and files are chosen by file extension (e.g. .fwf is fixed width, unknown extensions are read as csv).",
+    )
+    parser.add_argument(
+        "--edit",
+        nargs="+",
+        metavar=("row", "column=value"),
+        type=str,
+        help='Change fields of record at row (0 is first record, -1 last) in timesheet file provided with file (-f/--file) argument, e.g. --edit -1 notes="client call" end_time=17:30. Fixed width timesheets (.fwf) are changed in place.',
+    )
+    parser.add_argument(
+        "--convert",
+        metavar="output_file_path",
+        type=str,
+        help="Convert timesheet file provided with file (-f/--file) argument into new file (format chosen by extension, e.g. .csv, .feather or .parquet, or partitioned directory if path ends with /).",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Merge monthly shards from before the current year into one shard per year in partitioned timesheet provided with file (-f/--file) argument.",
+    )
+    parser.add_argument(
+        "--summary",
+        nargs="?",
+        const="day",
+        choices=["day", "week", "month"],
+        help="Print hours worked per day, week or month in timesheet file provided with file (-f/--file) argument.",
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_date",
+        metavar="YYYY-mm-dd",
+        type=str,
+        help="Print records from this date (inclusive) in timesheet file provided with file (-f/--file) argument (summarised if used with --summary).",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_date",
+        metavar="YYYY-mm-dd",
+        type=str,
+        help="Print records up to this date (inclusive) in timesheet file provided with file (-f/--file) argument (summarised if used with --summary).",
+    )
+    parser.add_argument(
+        "--occupancy",
+        nargs="?",
+        const="hour",
+        choices=["hour", "15min"],
+        help="Print minutes worked in each hour (or 15 minutes) of each day of the week in timesheet file provided with file (-f/--file) argument (only records between --from/--to dates if provided).",
+    )
+    parser.add_argument(
+        "--grep",
+        metavar="words",
+        type=str,
+        help="Print records whose notes contain every word (case is ignored) in timesheet file provided with file (-f/--file) argument (only records between --from/--to dates if provided).",
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_file",
+        metavar="records_file_path",
+        type=str,
+        help="Add sessions from CSV or JSON lines (.jsonl) file (date, start_time, end_time and optional notes) to timesheet file provided with file (-f/--file) argument, validated and written at once.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Check every record in timesheet file provided with file (-f/--file) argument for overlapping or open sessions, negative durations, wrong time worked, records out of date order and long gaps between sessions on the same day.",
+    )
+    parser.add_argument(
+        "--max-gap",
+        default=4.0,
+        metavar="hours",
+        type=float,
+        help="Longest gap (in hours) expected between sessions on the same day, used with --check.",
+    )
+    parser.add_argument(
+        "--stream",
+        nargs="?",
+        const=16,
+        metavar="chunk_MB",
+        type=int,
+        help="Read CSV timesheet file provided with file (-f/--file) argument in chunks (of chunk_MB megabytes) so memory use stays bounded for files larger than memory. Used with --summary, --from/--to (records printed as CSV) or --convert (to CSV).",
+    )
+    parser.add_argument(
+        "--team-report",
+        metavar="timesheet_directory_path",
+        type=str,
+        help="Print hours worked by each timesheet file (one per person) in directory, per day or per --summary period.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes used to read timesheet files for --team-report (default one per CPU).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1,
+        help="Number of timesheet files sent to each process at a time for --team-report.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run daemon that keeps timesheets in memory and runs commands forwarded from other calls (until Ctrl+C).",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="socket_path",
+        type=str,
+        default=str(server_functions.get_default_socket_path()),
+        help="Unix domain socket the daemon (--serve) listens on.",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run command in this process even if a daemon (--serve) is running.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",  # Accept 0 or 1 arguments
+        const=str(profile_functions.DEFAULT_METRICS_FILE),
+        metavar="metrics_file_path",
+        type=str,
+        help=f"Append time taken, rows processed and bytes read and written by each phase of run (e.g. parse) to metrics file as a JSON line. Also turned on by the {profile_functions.PROFILE_ENVIRONMENT_VARIABLE} environment variable (set to metrics file, or 1 for default file).",
+    )
 
     return parser
 
@@ -88,17 +243,300 @@ def parse_command_line_arguments(
     # Get arguments
     args = parser.parse_args(arguments)
 
-    # Load timesheet
-    my_timesheet = timesheet.Timesheet(file_name=Path(args.file))
+    # Check if running daemon
+    if args.serve:
+        server_functions.serve(Path(args.socket))
+        return
+
+    # Check if profiling run (with --profile or environment variable)
+    metrics_file = profile_functions.get_metrics_file(args.profile)
+    if metrics_file is None:
+        forward_or_run_command_line_arguments(args)
+        return
+
+    # Record phases of run then append them to metrics file (even if run failed)
+    profile_functions.start_profile(arguments)
+    try:
+        forward_or_run_command_line_arguments(args)
+    finally:
+        profile_functions.finish_profile(metrics_file)
+
+
+def forward_or_run_command_line_arguments(args: argparse.Namespace):
+    """Forward parsed command line arguments to daemon if running, otherwise run them
+
+    Args:
+        args (argparse.Namespace): parsed command line arguments
+    """
+
+    # Forward arguments to daemon if running (file paths absolute as daemon may be running
+    # in another directory, keeping trailing / of partitioned directories)
+    if not args.no_daemon:
+        forwarded_arguments = dict(vars(args))
+        for argument in ["file", "convert", "team_report", "import_file"]:
+            if forwarded_arguments[argument] != None:
+                path = forwarded_arguments[argument]
+                forwarded_arguments[argument] = str(Path(path).absolute()) + (
+                    "/" if path.endswith("/") else ""
+                )
+        with profile_functions.phase("forward"):
+            forwarded = server_functions.forward_arguments(
+                forwarded_arguments, Path(args.socket)
+            )
+        if forwarded:
+            return
+
+    run_command_line_arguments(args)
+
+
+def get_timesheet(file_name: Path, file_format: str = None, timesheets: dict = None):
+    """Get Timesheet object for file (lazy), reusing one kept in memory if available
+
+    Args:
+        file_name (Path): path to timesheet file
+        file_format (str, optional): format of timesheet file. Defaults to None (chosen by
+            file extension).
+        timesheets (dict, optional): Timesheet objects kept in memory between calls (e.g. by
+            the daemon), keyed by file path and format. Reused timesheets are re-read if the
+            file changed. Defaults to None (new Timesheet object created).
+
+    Returns:
+        timesheet.Timesheet: timesheet
+    """
+
+    with profile_functions.phase("import"):
+        from timesheet import timesheet
+
+    # Create new timesheet if not keeping them in memory
+    if timesheets is None:
+        return timesheet.Timesheet(
+            file_name=file_name, file_format=file_format, lazy=True
+        )
+
+    # Reuse timesheet kept in memory (re-read if file changed)
+    key = (str(file_name), file_format)
+    if key in timesheets:
+        timesheets[key].refresh()
+    else:
+        timesheets[key] = timesheet.Timesheet(
+            file_name=file_name, file_format=file_format, lazy=True
+        )
+
+    return timesheets[key]
+
+
+def run_command_line_arguments(args: argparse.Namespace, timesheets: dict = None):
+    """Run parsed command line arguments
+
+    Args:
+        args (argparse.Namespace): parsed command line arguments
+        timesheets (dict, optional): Timesheet objects kept in memory between calls (e.g. by
+            the daemon), see get_timesheet(). Defaults to None (timesheets read for each call,
+            CSV timesheets updated without loading pandas).
+    """
+
+    file_name = Path(args.file)
+
+    # Check if reporting on directory of timesheets (ignores other arguments)
+    if args.team_report:
+        from timesheet import team_functions
+
+        team_summary = team_functions.summarise_team(
+            Path(args.team_report),
+            period=args.summary if args.summary else "day",
+            n_workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+        print(team_functions.format_team_summary(team_summary))
+        return
+
+    # Check if timesheet stored as CSV, partitioned or fixed width (can be updated without
+    # pandas)
+    file_format = file_functions.get_file_format(file_name, args.format)
+    if timesheets is None and file_format in ["csv", "partitioned", "fixed"]:
+        punch_module = punch_functions
+        if file_format == "partitioned":
+            punch_module = partition_functions
+        elif file_format == "fixed":
+            punch_module = fixed_width_functions
+
+        # Check if resetting timesheet (or timesheet doesn't exist yet)
+        if args.reset or Path.exists(file_name) == False:
+            punch_module.create_timesheet(file_name)
+
+        # Check if adding start time
+        if args.start:
+            punch_module.add_start_time(file_name, start_time_string=args.start)
+
+        # Check if adding end time
+        if args.end:
+            punch_module.add_end_time(file_name, end_time_string=args.end)
+
+    else:
+
+        # Load timesheet
+        my_timesheet = get_timesheet(file_name, args.format, timesheets)
+
+        # Check if resetting timesheet
+        if args.reset:
+            my_timesheet.reset_timesheet()
+
+        # Check if adding start time
+        if args.start:
+            my_timesheet.add_start_time(start_time_string=args.start)
+
+        # Check if adding end time
+        if args.end:
+            my_timesheet.add_end_time(end_time_string=args.end)
+
+    # Check if changing fields of a record
+    if args.edit:
+        if len(args.edit) < 2 or any("=" not in value for value in args.edit[1:]):
+            raise Exception(
+                f"Edit provided ({' '.join(args.edit)}) isn't a row followed by column=value pairs"
+            )
+        values = dict(value.split("=", 1) for value in args.edit[1:])
+        get_timesheet(file_name, args.format, timesheets).edit_record(
+            int(args.edit[0]), values
+        )
+
+    # Check if importing sessions
+    if args.import_file:
+        with profile_functions.phase("import"):
+            from timesheet import import_functions
+
+        n_sessions = get_timesheet(file_name, args.format, timesheets).add_records(
+            import_functions.read_import_file(Path(args.import_file))
+        )
+        print(f"Imported {n_sessions} sessions into {file_name}")
+
+    # Check if checking timesheet for problems
+    if args.check:
+        with profile_functions.phase("import"):
+            from timesheet import check_functions
+
+        report = get_timesheet(file_name, args.format, timesheets).validate(
+            max_gap=timedelta(hours=args.max_gap)
+        )
+        print(check_functions.format_check_report(report, file_name))
+
+    # Check if streaming records (bounded memory, ignores later arguments)
+    if args.stream:
+        run_streaming_arguments(args, file_name)
+        return
+
+    # Check if reporting minutes worked per day of the week and time of day (between dates)
+    if args.occupancy:
+        with profile_functions.phase("import"):
+            from timesheet import summary_functions
+
+        my_timesheet = get_timesheet(file_name, args.format, timesheets)
+        occupancy_matrix = my_timesheet.occupancy_matrix(
+            resolution=args.occupancy, start_date=args.from_date, end_date=args.to_date
+        )
+        print(summary_functions.format_occupancy_matrix(occupancy_matrix))
+
+    # Check if searching notes (between dates)
+    elif args.grep:
+        with profile_functions.phase("import"):
+            from timesheet import data_functions
+
+        records = get_timesheet(file_name, args.format, timesheets).search_notes(
+            args.grep, start_date=args.from_date, end_date=args.to_date
+        )
+        records = data_functions.format_datetime_columns_to_strings(records)
+        print(records.astype({"notes": str}).fillna("").to_string(index=False))
+
+    # Check if reading records between dates
+    elif args.from_date or args.to_date:
+        with profile_functions.phase("import"):
+            from timesheet import summary_functions
+            from timesheet import data_functions
+
+        records = get_timesheet(file_name, args.format, timesheets).read_range(
+            start_date=args.from_date, end_date=args.to_date
+        )
+
+        # Summarise or print records
+        if args.summary:
+            summary = summary_functions.summarise_timesheet(
+                records, period=args.summary
+            )
+            print(summary_functions.format_summary(summary))
+        else:
+            records = data_functions.format_datetime_columns_to_strings(records)
+            print(records.astype({"notes": str}).fillna("").to_string(index=False))
+
+    # Check if summarising timesheet
+    elif args.summary:
+        with profile_functions.phase("import"):
+            from timesheet import summary_functions
+
+        summary = get_timesheet(file_name, args.format, timesheets).summarise(
+            period=args.summary
+        )
+        print(summary_functions.format_summary(summary))
+
+    # Check if merging old shards of partitioned timesheet
+    if args.compact:
+        years = get_timesheet(file_name, args.format, timesheets).compact()
+        print(f"Compacted {len(years)} years of {file_name} into yearly shards")
+
+    # Check if converting timesheet (to partitioned directory if path ends with /)
+    if args.convert:
+        with profile_functions.phase("import"):
+            from timesheet import storage
+
+        storage.convert_timesheet(
+            input_file_name=file_name,
+            output_file_name=Path(args.convert),
+            input_format=args.format,
+            output_format="partitioned" if args.convert.endswith("/") else None,
+        )
+
+
+def run_streaming_arguments(args: argparse.Namespace, file_name: Path):
+    """Summarise, print or convert records from CSV timesheet file one chunk at a time
+
+    Args:
+        args (argparse.Namespace): parsed command line arguments (with --stream)
+        file_name (Path): path to timesheet file
+
+    Raises:
+        Exception: if timesheet or converted file isn't CSV
+    """
+
+    with profile_functions.phase("import"):
+        from timesheet import stream_functions
+
+    # Check timesheet and converted files are CSV
+    if file_functions.get_file_format(file_name, args.format) != "csv":
+        raise Exception("Only CSV timesheet files can be streamed (--stream)")
+    if args.convert and file_functions.get_file_format(Path(args.convert)) != "csv":
+        raise Exception("Streamed timesheets can only be converted to CSV files")
+
+    # Read records in chunks
+    chunks = stream_functions.stream_timesheet(
+        file_name,
+        start_date=args.from_date,
+        end_date=args.to_date,
+        chunk_bytes=args.stream * 2**20,
+    )
 
-    # Check if resetting timesheet
-    if args.reset:
-        my_timesheet.reset_timesheet()
+    # Check if summarising, converting or printing records
+    if args.summary:
+        from timesheet import summary_functions
 
-    # Check if adding start time
-    if args.start:
-        my_timesheet.add_start_time(start_time_string=args.start)
+        summary = stream_functions.summarise_chunks(chunks, period=args.summary)
+        print(summary_functions.format_summary(summary))
+    elif args.convert:
+        n_records = stream_functions.write_chunks(chunks, Path(args.convert))
+        print(
+            f"Converted timesheet {file_name} to {args.convert} ({n_records} records)"
+        )
+    else:
+        from timesheet import data_functions
 
-    # Check if adding end time
-    if args.end:
-        my_timesheet.add_end_time(end_time_string=args.end)
+        print(stream_functions.format_header(), end="")
+        for chunk in chunks:
+            print(data_functions.format_timesheet_lines(chunk), end="")
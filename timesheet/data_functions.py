@@ -1,7 +1,14 @@
 from datetime import date, time, datetime, timedelta  # working with dates and times
 from pathlib import Path  # handling file paths
+import numpy as np  # calculating time differences
 import pandas as pd  # creating dummy data
+from pandas.api.types import union_categoricals  # merging notes categories
 import re  # string matching
+import random  # choosing synthetic notes and open sessions
+
+# Local imports
+from timesheet import file_functions  # formatting CSV values
+from timesheet import fixed_width_functions  # fixed width line layout
 
 
 def check_string_pattern_match(string: str, pattern: str):
@@ -21,6 +28,52 @@ def check_string_pattern_match(string: str, pattern: str):
         )
 
 
+# Times of day (hh:mm) for each minute after midnight
+TIME_STRINGS = np.array(
+    [f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60)],
+    dtype=object,
+)
+
+
+def format_dates(dates: pd.Series) -> np.ndarray:
+    """Format datetimes as dates (YYYY-mm-dd)
+
+    Each distinct date is only formatted once.
+
+    Args:
+        dates (pd.Series): datetimes (NaT if missing)
+
+    Returns:
+        np.ndarray: date strings (NaN if missing)
+    """
+
+    days = dates.to_numpy(dtype="datetime64[D]")
+    unique_days, codes = np.unique(days, return_inverse=True)
+    date_strings = np.datetime_as_string(unique_days).astype(object)[codes]
+    date_strings[np.isnat(days)] = np.nan
+
+    return date_strings
+
+
+def format_times_of_day(values: np.ndarray, missing: object = np.nan) -> np.ndarray:
+    """Format times of day (hh:mm) of datetimes or timedeltas (days and seconds dropped)
+
+    Args:
+        values (np.ndarray): datetime64[ns] or timedelta64[ns] values (NaT if missing)
+        missing (object, optional): value for missing times. Defaults to np.nan.
+
+    Returns:
+        np.ndarray: time strings
+    """
+
+    nanoseconds = values.view(np.int64)
+    minutes = (nanoseconds // (60 * 10**9)) % (24 * 60)
+    time_strings = TIME_STRINGS[minutes]
+    time_strings[np.isnat(values)] = missing
+
+    return time_strings
+
+
 def format_datetime_columns_to_strings(my_timesheet: pd.DataFrame) -> pd.DataFrame:
     """Formats the date and time columns in timesheet as strings
 
@@ -38,21 +91,154 @@ def format_datetime_columns_to_strings(my_timesheet: pd.DataFrame) -> pd.DataFra
         pd.DataFrame: timesheet dataframe with datetime columns as strings
     """
 
-    # Format the date and time columns as strings
-    my_timesheet.date = my_timesheet.date.dt.strftime("%Y-%m-%d")
-    my_timesheet.start_time = my_timesheet.start_time.dt.strftime("%H:%M")
-    my_timesheet.end_time = my_timesheet.end_time.dt.strftime("%H:%M")
-    my_timesheet.time_worked = my_timesheet.time_worked.astype(str).str[
-        -8:-3
-    ]  # strips out number days
+    # Format the date and time columns as strings (vectorised, missing dates and times NaN)
+    my_timesheet.date = format_dates(my_timesheet.date)
+    for column in ["start_time", "end_time"]:
+        my_timesheet[column] = format_times_of_day(
+            my_timesheet[column].to_numpy(dtype="datetime64[ns]")
+        )
+
+    # Format time worked as hh:mm, dropping number of days (missing time worked empty)
+    my_timesheet.time_worked = format_times_of_day(
+        pd.to_timedelta(my_timesheet.time_worked).to_numpy(dtype="timedelta64[ns]"),
+        missing="",
+    )
+
+    return my_timesheet
+
+
+def format_timesheet_lines(timesheet: pd.DataFrame) -> str:
+    """Format timesheet rows as CSV lines (without header), as written by CSV storage
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+
+    Returns:
+        str: CSV lines
+    """
 
-    # Replace oddly subsetted values in time_worked column with 00:00
-    # occurs when zero times sent through
-    my_timesheet.time_worked = my_timesheet.time_worked.replace("0 d", "00:00")
+    timesheet = format_datetime_columns_to_strings(timesheet.copy())
+
+    return timesheet.to_csv(index=False, header=False, lineterminator="\n")
+
+
+def format_fixed_width_lines(timesheet: pd.DataFrame) -> tuple[bytes, int]:
+    """Format timesheet rows as fixed width lines (without header), as written by fixed
+    width storage (see fixed_width_functions)
+
+    Lines are built as one array of bytes (one row per line) rather than line by line, and
+    each distinct note is only encoded once. The notes field is widened to fit the longest
+    note if needed.
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+
+    Raises:
+        Exception: if a note contains a newline
+
+    Returns:
+        tuple[bytes, int]: lines and line width (bytes, including newline)
+    """
+
+    timesheet = encode_notes(format_datetime_columns_to_strings(timesheet.copy()))
+
+    # Encode each distinct note once and choose notes width
+    notes = [note.encode() for note in timesheet.notes.cat.categories]
+    if any(b"\n" in note for note in notes):
+        raise Exception("Notes can't contain newlines in fixed width timesheets")
+    notes_width = max(
+        [fixed_width_functions.DEFAULT_NOTES_WIDTH] + [len(note) for note in notes]
+    )
+    line_width = fixed_width_functions.get_line_width(notes_width)
+
+    # Fill lines with padding, separators and newlines
+    lines = np.full(
+        (timesheet.shape[0], line_width), ord(fixed_width_functions.PADDING), np.uint8
+    )
+    for offset, width in list(fixed_width_functions.FIELD_OFFSETS.values())[:-1]:
+        lines[:, offset + width] = ord(",")
+    lines[:, -1] = ord("\n")
+
+    # Copy fields into lines (padding replaces empty bytes)
+    for column, (offset, width) in fixed_width_functions.FIELD_OFFSETS.items():
+        if column == "notes":
+            width = notes_width
+            values = np.array(notes, dtype=f"S{width}")[timesheet.notes.cat.codes]
+        else:
+            values = timesheet[column].fillna("").to_numpy().astype(f"S{width}")
+        characters = values.view(np.uint8).reshape(-1, width)
+        lines[:, offset : offset + width] = np.where(
+            characters == 0, lines[:, offset : offset + width], characters
+        )
+
+    return lines.tobytes(), line_width
+
+
+def encode_notes(my_timesheet: pd.DataFrame) -> pd.DataFrame:
+    """Dictionary-encode notes column in timesheet (categorical), if not already encoded
+
+    Each distinct note is stored once (as a category) and each row as an integer code, so
+    repeated notes take less memory and grouping or filtering by note compares codes.
+
+    Args:
+        my_timesheet (pd.DataFrame): dataframe containing timesheet
+
+    Returns:
+        pd.DataFrame: timesheet dataframe with categorical notes column (missing notes empty)
+    """
+
+    if not isinstance(my_timesheet.notes.dtype, pd.CategoricalDtype):
+        my_timesheet["notes"] = (
+            my_timesheet.notes.fillna("").astype(str).astype("category")
+        )
 
     return my_timesheet
 
 
+def concat_timesheets(timesheets: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate timesheets, keeping notes dictionary-encoded
+
+    Categories of the notes columns are merged (pd.concat would fall back to an object
+    column if they differ), sorted as pandas orders them.
+
+    Args:
+        timesheets (list[pd.DataFrame]): timesheets (at least one)
+
+    Returns:
+        pd.DataFrame: timesheets one after another (index reset)
+    """
+
+    # Merge note categories
+    timesheets = [encode_notes(timesheet.copy(deep=False)) for timesheet in timesheets]
+    notes = union_categoricals(
+        [timesheet.notes for timesheet in timesheets], sort_categories=True
+    )
+
+    # Concatenate other columns
+    timesheet = pd.concat(
+        [timesheet.drop(columns="notes") for timesheet in timesheets], ignore_index=True
+    )
+    timesheet["notes"] = notes
+
+    return timesheet[timesheets[0].columns]
+
+
+def convert_time_to_timestamp(time: datetime) -> pd.Timestamp:
+    """Convert time of day into timestamp on 1900-01-01
+
+    This matches how start and end times are held in the timesheet dataframe (times read
+    with format hh:mm are placed on 1900-01-01). Seconds are dropped.
+
+    Args:
+        time (datetime): datetime to take time of day from
+
+    Returns:
+        pd.Timestamp: time of day on 1900-01-01
+    """
+
+    return pd.Timestamp(year=1900, month=1, day=1, hour=time.hour, minute=time.minute)
+
+
 def calculate_time_difference(start_time: datetime, end_time: datetime) -> timedelta:
     """Calculate difference between start and end time
 
@@ -76,34 +262,101 @@ def calculate_time_difference(start_time: datetime, end_time: datetime) -> timed
     return difference
 
 
+def convert_to_datetime_array(times: np.ndarray) -> np.ndarray:
+    """Convert array, list or pd.Series of datetimes to datetime64[ns] array
+
+    Args:
+        times (np.ndarray): datetimes (array, list or pd.Series)
+
+    Returns:
+        np.ndarray: datetime64[ns] array (NaT where missing)
+    """
+
+    # Convert python datetimes (only datetime64 arrays can be used directly)
+    times = np.asarray(times)
+    if not np.issubdtype(times.dtype, np.datetime64):
+        times = pd.to_datetime(times).to_numpy()
+
+    return times.astype("datetime64[ns]", copy=False)
+
+
+def calculate_time_difference_array(
+    start_times: np.ndarray, end_times: np.ndarray, overnight: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    """Calculate differences between arrays of start and end times
+
+    Args:
+        start_times (np.ndarray): start times (array, list or pd.Series of datetimes)
+        end_times (np.ndarray): end times (array, list or pd.Series of datetimes)
+        overnight (bool, optional): treat end times before their start time (by less than
+            a day) as being on the next day, for sessions that cross midnight.
+            Defaults to False.
+
+    Raises:
+        Exception: if numbers of start and end times don't match
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: time differences (timedelta64[ns], NaT where invalid)
+            and mask of invalid pairs (missing times or end before start)
+    """
+
+    # Check the same number of start and end times provided
+    if len(start_times) != len(end_times):
+        raise Exception(
+            f"The number of start ({len(start_times)}) and end ({len(end_times)}) times provided don't match!"
+        )
+
+    # Calculate time differences
+    start_times = convert_to_datetime_array(start_times)
+    end_times = convert_to_datetime_array(end_times)
+    differences = end_times - start_times
+
+    # Move end times before start times to next day
+    one_day = np.timedelta64(1, "D")
+    if overnight:
+        crosses_midnight = (differences < np.timedelta64(0)) & (differences > -one_day)
+        differences[crosses_midnight] += one_day
+
+    # Mark missing times and negative differences as invalid
+    invalid = np.isnat(differences) | (differences < np.timedelta64(0))
+    differences[invalid] = np.timedelta64("NaT")
+
+    return differences, invalid
+
+
 def calculate_time_differences(
-    start_times: list[time], end_times: list[time]
+    start_times: list[time], end_times: list[time], overnight: bool = False
 ) -> list[timedelta]:
     """Calculate difference between times
 
-    Based on this stackoverflow answer: https://stackoverflow.com/questions/25346019/subtract-datetime-time-objects-stored-in-two-separate-lists
+    Wraps calculate_time_difference_array(), which works on whole arrays at once.
 
     Args:
         start_times (list[datetime.time]): list of start times
         end_times (list[datetime.time]): list of end times
+        overnight (bool, optional): treat end times before their start time as being on
+            the next day. Defaults to False.
+
+    Raises:
+        Exception: if any end time is before its start time (lists every invalid pair)
 
     Returns:
         list[datetime.time]: list of time differences
     """
 
-    # Check the same number of start and end times provided
-    if len(start_times) != len(end_times):
+    # Calculate time differences
+    differences, invalid = calculate_time_difference_array(
+        start_times, end_times, overnight=overnight
+    )
+
+    # Check all time differences are positive
+    if invalid.any():
+        invalid_indices = np.flatnonzero(invalid).tolist()
         raise Exception(
-            f"The number of start ({len(start_times)}) and end ({len(end_times)}) times provided don't match!"
+            f"The end_times provided at indices {invalid_indices} are missing or not after their start_times"
         )
 
-    # Calculate time differences
-    differences = [
-        calculate_time_difference(start_time, end_time)
-        for start_time, end_time in zip(start_times, end_times)
-    ]
-
-    return differences
+    return differences.astype("timedelta64[us]").tolist()
 
 
 def create_dummy_timesheet(file_name: Path):
@@ -174,3 +427,88 @@ def create_dummy_timesheet(file_name: Path):
 
     # Write data to file
     dummy_timesheet_data.to_csv(file_name, index=False)
+
+
+def create_synthetic_timesheet(
+    file_name: Path,
+    n_sessions: int = None,
+    sessions_per_day: int = 2,
+    start_date: date = date(year=2000, month=1, day=1),
+    n_days: int = None,
+    notes: list[str] = ["nothing of note"],
+    open_session_fraction: float = 0,
+    seed: int = 0,
+):
+    """Creates a large timesheet file with synthetic data in it
+
+    Rows are streamed to file one at a time so memory use doesn't grow with n_sessions.
+    The working day (08:00-18:00) is split into equal slots, one per session, and each
+    session lasts for the first three quarters of its slot.
+
+    Args:
+        file_name (Path): path to file where synthetic data are written
+        n_sessions (int, optional): number of sessions (rows) to write. Defaults to None
+            (n_days multiplied by sessions_per_day).
+        sessions_per_day (int, optional): number of sessions on each day. Defaults to 2.
+        start_date (date, optional): date of first session. Defaults to 2000-01-01.
+        n_days (int, optional): number of days to write sessions for (only used if
+            n_sessions not provided). Defaults to None.
+        notes (list[str], optional): notes to choose from at random for each session.
+            Defaults to ["nothing of note"].
+        open_session_fraction (float, optional): fraction of sessions, chosen at random,
+            without an end time. Defaults to 0.
+        seed (int, optional): seed for choosing notes and open sessions. Defaults to 0.
+
+    Raises:
+        Exception: if neither n_sessions or n_days provided
+    """
+
+    # Get number of sessions
+    if n_sessions == None:
+        if n_days == None:
+            raise Exception("Either n_sessions or n_days must be provided!")
+        n_sessions = n_days * sessions_per_day
+
+    # Define the daily sessions (start time, end time, time worked)
+    slot_minutes = 600 // sessions_per_day
+    session_minutes = slot_minutes * 3 // 4
+    daily_sessions = []
+    for session in range(sessions_per_day):
+        start_minute = 8 * 60 + session * slot_minutes
+        end_minute = start_minute + session_minutes
+        daily_sessions.append(
+            (
+                f"{start_minute // 60:02d}:{start_minute % 60:02d}",
+                f"{end_minute // 60:02d}:{end_minute % 60:02d}",
+                f"{session_minutes // 60:02d}:{session_minutes % 60:02d}",
+            )
+        )
+
+    # Format notes as CSV values (quoting any with commas)
+    notes = [file_functions.format_csv_line([note]).rstrip("\n") for note in notes]
+
+    # Notes and open sessions are chosen at random (only if needed, to keep writing fast)
+    generator = random.Random(seed)
+    note = notes[0]
+
+    with open(file_name, "w") as file:
+
+        # Write header
+        file.write("date,start_time,end_time,time_worked,notes\n")
+
+        # Write sessions
+        for index in range(n_sessions):
+
+            # Format date once per day
+            session = index % len(daily_sessions)
+            if session == 0 or index == 0:
+                days = index // len(daily_sessions)
+                session_date = f"{start_date + timedelta(days=days):%Y-%m-%d}"
+
+            # Get session times, note and whether session is open
+            start_time, end_time, time_worked = daily_sessions[session]
+            if len(notes) > 1:
+                note = generator.choice(notes)
+            if open_session_fraction > 0 and generator.random() < open_session_fraction:
+                end_time, time_worked = "", "00:00"
+            file.write(f"{session_date},{start_time},{end_time},{time_worked},{note}\n")
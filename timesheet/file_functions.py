@@ -0,0 +1,350 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import csv  # parsing and formatting CSV lines
+import io  # writing CSV lines to strings
+import os  # syncing and replacing files
+
+
+def find_last_line_offset(file_name: Path, block_size: int = 4096) -> int:
+    """Find the byte offset where the last line in a file starts
+
+    Reads backwards from the end of the file in blocks, so cost doesn't depend on file size.
+    A trailing newline at the very end of the file is ignored.
+
+    Args:
+        file_name (Path): path to file
+        block_size (int, optional): number of bytes read per block. Defaults to 4096.
+
+    Returns:
+        int: byte offset of the start of the last line (0 if file has a single line)
+    """
+
+    with open(file_name, "rb") as file:
+
+        # Get file size
+        file.seek(0, 2)
+        end = file.tell()
+
+        # Ignore trailing newline
+        if end > 0:
+            file.seek(end - 1)
+            if file.read(1) == b"\n":
+                end -= 1
+
+        # Read backwards in blocks until newline found
+        position = end
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            file.seek(position)
+            block = file.read(read_size)
+            newline_index = block.rfind(b"\n")
+            if newline_index != -1:
+                return position + newline_index + 1
+
+    return 0
+
+
+def append_line(file_name: Path, line: str):
+    """Append line to end of file
+
+    Adds a newline before the line if the file doesn't already end with one.
+
+    Args:
+        file_name (Path): path to file
+        line (str): line to append (should end with newline)
+    """
+
+    with open(file_name, "ab+") as file:
+
+        # Check whether file ends with newline
+        file.seek(0, 2)
+        if file.tell() > 0:
+            file.seek(-1, 2)
+            if file.read(1) != b"\n":
+                file.write(b"\n")
+
+        # Add line
+        file.write(line.encode())
+
+
+def replace_last_line(file_name: Path, line: str):
+    """Replace last line of file in place
+
+    Truncates file at start of last line and re-appends the new line, so only the
+    last line is rewritten.
+
+    Args:
+        file_name (Path): path to file
+        line (str): replacement line (should end with newline)
+    """
+
+    # Find where last line starts
+    offset = find_last_line_offset(file_name)
+
+    # Truncate and re-append
+    with open(file_name, "r+b") as file:
+        file.truncate(offset)
+        file.seek(offset)
+        file.write(line.encode())
+
+
+def read_header_and_last_line(
+    file_name: Path, block_size: int = 4096
+) -> tuple[list[str], list[str]]:
+    """Read the header and last line of a CSV file without reading the lines in between
+
+    Args:
+        file_name (Path): path to CSV file
+        block_size (int, optional): number of bytes read per block when searching
+            backwards for the last line. Defaults to 4096.
+
+    Returns:
+        tuple[list[str], list[str]]: header values and last line values (None if file
+            only contains a header)
+    """
+
+    # Find where last line starts
+    offset = find_last_line_offset(file_name, block_size=block_size)
+
+    with open(file_name, "rb") as file:
+
+        # Read header
+        header = next(csv.reader([file.readline().decode()]))
+
+        # Check if any lines after header
+        if offset == 0:
+            return header, None
+
+        # Read last line
+        file.seek(offset)
+        last_line = next(csv.reader([file.read().decode()]))
+
+    return header, last_line
+
+
+def find_first_line_offset(
+    file_name: Path, key: str, start_offset: int = 0, file_size: int = None
+) -> int:
+    """Find the byte offset of the first line starting with a value at or after key
+
+    Lines (from start_offset) must be sorted by their first len(key) characters. Binary
+    searches on byte offsets, reading one line per step, so cost grows with log of the file
+    size rather than the number of lines.
+
+    Args:
+        file_name (Path): path to file
+        key (str): value to search for (e.g. a date YYYY-mm-dd)
+        start_offset (int, optional): byte offset of line to start searching from (e.g. to
+            skip a header). Defaults to 0.
+        file_size (int, optional): size of file. Defaults to None (read from file).
+
+    Returns:
+        int: byte offset of first line at or after key (file size if there isn't one)
+    """
+
+    key = key.encode()
+    with open(file_name, "rb") as file:
+
+        # Get file size
+        if file_size == None:
+            file_size = file.seek(0, 2)
+
+        def line_at_or_after_key(offset: int) -> tuple[int, bool]:
+            """Find first line starting at or after offset and check if it is at or after key"""
+            if offset > start_offset:
+                file.seek(offset - 1)
+                file.readline()
+                offset = file.tell()
+            if offset >= file_size:
+                return offset, True
+            file.seek(offset)
+            return offset, file.readline()[: len(key)] >= key
+
+        # Binary search for smallest offset whose next line is at or after key
+        low, high = start_offset, file_size
+        while low < high:
+            middle = (low + high) // 2
+            if line_at_or_after_key(middle)[1]:
+                high = middle
+            else:
+                low = middle + 1
+
+        return min(line_at_or_after_key(low)[0], file_size)
+
+
+def read_header_and_lines_between(
+    file_name: Path, start_key: str = None, end_key: str = None
+) -> bytes:
+    """Read header and lines of sorted file from start key up to (but not including) end key
+
+    Lines are found with find_first_line_offset() so only the header and matching lines
+    are read.
+
+    Args:
+        file_name (Path): path to file (sorted by the start of each line after the header)
+        start_key (str, optional): value of first line to read. Defaults to None (read from
+            first line after header).
+        end_key (str, optional): value to stop reading lines at. Defaults to None (read to
+            end of file).
+
+    Returns:
+        bytes: header and matching lines
+    """
+
+    # Find where lines after header start
+    with open(file_name, "rb") as file:
+        header = file.readline()
+        file_size = file.seek(0, 2)
+
+    # Find offsets of first and last lines to read
+    start_offset = len(header)
+    if start_key != None:
+        start_offset = find_first_line_offset(
+            file_name, start_key, start_offset=start_offset, file_size=file_size
+        )
+    end_offset = file_size
+    if end_key != None:
+        end_offset = find_first_line_offset(
+            file_name, end_key, start_offset=start_offset, file_size=file_size
+        )
+
+    # Read lines
+    with open(file_name, "rb") as file:
+        file.seek(start_offset)
+        lines = file.read(max(end_offset - start_offset, 0))
+
+    return header + lines
+
+
+def read_header_and_lines_from(file_name: Path, start_key: str) -> tuple[int, bytes]:
+    """Read header and lines of sorted file from start key to end of file
+
+    Args:
+        file_name (Path): path to file (sorted by the start of each line after the header)
+        start_key (str): value of first line to read
+
+    Returns:
+        tuple[int, bytes]: byte offset of first line read (file size if none) and header
+            and lines from there
+    """
+
+    # Find where lines after header start
+    with open(file_name, "rb") as file:
+        header = file.readline()
+
+    # Find first line at or after start key and read from there
+    start_offset = find_first_line_offset(
+        file_name, start_key, start_offset=len(header)
+    )
+    with open(file_name, "rb") as file:
+        file.seek(start_offset)
+        lines = file.read()
+
+    return start_offset, header + lines
+
+
+def format_csv_line(values: list[str]) -> str:
+    """Format values as a line in a CSV file
+
+    Args:
+        values (list[str]): values to write
+
+    Returns:
+        str: CSV line (ending with newline)
+    """
+
+    line = io.StringIO()
+    csv.writer(line, lineterminator="\n").writerow(values)
+
+    return line.getvalue()
+
+
+def sync_directory(directory: Path):
+    """Flush directory entries (e.g. a renamed file) to disk
+
+    Only possible on POSIX systems, does nothing elsewhere.
+
+    Args:
+        directory (Path): path to directory
+    """
+
+    if hasattr(os, "O_DIRECTORY"):
+        directory_descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
+
+
+def write_file_atomically(file_name: Path, write_function):
+    """Write file via temporary file that replaces it once complete and synced to disk
+
+    A crash part way through writing leaves the original file untouched.
+
+    Args:
+        file_name (Path): path to file
+        write_function (callable): function taking a path and writing the new content to it
+    """
+
+    # Write to temporary file next to file
+    file_name = Path(file_name)
+    temporary_file_name = file_name.with_name(f".{file_name.name}.{os.getpid()}.tmp")
+    try:
+        write_function(temporary_file_name)
+        with open(temporary_file_name, "rb+") as file:
+            os.fsync(file.fileno())
+
+        # Replace file
+        os.replace(temporary_file_name, file_name)
+
+    finally:
+        if Path.exists(temporary_file_name):
+            Path.unlink(temporary_file_name)
+
+    # Make sure replacement is on disk
+    sync_directory(file_name.parent)
+
+
+# File formats for each file extension
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".feather": "feather",
+    ".parquet": "parquet",
+    ".fwf": "fixed",
+}
+
+# Format of timesheets stored as directory of shards (see partition_functions)
+PARTITIONED_FORMAT = "partitioned"
+
+
+def get_file_format(file_name: Path, file_format: str = None) -> str:
+    """Get format of timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+        file_format (str, optional): format to use. Defaults to None (partitioned for
+            existing directories, otherwise chosen by file extension, with CSV used for
+            unknown extensions).
+
+    Raises:
+        Exception: if file format provided isn't recognised
+
+    Returns:
+        str: file format (csv, feather, parquet, fixed or partitioned)
+    """
+
+    # Choose format by file extension if not provided
+    if file_format == None:
+        if Path(file_name).is_dir():
+            return PARTITIONED_FORMAT
+        return FILE_FORMATS.get(Path(file_name).suffix.lower(), "csv")
+
+    # Check format provided is recognised
+    file_formats = list(FILE_FORMATS.values()) + [PARTITIONED_FORMAT]
+    if file_format not in file_formats:
+        raise Exception(
+            f"File format provided ({file_format}) isn't one of: {', '.join(file_formats)}"
+        )
+
+    return file_format
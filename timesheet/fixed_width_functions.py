@@ -0,0 +1,403 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from datetime import datetime  # working with dates and times
+import mmap  # patching records in place
+import os  # reading file sizes
+
+# Local imports
+from timesheet import punch_functions  # checking and formatting start and end times
+from timesheet import journal_functions  # locking timesheet file while changing it
+from timesheet import file_functions  # writing files atomically
+from timesheet import totals_functions  # stamping timesheet files
+
+# Note this module only uses the standard library (no pandas) so the command line
+# interface can add start and end times to fixed width timesheets without paying for the
+# pandas import
+
+# A fixed width timesheet is laid out like a CSV timesheet, but every line (including the
+# header) has the same number of bytes, with notes padded with spaces to a fixed width and
+# empty times written as spaces, e.g.:
+#   2023-03-13,08:00,12:00,04:00,a note     \n
+# so record N starts at byte (N + 1) x line width and any field of any record can be
+# changed in place without reading or rewriting the rest of the file
+
+# Offset and width (bytes) of each field in a line
+FIELD_OFFSETS = {
+    "date": (0, 10),
+    "start_time": (11, 5),
+    "end_time": (17, 5),
+    "time_worked": (23, 5),
+    "notes": (29, None),  # rest of line (minus newline)
+}
+
+# Default width (bytes) of notes field (wider if longer notes written with whole file)
+DEFAULT_NOTES_WIDTH = 64
+
+# Padding character
+PADDING = " "
+
+
+def get_line_width(notes_width: int = DEFAULT_NOTES_WIDTH) -> int:
+    """Get width of each line (bytes, including newline) for width of notes field
+
+    Args:
+        notes_width (int, optional): width of notes field (bytes).
+            Defaults to DEFAULT_NOTES_WIDTH (64).
+
+    Returns:
+        int: line width
+    """
+
+    return FIELD_OFFSETS["notes"][0] + notes_width + 1
+
+
+def get_notes_width(line_width: int) -> int:
+    """Get width of notes field (bytes) for width of each line
+
+    Args:
+        line_width (int): line width (bytes, including newline)
+
+    Returns:
+        int: width of notes field
+    """
+
+    return line_width - FIELD_OFFSETS["notes"][0] - 1
+
+
+def format_header(line_width: int) -> bytes:
+    """Format header line (column names padded to line width)
+
+    Args:
+        line_width (int): line width (bytes, including newline)
+
+    Returns:
+        bytes: header line
+    """
+
+    return (
+        ",".join(punch_functions.TIMESHEET_COLUMNS).ljust(line_width - 1) + "\n"
+    ).encode()
+
+
+def format_field(column: str, value: str, line_width: int) -> bytes:
+    """Format field of record padded to its width
+
+    Args:
+        column (str): column name
+        value (str): value as written in CSV timesheet (e.g. hh:mm, empty if missing)
+        line_width (int): line width (bytes, including newline)
+
+    Raises:
+        Exception: if value is longer than field or contains a newline
+
+    Returns:
+        bytes: field
+    """
+
+    _, width = FIELD_OFFSETS[column]
+    if width is None:
+        width = get_notes_width(line_width)
+    field = str(value).encode()
+    if len(field) > width or b"\n" in field:
+        raise Exception(
+            f"Value provided for {column} ({value}) is longer than {width} bytes or contains a newline"
+        )
+
+    return field.ljust(width, PADDING.encode())
+
+
+def format_line(record: dict, line_width: int) -> bytes:
+    """Format record as fixed width line
+
+    Args:
+        record (dict): record with values as written in CSV timesheet
+        line_width (int): line width (bytes, including newline)
+
+    Returns:
+        bytes: line
+    """
+
+    return (
+        b",".join(
+            format_field(column, record[column], line_width)
+            for column in punch_functions.TIMESHEET_COLUMNS
+        )
+        + b"\n"
+    )
+
+
+def parse_line(line: bytes) -> dict:
+    """Parse fixed width line into record
+
+    Args:
+        line (bytes): line
+
+    Returns:
+        dict: record with values as written in CSV timesheet (padding removed)
+    """
+
+    record = {}
+    for column, (offset, width) in FIELD_OFFSETS.items():
+        end = len(line) - 1 if width is None else offset + width
+        record[column] = line[offset:end].decode().rstrip(PADDING)
+
+    return record
+
+
+def read_line_width(file_name: Path) -> int:
+    """Read line width of fixed width timesheet file (from its header)
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        int: line width (bytes, including newline)
+    """
+
+    with open(file_name, "rb") as file:
+        return len(file.readline())
+
+
+def count_records(file_name: Path, line_width: int) -> int:
+    """Count records in fixed width timesheet file from its size
+
+    Args:
+        file_name (Path): path to timesheet file
+        line_width (int): line width (bytes, including newline)
+
+    Raises:
+        Exception: if file size isn't a whole number of lines
+
+    Returns:
+        int: number of records
+    """
+
+    size = os.path.getsize(file_name)
+    if size % line_width != 0:
+        raise Exception(
+            f"Timesheet file ({file_name}) isn't fixed width (size {size} isn't a multiple of line width {line_width})"
+        )
+
+    return size // line_width - 1
+
+
+def get_record_offset(file_name: Path, row: int, line_width: int) -> int:
+    """Get offset of record in fixed width timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+        row (int): row of record (negative counts back from last record)
+        line_width (int): line width (bytes, including newline)
+
+    Raises:
+        Exception: if row isn't in timesheet
+
+    Returns:
+        int: offset of start of record
+    """
+
+    n_records = count_records(file_name, line_width)
+    if row < 0:
+        row += n_records
+    if row < 0 or row >= n_records:
+        raise Exception(
+            f"Row provided ({row}) isn't in timesheet ({n_records} records)"
+        )
+
+    return (row + 1) * line_width
+
+
+def read_record(file_name: Path, row: int) -> dict:
+    """Read one record of fixed width timesheet file (without reading other records)
+
+    Args:
+        file_name (Path): path to timesheet file
+        row (int): row of record (negative counts back from last record)
+
+    Returns:
+        dict: record with values as written in CSV timesheet
+    """
+
+    line_width = read_line_width(file_name)
+    with open(file_name, "rb") as file:
+        file.seek(get_record_offset(file_name, row, line_width))
+        return parse_line(file.read(line_width))
+
+
+def read_last_record(file_name: Path) -> dict:
+    """Read last record of fixed width timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        dict: last record (values as written in CSV timesheet), None if timesheet is empty
+    """
+
+    if count_records(file_name, read_line_width(file_name)) == 0:
+        return None
+
+    return read_record(file_name, -1)
+
+
+def write_lines(file_name: Path, lines, line_width: int):
+    """Write fixed width timesheet file (replacing current file)
+
+    Args:
+        file_name (Path): path to timesheet file
+        lines (iterable[bytes]): fixed width lines of records
+        line_width (int): line width (bytes, including newline)
+    """
+
+    def write_file(temporary_file_name):
+        with open(temporary_file_name, "wb") as file:
+            file.write(format_header(line_width))
+            for line in lines:
+                file.write(line)
+
+    file_functions.write_file_atomically(file_name, write_file)
+
+
+def create_timesheet(file_name: Path, notes_width: int = DEFAULT_NOTES_WIDTH):
+    """Create empty fixed width timesheet file (header only), replacing any current file
+
+    Args:
+        file_name (Path): path to timesheet file
+        notes_width (int, optional): width of notes field (bytes).
+            Defaults to DEFAULT_NOTES_WIDTH (64).
+    """
+
+    with journal_functions.commit_lock(file_name):
+        write_lines(file_name, [], get_line_width(notes_width))
+    print(f"Created timesheet file at: {file_name}")
+
+
+def patch_record(file_name: Path, row: int, values: dict):
+    """Change fields of one record of fixed width timesheet file in place
+
+    Only the bytes of the fields changed are written (through a memory map of the file),
+    so the cost doesn't depend on the size of the timesheet. Should only be called while
+    holding the commit lock (see journal_functions.commit_lock()).
+
+    Args:
+        file_name (Path): path to timesheet file
+        row (int): row of record (negative counts back from last record)
+        values (dict): new values (as written in CSV timesheet) keyed by column
+
+    Raises:
+        Exception: if a value is too long for its field
+    """
+
+    # Format fields before changing file (so a value too long changes nothing)
+    line_width = read_line_width(file_name)
+    offset = get_record_offset(file_name, row, line_width)
+    fields = {
+        column: format_field(column, value, line_width)
+        for column, value in values.items()
+    }
+
+    # Write fields in place
+    with open(file_name, "r+b") as file:
+        with mmap.mmap(file.fileno(), 0) as memory_map:
+            for column, field in fields.items():
+                field_offset = offset + FIELD_OFFSETS[column][0]
+                memory_map[field_offset : field_offset + len(field)] = field
+            memory_map.flush()
+
+
+def append_record(file_name: Path, record: dict):
+    """Append record to end of fixed width timesheet file. Should only be called while
+    holding the commit lock (see journal_functions.commit_lock()).
+
+    Args:
+        file_name (Path): path to timesheet file
+        record (dict): record with values as written in CSV timesheet
+    """
+
+    line = format_line(record, read_line_width(file_name))
+    with open(file_name, "ab") as file:
+        file.write(line)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def commit_operation(
+    file_name: Path, operation: str, operation_time: datetime, file_stamp: str = None
+) -> str:
+    """Add start or end time to fixed width timesheet file in place
+
+    Start times append a new record and end times patch the end_time and time_worked
+    fields of the last record. The last record is read and checked while holding the
+    commit lock, so processes adding times at the same time don't overwrite each other.
+
+    Args:
+        file_name (Path): path to timesheet file
+        operation (str): operation (start or end)
+        operation_time (datetime): start or end time
+        file_stamp (str, optional): stamp of timesheet file when it was last read by the
+            caller (see totals_functions.get_file_stamp()). Defaults to None.
+
+    Raises:
+        Exception: if operation failed checks (e.g. end time not after start time)
+
+    Returns:
+        str: new stamp of timesheet file if it was unchanged since it had file_stamp,
+            otherwise None
+    """
+
+    with journal_functions.commit_lock(file_name):
+        unchanged = file_stamp != None and (
+            totals_functions.get_file_stamp(file_name) == file_stamp
+        )
+        last_record = read_last_record(file_name)
+        start_time, end_time = punch_functions.get_current_times(last_record)
+
+        # Append new record for start time
+        if operation == "start":
+            punch_functions.check_start_time(operation_time, end_time)
+            append_record(
+                file_name, punch_functions.create_start_record(operation_time)
+            )
+
+        # Add end time and time worked to last record (if session not already ended)
+        else:
+            punch_functions.check_end_time(operation_time, start_time, end_time)
+            punch_functions.add_end_time_to_record(last_record, operation_time)
+            patch_record(
+                file_name,
+                -1,
+                {
+                    "end_time": last_record["end_time"],
+                    "time_worked": last_record["time_worked"],
+                },
+            )
+
+        new_file_stamp = totals_functions.get_file_stamp(file_name)
+
+    return new_file_stamp if unchanged else None
+
+
+def add_start_time(file_name: Path, start_time_string: str = None):
+    """Add start time to fixed width timesheet file without loading timesheet
+
+    Args:
+        file_name (Path): path to timesheet file
+        start_time_string (str, optional): time (format: hh:mm) to use for start time
+            Defaults to None (will use current time).
+    """
+
+    start_time = punch_functions.parse_time_string(start_time_string, datetime.now())
+    commit_operation(file_name, "start", start_time)
+
+
+def add_end_time(file_name: Path, end_time_string: str = None):
+    """Add end time to fixed width timesheet file without loading timesheet
+
+    Args:
+        file_name (Path): path to timesheet file
+        end_time_string (str, optional): time (format: hh:mm) to use for end time
+            Defaults to None (will use current time).
+    """
+
+    end_time = punch_functions.parse_time_string(end_time_string, datetime.now())
+    commit_operation(file_name, "end", end_time)
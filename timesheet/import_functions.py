@@ -0,0 +1,223 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import json  # reading JSON lines files
+import numpy as np  # checking sessions for overlaps
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import check_functions  # finding overlapping sessions
+from timesheet import data_functions  # merging timesheets with dictionary-encoded notes
+
+# Columns each imported record must have (notes are optional, time worked is calculated)
+REQUIRED_COLUMNS = ["date", "start_time", "end_time"]
+
+
+class TimesheetImportError(Exception):
+    """Raised when records to import fail validation
+
+    Attributes:
+        errors (pd.DataFrame): one row per problem, with the position of the record (from
+            0, in the order provided) and a description of the problem
+    """
+
+    def __init__(self, errors: pd.DataFrame):
+        self.errors = errors
+        super().__init__(
+            f"{errors.shape[0]} problem(s) found in records to import (nothing imported):\n{errors.head(10).to_string(index=False)}"
+        )
+
+
+def read_import_file(file_name: Path) -> pd.DataFrame:
+    """Read records to import from CSV or JSON lines file
+
+    CSV files have a header with (at least) date, start_time and end_time columns. JSON lines
+    files (.jsonl or .json extension) have one object per line with the same keys. Notes are
+    optional.
+
+    Args:
+        file_name (Path): path to file
+
+    Returns:
+        pd.DataFrame: records (values as strings, as written in file)
+    """
+
+    file_name = Path(file_name)
+
+    # Read JSON lines
+    if file_name.suffix.lower() in [".jsonl", ".json"]:
+        with open(file_name) as file:
+            records = [json.loads(line) for line in file if line.strip() != ""]
+        return pd.DataFrame(records, dtype=object)
+
+    # Read CSV
+    return pd.read_csv(file_name, dtype=str, keep_default_na=False)
+
+
+def convert_records_to_timesheet(records: pd.DataFrame) -> pd.DataFrame:
+    """Validate records to import and convert them into timesheet rows
+
+    Every record is checked at once (dates as YYYY-mm-dd, times as hh:mm, start time before
+    end time) and all problems are reported together.
+
+    Args:
+        records (pd.DataFrame): records (date, start_time, end_time and optional notes)
+
+    Raises:
+        Exception: if required columns missing
+        TimesheetImportError: if any records are malformed
+
+    Returns:
+        pd.DataFrame: timesheet rows with datetime and timedelta columns (in order provided)
+    """
+
+    # Check required columns present
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in records]
+    if len(missing_columns) > 0:
+        raise Exception(
+            f"Records to import are missing columns: {', '.join(missing_columns)}"
+        )
+    records = records.reset_index(drop=True)
+
+    # Parse dates and times (NaT if malformed or missing)
+    formats = {"date": "%Y-%m-%d", "start_time": "%H:%M", "end_time": "%H:%M"}
+    parsed = {
+        column: pd.to_datetime(
+            records[column].astype(str), format=column_format, errors="coerce"
+        )
+        for column, column_format in formats.items()
+    }
+
+    # Find malformed values and sessions that don't end after they start
+    errors = [
+        pd.DataFrame(
+            {
+                "record": np.flatnonzero(parsed[column].isna()),
+                "problem": f"{column} isn't formatted as {formats[column]}",
+            }
+        )
+        for column in formats
+    ]
+    errors.append(
+        pd.DataFrame(
+            {
+                "record": np.flatnonzero(parsed["start_time"] >= parsed["end_time"]),
+                "problem": "start_time isn't before end_time",
+            }
+        )
+    )
+    errors = pd.concat(errors, ignore_index=True)
+    if errors.shape[0] > 0:
+        raise TimesheetImportError(
+            errors.sort_values("record", kind="stable").reset_index(drop=True)
+        )
+
+    # Build timesheet rows
+    notes = (
+        records["notes"] if "notes" in records else pd.Series("", index=records.index)
+    )
+
+    return pd.DataFrame(
+        {
+            "date": parsed["date"],
+            "start_time": parsed["start_time"],
+            "end_time": parsed["end_time"],
+            "time_worked": parsed["end_time"] - parsed["start_time"],
+            "notes": notes.fillna("").astype(str).astype("category"),
+        }
+    )
+
+
+def calculate_session_intervals(timesheet: pd.DataFrame) -> tuple:
+    """Calculate start and end of each session in nanoseconds since 1970-01-01
+
+    Sessions without an end time are still running, so end at the largest possible time.
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with datetime date, start_time and end_time columns
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: start and end of each session (int64 nanoseconds)
+    """
+
+    day_start = pd.Timestamp("1900-01-01")
+    dates = timesheet.date.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    starts = dates + (timesheet.start_time - day_start).to_numpy().astype(np.int64)
+    end_offsets = timesheet.end_time - day_start
+    ends = dates + end_offsets.to_numpy().astype(np.int64)
+    ends[end_offsets.isna().to_numpy()] = np.iinfo(np.int64).max
+
+    return starts, ends
+
+
+def check_overlaps(new_timesheet: pd.DataFrame, timesheet: pd.DataFrame):
+    """Check new sessions don't overlap each other or sessions already in timesheet
+
+    All sessions are sorted by start time once, so every overlap is found in a single pass
+    (see check_functions.find_overlaps()). Overlaps between sessions already in the
+    timesheet aren't reported.
+
+    Args:
+        new_timesheet (pd.DataFrame): new sessions (see convert_records_to_timesheet())
+        timesheet (pd.DataFrame): sessions already in timesheet (only those that could
+            overlap new sessions are needed)
+
+    Raises:
+        TimesheetImportError: if any new sessions overlap
+    """
+
+    # Combine sessions (new sessions numbered from 0, existing sessions -1)
+    new_starts, new_ends = calculate_session_intervals(new_timesheet)
+    starts, ends = calculate_session_intervals(timesheet)
+    starts = np.concatenate([starts, new_starts])
+    ends = np.concatenate([ends, new_ends])
+    records = np.concatenate(
+        [np.full(timesheet.shape[0], -1), np.arange(new_timesheet.shape[0])]
+    )
+
+    # Find overlapping sessions (involving a new session)
+    positions, other_positions = check_functions.find_overlaps(starts, ends)
+    overlapping_records, other_records = records[positions], records[other_positions]
+    involves_new = (overlapping_records >= 0) | (other_records >= 0)
+    overlapping_records = overlapping_records[involves_new]
+    other_records = other_records[involves_new]
+    if overlapping_records.shape[0] == 0:
+        return
+
+    # Report each overlap against the new record
+    new_records = np.where(overlapping_records >= 0, overlapping_records, other_records)
+    other_records = np.where(overlapping_records >= 0, other_records, -1)
+    problems = [
+        "overlaps a session already in timesheet"
+        if other_record < 0
+        else f"overlaps record {other_record}"
+        for other_record in other_records
+    ]
+    errors = pd.DataFrame({"record": new_records, "problem": problems})
+    raise TimesheetImportError(
+        errors.drop_duplicates()
+        .sort_values("record", kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def merge_timesheets(
+    timesheet: pd.DataFrame, new_timesheet: pd.DataFrame
+) -> pd.DataFrame:
+    """Merge new sessions into timesheet in date and start time order
+
+    Args:
+        timesheet (pd.DataFrame): timesheet (in date order)
+        new_timesheet (pd.DataFrame): new sessions
+
+    Returns:
+        pd.DataFrame: merged timesheet
+    """
+
+    if timesheet.shape[0] == 0:
+        merged_timesheet = new_timesheet
+    else:
+        merged_timesheet = data_functions.concat_timesheets([timesheet, new_timesheet])
+
+    return merged_timesheet.sort_values(
+        ["date", "start_time"], kind="stable"
+    ).reset_index(drop=True)
@@ -0,0 +1,392 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from contextlib import contextmanager  # holding locks in with statements
+from datetime import datetime  # working with dates and times
+import csv  # parsing journal lines
+import json  # reading and writing redo records
+import os  # syncing and removing files
+import time  # creating operation ids
+import threading  # tracking commit locks held by each thread
+
+# Local imports
+from timesheet import (
+    file_functions,
+)  # formatting CSV lines and writing files atomically
+
+# Advisory file locks (fcntl on POSIX systems, msvcrt on Windows)
+try:
+    import fcntl  # locking files on POSIX systems
+except ImportError:
+    fcntl = None
+    import msvcrt  # locking files on Windows
+
+# Note this module only uses the standard library (no pandas) so the command line
+# interface can add start and end times without paying for the pandas import
+
+# Operations that can be added to journal
+JOURNAL_OPERATIONS = ["start", "end"]
+
+# Commit locks held by each thread (depths keyed by lock file path), so a thread already
+# holding a timesheet's commit lock doesn't wait for itself
+held_commit_locks = threading.local()
+
+
+def get_journal_file_names(file_name: Path) -> dict:
+    """Get paths of files used to journal changes to timesheet file
+
+    - journal: operations waiting to be added to timesheet (e.g. outputs/timesheet_journal.csv)
+    - lock: held by the process adding operations to timesheet (e.g. outputs/timesheet.lock)
+    - redo: new end of timesheet, written before timesheet is changed so a crash part way
+      through can be recovered from (e.g. outputs/timesheet_journal_redo.json)
+    - rejected: operations that failed checks, waiting to be reported to the process that
+      added them (e.g. outputs/timesheet_journal_rejected.csv)
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        dict: paths to journal, lock, redo and rejected files
+    """
+
+    file_name = Path(file_name)
+
+    return {
+        "journal": file_name.with_name(f"{file_name.stem}_journal.csv"),
+        "lock": file_name.with_name(f"{file_name.stem}.lock"),
+        "redo": file_name.with_name(f"{file_name.stem}_journal_redo.json"),
+        "rejected": file_name.with_name(f"{file_name.stem}_journal_rejected.csv"),
+    }
+
+
+def acquire_lock(file):
+    """Wait for exclusive advisory lock on open file
+
+    Args:
+        file (file object): open file
+    """
+
+    if fcntl != None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        return
+
+    # Windows locks first byte of file (LK_LOCK gives up after 10 attempts so keep trying)
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def release_lock(file):
+    """Release advisory lock on open file
+
+    Args:
+        file (file object): open file
+    """
+
+    if fcntl != None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def lock_file(file_name: Path, remove: bool = False):
+    """Hold exclusive advisory lock on file (created if it doesn't exist)
+
+    If the file was removed or replaced while waiting for the lock, the new file is locked
+    instead, so lock files can be removed when finished with.
+
+    Args:
+        file_name (Path): path to file to lock
+        remove (bool, optional): remove file before releasing lock. Defaults to False.
+
+    Yields:
+        file object: locked file (opened for appending and reading bytes)
+    """
+
+    # Wait for lock on file currently at path
+    while True:
+        file = open(file_name, "a+b")
+        acquire_lock(file)
+        try:
+            if os.path.samestat(os.fstat(file.fileno()), os.stat(file_name)):
+                break
+        except FileNotFoundError:
+            pass
+        file.close()
+
+    try:
+        yield file
+    finally:
+        if remove:
+            try:
+                os.unlink(file_name)
+            except OSError:
+                pass  # files can't be removed while open on Windows
+        release_lock(file)
+        file.close()
+
+
+def append_operation(file_name: Path, operation: str, operation_time: datetime) -> str:
+    """Add operation to end of timesheet's journal
+
+    Only holds the journal lock while the line is written, so many processes can add
+    operations while another is adding earlier operations to the timesheet.
+
+    Args:
+        file_name (Path): path to timesheet file
+        operation (str): operation (start or end)
+        operation_time (datetime): start or end time
+
+    Raises:
+        Exception: if operation isn't start or end
+
+    Returns:
+        str: id of operation
+    """
+
+    # Check operation
+    if operation not in JOURNAL_OPERATIONS:
+        raise Exception(
+            f"Operation provided ({operation}) isn't one of: {', '.join(JOURNAL_OPERATIONS)}"
+        )
+
+    # Create line for operation
+    operation_id = f"{os.getpid()}-{time.time_ns()}"
+    line = file_functions.format_csv_line(
+        [operation_id, operation, operation_time.isoformat()]
+    )
+
+    # Add to journal (after a newline if a crash left a partial line)
+    with lock_file(get_journal_file_names(file_name)["journal"]) as journal:
+        if journal.seek(0, 2) > 0:
+            journal.seek(-1, 2)
+            if journal.read(1) != b"\n":
+                line = "\n" + line
+        journal.write(line.encode())
+
+    return operation_id
+
+
+def parse_operations(content: bytes) -> list[dict]:
+    """Parse operations from journal content
+
+    Lines that are incomplete or malformed (e.g. left by a crash part way through writing)
+    are ignored.
+
+    Args:
+        content (bytes): journal content
+
+    Returns:
+        list[dict]: operations (operation_id, operation and time) in order added
+    """
+
+    operations = []
+    for values in csv.reader(content.decode().split("\n")[:-1]):
+        if len(values) != 3 or values[1] not in JOURNAL_OPERATIONS:
+            continue
+        try:
+            operation_time = datetime.fromisoformat(values[2])
+        except ValueError:
+            continue
+        operations.append(
+            {"operation_id": values[0], "operation": values[1], "time": operation_time}
+        )
+
+    return operations
+
+
+def read_operations(file_name: Path) -> list[dict]:
+    """Read operations waiting in timesheet's journal
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        list[dict]: operations (operation_id, operation and time) in order added
+    """
+
+    # Check journal exists
+    journal_file_name = get_journal_file_names(file_name)["journal"]
+    if not Path.exists(journal_file_name):
+        return []
+
+    with lock_file(journal_file_name) as journal:
+        journal.seek(0)
+        return parse_operations(journal.read())
+
+
+def remove_operations(file_name: Path, operation_ids: list[str]):
+    """Remove operations from timesheet's journal (journal removed once empty)
+
+    Args:
+        file_name (Path): path to timesheet file
+        operation_ids (list[str]): ids of operations to remove
+    """
+
+    # Check journal exists
+    journal_file_name = get_journal_file_names(file_name)["journal"]
+    if not Path.exists(journal_file_name):
+        return
+
+    operation_ids = set(operation_ids)
+    with lock_file(journal_file_name) as journal:
+
+        # Keep lines for other operations
+        journal.seek(0)
+        lines = journal.read().split(b"\n")
+        remaining_lines = [
+            line
+            for line in lines[:-1]
+            if line.split(b",", 1)[0].decode(errors="replace") not in operation_ids
+        ]
+
+        # Rewrite journal (or remove if empty)
+        if len(remaining_lines) == 0:
+            try:
+                os.unlink(journal_file_name)
+                return
+            except OSError:
+                pass  # files can't be removed while open on Windows
+        journal.truncate(0)
+        if len(remaining_lines) > 0:
+            journal.write(b"\n".join(remaining_lines) + b"\n")
+
+
+def write_redo(
+    file_name: Path, offset: int, tail: str, operation_ids: list, rejected: dict
+):
+    """Write redo record describing change to end of timesheet file, synced to disk
+
+    Args:
+        file_name (Path): path to timesheet file
+        offset (int): byte offset in timesheet file where new tail starts
+        tail (str): new content of timesheet file from offset
+        operation_ids (list): ids of journal operations included in change
+        rejected (dict): error message for each operation that failed checks
+    """
+
+    redo = {
+        "offset": offset,
+        "tail": tail,
+        "operation_ids": operation_ids,
+        "rejected": rejected,
+    }
+    file_functions.write_file_atomically(
+        get_journal_file_names(file_name)["redo"],
+        lambda redo_file_name: Path(redo_file_name).write_text(json.dumps(redo)),
+    )
+
+
+def apply_redo(file_name: Path):
+    """Apply redo record (if present) to timesheet file
+
+    Removes the operations it includes from the journal, writes the new end of the timesheet
+    and syncs it to disk, and records rejected operations. Each step can be repeated, so an
+    interrupted redo is completed the next time this is called. Should only be called while
+    holding the commit lock (see commit_lock()).
+
+    Args:
+        file_name (Path): path to timesheet file
+    """
+
+    # Check redo record exists
+    journal_file_names = get_journal_file_names(file_name)
+    if not Path.exists(journal_file_names["redo"]):
+        return
+    redo = json.loads(journal_file_names["redo"].read_text())
+
+    # Remove operations from journal
+    remove_operations(file_name, redo["operation_ids"])
+
+    # Write new end of timesheet
+    with open(file_name, "r+b") as file:
+        file.seek(redo["offset"])
+        file.write(redo["tail"].encode())
+        file.truncate()
+        file.flush()
+        os.fsync(file.fileno())
+
+    # Record rejected operations
+    if len(redo["rejected"]) > 0:
+        with open(journal_file_names["rejected"], "a") as file:
+            for operation_id, message in redo["rejected"].items():
+                file.write(file_functions.format_csv_line([operation_id, message]))
+
+    # Remove redo record
+    os.unlink(journal_file_names["redo"])
+
+
+def pop_rejection(file_name: Path, operation_id: str) -> str:
+    """Get (and forget) error message for operation if it was rejected
+
+    Should only be called while holding the commit lock (see commit_lock()).
+
+    Args:
+        file_name (Path): path to timesheet file
+        operation_id (str): id of operation
+
+    Returns:
+        str: error message, None if operation wasn't rejected
+    """
+
+    # Check any operations rejected
+    rejected_file_name = get_journal_file_names(file_name)["rejected"]
+    if not Path.exists(rejected_file_name):
+        return None
+
+    # Find operation
+    with open(rejected_file_name, "r", newline="") as file:
+        rejections = list(csv.reader(file))
+    messages = [
+        message for rejected_id, message in rejections if rejected_id == operation_id
+    ]
+    if len(messages) == 0:
+        return None
+
+    # Remove operation from rejected file (or remove file if empty)
+    rejections = [rejection for rejection in rejections if rejection[0] != operation_id]
+    if len(rejections) == 0:
+        os.unlink(rejected_file_name)
+    else:
+        with open(rejected_file_name, "w") as file:
+            for rejection in rejections:
+                file.write(file_functions.format_csv_line(rejection))
+
+    return messages[0]
+
+
+@contextmanager
+def commit_lock(file_name: Path):
+    """Hold lock for changing timesheet file, completing any interrupted redo first
+
+    The lock is re-entrant: if the current thread already holds it (e.g. a timesheet is
+    recreated while a record is edited) it is held until the outermost call finishes.
+
+    Args:
+        file_name (Path): path to timesheet file
+    """
+
+    lock_file_name = Path(os.path.abspath(get_journal_file_names(file_name)["lock"]))
+    depths = held_commit_locks.__dict__.setdefault("depths", {})
+
+    # Lock already held by this thread
+    if lock_file_name in depths:
+        depths[lock_file_name] += 1
+        try:
+            yield
+        finally:
+            depths[lock_file_name] -= 1
+        return
+
+    with lock_file(lock_file_name, remove=True):
+        depths[lock_file_name] = 1
+        try:
+            apply_redo(file_name)
+            yield
+        finally:
+            del depths[lock_file_name]
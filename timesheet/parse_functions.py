@@ -0,0 +1,781 @@
+# Load packages
+import io  # reading bytes with pandas
+import numpy as np  # vectorised parsing
+import pandas as pd  # building timesheet dataframe
+
+# Local imports
+from timesheet import punch_functions  # timesheet column names
+from timesheet import fixed_width_functions  # fixed width line layout
+
+# Character codes used when decoding fixed width fields
+ZERO, COMMA, HYPHEN, COLON, NEWLINE, CARRIAGE_RETURN, QUOTE, SPACE = b'0,-:\n\r" '
+
+# Widths of fixed width columns (dates: YYYY-mm-dd, times: hh:mm)
+COLUMN_WIDTHS = {"date": 10, "start_time": 5, "end_time": 5, "time_worked": 5}
+
+# Number of lines decoded at a time (so each block's characters stay in cache)
+DECODE_BLOCK_LINES = 2**16
+
+# Number of bytes searched for newlines at a time (so each search stays in cache)
+NEWLINE_SEARCH_BYTES = 2**20
+
+# Width of start of each line holding the fixed width fields (as written by timesheet,
+# fields have the same offsets in CSV lines as in fixed width lines)
+LINE_PREFIX_WIDTH = fixed_width_functions.FIELD_OFFSETS["notes"][0]
+
+# First and last whole years that can be held in datetime64[ns]
+FIRST_YEAR, LAST_YEAR = 1678, 2261
+
+# Nanoseconds in a minute and a day, and integer value of NaT
+MINUTE_NANOSECONDS = np.int64(60 * 10**9)
+DAY_NANOSECONDS = 1440 * MINUTE_NANOSECONDS
+NAT = np.iinfo(np.int64).min
+
+# Integer value of first day of times (times are read as datetimes on this day)
+FIRST_TIME = np.datetime64("1900-01-01", "ns").astype(np.int64)
+
+
+class TimesheetFormatError(Exception):
+    """Raised when a timesheet file contains malformed records
+
+    Attributes:
+        errors (pd.DataFrame): one row per malformed value, with the line number in the
+            file, the column and the value found
+    """
+
+    def __init__(self, errors: pd.DataFrame):
+        self.errors = errors
+        super().__init__(
+            f"Timesheet contains {errors.shape[0]} malformed value(s):\n{errors.head(10).to_string(index=False)}"
+        )
+
+
+def decode_digits(characters: np.ndarray, positions: list[int]) -> tuple:
+    """Decode digits at fixed positions into an integer
+
+    Args:
+        characters (np.ndarray): character codes (one row per value, one column per character)
+        positions (list[int]): positions of digits (most significant first)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: integer values (int16, so up to 4 digits) and
+            whether all characters were digits
+    """
+
+    values = np.zeros(characters.shape[0], dtype=np.int16)
+    valid = np.ones(characters.shape[0], dtype=bool)
+    for position in positions:
+        # Characters below zero wrap around to large unsigned values
+        digits = characters[:, position] - np.uint8(ZERO)
+        valid &= digits <= 9
+        values *= 10
+        values += digits
+
+    return values, valid
+
+
+def get_month_tables() -> tuple:
+    """Get first day and number of days of each month of the years that can be held in
+    datetime64[ns], for looking up by month index (see get_month_index)
+
+    Months outside these years, or numbered 0 or 13, have no days.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: days since epoch each month starts and days in each
+            month
+    """
+
+    # Get months of each year
+    months = np.arange(
+        f"{FIRST_YEAR}-01", f"{LAST_YEAR + 1}-01", dtype="datetime64[M]"
+    ).reshape(-1, 12)
+    first_days = months.astype("datetime64[D]").astype(np.int64)
+    last_days = (months + 1).astype("datetime64[D]").astype(np.int64)
+
+    # Add months 0 and 13 and a year either side with no days
+    month_starts = np.zeros((months.shape[0] + 2, 14), dtype=np.int64)
+    days_in_month = np.zeros((months.shape[0] + 2, 14), dtype=np.int64)
+    month_starts[1:-1, 1:-1] = first_days
+    days_in_month[1:-1, 1:-1] = last_days - first_days
+
+    return month_starts.ravel(), days_in_month.ravel()
+
+
+def get_month_index(year: np.ndarray, month: np.ndarray) -> np.ndarray:
+    """Get index of months in tables from get_month_tables (months out of range are
+    given an index of a month with no days)
+
+    Args:
+        year (np.ndarray): years
+        month (np.ndarray): months (1-12)
+
+    Returns:
+        np.ndarray: index of each month
+    """
+
+    year_index = np.clip(year - (FIRST_YEAR - 1), 0, LAST_YEAR - FIRST_YEAR + 2)
+
+    return year_index * 14 + np.clip(month, 0, 13)
+
+
+# Days since epoch each month starts and days in each month (by month index)
+MONTH_STARTS, DAYS_IN_MONTH = get_month_tables()
+
+
+def decode_dates(characters: np.ndarray, lengths: np.ndarray) -> tuple:
+    """Decode dates (YYYY-mm-dd) into datetimes using fixed width character positions
+
+    The start and length of each month are looked up from tables rather than converting
+    between datetime units.
+
+    Args:
+        characters (np.ndarray): character codes (one row per date, at least 10 columns)
+        lengths (np.ndarray): length of each date string
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: datetime64[ns] dates (NaT if invalid) and whether each
+            date is valid
+    """
+
+    # Decode year, month and day digits
+    year, year_valid = decode_digits(characters, [0, 1, 2, 3])
+    month, month_valid = decode_digits(characters, [5, 6])
+    day, day_valid = decode_digits(characters, [8, 9])
+
+    # Look up month (months out of range or that can't be held in datetime64[ns] have no
+    # days)
+    month_index = get_month_index(year, month)
+    month_starts = MONTH_STARTS[month_index]
+
+    # Check format and that day exists in month
+    valid = (
+        (lengths == 10)
+        & year_valid
+        & month_valid
+        & day_valid
+        & (characters[:, 4] == HYPHEN)
+        & (characters[:, 7] == HYPHEN)
+        & (day >= 1)
+        & (day <= DAYS_IN_MONTH[month_index])
+    )
+
+    # Build dates from start of month plus days
+    dates = np.where(valid, (month_starts + day - 1) * DAY_NANOSECONDS, NAT)
+    dates = dates.view("datetime64[ns]")
+
+    return dates, valid
+
+
+def decode_times(characters: np.ndarray, lengths: np.ndarray) -> tuple:
+    """Decode times (hh:mm) into minutes using fixed width character positions
+
+    Empty strings are treated as missing (valid) times.
+
+    Args:
+        characters (np.ndarray): character codes (one row per time, at least 5 columns)
+        lengths (np.ndarray): length of each time string
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: minutes (-1 if missing or invalid) and whether each
+            time is valid
+    """
+
+    # Decode hour and minute digits
+    hours, hours_valid = decode_digits(characters, [0, 1])
+    minutes, minutes_valid = decode_digits(characters, [3, 4])
+
+    # Check format
+    valid = (
+        (lengths == 5)
+        & hours_valid
+        & minutes_valid
+        & (characters[:, 2] == COLON)
+        & (hours < 24)
+        & (minutes < 60)
+    )
+    minutes = np.where(valid, hours * 60 + minutes, -1)
+
+    return minutes, valid | (lengths == 0)
+
+
+def convert_minutes_to_times(minutes: np.ndarray) -> np.ndarray:
+    """Convert minutes after midnight into datetimes on 1900-01-01
+
+    Args:
+        minutes (np.ndarray): minutes after midnight (-1 if missing)
+
+    Returns:
+        np.ndarray: datetime64[ns] times (NaT if missing)
+    """
+
+    times = np.where(minutes < 0, NAT, FIRST_TIME + minutes * MINUTE_NANOSECONDS)
+
+    return times.view("datetime64[ns]")
+
+
+def convert_minutes_to_timedeltas(minutes: np.ndarray) -> np.ndarray:
+    """Convert minutes into timedeltas
+
+    Args:
+        minutes (np.ndarray): minutes (-1 if missing)
+
+    Returns:
+        np.ndarray: timedelta64[ns] durations (NaT if missing)
+    """
+
+    timedeltas = np.where(minutes < 0, NAT, minutes * MINUTE_NANOSECONDS)
+
+    return timedeltas.view("timedelta64[ns]")
+
+
+def gather_characters(buffer: np.ndarray, starts: np.ndarray, width: int) -> np.ndarray:
+    """Gather fixed number of characters from each start position (characters past the
+    end of the buffer are zero)
+
+    Args:
+        buffer (np.ndarray): bytes (uint8)
+        starts (np.ndarray): start positions
+        width (int): number of characters to gather
+
+    Returns:
+        np.ndarray: character codes (one row per start, one column per character)
+    """
+
+    last_start = buffer.shape[0] - width
+    if starts.max(initial=0) <= last_start:
+        return np.lib.stride_tricks.sliding_window_view(buffer, width)[starts]
+
+    # Gather characters running past end of buffer from zero padded copy of its end
+    tail_start = max(last_start + 1, 0)
+    tail = np.zeros(buffer.shape[0] - tail_start + width, dtype=np.uint8)
+    tail[: buffer.shape[0] - tail_start] = buffer[tail_start:]
+    tail_windows = np.lib.stride_tricks.sliding_window_view(tail, width)
+    if tail_start == 0:
+        return tail_windows[starts]
+    past_end = starts >= tail_start
+    characters = np.lib.stride_tricks.sliding_window_view(buffer, width)[
+        np.where(past_end, 0, starts)
+    ]
+    characters[past_end] = tail_windows[starts[past_end] - tail_start]
+
+    return characters
+
+
+def decode_strings(
+    buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> pd.Categorical:
+    """Decode byte ranges of buffer into dictionary-encoded strings, decoding each distinct
+    string once
+
+    Strings of the same length are grouped by a hash of their bytes (checked against the
+    bytes themselves, falling back to sorting if hashes collide) so repeated strings, such as
+    notes, are only decoded once. Each distinct string is kept once, as a category, and
+    each row as an integer code.
+
+    Args:
+        buffer (np.ndarray): bytes (uint8)
+        starts (np.ndarray): start of each string
+        ends (np.ndarray): end (exclusive) of each string
+
+    Returns:
+        pd.Categorical: strings (categories in sorted order)
+    """
+
+    lengths = ends - starts
+    string_codes = np.zeros(starts.shape[0], dtype=np.int64)
+    categories = [np.array([""], dtype=object)]
+    n_categories = 1
+    length_counts = np.bincount(lengths)
+    for length in np.flatnonzero(length_counts[1:]) + 1:
+
+        # Gather strings of this length as 8 byte words (zero padded)
+        if length_counts[length] == lengths.shape[0]:
+            rows = slice(None)
+        else:
+            rows = np.flatnonzero(lengths == length)
+        n_words = -(-length // 8)
+        characters = gather_characters(buffer, starts[rows], n_words * 8)
+        characters[:, length:] = 0
+        words = characters.view(np.uint64)
+
+        # Group identical strings by hash of their words (codes are numbered in order of
+        # first appearance, so each string's first row is where codes first reach it)
+        hashes = words[:, 0]
+        for word in range(1, n_words):
+            hashes = hashes * np.uint64(1099511628211) ^ words[:, word]
+        codes, uniques = pd.factorize(hashes)
+        first_rows = np.searchsorted(
+            np.maximum.accumulate(codes), np.arange(uniques.shape[0])
+        )
+
+        # Fall back to sorting strings if any hashes collide
+        if n_words > 1 and not all(
+            (words[:, word] == words[first_rows, word][codes]).all()
+            for word in range(n_words)
+        ):
+            values = characters.view(f"S{n_words * 8}").ravel()
+            _, first_rows, codes = np.unique(
+                values, return_index=True, return_inverse=True
+            )
+
+        # Decode each distinct string once
+        decoded = np.array(
+            [bytes(characters[row, :length]).decode() for row in first_rows],
+            dtype=object,
+        )
+        string_codes[rows] = n_categories + codes.ravel()
+        categories.append(decoded)
+        n_categories += decoded.shape[0]
+
+    # Keep strings present, with categories sorted (as pandas orders them)
+    categories = np.concatenate(categories)
+    present = np.zeros(n_categories, dtype=bool)
+    present[string_codes] = True
+    order = np.flatnonzero(present)[np.argsort(categories[present], kind="stable")]
+    new_codes = np.zeros(n_categories, dtype=np.int64)
+    new_codes[order] = np.arange(order.shape[0])
+
+    return pd.Categorical.from_codes(
+        new_codes[string_codes], categories=pd.Index(categories[order], dtype=object)
+    )
+
+
+def find_lines(buffer: np.ndarray) -> tuple:
+    """Find start and end of each non-blank line
+
+    Args:
+        buffer (np.ndarray): bytes (uint8)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: line starts, line ends (excluding newline
+            and carriage return) and line numbers (counting from 1)
+    """
+
+    # Find newlines (treating end of content as a newline)
+    size = buffer.shape[0]
+    newlines = np.concatenate(
+        [
+            np.flatnonzero(buffer[start : start + NEWLINE_SEARCH_BYTES] == NEWLINE)
+            + start
+            for start in range(0, size, NEWLINE_SEARCH_BYTES)
+        ]
+        + [np.zeros(0, dtype=np.int64)]
+    )
+    if size > 0 and (newlines.shape[0] == 0 or newlines[-1] != size - 1):
+        newlines = np.append(newlines, size)
+
+    # Get line starts and ends, ignoring carriage returns
+    line_starts = np.zeros_like(newlines)
+    np.add(newlines[:-1], 1, out=line_starts[1:])
+    line_ends = newlines
+    carriage_returns = buffer[newlines - 1] == CARRIAGE_RETURN
+    if carriage_returns.any():
+        line_ends = newlines - (carriage_returns & (newlines > line_starts))
+    line_numbers = np.arange(1, line_starts.shape[0] + 1)
+
+    # Remove blank lines
+    not_blank = line_ends > line_starts
+    if not not_blank.all():
+        line_starts, line_ends = line_starts[not_blank], line_ends[not_blank]
+        line_numbers = line_numbers[not_blank]
+
+    return line_starts, line_ends, line_numbers
+
+
+def find_fields(
+    buffer: np.ndarray,
+    line_starts: np.ndarray,
+    line_ends: np.ndarray,
+    prefixes: np.ndarray,
+) -> tuple:
+    """Find start and end of each field on each line
+
+    Lines are expected to have the fixed width layout written by timesheet (a 10 character
+    date and 5 character or empty times), so separators are found from fixed offsets in the
+    start of each line. If any line doesn't match this layout, the first four commas on each
+    line are used instead (dates and times never contain commas, so everything after the
+    fourth comma is the note).
+
+    Args:
+        buffer (np.ndarray): bytes (uint8)
+        line_starts (np.ndarray): start of each line
+        line_ends (np.ndarray): end of each line
+        prefixes (np.ndarray): first LINE_PREFIX_WIDTH character codes of each line (see
+            gather_characters)
+
+    Returns:
+        tuple[dict, np.ndarray]: start and end of each column's field on each line (offsets
+            from start of line), and whether each line had enough fields
+    """
+
+    # Find separators from fixed offsets (each time is either empty, so the next character
+    # is a comma, or 5 characters)
+    line_lengths = line_ends - line_starts
+    is_comma = {
+        offset: prefixes[:, offset] == COMMA for offset in [10, 16, 17, 18, 22, 23, 28]
+    }
+    end_empty = is_comma[17]
+    worked_empty = np.where(end_empty, is_comma[18], is_comma[23])
+    third_offsets = np.where(end_empty, np.int16(17), np.int16(22))
+    fourth_offsets = third_offsets + np.where(worked_empty, np.int16(1), np.int16(6))
+    separators = [
+        np.full(line_starts.shape[0], 10, dtype=np.int16),
+        np.full(line_starts.shape[0], 16, dtype=np.int16),
+        third_offsets,
+        fourth_offsets,
+    ]
+    matches_layout = (
+        is_comma[10]
+        & is_comma[16]
+        & (end_empty | is_comma[22])
+        & (worked_empty | np.where(end_empty, is_comma[23], is_comma[28]))
+        & (fourth_offsets < line_lengths)
+    )
+
+    # Otherwise search for first four commas on each line
+    if not matches_layout.all():
+        commas = np.append(np.flatnonzero(buffer == COMMA), buffer.shape[0])
+        first_comma = np.searchsorted(commas, line_starts)
+        separators = [
+            commas[np.minimum(first_comma + index, commas.shape[0] - 1)] - line_starts
+            for index in range(4)
+        ]
+    enough_fields = separators[-1] < line_lengths
+
+    # Record start and end of each field (limited to line)
+    field_starts = [np.zeros_like(separators[0])] + [
+        separator + 1 for separator in separators
+    ]
+    field_ends = separators + [line_lengths]
+    fields = {}
+    for column, start, end in zip(
+        punch_functions.TIMESHEET_COLUMNS, field_starts, field_ends
+    ):
+        if not enough_fields.all():
+            start = np.minimum(start, line_lengths)
+            end = np.minimum(np.maximum(end, start), line_lengths)
+        fields[column] = (start, end)
+
+    return fields, enough_fields
+
+
+def gather_field_characters(
+    buffer: np.ndarray,
+    prefixes: np.ndarray,
+    line_starts: np.ndarray,
+    field_starts: np.ndarray,
+    offset: int,
+    width: int,
+) -> np.ndarray:
+    """Gather fixed number of characters of a field on each line, taking them from the
+    start of the line (already gathered) where the field is at its usual offset
+
+    Args:
+        buffer (np.ndarray): bytes (uint8)
+        prefixes (np.ndarray): first LINE_PREFIX_WIDTH character codes of each line
+        line_starts (np.ndarray): start of each line
+        field_starts (np.ndarray): start of field on each line (offset from start of line)
+        offset (int): usual offset of field from start of line
+        width (int): number of characters to gather
+
+    Returns:
+        np.ndarray: character codes (one row per line, one column per character)
+    """
+
+    characters = prefixes[:, offset : offset + width]
+
+    # Gather characters of fields elsewhere on their line
+    moved = np.flatnonzero(field_starts != offset)
+    if moved.shape[0] > 0:
+        characters = characters.copy()
+        characters[moved] = gather_characters(
+            buffer, line_starts[moved] + field_starts[moved], width
+        )
+
+    return characters
+
+
+def convert_strings_to_characters(values: pd.Series, width: int) -> tuple:
+    """Convert strings into fixed width character codes
+
+    Args:
+        values (pd.Series): strings
+        width (int): number of characters to keep
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: character codes (one row per string, width columns)
+            and length of each string
+    """
+
+    encoded = values.str.encode("utf-8").to_numpy(dtype="S")
+    lengths = np.char.str_len(encoded)
+    characters = encoded.astype(f"S{width}").view(np.uint8).reshape(-1, width)
+
+    return characters, lengths
+
+
+def decode_columns(columns: dict) -> dict:
+    """Decode fixed width timesheet columns
+
+    Args:
+        columns (dict): character codes and lengths for date, start_time, end_time and
+            time_worked columns
+
+    Returns:
+        dict: decoded values (datetime64[ns] dates, or minutes for times) and whether each
+            is valid, for each column
+    """
+
+    decoded = {"date": decode_dates(*columns["date"])}
+    for column in ["start_time", "end_time", "time_worked"]:
+        decoded[column] = decode_times(*columns[column])
+
+    # Start times are required
+    start_minutes, start_valid = decoded["start_time"]
+    start_valid &= start_minutes >= 0
+
+    return decoded
+
+
+def concatenate_blocks(blocks: list[dict]) -> dict:
+    """Join arrays found for each block of rows
+
+    Args:
+        blocks (list[dict]): arrays for each column (in tuples), for each block of rows
+
+    Returns:
+        dict: arrays for each column (in tuples), for all rows
+    """
+
+    return {
+        column: tuple(
+            np.concatenate(arrays)
+            for arrays in zip(*[block[column] for block in blocks])
+        )
+        for column in blocks[0]
+    }
+
+
+def build_timesheet(
+    decoded: dict, notes: pd.Categorical, line_numbers: np.ndarray, raw_values: callable
+) -> pd.DataFrame:
+    """Build timesheet dataframe from decoded columns
+
+    Args:
+        decoded (dict): decoded values and whether each is valid, for each column (see
+            decode_columns)
+        notes (pd.Categorical): dictionary-encoded notes
+        line_numbers (np.ndarray): line number in file of each record
+        raw_values (callable): function taking column name and row indices and returning
+            the raw strings (used to report malformed values)
+
+    Raises:
+        TimesheetFormatError: if any records are malformed
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    # Report malformed values
+    errors = []
+    for column, (_, valid) in decoded.items():
+        if not valid.all():
+            invalid_rows = np.flatnonzero(~valid)
+            errors.append(
+                pd.DataFrame(
+                    {
+                        "line": line_numbers[invalid_rows],
+                        "column": column,
+                        "value": raw_values(column, invalid_rows),
+                    }
+                )
+            )
+    if len(errors) > 0:
+        errors = pd.concat(errors).sort_values("line", kind="stable")
+        raise TimesheetFormatError(errors.reset_index(drop=True))
+
+    # Build timesheet
+    return pd.DataFrame(
+        {
+            "date": decoded["date"][0],
+            "start_time": convert_minutes_to_times(decoded["start_time"][0]),
+            "end_time": convert_minutes_to_times(decoded["end_time"][0]),
+            "time_worked": convert_minutes_to_timedeltas(decoded["time_worked"][0]),
+            "notes": notes,
+        }
+    )
+
+
+def parse_timesheet_csv(content: bytes) -> pd.DataFrame:
+    """Parse timesheet CSV content into timesheet dataframe
+
+    Dates (YYYY-mm-dd) and times (hh:mm) are decoded straight from their fixed width
+    characters into numeric arrays rather than letting pandas infer their format, and
+    malformed values are collected into a single error report. Files with quoted values
+    (e.g. notes containing commas) or unexpected columns are split into fields with
+    pandas (all columns read as strings) before decoding.
+
+    Args:
+        content (bytes): timesheet file content (including header)
+
+    Raises:
+        TimesheetFormatError: if any records are malformed
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    # Read header
+    header_end = content.find(b"\n")
+    header_end = len(content) if header_end == -1 else header_end
+    header = content[:header_end].rstrip(b"\r").decode().split(",")
+
+    # Check if file can be split into fields directly
+    if header == punch_functions.TIMESHEET_COLUMNS and content.find(QUOTE) == -1:
+
+        # Read content (minus header) without copying
+        buffer = np.frombuffer(memoryview(content)[header_end + 1 :], dtype=np.uint8)
+
+        # Find lines
+        line_starts, line_ends, line_numbers = find_lines(buffer)
+
+        # Find fields and decode fixed width columns a block of lines at a time, so each
+        # block's characters stay in cache (at least one block, so empty files still
+        # give every column)
+        field_blocks, decoded_blocks = [], []
+        for start in range(0, max(line_starts.shape[0], 1), DECODE_BLOCK_LINES):
+            block_starts = line_starts[start : start + DECODE_BLOCK_LINES]
+            block_ends = line_ends[start : start + DECODE_BLOCK_LINES]
+            prefixes = gather_characters(buffer, block_starts, LINE_PREFIX_WIDTH)
+            fields, enough_fields = find_fields(
+                buffer, block_starts, block_ends, prefixes
+            )
+
+            # Gather characters of fixed width columns
+            columns = {
+                column: (
+                    gather_field_characters(
+                        buffer,
+                        prefixes,
+                        block_starts,
+                        fields[column][0],
+                        fixed_width_functions.FIELD_OFFSETS[column][0],
+                        width,
+                    ),
+                    fields[column][1] - fields[column][0],
+                )
+                for column, width in COLUMN_WIDTHS.items()
+            }
+
+            # Lines without enough fields are malformed (marked by invalid date length)
+            columns["date"][1][~enough_fields] = -1
+
+            field_blocks.append(fields)
+            decoded_blocks.append(decode_columns(columns))
+        fields = concatenate_blocks(field_blocks)
+        notes = decode_strings(buffer, line_starts + fields["notes"][0], line_ends)
+
+        def raw_values(column, rows):
+            starts = line_starts[rows] + fields[column][0][rows]
+            ends = line_starts[rows] + fields[column][1][rows]
+            return [
+                bytes(buffer[start:end]).decode(errors="replace")
+                for start, end in zip(starts, ends)
+            ]
+
+        return build_timesheet(
+            concatenate_blocks(decoded_blocks), notes, line_numbers + 1, raw_values
+        )
+
+    # Split into fields with pandas
+    timesheet = pd.read_csv(
+        io.BytesIO(content),
+        dtype=str,
+        usecols=punch_functions.TIMESHEET_COLUMNS,
+        keep_default_na=False,
+    )
+    columns = {
+        column: convert_strings_to_characters(timesheet[column], width)
+        for column, width in COLUMN_WIDTHS.items()
+    }
+    notes = pd.Categorical(timesheet["notes"])
+
+    def raw_values(column, rows):
+        return timesheet[column].to_numpy()[rows]
+
+    return build_timesheet(
+        decode_columns(columns), notes, np.arange(timesheet.shape[0]) + 2, raw_values
+    )
+
+
+def parse_fixed_width_timesheet(content: bytes) -> pd.DataFrame:
+    """Parse fixed width timesheet content (see fixed_width_functions) into timesheet
+    dataframe
+
+    Every line has the same width, so each field is found by offset arithmetic rather than
+    by searching for separators. Fields of spaces are empty and padding is removed from
+    notes.
+
+    Args:
+        content (bytes): timesheet file content (including header)
+
+    Raises:
+        Exception: if content isn't a whole number of lines of the header's width
+        TimesheetFormatError: if any records are malformed
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    # Get line width from header
+    line_width = content.find(b"\n") + 1
+    if line_width == 0 or len(content) % line_width != 0:
+        raise Exception(
+            f"Timesheet content ({len(content)} bytes) isn't made of lines of the same width as its header ({line_width} bytes)"
+        )
+    n_records = len(content) // line_width - 1
+
+    # Read content (minus header) without copying
+    buffer = np.frombuffer(memoryview(content)[line_width:], dtype=np.uint8)
+    lines = buffer.reshape(n_records, line_width)
+    line_starts = np.arange(n_records, dtype=np.int64) * line_width
+
+    # Gather characters of fixed width columns (fields starting with a space are empty)
+    columns = {}
+    for column, width in COLUMN_WIDTHS.items():
+        offset = fixed_width_functions.FIELD_OFFSETS[column][0]
+        characters = gather_characters(buffer, line_starts + offset, width)
+        columns[column] = (characters, np.where(characters[:, 0] == SPACE, 0, width))
+
+    # Notes run to last character before padding
+    notes_offset = fixed_width_functions.FIELD_OFFSETS["notes"][0]
+    notes_characters = lines[:, notes_offset:-1] != SPACE
+    notes_lengths = np.where(
+        notes_characters.any(axis=1),
+        notes_characters.shape[1] - np.argmax(notes_characters[:, ::-1], axis=1),
+        0,
+    )
+    notes_starts = line_starts + notes_offset
+    notes = decode_strings(buffer, notes_starts, notes_starts + notes_lengths)
+
+    # Lines without separators and newline in place are malformed (invalid date length)
+    separator_offsets = [
+        offset + width
+        for offset, width in list(fixed_width_functions.FIELD_OFFSETS.values())[:-1]
+    ]
+    well_formed = (lines[:, separator_offsets] == COMMA).all(axis=1) & (
+        lines[:, -1] == NEWLINE
+    )
+    columns["date"][1][~well_formed] = -1
+
+    def raw_values(column, rows):
+        offset = fixed_width_functions.FIELD_OFFSETS[column][0]
+        width = COLUMN_WIDTHS[column]
+        return [
+            bytes(lines[row, offset : offset + width]).decode(errors="replace")
+            for row in rows
+        ]
+
+    return build_timesheet(
+        decode_columns(columns), notes, np.arange(n_records) + 2, raw_values
+    )
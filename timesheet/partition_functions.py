@@ -0,0 +1,395 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from datetime import datetime  # working with dates and times
+import csv  # reading shard records
+import json  # reading and writing manifest
+import re  # finding shard files
+import warnings  # ignoring warnings already given
+
+# Local imports
+from timesheet import punch_functions  # adding start and end times to shards
+from timesheet import (
+    journal_functions,
+)  # locking partitioned timesheet while changing it
+from timesheet import file_functions  # writing manifest atomically
+from timesheet import totals_functions  # stamping shard files
+
+# Note this module only uses the standard library (no pandas) so the command line
+# interface can add start and end times to partitioned timesheets without paying for the
+# pandas import
+
+# A partitioned timesheet is a directory of CSV timesheet files (shards), one per year
+# (e.g. 2025.csv) or month (e.g. 2026-03.csv), and a manifest (manifest.json) with the
+# number of records and first and last dates in each shard and the last record of the
+# timesheet (the open session, if any)
+
+# Name of manifest file in partitioned timesheet directory
+MANIFEST_FILE_NAME = "manifest.json"
+
+# Number of characters of date (YYYY-mm-dd) used as shard key for each partition period
+PARTITION_PERIODS = {"year": 4, "month": 7}
+
+# Period new shards are created for (old months are merged into years by compaction)
+DEFAULT_PARTITION_PERIOD = "month"
+
+# Shard file names (YYYY.csv or YYYY-mm.csv)
+SHARD_FILE_PATTERN = re.compile(r"^(\d{4}(?:-\d{2})?)\.csv$")
+
+
+def get_manifest_file_name(directory: Path) -> Path:
+    """Get path of manifest file in partitioned timesheet directory
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+
+    Returns:
+        Path: path to manifest file
+    """
+
+    return Path(directory) / MANIFEST_FILE_NAME
+
+
+def get_shard_file_name(directory: Path, key: str) -> Path:
+    """Get path of shard file in partitioned timesheet directory
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+        key (str): shard key (YYYY or YYYY-mm)
+
+    Returns:
+        Path: path to shard file
+    """
+
+    return Path(directory) / f"{key}.csv"
+
+
+def find_shard_files(directory: Path) -> dict:
+    """Find shard files in partitioned timesheet directory
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+
+    Returns:
+        dict: path to each shard file, keyed by shard key (in date order)
+    """
+
+    shard_files = {}
+    for file_name in Path(directory).iterdir():
+        match = SHARD_FILE_PATTERN.match(file_name.name)
+        if match:
+            shard_files[match.group(1)] = file_name
+
+    return dict(sorted(shard_files.items()))
+
+
+def find_shard_key(shard_keys: list[str], date_string: str, period: str) -> str:
+    """Find key of shard records on a date belong in
+
+    Records go in the existing shard covering their date (month or year), otherwise in a
+    new shard for the partition period.
+
+    Args:
+        shard_keys (list[str]): keys of existing shards
+        date_string (str): date (YYYY-mm-dd)
+        period (str): partition period for new shards (year or month)
+
+    Returns:
+        str: shard key (YYYY or YYYY-mm)
+    """
+
+    for length in sorted(PARTITION_PERIODS.values(), reverse=True):
+        if date_string[:length] in shard_keys:
+            return date_string[:length]
+
+    return date_string[: PARTITION_PERIODS[period]]
+
+
+def describe_shard(file_name: Path) -> dict:
+    """Count records in shard file and find its first and last dates
+
+    Args:
+        file_name (Path): path to shard file
+
+    Returns:
+        dict: number of records (rows), first and last dates (None if no records) and stamp
+            of shard file
+    """
+
+    # Read dates of records (skipping header and blank lines)
+    with open(file_name, newline="") as file:
+        dates = [row[0] for row in csv.reader(file) if len(row) > 0][1:]
+
+    return {
+        "rows": len(dates),
+        "first_date": min(dates) if len(dates) > 0 else None,
+        "last_date": max(dates) if len(dates) > 0 else None,
+        "stamp": totals_functions.get_file_stamp(file_name),
+    }
+
+
+def create_manifest(period: str = DEFAULT_PARTITION_PERIOD) -> dict:
+    """Create manifest for empty partitioned timesheet
+
+    Args:
+        period (str, optional): partition period for new shards (year or month).
+            Defaults to DEFAULT_PARTITION_PERIOD (month).
+
+    Raises:
+        Exception: if partition period isn't recognised
+
+    Returns:
+        dict: manifest (partition period, shards and last record)
+    """
+
+    if period not in PARTITION_PERIODS:
+        raise Exception(
+            f"Partition period provided ({period}) isn't one of: {', '.join(PARTITION_PERIODS)}"
+        )
+
+    return {"period": period, "shards": {}, "last_record": None}
+
+
+def write_manifest(directory: Path, manifest: dict):
+    """Write manifest to partitioned timesheet directory (replacing current manifest)
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+        manifest (dict): manifest (partition period, shards and last record)
+    """
+
+    file_functions.write_file_atomically(
+        get_manifest_file_name(directory),
+        lambda file_name: Path(file_name).write_text(json.dumps(manifest, indent=2)),
+    )
+
+
+def read_manifest(directory: Path) -> dict:
+    """Read manifest of partitioned timesheet, updating entries for shards changed since
+    it was written
+
+    Shards are compared with the manifest by their stamps (size and modification time), so
+    only new or changed shards are read. The manifest is rewritten if anything changed.
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+
+    Returns:
+        dict: manifest (partition period, shards and last record)
+    """
+
+    # Read manifest (or start new one)
+    manifest_file_name = get_manifest_file_name(directory)
+    if Path.exists(manifest_file_name):
+        manifest = json.loads(manifest_file_name.read_text())
+    else:
+        manifest = create_manifest()
+
+    # Describe new and changed shards
+    shards = {}
+    for key, shard_file_name in find_shard_files(directory).items():
+        shard = manifest["shards"].get(key)
+        if shard is None or shard["stamp"] != totals_functions.get_file_stamp(
+            shard_file_name
+        ):
+            shard = describe_shard(shard_file_name)
+        shards[key] = shard
+
+    # Check if manifest changed
+    if shards == manifest["shards"] and Path.exists(manifest_file_name):
+        return manifest
+
+    # Keep last record of timesheet (in last shard with records)
+    last_record = None
+    for key in reversed(shards):
+        if shards[key]["rows"] > 0:
+            last_record = punch_functions.read_last_record(
+                get_shard_file_name(directory, key)
+            )
+            break
+    manifest.update({"shards": shards, "last_record": last_record})
+    write_manifest(directory, manifest)
+
+    return manifest
+
+
+def get_stamp(directory: Path) -> str:
+    """Get stamp identifying current content of partitioned timesheet (stamps of shards)
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+
+    Returns:
+        str: stamp, None if directory doesn't exist
+    """
+
+    if not Path(directory).is_dir():
+        return None
+
+    return ";".join(
+        f"{key}:{totals_functions.get_file_stamp(shard_file_name)}"
+        for key, shard_file_name in find_shard_files(directory).items()
+    )
+
+
+def read_last_record(directory: Path) -> dict:
+    """Read last record of partitioned timesheet (from manifest)
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+
+    Returns:
+        dict: last record (values as written in file), None if timesheet is empty
+    """
+
+    return read_manifest(directory)["last_record"]
+
+
+def remove_shard(shard_file_name: Path):
+    """Remove shard file, its daily totals file and its (folded) journal
+
+    Args:
+        shard_file_name (Path): path to shard file
+    """
+
+    Path.unlink(shard_file_name, missing_ok=True)
+    Path.unlink(
+        totals_functions.get_daily_totals_file_name(shard_file_name), missing_ok=True
+    )
+    Path.unlink(
+        journal_functions.get_journal_file_names(shard_file_name)["journal"],
+        missing_ok=True,
+    )
+
+
+def create_timesheet(directory: Path, period: str = DEFAULT_PARTITION_PERIOD):
+    """Create empty partitioned timesheet (removing shards if directory already exists)
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+        period (str, optional): partition period for new shards (year or month).
+            Defaults to DEFAULT_PARTITION_PERIOD (month).
+    """
+
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    with journal_functions.commit_lock(directory):
+        for shard_file_name in find_shard_files(directory).values():
+            remove_shard(shard_file_name)
+        write_manifest(directory, create_manifest(period))
+    print(f"Created partitioned timesheet at: {directory}")
+
+
+def commit_operation(
+    directory: Path, operation: str, operation_time: datetime, file_stamp: str = None
+) -> str:
+    """Add start or end time to partitioned timesheet (only its current shard is changed)
+
+    Start times go in the shard for their date (created if needed, after checking the last
+    record of the previous shard is closed) and end times complete the last record. The
+    timesheet is locked while the shard is changed, then the manifest is updated.
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+        operation (str): operation (start or end)
+        operation_time (datetime): start or end time
+        file_stamp (str, optional): stamp of partitioned timesheet when it was last read by
+            the caller (see get_stamp()). Defaults to None.
+
+    Raises:
+        Exception: if operation failed checks (e.g. end time not after start time)
+
+    Returns:
+        str: new stamp of partitioned timesheet if only this operation was added to it
+            since it had file_stamp, otherwise None
+    """
+
+    with journal_functions.commit_lock(directory):
+        manifest = read_manifest(directory)
+        shard_keys = list(manifest["shards"])
+        unchanged = file_stamp != None and file_stamp == get_stamp(directory)
+
+        # Find shard for start time (creating new shard if timesheet moved into new period)
+        new_shard = False
+        if operation == "start":
+            key = find_shard_key(
+                shard_keys, operation_time.strftime("%Y-%m-%d"), manifest["period"]
+            )
+            if len(shard_keys) > 0 and key < shard_keys[-1]:
+                raise Exception(
+                    f"The start_time provided ({operation_time}) is before the latest shard ({shard_keys[-1]}) of the timesheet"
+                )
+            if key not in shard_keys:
+                _, end_time = punch_functions.get_current_times(manifest["last_record"])
+                punch_functions.check_start_time(operation_time, end_time)
+                punch_functions.write_empty_timesheet(
+                    get_shard_file_name(directory, key)
+                )
+                new_shard = True
+
+        # End time completes last record
+        else:
+            if len(shard_keys) == 0:
+                punch_functions.check_end_time(operation_time, None)
+            key = shard_keys[-1]
+
+        # Add operation to shard (start time already checked against previous shard, so
+        # warning about empty new shard isn't repeated)
+        shard_file_name = get_shard_file_name(directory, key)
+        with warnings.catch_warnings():
+            if new_shard:
+                warnings.simplefilter("ignore")
+            new_shard_stamp = punch_functions.commit_operation(
+                shard_file_name,
+                operation,
+                operation_time,
+                totals_functions.get_file_stamp(shard_file_name),
+            )
+
+        # Update manifest entry of shard without reading it (re-read if other operations
+        # waiting in its journal were added too)
+        if new_shard_stamp == None:
+            read_manifest(directory)
+        else:
+            if new_shard:
+                manifest["shards"][key] = describe_shard(shard_file_name)
+            else:
+                shard = manifest["shards"][key]
+                if operation == "start":
+                    date_string = operation_time.strftime("%Y-%m-%d")
+                    shard["rows"] += 1
+                    shard["first_date"] = min(
+                        shard["first_date"] or date_string, date_string
+                    )
+                    shard["last_date"] = max(
+                        shard["last_date"] or date_string, date_string
+                    )
+                shard["stamp"] = new_shard_stamp
+            manifest["last_record"] = punch_functions.read_last_record(shard_file_name)
+            write_manifest(directory, manifest)
+
+    return get_stamp(directory) if unchanged and new_shard_stamp != None else None
+
+
+def add_start_time(directory: Path, start_time_string: str = None):
+    """Add start time to partitioned timesheet without loading timesheet
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+        start_time_string (str, optional): time (format: hh:mm) to use for start time
+            Defaults to None (will use current time).
+    """
+
+    start_time = punch_functions.parse_time_string(start_time_string, datetime.now())
+    commit_operation(directory, "start", start_time)
+
+
+def add_end_time(directory: Path, end_time_string: str = None):
+    """Add end time to partitioned timesheet without loading timesheet
+
+    Args:
+        directory (Path): path to partitioned timesheet directory
+        end_time_string (str, optional): time (format: hh:mm) to use for end time
+            Defaults to None (will use current time).
+    """
+
+    end_time = punch_functions.parse_time_string(end_time_string, datetime.now())
+    commit_operation(directory, "end", end_time)
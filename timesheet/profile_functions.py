@@ -0,0 +1,198 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from datetime import datetime  # stamping profiled runs
+import json  # writing metrics lines
+import contextvars  # keeping profiled run separate per thread and task
+import os  # reading profiling environment variable
+import time  # timing phases
+
+# Note this module only uses the standard library (no pandas) so it can be used by the
+# command line interface when adding start and end times without pandas
+
+# Profiling records the wall time, rows processed and bytes read and written by each
+# phase of a run (e.g. reading and parsing a timesheet file). Phases are only recorded
+# between start_profile() and finish_profile(), otherwise phase() returns a shared object
+# that does nothing, so instrumented code costs next to nothing when profiling is off
+
+# The current run is kept in a context variable rather than a global, so concurrent
+# AsyncTimesheet calls each record into their own run (asyncio tasks and
+# asyncio.to_thread copy the context they were started from)
+
+# Environment variable turning on profiling (value is metrics file, or 1 for default)
+PROFILE_ENVIRONMENT_VARIABLE = "TIMESHEET_PROFILE"
+
+# Default file profiled runs are appended to (one JSON line per run)
+DEFAULT_METRICS_FILE = Path("outputs/timesheet_metrics.jsonl")
+
+# Current profiled run (None when profiling is off)
+_profile = contextvars.ContextVar("profile", default=None)
+
+
+class Phase:
+    """Times a phase of a profiled run (used in with statement) and counts the rows and
+    bytes it processed"""
+
+    def __init__(self, name: str):
+        """Create Phase object
+
+        Args:
+            name (str): name of phase (e.g. parse)
+        """
+        self.name = name
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        seconds = time.perf_counter() - self.start
+        profile = _profile.get()
+        if profile != None:
+            profile["phases"].append(
+                {
+                    "name": self.name,
+                    "seconds": round(seconds, 6),
+                    "rows": self.rows,
+                    "bytes_read": self.bytes_read,
+                    "bytes_written": self.bytes_written,
+                }
+            )
+
+    def count(self, rows: int = 0, bytes_read: int = 0, bytes_written: int = 0):
+        """Add to rows processed and bytes read and written by phase
+
+        Args:
+            rows (int, optional): rows processed. Defaults to 0.
+            bytes_read (int, optional): bytes read. Defaults to 0.
+            bytes_written (int, optional): bytes written. Defaults to 0.
+        """
+        self.rows += rows
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+
+
+class DisabledPhase:
+    """Stands in for Phase when profiling is off (does nothing)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        pass
+
+    def count(self, rows: int = 0, bytes_read: int = 0, bytes_written: int = 0):
+        pass
+
+
+# Shared phase returned when profiling is off
+DISABLED_PHASE = DisabledPhase()
+
+
+def is_profiling() -> bool:
+    """Check if a run is being profiled
+
+    Returns:
+        bool: True if profiling is on
+    """
+
+    return _profile.get() != None
+
+
+def phase(name: str):
+    """Get phase of profiled run to time in with statement, for example:
+
+        with profile_functions.phase("parse") as parse_phase:
+            timesheet = parse_timesheet_csv(content)
+            parse_phase.count(rows=timesheet.shape[0])
+
+    Phases may be nested (e.g. parse within read), each is recorded separately when it
+    finishes.
+
+    Args:
+        name (str): name of phase
+
+    Returns:
+        Phase: phase (DISABLED_PHASE if profiling is off)
+    """
+
+    if _profile.get() is None:
+        return DISABLED_PHASE
+
+    return Phase(name)
+
+
+def start_profile(command: list[str] = None):
+    """Start profiling run (phases recorded until finish_profile() called)
+
+    Args:
+        command (list[str], optional): command line arguments of run. Defaults to None.
+    """
+
+    _profile.set(
+        {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "command": command,
+            "start": time.perf_counter(),
+            "phases": [],
+        }
+    )
+
+
+def finish_profile(metrics_file: Path = DEFAULT_METRICS_FILE) -> dict:
+    """Stop profiling run and append its metrics to metrics file as one JSON line
+
+    Args:
+        metrics_file (Path, optional): path to metrics file (JSON lines).
+            Defaults to DEFAULT_METRICS_FILE.
+
+    Returns:
+        dict: metrics of run (time, command, total seconds and phases), None if profiling
+            wasn't on
+    """
+
+    profile = _profile.get()
+    _profile.set(None)
+    if profile is None:
+        return None
+
+    # Time whole run
+    seconds = time.perf_counter() - profile.pop("start")
+    metrics = {
+        "time": profile["time"],
+        "command": profile["command"],
+        "seconds": round(seconds, 6),
+        "phases": profile["phases"],
+    }
+
+    # Append metrics to file
+    Path(metrics_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(metrics_file, "a") as file:
+        file.write(json.dumps(metrics) + "\n")
+
+    return metrics
+
+
+def get_metrics_file(metrics_file: str = None) -> Path:
+    """Get metrics file for run if profiling is turned on (by argument or environment
+    variable)
+
+    Args:
+        metrics_file (str, optional): metrics file given on command line (--profile).
+            Defaults to None (TIMESHEET_PROFILE environment variable used).
+
+    Returns:
+        Path: path to metrics file, None if profiling is off
+    """
+
+    if metrics_file is None:
+        metrics_file = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE, "")
+        if metrics_file in ["", "0"]:
+            return None
+        if metrics_file == "1":
+            return DEFAULT_METRICS_FILE
+
+    return Path(metrics_file)
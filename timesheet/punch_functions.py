@@ -0,0 +1,428 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from datetime import datetime  # working with dates and times
+import re  # string matching
+import warnings  # writing warnings
+
+# Local imports
+from timesheet import file_functions  # appending and patching lines in files
+from timesheet import totals_functions  # updating daily totals
+from timesheet import journal_functions  # locking and journalling changes to timesheet
+from timesheet import profile_functions  # timing commits
+
+# Note this module only uses the standard library (no pandas) so the command line
+# interface can add start and end times without paying for the pandas import
+
+# Columns in timesheet file
+TIMESHEET_COLUMNS = ["date", "start_time", "end_time", "time_worked", "notes"]
+
+
+def parse_time_string(time_string: str, current_datetime: datetime) -> datetime:
+    """Convert time string (hh:mm) into datetime on current date
+
+    Args:
+        time_string (str): time (format: hh:mm). If None current time is used.
+        current_datetime (datetime): current date and time
+
+    Raises:
+        Exception: if time string doesn't match hh:mm format
+
+    Returns:
+        datetime: time on current date
+    """
+
+    # Use current time if no time provided
+    if time_string == None:
+        return current_datetime
+
+    # Check string format
+    pattern = r"[0-9][0-9]:[0-9][0-9]"
+    if not re.match(pattern, time_string):
+        raise Exception(
+            f"String provided ({time_string}) doesn't match pattern ({pattern})!"
+        )
+
+    # Convert to time
+    hours, minutes = map(int, time_string.split(":"))
+
+    return current_datetime.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+
+
+def get_current_times(last_record: dict) -> tuple[datetime, datetime]:
+    """Get current start and end times from last record of timesheet
+
+    Args:
+        last_record (dict): last record in timesheet (values as written in file), None
+            if timesheet is empty
+
+    Returns:
+        tuple[datetime, datetime]: current start and end times (None if not present)
+    """
+
+    # Check if any timesheet data present
+    if last_record is None:
+        return None, None
+
+    # Combine date and times of last record
+    record_date = datetime.strptime(last_record["date"], "%Y-%m-%d")
+    current_times = []
+    for column in ["start_time", "end_time"]:
+        current_time = None
+        if last_record[column] != "":
+            current_time = parse_time_string(last_record[column], record_date)
+        current_times.append(current_time)
+
+    return tuple(current_times)
+
+
+def check_start_time(start_time: datetime, end_time: datetime):
+    """Check new start time can be added after current end time
+
+    Args:
+        start_time (datetime): new start time
+        end_time (datetime): current end time (None if not present)
+
+    Raises:
+        Exception: if start time isn't after current end time
+    """
+
+    # Check if a current end_time exists
+    if end_time == None:
+        warnings.warn(
+            f"Adding new start time when current end_time is None. (Please review and edit timesheet file)"
+        )
+
+    # Check current start is after end_time
+    elif end_time >= start_time:
+        raise Exception(
+            f"The start_time provided ({start_time}) is not after the current end_time ({end_time})"
+        )
+
+
+def check_end_time(
+    end_time: datetime, start_time: datetime, current_end_time: datetime = None
+):
+    """Check new end time can be added after current start time
+
+    Args:
+        end_time (datetime): new end time
+        start_time (datetime): current start time (None if not present)
+        current_end_time (datetime, optional): current end time. Defaults to None (not
+            present).
+
+    Raises:
+        Exception: if there is no current start time, the current session already ended
+            or end time isn't after start time
+    """
+
+    # Check if a current start_time exists
+    if start_time == None:
+        raise Exception(
+            f"Trying to add end time when start time is None (doesn't exist). (Please review and edit timesheet file)"
+        )
+
+    # Check current session hasn't already ended
+    elif current_end_time != None:
+        raise Exception(
+            f"The current session already ended at {current_end_time}. (Please add a start time first)"
+        )
+
+    # Check current end is after start_time
+    elif start_time >= end_time:
+        raise Exception(
+            f"The end_time provided ({end_time}) is not after the current start_time ({start_time})"
+        )
+
+
+def create_start_record(start_time: datetime) -> dict:
+    """Create new timesheet record for a start time
+
+    Args:
+        start_time (datetime): start time
+
+    Returns:
+        dict: record with values formatted as written in file
+    """
+
+    return {
+        "date": start_time.strftime("%Y-%m-%d"),
+        "start_time": start_time.strftime("%H:%M"),
+        "end_time": "",
+        "time_worked": "00:00",
+        "notes": "",
+    }
+
+
+def format_time_worked(record: dict) -> str:
+    """Format time worked in timesheet record from its start and end times
+
+    Args:
+        record (dict): record (values as written in file)
+
+    Returns:
+        str: time worked (format: hh:mm), 00:00 if session is open or invalid
+    """
+
+    minutes = totals_functions.calculate_record_seconds(record) // 60
+
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def add_end_time_to_record(record: dict, end_time: datetime):
+    """Add end time to timesheet record, filling in time worked since its start time
+
+    Args:
+        record (dict): record (values as written in file), changed in place
+        end_time (datetime): end time
+    """
+
+    record["end_time"] = end_time.strftime("%H:%M")
+    record["time_worked"] = format_time_worked(record)
+
+
+def read_last_record(file_name: Path) -> dict:
+    """Read last record of timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        dict: last record (values as written in file), None if timesheet is empty
+    """
+
+    header, last_line = file_functions.read_header_and_last_line(file_name)
+
+    return None if last_line is None else dict(zip(header, last_line))
+
+
+def write_empty_timesheet(file_name: Path):
+    """Write empty timesheet file (header only), replacing any current file
+
+    Args:
+        file_name (Path): path to timesheet file
+    """
+
+    file_functions.write_file_atomically(
+        file_name,
+        lambda temporary_file_name: Path(temporary_file_name).write_text(
+            file_functions.format_csv_line(TIMESHEET_COLUMNS)
+        ),
+    )
+    print(f"Created timesheet file at: {file_name}")
+
+
+def create_timesheet(file_name: Path):
+    """Create empty timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+    """
+
+    with journal_functions.commit_lock(file_name):
+        write_empty_timesheet(file_name)
+
+
+def read_last_record_and_offset(file_name: Path) -> tuple[dict, int]:
+    """Read last record of timesheet file and the byte offset where it starts
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        tuple[dict, int]: last record (values as written in file, None if timesheet is
+            empty) and offset of its start (end of file if timesheet is empty)
+    """
+
+    # Find start of last line
+    offset = file_functions.find_last_line_offset(file_name)
+    last_record = read_last_record(file_name)
+
+    # Use end of file if only header present
+    if last_record is None:
+        offset = Path(file_name).stat().st_size
+
+    return last_record, offset
+
+
+def apply_operations(last_record: dict, operations: list[dict]) -> tuple:
+    """Apply journal operations (adding start and end times) to last record of timesheet
+
+    Each operation is checked against the records before it (see check_start_time() and
+    check_end_time()), operations that fail checks are rejected. End times are rejected if
+    the current session already has one, so an end time added from an out of date copy of
+    the timesheet can't replace it.
+
+    Args:
+        last_record (dict): last record in timesheet (values as written in file), None if
+            timesheet is empty
+        operations (list[dict]): operations (operation_id, operation and time) in order
+
+    Returns:
+        tuple[list[dict], list[tuple], dict]: records replacing the last record, changes
+            made ((record, previous record) pairs, previous record None for new records)
+            and error message for each rejected operation
+    """
+
+    records = [] if last_record is None else [dict(last_record)]
+    changes = []
+    rejected = {}
+    for operation in operations:
+        current_record = records[-1] if len(records) > 0 else None
+        start_time, end_time = get_current_times(current_record)
+        try:
+
+            # Add new record for start time
+            if operation["operation"] == "start":
+                check_start_time(operation["time"], end_time)
+                records.append(create_start_record(operation["time"]))
+                changes.append((dict(records[-1]), None))
+
+            # Add end time to current record (if session not already ended)
+            else:
+                check_end_time(operation["time"], start_time, end_time)
+                previous_record = dict(current_record)
+                add_end_time_to_record(current_record, operation["time"])
+                changes.append((dict(current_record), previous_record))
+
+        except Exception as error:
+            rejected[operation["operation_id"]] = str(error)
+
+    return records, changes, rejected
+
+
+def fold_journal(file_name: Path):
+    """Add all operations waiting in journal to timesheet file (group commit)
+
+    The new end of the timesheet is written as a redo record before the timesheet is
+    changed and synced to disk once for all operations. Should only be called while holding
+    the commit lock (see journal_functions.commit_lock()).
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        list[str]: ids of operations added (or rejected)
+    """
+
+    # Read waiting operations
+    operations = journal_functions.read_operations(file_name)
+    if len(operations) == 0:
+        return []
+
+    # Check timesheet exists
+    if Path.exists(file_name) == False:
+        write_empty_timesheet(file_name)
+
+    # Check daily totals match timesheet before changing it
+    daily_totals_current = totals_functions.is_daily_totals_current(file_name)
+
+    # Apply operations to last record
+    last_record, offset = read_last_record_and_offset(file_name)
+    records, changes, rejected = apply_operations(last_record, operations)
+
+    # Format new end of timesheet (after a newline if file doesn't end with one)
+    tail = "".join(
+        file_functions.format_csv_line(record.values()) for record in records
+    )
+    if last_record is None and offset > 0:
+        with open(file_name, "rb") as file:
+            file.seek(offset - 1)
+            if file.read(1) != b"\n":
+                tail = "\n" + tail
+
+    # Write redo record then change timesheet
+    with profile_functions.phase("write_file") as write_phase:
+        journal_functions.write_redo(
+            file_name,
+            offset=offset,
+            tail=tail,
+            operation_ids=[operation["operation_id"] for operation in operations],
+            rejected=rejected,
+        )
+        journal_functions.apply_redo(file_name)
+        write_phase.count(rows=len(records), bytes_written=len(tail.encode()))
+
+    # Update daily totals (only their stamp if every operation was rejected)
+    if daily_totals_current:
+        for record, previous_record in changes:
+            totals_functions.update_daily_totals(file_name, record, previous_record)
+        if len(changes) == 0:
+            totals_functions.write_daily_totals_stamp(file_name)
+
+    return [operation["operation_id"] for operation in operations]
+
+
+def commit_operation(
+    file_name: Path, operation: str, operation_time: datetime, file_stamp: str = None
+) -> str:
+    """Add start or end time to timesheet file via its journal
+
+    The operation is added to the journal, then once the commit lock is free every waiting
+    operation (including those from other processes) is added to the timesheet together.
+    Safe to call from many processes at once.
+
+    Args:
+        file_name (Path): path to timesheet file
+        operation (str): operation (start or end)
+        operation_time (datetime): start or end time
+        file_stamp (str, optional): stamp of timesheet file when it was last read by the
+            caller (see totals_functions.get_file_stamp()). Defaults to None.
+
+    Raises:
+        Exception: if operation failed checks (e.g. end time not after start time)
+
+    Returns:
+        str: new stamp of timesheet file if only this operation was added to it since it
+            had file_stamp (so a copy read then only needs this change), otherwise None
+    """
+
+    # Add operation to journal
+    with profile_functions.phase("journal"):
+        operation_id = journal_functions.append_operation(
+            file_name, operation, operation_time
+        )
+
+    # Add waiting operations to timesheet
+    new_file_stamp = None
+    with profile_functions.phase("commit") as commit_phase:
+        with journal_functions.commit_lock(file_name):
+            unchanged = Path.exists(file_name) and (
+                totals_functions.get_file_stamp(file_name) == file_stamp
+            )
+            operation_ids = fold_journal(file_name)
+            rejection = journal_functions.pop_rejection(file_name, operation_id)
+            if unchanged and operation_ids == [operation_id]:
+                new_file_stamp = totals_functions.get_file_stamp(file_name)
+        commit_phase.count(rows=len(operation_ids))
+
+    # Check if operation rejected
+    if rejection != None:
+        raise Exception(rejection)
+
+    return new_file_stamp
+
+
+def add_start_time(file_name: Path, start_time_string: str = None):
+    """Add start time to timesheet file without loading timesheet
+
+    Args:
+        file_name (Path): path to timesheet file
+        start_time_string (str, optional): time (format: hh:mm) to use for start time
+            Defaults to None (will use current time).
+    """
+
+    start_time = parse_time_string(start_time_string, datetime.now())
+    commit_operation(file_name, "start", start_time)
+
+
+def add_end_time(file_name: Path, end_time_string: str = None):
+    """Add end time to timesheet file without loading timesheet
+
+    Args:
+        file_name (Path): path to timesheet file
+        end_time_string (str, optional): time (format: hh:mm) to use for end time
+            Defaults to None (will use current time).
+    """
+
+    end_time = parse_time_string(end_time_string, datetime.now())
+    commit_operation(file_name, "end", end_time)
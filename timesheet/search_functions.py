@@ -0,0 +1,527 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import json  # storing index details
+import os  # replacing index files
+import re  # splitting notes into tokens
+import zipfile  # catching unreadable indexes
+import numpy as np  # storing row ids of tokens
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import parse_functions  # parsing timesheet files
+from timesheet import totals_functions  # stamping timesheet files
+from timesheet import cache_functions  # hashing blocks of timesheet files
+from timesheet import profile_functions  # timing index reads and updates
+
+# Notes are searched through an inverted index kept next to the timesheet file (e.g.
+# outputs/timesheet_notes_index.npz), mapping each token (lowercase word) of the notes to
+# the rows of the records containing it, along with the byte offset of each record in the
+# file, so matching records are read without reading or parsing the rest of the file. The
+# index records which version of the timesheet file it matches. If the file only changed
+# from its last record onwards (e.g. start and end times added) only the new records are
+# indexed, otherwise the index is rebuilt
+
+# Words (letters, digits and underscores) notes are split into
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def get_notes_index_file_name(file_name: Path) -> Path:
+    """Get path of notes index file kept next to timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        Path: path to notes index file (e.g. outputs/timesheet_notes_index.npz)
+    """
+
+    file_name = Path(file_name)
+
+    return file_name.with_name(f"{file_name.stem}_notes_index.npz")
+
+
+def tokenise(text: str) -> list[str]:
+    """Split text into tokens (distinct lowercase words, in order of first appearance)
+
+    Args:
+        text (str): text (e.g. a note or search query)
+
+    Returns:
+        list[str]: tokens
+    """
+
+    return list(dict.fromkeys(TOKEN_PATTERN.findall(str(text).lower())))
+
+
+def index_notes(notes: pd.Series, first_row: int = 0) -> dict:
+    """Find rows containing each token of notes
+
+    Each distinct note is only split into tokens once (notes are categorical), and rows
+    are grouped by note with one sort, so cost grows with the number of distinct notes
+    rather than the number of rows.
+
+    Args:
+        notes (pd.Series): notes of each record (categorical)
+        first_row (int, optional): row of first note in timesheet. Defaults to 0.
+
+    Returns:
+        dict: sorted rows (np.ndarray) keyed by token
+    """
+
+    # Group rows by note
+    notes = notes.astype("category")
+    codes = notes.cat.codes.to_numpy()
+    rows = np.argsort(codes, kind="stable") + first_row
+    counts = np.bincount(codes[codes >= 0], minlength=len(notes.cat.categories))
+    ends = np.cumsum(counts) + (codes < 0).sum()  # missing notes (code -1) sorted first
+    starts = ends - counts
+
+    # Add rows of each note to its tokens
+    token_rows = {}
+    for note, start, end in zip(notes.cat.categories, starts, ends):
+        if end > start:
+            for token in tokenise(note):
+                token_rows.setdefault(token, []).append(rows[start:end])
+
+    return {
+        token: np.sort(np.concatenate(note_rows))
+        for token, note_rows in token_rows.items()
+    }
+
+
+def find_record_offsets(content: bytes, fixed_width: bool = False) -> np.ndarray:
+    """Find byte offset of start of each record in timesheet file content
+
+    Records of CSV content start after each newline that isn't inside a quoted value (i.e.
+    after an even number of quotes), skipping blank lines as the parser does. Records of
+    fixed width content start at multiples of the line width.
+
+    Args:
+        content (bytes): timesheet file content (including header)
+        fixed_width (bool, optional): content is a fixed width timesheet. Defaults to False.
+
+    Returns:
+        np.ndarray: int64 offset of each record
+    """
+
+    # Find first record after header
+    header_end = content.find(b"\n")
+    if header_end == -1:
+        return np.zeros(0, dtype=np.int64)
+
+    # Records of fixed width content follow one another
+    if fixed_width:
+        n_records = len(content) // (header_end + 1) - 1
+        return (np.arange(n_records, dtype=np.int64) + 1) * (header_end + 1)
+
+    # Find newlines outside quoted values
+    buffer = np.frombuffer(content, dtype=np.uint8)
+    newlines = np.flatnonzero(buffer == parse_functions.NEWLINE)
+    if content.find(parse_functions.QUOTE) != -1:
+        quotes = np.cumsum(buffer == parse_functions.QUOTE)
+        newlines = newlines[quotes[newlines] % 2 == 0]
+
+    # Records start after newlines (skipping blank lines and end of content)
+    starts = newlines + 1
+    starts = starts[starts < len(content)]
+    blank = np.isin(
+        buffer[starts], [parse_functions.NEWLINE, parse_functions.CARRIAGE_RETURN]
+    )
+
+    return starts[~blank].astype(np.int64)
+
+
+def parse_content(content: bytes, fixed_width: bool = False) -> pd.DataFrame:
+    """Parse timesheet file content (CSV or fixed width)
+
+    Args:
+        content (bytes): timesheet file content (including header)
+        fixed_width (bool, optional): content is a fixed width timesheet. Defaults to False.
+
+    Returns:
+        pd.DataFrame: timesheet with datetime and timedelta columns
+    """
+
+    if fixed_width:
+        return parse_functions.parse_fixed_width_timesheet(content)
+
+    return parse_functions.parse_timesheet_csv(content)
+
+
+def describe_file(file_name: Path, offsets: np.ndarray) -> dict:
+    """Describe timesheet file for checking its notes index is still valid
+
+    Args:
+        file_name (Path): path to timesheet file
+        offsets (np.ndarray): offset of each record in file
+
+    Returns:
+        dict: stamp of file (see totals_functions.get_file_stamp()), number of records and
+            offset of and hash of block ending at last record
+    """
+
+    with open(file_name, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        prefix_size = int(offsets[-1]) if offsets.shape[0] > 0 else size
+
+        return {
+            "stamp": totals_functions.get_file_stamp(file_name),
+            "records": int(offsets.shape[0]),
+            "prefix_size": prefix_size,
+            "prefix_hash": cache_functions.hash_block(file, prefix_size),
+        }
+
+
+def write_notes_index(file_name: Path, token_rows: dict, offsets: np.ndarray) -> dict:
+    """Write notes index of timesheet file (replacing current index)
+
+    Rows of all tokens are stored one after another with the position each token's rows
+    start at, and tokens are sorted so they can be found with a binary search.
+
+    Args:
+        file_name (Path): path to timesheet file
+        token_rows (dict): sorted rows (np.ndarray) keyed by token (see index_notes())
+        offsets (np.ndarray): offset of each record in file
+
+    Returns:
+        dict: notes index written (see read_notes_index())
+    """
+
+    # Store rows of tokens in token order
+    tokens = sorted(token_rows)
+    lengths = [token_rows[token].shape[0] for token in tokens]
+    arrays = {
+        "tokens": np.array(tokens, dtype=str),
+        "pointers": np.cumsum([0] + lengths, dtype=np.int64),
+        "rows": np.concatenate(
+            [np.zeros(0, dtype=np.int64)] + [token_rows[token] for token in tokens]
+        ).astype(np.int64),
+        "offsets": offsets.astype(np.int64),
+    }
+    description = describe_file(file_name, offsets)
+
+    # Write index via temporary file so readers never see a partial index
+    index_file_name = get_notes_index_file_name(file_name)
+    temporary_file_name = index_file_name.with_name(
+        f".{index_file_name.name}.{os.getpid()}.tmp"
+    )
+    with open(temporary_file_name, "wb") as file:
+        np.savez(file, **arrays, description=np.array(json.dumps(description)))
+    os.replace(temporary_file_name, index_file_name)
+
+    return {**arrays, "description": description}
+
+
+def read_notes_index(file_name: Path) -> dict:
+    """Read notes index of timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        dict: sorted tokens, position of each token's rows, rows, offset of each record and
+            description of file (see describe_file()), None if index is missing or
+            unreadable
+    """
+
+    try:
+        with np.load(get_notes_index_file_name(file_name)) as index:
+            notes_index = {
+                key: index[key] for key in ["tokens", "pointers", "rows", "offsets"]
+            }
+            notes_index["description"] = json.loads(str(index["description"]))
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+    return notes_index
+
+
+def get_token_rows(notes_index: dict) -> dict:
+    """Get rows of each token of notes index
+
+    Args:
+        notes_index (dict): notes index (see read_notes_index())
+
+    Returns:
+        dict: sorted rows (np.ndarray) keyed by token
+    """
+
+    pointers = notes_index["pointers"]
+
+    return {
+        str(token): notes_index["rows"][start:end]
+        for token, start, end in zip(notes_index["tokens"], pointers[:-1], pointers[1:])
+    }
+
+
+def is_notes_index_current(file_name: Path) -> bool:
+    """Check if notes index exists and matches current content of timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        bool: True if notes index is up to date
+    """
+
+    # Check files exist
+    index_file_name = get_notes_index_file_name(file_name)
+    if not (Path.exists(file_name) and Path.exists(index_file_name)):
+        return False
+
+    # Compare stamp in notes index with timesheet file (without reading rows of tokens)
+    try:
+        with np.load(index_file_name) as index:
+            description = json.loads(str(index["description"]))
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return False
+
+    return description["stamp"] == totals_functions.get_file_stamp(file_name)
+
+
+def update_notes_index(file_name: Path, fixed_width: bool = False) -> dict:
+    """Update notes index to match timesheet file (indexing new records only if the file
+    only changed from its last indexed record onwards, otherwise rebuilding it)
+
+    Args:
+        file_name (Path): path to timesheet file
+        fixed_width (bool, optional): file is a fixed width timesheet. Defaults to False.
+
+    Raises:
+        parse_functions.TimesheetFormatError: if any records are malformed
+
+    Returns:
+        dict: notes index (see read_notes_index())
+    """
+
+    # Check if index matches file
+    notes_index = read_notes_index(file_name)
+    stamp = totals_functions.get_file_stamp(file_name)
+    if notes_index != None and notes_index["description"]["stamp"] == stamp:
+        return notes_index
+
+    with open(file_name, "rb") as file, profile_functions.phase("index_notes") as phase:
+        header = file.readline()
+        size = os.fstat(file.fileno()).st_size
+
+        # Index records from last indexed record if file before it is unchanged
+        description = None if notes_index is None else notes_index["description"]
+        if (
+            description != None
+            and description["records"] > 0
+            and size >= description["prefix_size"]
+            and description["prefix_hash"]
+            == cache_functions.hash_block(file, description["prefix_size"])
+        ):
+            first_row = description["records"] - 1
+            token_rows = {
+                token: rows[rows < first_row]
+                for token, rows in get_token_rows(notes_index).items()
+            }
+            file.seek(description["prefix_size"])
+            content = header + file.read()
+            new_offsets = find_record_offsets(content, fixed_width)
+            offsets = np.concatenate(
+                [
+                    notes_index["offsets"][:first_row],
+                    new_offsets - len(header) + description["prefix_size"],
+                ]
+            )
+
+        # Otherwise index whole file
+        else:
+            first_row = 0
+            token_rows = {}
+            file.seek(0)
+            content = file.read()
+            offsets = find_record_offsets(content, fixed_width)
+        phase.count(bytes_read=len(content))
+
+        # Add tokens of new records
+        new_records = parse_content(content, fixed_width)
+        for token, rows in index_notes(new_records.notes, first_row).items():
+            if token in token_rows:
+                rows = np.concatenate([token_rows[token], rows])
+            token_rows[token] = rows
+        token_rows = {
+            token: rows for token, rows in token_rows.items() if rows.size > 0
+        }
+        phase.count(rows=new_records.shape[0])
+
+    return write_notes_index(file_name, token_rows, offsets)
+
+
+def update_note(
+    file_name: Path,
+    row: int,
+    old_note: str,
+    new_note: str,
+    fixed_width: bool = False,
+    length_change: int = 0,
+):
+    """Update notes index after one record of timesheet file was changed (e.g. its note was
+    edited)
+
+    Only the rows of the tokens of the old and new notes are changed, and the offsets of the
+    records after the changed record are moved by the change in its length (records of
+    fixed width files keep their length), so the file isn't read again. Should only be
+    called if the notes index was current before the timesheet file was changed (see
+    is_notes_index_current()). If the index was removed since, it is rebuilt.
+
+    Args:
+        file_name (Path): path to timesheet file
+        row (int): row of changed record
+        old_note (str): note of record before it was changed
+        new_note (str): note of record after it was changed
+        fixed_width (bool, optional): file is a fixed width timesheet. Defaults to False.
+        length_change (int, optional): change in length (bytes) of changed record.
+            Defaults to 0.
+    """
+
+    # Rebuild index if it was removed
+    notes_index = read_notes_index(file_name)
+    if notes_index is None:
+        update_notes_index(file_name, fixed_width)
+        return
+
+    # Move row from tokens of old note to tokens of new note
+    token_rows = get_token_rows(notes_index)
+    old_tokens, new_tokens = set(tokenise(old_note)), set(tokenise(new_note))
+    for token in old_tokens - new_tokens:
+        token_rows[token] = token_rows[token][token_rows[token] != row]
+    for token in new_tokens - old_tokens:
+        rows = token_rows.get(token, np.zeros(0, dtype=np.int64))
+        token_rows[token] = np.insert(rows, np.searchsorted(rows, row), row)
+    token_rows = {token: rows for token, rows in token_rows.items() if rows.size > 0}
+
+    # Move offsets of records after changed record
+    offsets = notes_index["offsets"].copy()
+    offsets[row + 1 :] += length_change
+
+    write_notes_index(file_name, token_rows, offsets)
+
+
+def find_rows(
+    notes_index: dict, query: str, start_row: int = 0, end_row: int = None
+) -> np.ndarray:
+    """Find rows of records whose notes contain every token of query
+
+    Tokens are found with a binary search of the sorted tokens and the rows of each are
+    limited to the rows searched (binary searched, as rows are sorted). Rows in every token
+    are then found by binary searching the rows of each token for the rows of the token
+    with fewest rows, so common words don't make searches slow.
+
+    Args:
+        notes_index (dict): notes index (see read_notes_index())
+        query (str): words to search for (case is ignored)
+        start_row (int, optional): first row to search. Defaults to 0.
+        end_row (int, optional): row to stop searching at (not included). Defaults to None
+            (search to last row).
+
+    Raises:
+        Exception: if query has no words
+
+    Returns:
+        np.ndarray: sorted rows of matching records
+    """
+
+    # Split query into tokens
+    query_tokens = tokenise(query)
+    if len(query_tokens) == 0:
+        raise Exception(f"Query provided ({query}) doesn't contain any words")
+    if end_row is None:
+        end_row = notes_index["offsets"].shape[0]
+
+    # Find rows of each token between start and end rows
+    tokens, pointers = notes_index["tokens"], notes_index["pointers"]
+    token_rows = []
+    for token in query_tokens:
+        position = np.searchsorted(tokens, token)
+        if position == tokens.shape[0] or tokens[position] != token:
+            return np.zeros(0, dtype=np.int64)
+        rows = notes_index["rows"][pointers[position] : pointers[position + 1]]
+        token_rows.append(
+            rows[np.searchsorted(rows, start_row) : np.searchsorted(rows, end_row)]
+        )
+
+    # Keep rows of token with fewest rows that are in rows of every other token (other
+    # tokens only have no rows if the first has none)
+    token_rows.sort(key=len)
+    rows = token_rows[0]
+    for other_rows in token_rows[1:]:
+        positions = np.minimum(
+            np.searchsorted(other_rows, rows), other_rows.shape[0] - 1
+        )
+        rows = rows[other_rows[positions] == rows]
+
+    return rows
+
+
+def read_records(
+    file_name: Path, notes_index: dict, rows: np.ndarray, fixed_width: bool = False
+) -> pd.DataFrame:
+    """Read records of timesheet file at rows (found from their offsets in notes index)
+
+    Runs of consecutive rows are read in one go, and only the records read are parsed.
+
+    Args:
+        file_name (Path): path to timesheet file
+        notes_index (dict): notes index matching file (see update_notes_index())
+        rows (np.ndarray): sorted rows of records to read
+        fixed_width (bool, optional): file is a fixed width timesheet. Defaults to False.
+
+    Returns:
+        pd.DataFrame: records with datetime and timedelta columns
+    """
+
+    # Find first and last row of each run of consecutive rows
+    offsets = notes_index["offsets"]
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    run_starts = rows[np.concatenate([[0], breaks + 1])] if rows.size > 0 else rows
+    run_ends = rows[np.append(breaks, rows.size - 1)] + 1 if rows.size > 0 else rows
+
+    # Read header and runs of records
+    with open(file_name, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        content = [file.readline()]
+        for start, end in zip(run_starts, run_ends):
+            file.seek(offsets[start])
+            end_offset = offsets[end] if end < offsets.shape[0] else size
+            record = file.read(end_offset - offsets[start])
+            content.append(record if record.endswith(b"\n") else record + b"\n")
+
+    return parse_content(b"".join(content), fixed_width)
+
+
+def search_timesheet(timesheet: pd.DataFrame, query: str) -> pd.DataFrame:
+    """Find records of timesheet whose notes contain every token of query (for timesheets
+    without a notes index, e.g. Parquet)
+
+    Each distinct note is only split into tokens once (notes are categorical).
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with categorical notes column
+        query (str): words to search for (case is ignored)
+
+    Raises:
+        Exception: if query has no words
+
+    Returns:
+        pd.DataFrame: matching records
+    """
+
+    # Split query into tokens
+    query_tokens = set(tokenise(query))
+    if len(query_tokens) == 0:
+        raise Exception(f"Query provided ({query}) doesn't contain any words")
+
+    # Find notes containing every token and keep their records
+    notes = timesheet.notes.astype("category")
+    matching_notes = np.array(
+        [query_tokens.issubset(tokenise(note)) for note in notes.cat.categories]
+        + [False],  # missing notes (code -1)
+        dtype=bool,
+    )
+    matches = matching_notes[notes.cat.codes.to_numpy()]
+
+    return timesheet[matches].reset_index(drop=True)
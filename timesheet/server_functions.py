@@ -0,0 +1,275 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import argparse  # rebuilding parsed command line arguments
+import contextlib  # capturing printed output
+import io  # capturing printed output
+import json  # encoding requests and responses
+import os  # finding default socket location
+import signal  # stopping daemon when terminated
+import socket  # connecting to daemon
+import socketserver  # running daemon
+import stat  # checking socket and directory permissions
+import warnings  # capturing and re-raising warnings
+
+# Note this module only uses the standard library (no pandas) so the command line
+# interface can forward arguments to a running daemon without paying for the pandas import
+
+# Timeout (seconds) waiting for daemon to respond
+RESPONSE_TIMEOUT = 60
+
+
+def get_default_socket_path() -> Path:
+    """Get default path of the daemon's Unix domain socket
+
+    Uses the TIMESHEET_SOCKET environment variable if set, otherwise a socket in the current
+    user's runtime directory (e.g. /run/user/1000/timesheet.sock) or, if XDG_RUNTIME_DIR
+    isn't set, in a directory for the current user in the temporary directory (e.g.
+    /tmp/timesheet-1000/timesheet.sock, created only accessible by the user when the daemon
+    starts).
+
+    Returns:
+        Path: path to socket
+    """
+
+    if "TIMESHEET_SOCKET" in os.environ:
+        return Path(os.environ["TIMESHEET_SOCKET"])
+    if os.environ.get("XDG_RUNTIME_DIR", "") != "":
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "timesheet.sock"
+
+    user_id = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+
+    return (
+        Path(os.environ.get("TMPDIR", "/tmp"))
+        / f"timesheet-{user_id}"
+        / "timesheet.sock"
+    )
+
+
+def is_daemon_supported() -> bool:
+    """Check if Unix domain sockets are available (not on most Windows builds)
+
+    Returns:
+        bool: True if daemon can be run
+    """
+
+    return hasattr(socket, "AF_UNIX")
+
+
+def is_socket_owned(socket_path: Path) -> bool:
+    """Check socket belongs to the current user
+
+    Another user could create a socket at a path the daemon would use, to receive the
+    arguments (file paths and notes) forwarded to it.
+
+    Args:
+        socket_path (Path): path to daemon's socket
+
+    Returns:
+        bool: True if path is a socket (not a link) owned by the current user
+    """
+
+    socket_stat = os.lstat(socket_path)
+
+    return stat.S_ISSOCK(socket_stat.st_mode) and socket_stat.st_uid == os.getuid()
+
+
+def create_socket_directory(socket_path: Path):
+    """Create directory for daemon's socket (only accessible by the current user) if it
+    doesn't exist, and check other users can't replace the socket in it
+
+    Args:
+        socket_path (Path): path to socket
+
+    Raises:
+        Exception: if directory is owned by another user, or any user can write to it and
+            it isn't sticky (e.g. /tmp, where only the owner can remove files)
+    """
+
+    directory = Path(socket_path).parent
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    directory_stat = os.stat(directory)
+    if directory_stat.st_uid not in [os.getuid(), 0] or (
+        directory_stat.st_mode & stat.S_IWOTH
+        and not directory_stat.st_mode & stat.S_ISVTX
+    ):
+        raise Exception(
+            f"Socket directory ({directory}) can be changed by other users, use --socket "
+            "to choose another path"
+        )
+
+
+def send_request(arguments: dict, socket_path: Path) -> dict:
+    """Send parsed command line arguments to daemon and wait for its response
+
+    Args:
+        arguments (dict): parsed command line arguments (file paths absolute)
+        socket_path (Path): path to daemon's socket
+
+    Returns:
+        dict: response (output, warnings and error), None if no daemon is listening on socket
+            (or socket isn't owned by the current user)
+    """
+
+    # Check daemon could be running
+    if not is_daemon_supported() or not Path.exists(socket_path):
+        return None
+
+    # Check socket belongs to current user before sending arguments to it
+    if not is_socket_owned(socket_path):
+        warnings.warn(
+            f"Not forwarding to {socket_path} as it isn't a socket owned by the current "
+            "user, running here instead"
+        )
+        return None
+
+    # Connect to daemon (socket file left by a daemon that stopped refuses connections)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(str(socket_path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            return None
+
+        # Send arguments and read response
+        connection.settimeout(RESPONSE_TIMEOUT)
+        connection.sendall(json.dumps(arguments).encode() + b"\n")
+        connection.shutdown(socket.SHUT_WR)
+        with connection.makefile("rb") as response_file:
+            response = response_file.readline()
+
+    return json.loads(response)
+
+
+def forward_arguments(arguments: dict, socket_path: Path) -> bool:
+    """Run parsed command line arguments in daemon (if running), printing its output
+
+    Warnings and errors raised in the daemon are raised again here.
+
+    Args:
+        arguments (dict): parsed command line arguments (file paths absolute)
+        socket_path (Path): path to daemon's socket
+
+    Raises:
+        Exception: if daemon raised an error running arguments
+
+    Returns:
+        bool: True if daemon ran arguments, False if no daemon running
+    """
+
+    response = send_request(arguments, socket_path)
+    if response is None:
+        return False
+
+    # Report output, warnings and errors from daemon
+    print(response["output"], end="")
+    for message in response["warnings"]:
+        warnings.warn(message)
+    if response["error"] != None:
+        raise Exception(response["error"])
+
+    return True
+
+
+def run_request(request: bytes, timesheets: dict) -> dict:
+    """Run request (parsed command line arguments) in daemon, capturing output
+
+    Args:
+        request (bytes): JSON encoded parsed command line arguments
+        timesheets (dict): Timesheet objects kept in memory by daemon (keyed by file path
+            and format), see command_line_interface_functions.get_timesheet()
+
+    Returns:
+        dict: printed output, warning messages and error message (None if no error)
+    """
+
+    from timesheet import command_line_interface_functions
+
+    # Run arguments, capturing printed output and warnings
+    output = io.StringIO()
+    error = None
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        with contextlib.redirect_stdout(output):
+            try:
+                args = argparse.Namespace(**json.loads(request))
+                command_line_interface_functions.run_command_line_arguments(
+                    args, timesheets=timesheets
+                )
+            except Exception as exception:
+                error = str(exception)
+
+    return {
+        "output": output.getvalue(),
+        "warnings": [str(caught_warning.message) for caught_warning in caught_warnings],
+        "error": error,
+    }
+
+
+class TimesheetRequestHandler(socketserver.StreamRequestHandler):
+    """Handles a request from the command line interface (one JSON line per connection)"""
+
+    def handle(self):
+        request = self.rfile.readline()
+        response = run_request(request, self.server.timesheets)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def create_server(socket_path: Path) -> socketserver.UnixStreamServer:
+    """Create daemon server listening on Unix domain socket
+
+    Requests are handled one at a time, so the Timesheet objects kept in memory are never
+    used by two requests at once. Only the current user can connect to the socket.
+
+    Args:
+        socket_path (Path): path to socket
+
+    Raises:
+        Exception: if Unix domain sockets aren't available, a daemon is already running or
+            other users could replace the socket (see create_socket_directory())
+
+    Returns:
+        socketserver.UnixStreamServer: server (with empty timesheets dictionary)
+    """
+
+    # Check daemon can run
+    if not is_daemon_supported():
+        raise Exception("Daemon needs Unix domain sockets, which aren't available here")
+    create_socket_directory(socket_path)
+
+    # Check daemon not already running (removing socket left by a daemon that stopped)
+    if Path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            try:
+                connection.connect(str(socket_path))
+                raise Exception(f"Daemon already running on {socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                Path.unlink(socket_path, missing_ok=True)
+
+    # Create server
+    server = socketserver.UnixStreamServer(str(socket_path), TimesheetRequestHandler)
+    os.chmod(socket_path, 0o600)
+    server.timesheets = {}
+
+    return server
+
+
+def serve(socket_path: Path):
+    """Run daemon until interrupted, keeping timesheets in memory between requests
+
+    Stops on Ctrl+C or when terminated, removing the socket.
+
+    Args:
+        socket_path (Path): path to socket
+    """
+
+    # Stop on terminate signal as for Ctrl+C (so socket is removed)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with create_server(socket_path) as server:
+        print(f"Serving timesheet on {socket_path} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            Path.unlink(socket_path, missing_ok=True)
@@ -0,0 +1,371 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from datetime import date, time, timedelta  # working with dates and times
+import sys  # measuring memory use of notes
+import numpy as np  # storing sessions in compact arrays
+import pandas as pd  # converting to and from timesheet dataframes
+
+# Local imports
+from timesheet import storage  # reading timesheet files
+from timesheet import parse_functions  # converting minutes to times
+from timesheet import data_functions  # dictionary-encoding notes
+
+# Day numbers count days since 1970-01-01
+EPOCH = date(1970, 1, 1)
+
+# Minutes used for missing start and end times
+MISSING_MINUTES = -1
+
+
+def convert_times_to_minutes(times: pd.Series) -> np.ndarray:
+    """Convert times (datetimes on 1900-01-01) into minutes after midnight
+
+    Args:
+        times (pd.Series): datetime times (NaT if missing)
+
+    Returns:
+        np.ndarray: minutes after midnight (int16, -1 if missing)
+    """
+
+    minutes = (times - pd.Timestamp("1900-01-01")) // pd.Timedelta(1, "m")
+
+    return minutes.fillna(MISSING_MINUTES).to_numpy(dtype=np.int16)
+
+
+def convert_time_to_minutes(value: time) -> int:
+    """Convert time into minutes after midnight
+
+    Args:
+        value (time): time (None if missing)
+
+    Returns:
+        int: minutes after midnight (-1 if missing)
+    """
+
+    if value == None:
+        return MISSING_MINUTES
+
+    return value.hour * 60 + value.minute
+
+
+class SessionView:
+    """View of one session in a SessionStore
+
+    Values are read from (and written to) the store's arrays when used, so views are cheap to
+    create and no per-session objects are kept in memory.
+    """
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index: int):
+        """Create view of session
+
+        Args:
+            store (SessionStore): store holding session
+            index (int): position of session in store
+        """
+        self.store = store
+        self.index = index
+
+    @property
+    def date(self) -> date:
+        """Date of session"""
+        return EPOCH + timedelta(days=int(self.store.days[self.index]))
+
+    @property
+    def start_time(self) -> time:
+        """Start time of session (None if missing)"""
+        return self.store.get_time(self.store.start_minutes, self.index)
+
+    @property
+    def end_time(self) -> time:
+        """End time of session (None if session still open)"""
+        return self.store.get_time(self.store.end_minutes, self.index)
+
+    @end_time.setter
+    def end_time(self, value: time):
+        self.store.end_minutes[self.index] = convert_time_to_minutes(value)
+
+    @property
+    def notes(self) -> str:
+        """Notes for session"""
+        return self.store.notes[self.store.note_ids[self.index]]
+
+    @notes.setter
+    def notes(self, value: str):
+        self.store.note_ids[self.index] = self.store.intern_note(value)
+
+    @property
+    def time_worked(self) -> timedelta:
+        """Time worked in session (zero if session still open or ends before it starts)"""
+        start_minutes = int(self.store.start_minutes[self.index])
+        end_minutes = int(self.store.end_minutes[self.index])
+        if start_minutes < 0 or end_minutes < start_minutes:
+            return timedelta(0)
+        return timedelta(minutes=end_minutes - start_minutes)
+
+    def to_record(self) -> dict:
+        """Format session as a record with values as written in timesheet file
+
+        Returns:
+            dict: date, start_time, end_time, time_worked and notes
+        """
+
+        return {
+            "date": self.date.strftime("%Y-%m-%d"),
+            "start_time": "" if self.start_time is None else f"{self.start_time:%H:%M}",
+            "end_time": "" if self.end_time is None else f"{self.end_time:%H:%M}",
+            "time_worked": "{:02d}:{:02d}".format(
+                *divmod(self.time_worked.seconds // 60, 60)
+            ),
+            "notes": self.notes,
+        }
+
+    def __repr__(self) -> str:
+        return f"SessionView({self.to_record()})"
+
+
+class SessionStore:
+    """Timesheet sessions held in compact parallel arrays
+
+    Each session takes 12 bytes: day number (int32, days since 1970-01-01), start and end
+    minutes after midnight (int16, -1 if missing) and an id (int32) for its notes. Each
+    distinct note is stored once. The same sessions in a timesheet dataframe take around 33
+    bytes each (1M sessions with a few distinct notes), mostly for the four 8 byte date,
+    time and timedelta columns (notes are dictionary-encoded), see
+    benchmark_server_functions.benchmark_session_store_memory().
+
+    Sessions are read through SessionView objects (e.g. store[-1].end_time), and a timesheet
+    dataframe is only built when to_dataframe() is called. Time worked is calculated from
+    the start and end times rather than stored, with open sessions and sessions ending
+    before they start counting as zero (as in summaries and checks, see
+    summary_functions.calculate_session_seconds()).
+    """
+
+    def __init__(self, capacity: int = 16):
+        """Create empty session store
+
+        Args:
+            capacity (int, optional): number of sessions space is set aside for (grows as
+                needed). Defaults to 16.
+        """
+        self.n_sessions = 0
+        self.days = np.zeros(capacity, dtype=np.int32)
+        self.start_minutes = np.zeros(capacity, dtype=np.int16)
+        self.end_minutes = np.zeros(capacity, dtype=np.int16)
+        self.note_ids = np.zeros(capacity, dtype=np.int32)
+        self.notes = [""]
+        self.note_ids_by_note = {"": 0}
+
+    @classmethod
+    def from_dataframe(cls, timesheet: pd.DataFrame):
+        """Create session store from timesheet dataframe
+
+        Args:
+            timesheet (pd.DataFrame): timesheet with datetime date, start_time and end_time
+                columns and notes column
+
+        Returns:
+            SessionStore: sessions in timesheet
+        """
+
+        # Intern notes (each category of dictionary-encoded notes column once)
+        notes = data_functions.encode_notes(timesheet[["notes"]].copy()).notes
+        note_ids, notes = notes.cat.codes.to_numpy(), notes.cat.categories
+
+        # Fill arrays
+        store = cls(capacity=timesheet.shape[0])
+        store.n_sessions = timesheet.shape[0]
+        store.days[:] = timesheet.date.to_numpy(dtype="datetime64[D]").astype(np.int32)
+        store.start_minutes[:] = convert_times_to_minutes(timesheet.start_time)
+        store.end_minutes[:] = convert_times_to_minutes(timesheet.end_time)
+        if len(notes) > 0:
+            store_note_ids = np.array([store.intern_note(note) for note in notes])
+            store.note_ids[:] = store_note_ids[note_ids]
+
+        return store
+
+    @classmethod
+    def read(cls, file_name: Path, file_format: str = None):
+        """Read session store from timesheet file (any storage format)
+
+        Args:
+            file_name (Path): path to timesheet file
+            file_format (str, optional): format of timesheet file (csv, feather or parquet).
+                Defaults to None (format chosen by file extension).
+
+        Returns:
+            SessionStore: sessions in timesheet file
+        """
+
+        return cls.from_dataframe(storage.get_storage(file_name, file_format).read())
+
+    def __len__(self) -> int:
+        return self.n_sessions
+
+    def __getitem__(self, index: int) -> SessionView:
+        if index < 0:
+            index += self.n_sessions
+        if index < 0 or index >= self.n_sessions:
+            raise IndexError(
+                f"Session {index} not in store of {self.n_sessions} sessions"
+            )
+        return SessionView(self, index)
+
+    def __iter__(self):
+        for index in range(self.n_sessions):
+            yield SessionView(self, index)
+
+    def get_time(self, minutes: np.ndarray, index: int) -> time:
+        """Get time from array of minutes after midnight
+
+        Args:
+            minutes (np.ndarray): minutes after midnight (-1 if missing)
+            index (int): position of session
+
+        Returns:
+            time: time (None if missing)
+        """
+
+        if minutes[index] < 0:
+            return None
+
+        return time(*divmod(int(minutes[index]), 60))
+
+    def intern_note(self, note: str) -> int:
+        """Get id for note, adding it to the store's notes if new
+
+        Args:
+            note (str): note
+
+        Returns:
+            int: id of note
+        """
+
+        if note not in self.note_ids_by_note:
+            self.note_ids_by_note[note] = len(self.notes)
+            self.notes.append(note)
+
+        return self.note_ids_by_note[note]
+
+    def reserve(self, capacity: int):
+        """Make space for at least capacity sessions (doubling space when growing)
+
+        Args:
+            capacity (int): number of sessions needed
+        """
+
+        if capacity <= self.days.shape[0]:
+            return
+
+        new_capacity = max(capacity, 2 * self.days.shape[0])
+        for column in ["days", "start_minutes", "end_minutes", "note_ids"]:
+            array = getattr(self, column)
+            new_array = np.zeros(new_capacity, dtype=array.dtype)
+            new_array[: self.n_sessions] = array[: self.n_sessions]
+            setattr(self, column, new_array)
+
+    def append(
+        self,
+        session_date: date,
+        start_time: time,
+        end_time: time = None,
+        notes: str = "",
+    ) -> SessionView:
+        """Add session to end of store
+
+        Args:
+            session_date (date): date of session
+            start_time (time): start time
+            end_time (time, optional): end time. Defaults to None (session still open).
+            notes (str, optional): notes. Defaults to "".
+
+        Returns:
+            SessionView: view of new session
+        """
+
+        self.reserve(self.n_sessions + 1)
+        index = self.n_sessions
+        self.days[index] = (session_date - EPOCH).days
+        self.start_minutes[index] = convert_time_to_minutes(start_time)
+        self.end_minutes[index] = convert_time_to_minutes(end_time)
+        self.note_ids[index] = self.intern_note(notes)
+        self.n_sessions += 1
+
+        return SessionView(self, index)
+
+    def calculate_worked_minutes(self) -> np.ndarray:
+        """Calculate minutes worked in each session
+
+        Returns:
+            np.ndarray: minutes worked (zero if session still open or ends before it starts)
+        """
+
+        start_minutes = self.start_minutes[: self.n_sessions].astype(np.int32)
+        end_minutes = self.end_minutes[: self.n_sessions].astype(np.int32)
+        worked_minutes = end_minutes - start_minutes
+        worked_minutes[
+            (start_minutes < 0) | (end_minutes < 0) | (worked_minutes < 0)
+        ] = 0
+
+        return worked_minutes
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Build timesheet dataframe from sessions
+
+        Returns:
+            pd.DataFrame: timesheet with datetime and timedelta columns
+        """
+
+        return pd.DataFrame(
+            {
+                "date": self.days[: self.n_sessions]
+                .astype("datetime64[D]")
+                .astype("datetime64[ns]"),
+                "start_time": parse_functions.convert_minutes_to_times(
+                    self.start_minutes[: self.n_sessions]
+                ),
+                "end_time": parse_functions.convert_minutes_to_times(
+                    self.end_minutes[: self.n_sessions]
+                ),
+                "time_worked": parse_functions.convert_minutes_to_timedeltas(
+                    self.calculate_worked_minutes()
+                ),
+                "notes": self.build_notes(),
+            }
+        )
+
+    def build_notes(self) -> pd.Categorical:
+        """Build dictionary-encoded notes column from note ids, without copying notes
+
+        Returns:
+            pd.Categorical: notes of sessions (categories in sorted order, as when read
+                from file)
+        """
+
+        notes = pd.Categorical.from_codes(
+            self.note_ids[: self.n_sessions], categories=self.notes
+        ).remove_unused_categories()
+
+        return notes.reorder_categories(sorted(notes.categories))
+
+    def memory_usage(self) -> int:
+        """Measure memory used by sessions (arrays including spare space, and notes)
+
+        Returns:
+            int: bytes
+        """
+
+        array_bytes = sum(
+            array.nbytes
+            for array in [
+                self.days,
+                self.start_minutes,
+                self.end_minutes,
+                self.note_ids,
+            ]
+        )
+        note_bytes = sum(sys.getsizeof(note) for note in self.notes)
+        note_bytes += sys.getsizeof(self.notes) + sys.getsizeof(self.note_ids_by_note)
+
+        return array_bytes + note_bytes
@@ -0,0 +1,517 @@
+# Load packages
+import abc  # defining methods backends must provide
+from pathlib import Path  # handling file paths
+from datetime import date  # working with dates
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import data_functions  # general functions for working with data
+from timesheet import file_functions  # detecting file formats
+from timesheet import parse_functions  # parsing timesheet CSV files
+from timesheet import partition_functions  # finding shards of partitioned timesheets
+from timesheet import punch_functions  # folding shard journals
+from timesheet import journal_functions  # locking shards while compacting
+from timesheet import totals_functions  # checking daily totals of shards
+from timesheet import summary_functions  # reading daily totals of shards
+from timesheet import stream_functions  # rebuilding daily totals of shards
+from timesheet import profile_functions  # timing reads and writes
+from timesheet import cache_functions  # caching parsed CSV timesheets
+from timesheet import fixed_width_functions  # writing fixed width timesheets
+
+
+class Storage(abc.ABC):
+    """Base class for timesheet storage backends
+
+    A backend reads and writes the timesheet dataframe (date, start_time, end_time, time_worked
+    and notes columns) to a file, so must provide read() and write() (a backend missing
+    either can't be created). Backends that can append and patch single records set
+    supports_append to True. Backends storing the timesheet as a directory of shards set
+    partitioned to True. Backends storing every record with the same width, so any record
+    can be changed in place, set fixed_width to True.
+    """
+
+    supports_append = False
+    partitioned = False
+    fixed_width = False
+
+    def __init__(self, file_name: Path):
+        """Create storage backend for file
+
+        Args:
+            file_name (Path): path to timesheet file
+        """
+        self.file_name = Path(file_name)
+
+    @abc.abstractmethod
+    def read(self) -> pd.DataFrame:
+        """Read timesheet from file
+
+        Returns:
+            pd.DataFrame: timesheet with datetime and timedelta columns
+        """
+
+    @abc.abstractmethod
+    def write(self, timesheet: pd.DataFrame):
+        """Write timesheet to file, overwriting current content
+
+        Backends write via a temporary file (see file_functions.write_file_atomically()) so
+        a crash part way through writing doesn't truncate the timesheet.
+
+        Args:
+            timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        """
+
+
+class CSVStorage(Storage):
+    """Stores timesheet as CSV with dates (YYYY-mm-dd) and times (hh:mm) as strings"""
+
+    supports_append = True
+
+    def read(self) -> pd.DataFrame:
+        """Read timesheet from CSV file
+
+        If the TIMESHEET_CACHE environment variable is set the parsed columns are cached
+        (see cache_functions.read_timesheet_csv()), so an unchanged file isn't parsed again
+        and only new records are parsed after start and end times are added.
+
+        Raises:
+            parse_functions.TimesheetFormatError: if any records are malformed
+
+        Returns:
+            pd.DataFrame: timesheet with datetime and timedelta columns
+        """
+
+        # Read from cache if turned on
+        cache_directory = cache_functions.get_cache_directory()
+        if cache_directory != None:
+            return cache_functions.read_timesheet_csv(self.file_name, cache_directory)
+
+        # Read and parse whole file
+        with profile_functions.phase("read_file") as read_phase:
+            content = self.file_name.read_bytes()
+            read_phase.count(bytes_read=len(content))
+        with profile_functions.phase("parse") as parse_phase:
+            timesheet = parse_functions.parse_timesheet_csv(content)
+            parse_phase.count(rows=timesheet.shape[0])
+
+        return timesheet
+
+    def write(self, timesheet: pd.DataFrame):
+        """Write timesheet to CSV file, overwriting current content
+
+        Args:
+            timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        """
+
+        # Format the date and time columns as strings (on a copy)
+        with profile_functions.phase("format") as format_phase:
+            timesheet = data_functions.format_datetime_columns_to_strings(
+                timesheet.copy()
+            )
+            format_phase.count(rows=timesheet.shape[0])
+
+        # Write to file
+        with profile_functions.phase("write_file") as write_phase:
+            file_functions.write_file_atomically(
+                self.file_name,
+                lambda file_name: timesheet.to_csv(file_name, index=False),
+            )
+            write_phase.count(
+                rows=timesheet.shape[0], bytes_written=self.file_name.stat().st_size
+            )
+
+
+class FeatherStorage(Storage):
+    """Stores timesheet in columnar Feather (Arrow IPC) file
+
+    Date and time columns are kept as native timestamp and duration columns so no string
+    parsing or formatting is needed, and notes as a dictionary column (each distinct note
+    stored once). Requires the pyarrow package.
+    """
+
+    def read(self) -> pd.DataFrame:
+        """Read timesheet from Feather file
+
+        Returns:
+            pd.DataFrame: timesheet with datetime and timedelta columns
+        """
+        with profile_functions.phase("read_file") as read_phase:
+            timesheet = data_functions.encode_notes(pd.read_feather(self.file_name))
+            read_phase.count(
+                rows=timesheet.shape[0], bytes_read=self.file_name.stat().st_size
+            )
+
+        return timesheet
+
+    def write(self, timesheet: pd.DataFrame):
+        """Write timesheet to Feather file, overwriting current content
+
+        Args:
+            timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        """
+        with profile_functions.phase("write_file") as write_phase:
+            file_functions.write_file_atomically(
+                self.file_name, timesheet.reset_index(drop=True).to_feather
+            )
+            write_phase.count(
+                rows=timesheet.shape[0], bytes_written=self.file_name.stat().st_size
+            )
+
+
+class ParquetStorage(Storage):
+    """Stores timesheet in columnar Parquet file
+
+    Date and time columns are kept as native timestamp and duration columns so no string
+    parsing or formatting is needed, and notes as a dictionary column (each distinct note
+    stored once). Requires the pyarrow package.
+    """
+
+    def read(self) -> pd.DataFrame:
+        """Read timesheet from Parquet file
+
+        Returns:
+            pd.DataFrame: timesheet with datetime and timedelta columns
+        """
+        with profile_functions.phase("read_file") as read_phase:
+            timesheet = data_functions.encode_notes(pd.read_parquet(self.file_name))
+            read_phase.count(
+                rows=timesheet.shape[0], bytes_read=self.file_name.stat().st_size
+            )
+
+        return timesheet
+
+    def write(self, timesheet: pd.DataFrame):
+        """Write timesheet to Parquet file, overwriting current content
+
+        Args:
+            timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        """
+        with profile_functions.phase("write_file") as write_phase:
+            file_functions.write_file_atomically(
+                self.file_name,
+                lambda file_name: timesheet.to_parquet(file_name, index=False),
+            )
+            write_phase.count(
+                rows=timesheet.shape[0], bytes_written=self.file_name.stat().st_size
+            )
+
+
+class FixedWidthStorage(Storage):
+    """Stores timesheet as text file in which every line has the same number of bytes
+    (see fixed_width_functions)
+
+    Records are found by offset arithmetic, so start and end times, note edits and
+    corrections to any record only change the bytes of the fields changed, in place, and
+    the whole file is parsed without searching for separators.
+    """
+
+    fixed_width = True
+
+    def read(self) -> pd.DataFrame:
+        """Read timesheet from fixed width file
+
+        Raises:
+            parse_functions.TimesheetFormatError: if any records are malformed
+
+        Returns:
+            pd.DataFrame: timesheet with datetime and timedelta columns
+        """
+
+        with profile_functions.phase("read_file") as read_phase:
+            content = self.file_name.read_bytes()
+            read_phase.count(bytes_read=len(content))
+        with profile_functions.phase("parse") as parse_phase:
+            timesheet = parse_functions.parse_fixed_width_timesheet(content)
+            parse_phase.count(rows=timesheet.shape[0])
+
+        return timesheet
+
+    def write(self, timesheet: pd.DataFrame):
+        """Write timesheet to fixed width file, overwriting current content (notes field
+        widened to fit longest note)
+
+        Args:
+            timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        """
+
+        with profile_functions.phase("format") as format_phase:
+            lines, line_width = data_functions.format_fixed_width_lines(timesheet)
+            format_phase.count(rows=timesheet.shape[0])
+        with profile_functions.phase("write_file") as write_phase:
+            fixed_width_functions.write_lines(self.file_name, [lines], line_width)
+            write_phase.count(
+                rows=timesheet.shape[0], bytes_written=self.file_name.stat().st_size
+            )
+
+
+class PartitionedStorage(Storage):
+    """Stores timesheet as directory of CSV shards, one per month or year, with a manifest
+    of the records in each shard (see partition_functions)
+
+    Start and end times only change the latest shard, and records between dates are only
+    read from the shards covering those dates.
+    """
+
+    supports_append = True
+    partitioned = True
+
+    def get_shard_storage(self, key: str) -> CSVStorage:
+        """Get storage backend for shard
+
+        Args:
+            key (str): shard key (YYYY or YYYY-mm)
+
+        Returns:
+            CSVStorage: storage backend for shard file
+        """
+        return CSVStorage(partition_functions.get_shard_file_name(self.file_name, key))
+
+    def read(self, start_date: date = None) -> pd.DataFrame:
+        """Read timesheet from shards
+
+        Args:
+            start_date (date, optional): only read shards covering this date (date or
+                YYYY-mm-dd string) or later, in full. Defaults to None (all shards).
+
+        Raises:
+            parse_functions.TimesheetFormatError: if any records are malformed
+
+        Returns:
+            pd.DataFrame: timesheet with datetime and timedelta columns
+        """
+
+        # Find shards covering start date onwards
+        keys = list(partition_functions.find_shard_files(self.file_name))
+        if start_date != None:
+            start_key = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+            keys = [key for key in keys if key >= start_key[: len(key)]]
+
+        # Read shards
+        timesheets = [self.get_shard_storage(key).read() for key in keys]
+        if len(timesheets) == 0:
+            return create_empty_timesheet()
+
+        return data_functions.concat_timesheets(timesheets)
+
+    def write(self, timesheet: pd.DataFrame, remove_other_shards: bool = True):
+        """Write timesheet to shards (by date of each record), overwriting current content
+
+        Records go in the existing shard covering their date, otherwise in a new shard for
+        the partition period in the manifest (see partition_functions.find_shard_key()).
+
+        Args:
+            timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+            remove_other_shards (bool, optional): remove shards without records in timesheet.
+                Defaults to True (False only replaces shards with records in timesheet).
+        """
+
+        # Find shard of each record
+        Path(self.file_name).mkdir(parents=True, exist_ok=True)
+        manifest = partition_functions.read_manifest(self.file_name)
+        dates = pd.Series(data_functions.format_dates(timesheet.date), dtype=object)
+        shard_keys = {
+            date_string: partition_functions.find_shard_key(
+                list(manifest["shards"]), date_string, manifest["period"]
+            )
+            for date_string in dates.unique()
+        }
+        keys = dates.map(shard_keys).to_numpy()
+
+        # Write each shard
+        for key in sorted(set(shard_keys.values())):
+            self.get_shard_storage(key).write(timesheet[keys == key])
+
+        # Remove shards without records
+        if remove_other_shards:
+            for key, shard_file_name in partition_functions.find_shard_files(
+                self.file_name
+            ).items():
+                if key not in shard_keys.values():
+                    partition_functions.remove_shard(shard_file_name)
+
+        # Update manifest
+        partition_functions.read_manifest(self.file_name)
+
+    def read_range(self, start_key: str = None, end_key: str = None) -> pd.DataFrame:
+        """Read records between two dates from shards
+
+        Shards are chosen by the first and last dates in the manifest, then each shard is
+        binary searched (see file_functions.read_header_and_lines_between()).
+
+        Args:
+            start_key (str, optional): first date to include (YYYY-mm-dd). Defaults to None
+                (from start of timesheet).
+            end_key (str, optional): date to stop at (YYYY-mm-dd, not included). Defaults to
+                None (to end of timesheet).
+
+        Returns:
+            pd.DataFrame: timesheet records between dates
+        """
+
+        timesheets = []
+        manifest = partition_functions.read_manifest(self.file_name)
+        for key, shard in manifest["shards"].items():
+
+            # Skip shards without records between dates
+            if shard["rows"] == 0:
+                continue
+            if start_key != None and shard["last_date"] < start_key:
+                continue
+            if end_key != None and shard["first_date"] >= end_key:
+                continue
+
+            # Read and parse matching records
+            content = file_functions.read_header_and_lines_between(
+                partition_functions.get_shard_file_name(self.file_name, key),
+                start_key=start_key,
+                end_key=end_key,
+            )
+            timesheets.append(parse_functions.parse_timesheet_csv(content))
+
+        if len(timesheets) == 0:
+            return create_empty_timesheet()
+
+        return data_functions.concat_timesheets(timesheets)
+
+    def read_daily_totals(self) -> pd.DataFrame:
+        """Read daily totals of every shard, rebuilding those that don't match their shard
+
+        Returns:
+            pd.DataFrame: seconds worked and sessions per day (date, seconds and sessions
+                columns)
+        """
+
+        daily_totals = [stream_functions.calculate_daily_totals([])]
+        for shard_file_name in partition_functions.find_shard_files(
+            self.file_name
+        ).values():
+            if not totals_functions.is_daily_totals_current(shard_file_name):
+                stream_functions.write_daily_totals(shard_file_name)
+            daily_totals.append(summary_functions.read_daily_totals(shard_file_name))
+
+        return pd.concat(daily_totals, ignore_index=True)
+
+    def fold_journals(self, keys: list[str] = None):
+        """Add operations waiting in shard journals to shards (e.g. after a crash)
+
+        Args:
+            keys (list[str], optional): keys of shards. Defaults to None (all shards).
+        """
+
+        shard_files = partition_functions.find_shard_files(self.file_name)
+        for key in shard_files if keys == None else keys:
+            with journal_functions.commit_lock(shard_files[key]):
+                punch_functions.fold_journal(shard_files[key])
+
+    def compact(self) -> list[str]:
+        """Merge monthly shards of years before the current year into one shard per year
+
+        Records are sorted by date and start time as they are merged. Recent shards are
+        left as they are, so start and end times still only change a small shard.
+
+        Returns:
+            list[str]: keys of yearly shards written
+        """
+
+        # Find monthly shards of finished years
+        current_year = str(date.today().year)
+        shard_keys = list(partition_functions.find_shard_files(self.file_name))
+        years = sorted(
+            set(
+                key[:4] for key in shard_keys if len(key) > 4 and key[:4] < current_year
+            )
+        )
+
+        for year in years:
+
+            # Read every shard of year (including any yearly shard already written)
+            keys = [key for key in shard_keys if key[:4] == year]
+            self.fold_journals(keys)
+            timesheet = data_functions.concat_timesheets(
+                [self.get_shard_storage(key).read() for key in keys]
+            )
+            timesheet = timesheet.sort_values(
+                ["date", "start_time"], kind="stable"
+            ).reset_index(drop=True)
+
+            # Write yearly shard and remove monthly shards
+            self.get_shard_storage(year).write(timesheet)
+            for key in keys:
+                if key != year:
+                    partition_functions.remove_shard(
+                        partition_functions.get_shard_file_name(self.file_name, key)
+                    )
+
+        # Update manifest
+        partition_functions.read_manifest(self.file_name)
+
+        return years
+
+
+# Storage backends for each file format
+STORAGE_BACKENDS = {
+    "csv": CSVStorage,
+    "feather": FeatherStorage,
+    "parquet": ParquetStorage,
+    "partitioned": PartitionedStorage,
+    "fixed": FixedWidthStorage,
+}
+
+
+def get_storage(file_name: Path, file_format: str = None) -> Storage:
+    """Get storage backend for timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+        file_format (str, optional): file format (csv, feather, parquet, fixed or
+            partitioned). Defaults to None (partitioned for directories, otherwise chosen
+            by file extension).
+
+    Returns:
+        Storage: storage backend for file
+    """
+
+    file_format = file_functions.get_file_format(file_name, file_format)
+
+    return STORAGE_BACKENDS[file_format](file_name)
+
+
+def create_empty_timesheet() -> pd.DataFrame:
+    """Create empty timesheet dataframe with typed columns
+
+    Returns:
+        pd.DataFrame: empty timesheet
+    """
+
+    return pd.DataFrame(
+        {
+            "date": pd.Series(dtype="datetime64[ns]"),
+            "start_time": pd.Series(dtype="datetime64[ns]"),
+            "end_time": pd.Series(dtype="datetime64[ns]"),
+            "time_worked": pd.Series(dtype="timedelta64[ns]"),
+            "notes": pd.Series(dtype="category"),
+        }
+    )
+
+
+def convert_timesheet(
+    input_file_name: Path,
+    output_file_name: Path,
+    input_format: str = None,
+    output_format: str = None,
+):
+    """Convert timesheet file from one format to another (e.g. CSV to Parquet)
+
+    Args:
+        input_file_name (Path): path to timesheet file to convert
+        output_file_name (Path): path to write converted timesheet to
+        input_format (str, optional): format of input file. Defaults to None (chosen by extension).
+        output_format (str, optional): format of output file. Defaults to None (chosen by extension).
+    """
+
+    # Read timesheet
+    timesheet = get_storage(input_file_name, input_format).read()
+
+    # Write timesheet in new format
+    get_storage(output_file_name, output_format).write(timesheet)
+    print(f"Converted timesheet {input_file_name} to {output_file_name}")
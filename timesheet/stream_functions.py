@@ -0,0 +1,264 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from datetime import date  # working with dates
+import numpy as np  # aggregating chunks
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import parse_functions  # parsing timesheet CSV chunks
+from timesheet import summary_functions  # calculating and summarising seconds worked
+from timesheet import data_functions  # formatting timesheet columns as strings
+from timesheet import file_functions  # writing files atomically
+from timesheet import punch_functions  # timesheet column names
+from timesheet import totals_functions  # writing daily totals files
+
+# Note the functions here are generator stages (read -> parse -> filter -> aggregate or
+# write) for timesheet CSV files larger than memory. Only one chunk of records is held at
+# a time, plus running totals per day, so memory use doesn't grow with the file
+
+# Default size (bytes) of each chunk read from file
+DEFAULT_CHUNK_BYTES = 16 * 2**20
+
+
+def read_csv_chunks(file_name: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES):
+    """Read timesheet CSV file in chunks of whole lines, each starting with the header
+
+    Chunks are split at the last newline in each block read that isn't inside a quoted
+    value (e.g. notes containing newlines), so no record is split between chunks.
+
+    Args:
+        file_name (Path): path to timesheet CSV file
+        chunk_bytes (int, optional): number of bytes read at a time.
+            Defaults to DEFAULT_CHUNK_BYTES (16MB).
+
+    Yields:
+        bytes: header and whole lines
+    """
+
+    with open(file_name, "rb") as file:
+        header = file.readline()
+        remainder = b""
+        while True:
+
+            # Read next block (continuing partial line from last block)
+            block = file.read(chunk_bytes)
+            if not block:
+                break
+            block = remainder + block
+
+            # Find last newline outside quoted values (odd number of quotes before it)
+            last_newline = block.rfind(b"\n")
+            while last_newline != -1 and block.count(b'"', 0, last_newline) % 2 == 1:
+                last_newline = block.rfind(b"\n", 0, last_newline)
+            if last_newline == -1:
+                remainder = block
+                continue
+
+            # Keep partial line for next chunk
+            remainder = block[last_newline + 1 :]
+            yield header + block[: last_newline + 1]
+
+        # Check for last line without newline
+        if remainder.strip() != b"":
+            yield header + remainder
+
+
+def parse_chunks(chunks):
+    """Parse chunks of timesheet CSV content into timesheet dataframes
+
+    Args:
+        chunks (iterable[bytes]): chunks from read_csv_chunks()
+
+    Raises:
+        parse_functions.TimesheetFormatError: if any records in a chunk are malformed
+            (line numbers counted from start of file)
+
+    Yields:
+        pd.DataFrame: timesheet with datetime and timedelta columns for each chunk
+    """
+
+    n_lines = 0
+    for chunk in chunks:
+
+        # Parse chunk, numbering malformed lines from start of file
+        try:
+            yield parse_functions.parse_timesheet_csv(chunk)
+        except parse_functions.TimesheetFormatError as error:
+            errors = error.errors.copy()
+            errors["line"] += n_lines
+            raise parse_functions.TimesheetFormatError(errors) from None
+
+        # Count lines in chunk (minus header)
+        n_lines += chunk.count(b"\n") - 1
+
+
+def filter_dates(timesheets, start_date: date = None, end_date: date = None):
+    """Keep records between two dates (inclusive) from each timesheet chunk
+
+    Args:
+        timesheets (iterable[pd.DataFrame]): timesheet chunks from parse_chunks()
+        start_date (date, optional): first date to include (date or YYYY-mm-dd string).
+            Defaults to None (from start of timesheet).
+        end_date (date, optional): last date to include (date or YYYY-mm-dd string).
+            Defaults to None (to end of timesheet).
+
+    Yields:
+        pd.DataFrame: records between dates in each chunk
+    """
+
+    for timesheet in timesheets:
+        keep = np.ones(timesheet.shape[0], dtype=bool)
+        if start_date != None:
+            keep &= (timesheet.date >= pd.Timestamp(start_date)).to_numpy()
+        if end_date != None:
+            keep &= (timesheet.date <= pd.Timestamp(end_date)).to_numpy()
+        yield timesheet[keep].reset_index(drop=True)
+
+
+def calculate_daily_totals(timesheets) -> pd.DataFrame:
+    """Sum seconds worked and sessions per day over timesheet chunks
+
+    Only the running totals (one row per day seen) are kept between chunks.
+
+    Args:
+        timesheets (iterable[pd.DataFrame]): timesheet chunks
+
+    Returns:
+        pd.DataFrame: seconds worked and sessions per day (date, seconds and sessions
+            columns), in date order
+    """
+
+    days = np.zeros(0, dtype=np.int64)
+    seconds = np.zeros(0, dtype=np.int64)
+    sessions = np.zeros(0, dtype=np.int64)
+    for timesheet in timesheets:
+
+        # Combine chunk's sessions with running totals
+        chunk_days = timesheet.date.to_numpy(dtype="datetime64[D]").astype(np.int64)
+        days = np.concatenate([days, chunk_days])
+        seconds = np.concatenate(
+            [seconds, summary_functions.calculate_session_seconds(timesheet)]
+        )
+        sessions = np.concatenate([sessions, np.ones(chunk_days.shape[0], np.int64)])
+
+        # Sum by day
+        days, codes = np.unique(days, return_inverse=True)
+        seconds = np.bincount(codes, weights=seconds, minlength=days.shape[0]).astype(
+            np.int64
+        )
+        sessions = np.bincount(codes, weights=sessions, minlength=days.shape[0]).astype(
+            np.int64
+        )
+
+    return pd.DataFrame(
+        {
+            "date": days.astype("datetime64[D]").astype("datetime64[ns]"),
+            "seconds": seconds,
+            "sessions": sessions,
+        }
+    )
+
+
+def summarise_chunks(timesheets, period: str = "day") -> pd.DataFrame:
+    """Summarise hours worked per day, week or month over timesheet chunks
+
+    Args:
+        timesheets (iterable[pd.DataFrame]): timesheet chunks
+        period (str, optional): period to summarise over (day, week or month). Weeks start
+            on Monday. Defaults to "day".
+
+    Returns:
+        pd.DataFrame: one row per period with sessions (period_start, time_worked, hours and
+            sessions columns)
+    """
+
+    return summary_functions.summarise_daily_totals(
+        calculate_daily_totals(timesheets), period=period
+    )
+
+
+def write_daily_totals(file_name: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES):
+    """Calculate daily totals from timesheet CSV file one chunk at a time and write them to
+    file next to timesheet file (see summary_functions.write_daily_totals())
+
+    Args:
+        file_name (Path): path to timesheet CSV file
+        chunk_bytes (int, optional): number of bytes read at a time.
+            Defaults to DEFAULT_CHUNK_BYTES (16MB).
+    """
+
+    daily_totals = calculate_daily_totals(
+        stream_timesheet(file_name, chunk_bytes=chunk_bytes)
+    )
+    totals_functions.write_daily_totals(
+        file_name,
+        zip(
+            data_functions.format_dates(daily_totals.date),
+            daily_totals.seconds,
+            daily_totals.sessions,
+        ),
+    )
+
+
+def format_header() -> str:
+    """Format timesheet CSV header
+
+    Returns:
+        str: header line
+    """
+
+    return file_functions.format_csv_line(punch_functions.TIMESHEET_COLUMNS)
+
+
+def write_chunks(timesheets, file_name: Path) -> int:
+    """Write timesheet chunks to CSV file (replacing file once all chunks written)
+
+    Args:
+        timesheets (iterable[pd.DataFrame]): timesheet chunks
+        file_name (Path): path to CSV file
+
+    Returns:
+        int: number of records written
+    """
+
+    n_records = 0
+
+    def write_lines(temporary_file_name: Path):
+        nonlocal n_records
+        with open(temporary_file_name, "w", newline="") as file:
+            file.write(format_header())
+            for timesheet in timesheets:
+                file.write(data_functions.format_timesheet_lines(timesheet))
+                n_records += timesheet.shape[0]
+
+    file_functions.write_file_atomically(file_name, write_lines)
+
+    return n_records
+
+
+def stream_timesheet(
+    file_name: Path,
+    start_date: date = None,
+    end_date: date = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+):
+    """Stream records from timesheet CSV file one chunk at a time
+
+    Args:
+        file_name (Path): path to timesheet CSV file
+        start_date (date, optional): first date to include (date or YYYY-mm-dd string).
+            Defaults to None (from start of timesheet).
+        end_date (date, optional): last date to include (date or YYYY-mm-dd string).
+            Defaults to None (to end of timesheet).
+        chunk_bytes (int, optional): number of bytes read at a time.
+            Defaults to DEFAULT_CHUNK_BYTES (16MB).
+
+    Returns:
+        iterable[pd.DataFrame]: timesheet chunks with datetime and timedelta columns
+    """
+
+    timesheets = parse_chunks(read_csv_chunks(file_name, chunk_bytes))
+    if start_date != None or end_date != None:
+        timesheets = filter_dates(timesheets, start_date, end_date)
+
+    return timesheets
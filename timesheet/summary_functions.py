@@ -0,0 +1,359 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import numpy as np  # vectorised aggregation
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import data_functions  # calculating time differences
+from timesheet import totals_functions  # reading and writing daily totals files
+
+# Periods timesheet can be summarised over
+SUMMARY_PERIODS = ["day", "week", "month"]
+
+# Minutes in each time of day bin of occupancy matrices, keyed by resolution
+OCCUPANCY_RESOLUTIONS = {"hour": 60, "15min": 15}
+
+# Days of the week (rows of occupancy matrices)
+WEEKDAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+# Minutes in a day
+MINUTES_PER_DAY = 24 * 60
+
+
+def calculate_session_seconds(timesheet: pd.DataFrame) -> np.ndarray:
+    """Calculate seconds worked in each session from its start and end times
+
+    time_worked isn't used as it is only a placeholder until the session's end time is
+    added. Sessions without an end time, or with an end time that isn't after the start
+    time, count as zero seconds.
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with datetime start_time and end_time columns
+
+    Returns:
+        np.ndarray: seconds worked in each session
+    """
+
+    # Calculate session durations
+    durations, invalid = data_functions.calculate_time_difference_array(
+        timesheet.start_time.to_numpy(dtype="datetime64[ns]"),
+        timesheet.end_time.to_numpy(dtype="datetime64[ns]"),
+    )
+
+    # Ignore open or invalid sessions
+    return np.where(invalid, 0, durations.view(np.int64) // 1_000_000_000)
+
+
+def calculate_period_codes(dates: np.ndarray, period: str) -> np.ndarray:
+    """Calculate integer code of the period (day, week or month) each date falls in
+
+    Codes count days, weeks (starting on Monday) or months since 1970-01-01.
+
+    Args:
+        dates (np.ndarray): datetime64 dates
+        period (str): period to group dates by (day, week or month)
+
+    Raises:
+        Exception: if period isn't one of day, week or month
+
+    Returns:
+        np.ndarray: int64 period codes
+    """
+
+    # Check period
+    if period not in SUMMARY_PERIODS:
+        raise Exception(
+            f"Period provided ({period}) isn't one of: {', '.join(SUMMARY_PERIODS)}"
+        )
+
+    # Calculate days since 1970-01-01 (a Thursday)
+    if period == "month":
+        return dates.astype("datetime64[M]").astype(np.int64)
+    days = dates.astype("datetime64[D]").astype(np.int64)
+
+    return days if period == "day" else (days + 3) // 7
+
+
+def convert_period_codes_to_dates(codes: np.ndarray, period: str) -> np.ndarray:
+    """Convert period codes into the date each period starts on
+
+    Args:
+        codes (np.ndarray): int64 period codes (from calculate_period_codes())
+        period (str): period codes are for (day, week or month)
+
+    Returns:
+        np.ndarray: datetime64[ns] start date of each period
+    """
+
+    if period == "month":
+        dates = codes.astype("datetime64[M]")
+    elif period == "week":
+        dates = (codes * 7 - 3).astype("datetime64[D]")
+    else:
+        dates = codes.astype("datetime64[D]")
+
+    return dates.astype("datetime64[ns]")
+
+
+def summarise_seconds(
+    dates: np.ndarray, seconds: np.ndarray, sessions: np.ndarray, period: str
+) -> pd.DataFrame:
+    """Sum seconds worked and sessions per day, week or month
+
+    Values are grouped by integer period codes with np.bincount, so cost grows linearly
+    with the number of values.
+
+    Args:
+        dates (np.ndarray): datetime64 date of each value
+        seconds (np.ndarray): seconds worked
+        sessions (np.ndarray): number of sessions
+        period (str): period to summarise over (day, week or month)
+
+    Returns:
+        pd.DataFrame: one row per period with sessions (period_start, time_worked, hours and
+            sessions columns)
+    """
+
+    # Calculate period of each value
+    codes = calculate_period_codes(dates, period)
+
+    # Check any sessions to summarise
+    if codes.shape[0] == 0:
+        return pd.DataFrame(
+            {
+                "period_start": pd.Series(dtype="datetime64[ns]"),
+                "time_worked": pd.Series(dtype="timedelta64[ns]"),
+                "hours": pd.Series(dtype=float),
+                "sessions": pd.Series(dtype=np.int64),
+            }
+        )
+
+    # Sum seconds and count sessions in each period
+    first_code = codes.min()
+    offsets = codes - first_code
+    sessions = np.bincount(offsets, weights=sessions).astype(np.int64)
+    total_seconds = np.bincount(offsets, weights=seconds).astype(np.int64)
+
+    # Keep periods with sessions
+    present = np.flatnonzero(sessions)
+
+    return pd.DataFrame(
+        {
+            "period_start": convert_period_codes_to_dates(present + first_code, period),
+            "time_worked": total_seconds[present]
+            .astype("timedelta64[s]")
+            .astype("timedelta64[ns]"),
+            "hours": total_seconds[present] / 3600,
+            "sessions": sessions[present],
+        }
+    )
+
+
+def summarise_timesheet(timesheet: pd.DataFrame, period: str = "day") -> pd.DataFrame:
+    """Summarise hours worked per day, week or month
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+        period (str, optional): period to summarise over (day, week or month). Weeks start
+            on Monday. Defaults to "day".
+
+    Returns:
+        pd.DataFrame: one row per period with sessions (period_start, time_worked, hours and
+            sessions columns)
+    """
+
+    return summarise_seconds(
+        timesheet.date.to_numpy(dtype="datetime64[ns]"),
+        calculate_session_seconds(timesheet),
+        np.ones(timesheet.shape[0], dtype=np.int64),
+        period,
+    )
+
+
+def calculate_occupancy_matrix(
+    timesheet: pd.DataFrame, resolution: str = "hour"
+) -> pd.DataFrame:
+    """Calculate minutes worked in each hour (or 15 minutes) of each day of the week
+
+    Each session is turned into an interval of minutes of the week (Monday 00:00 is
+    minute 0). Sessions add 1 at their first minute and -1 after their last minute of a
+    difference array (built with np.bincount), whose cumulative sum is the number of
+    sessions working in each minute of the week. Minutes are then summed into time of day
+    bins, so cost grows linearly with the number of sessions and no minutes are looped
+    over. Sessions without an end time, or with an end time that isn't after the start
+    time, aren't counted.
+
+    Args:
+        timesheet (pd.DataFrame): timesheet with datetime date, start_time and end_time
+            columns
+        resolution (str, optional): width of time of day bins (hour or 15min).
+            Defaults to "hour".
+
+    Raises:
+        Exception: if resolution isn't one of hour or 15min
+
+    Returns:
+        pd.DataFrame: minutes worked with one row per day of the week (Monday to Sunday)
+            and one column per time of day bin (labelled by its start, hh:mm)
+    """
+
+    # Check resolution
+    if resolution not in OCCUPANCY_RESOLUTIONS:
+        raise Exception(
+            f"Resolution provided ({resolution}) isn't one of: {', '.join(OCCUPANCY_RESOLUTIONS)}"
+        )
+    bin_minutes = OCCUPANCY_RESOLUTIONS[resolution]
+    minutes_per_week = len(WEEKDAYS) * MINUTES_PER_DAY
+
+    # Keep sessions with time worked
+    minutes_worked = calculate_session_seconds(timesheet) // 60
+    worked = minutes_worked > 0
+
+    # Calculate minute of week each session starts and ends (days since 1970-01-01, a
+    # Thursday, give the day of the week)
+    days = timesheet.date.to_numpy(dtype="datetime64[ns]")[worked]
+    weekdays = (days.astype("datetime64[D]").astype(np.int64) + 3) % 7
+    start_times = timesheet.start_time.to_numpy(dtype="datetime64[ns]")[worked]
+    start_minutes = (start_times - start_times.astype("datetime64[D]")).astype(
+        "timedelta64[m]"
+    )
+    start_minutes = start_minutes.astype(np.int64)
+    starts = weekdays * MINUTES_PER_DAY + start_minutes
+    ends = np.minimum(starts + minutes_worked[worked], minutes_per_week)
+
+    # Count sessions working in each minute of the week from difference array
+    differences = np.bincount(starts, minlength=minutes_per_week + 1) - np.bincount(
+        ends, minlength=minutes_per_week + 1
+    )
+    occupancy = np.cumsum(differences[:minutes_per_week])
+
+    # Sum minutes into time of day bins
+    matrix = occupancy.reshape(len(WEEKDAYS), -1, bin_minutes).sum(axis=2)
+    bin_starts = np.arange(0, MINUTES_PER_DAY, bin_minutes)
+
+    return pd.DataFrame(
+        matrix,
+        index=pd.Index(WEEKDAYS, name="weekday"),
+        columns=[f"{minutes // 60:02d}:{minutes % 60:02d}" for minutes in bin_starts],
+    )
+
+
+def summarise_daily_totals(
+    daily_totals: pd.DataFrame, period: str = "day"
+) -> pd.DataFrame:
+    """Summarise hours worked per day, week or month from daily totals
+
+    Cost grows with the number of days rather than the number of sessions.
+
+    Args:
+        daily_totals (pd.DataFrame): seconds worked and sessions per day (date, seconds and
+            sessions columns)
+        period (str, optional): period to summarise over (day, week or month). Weeks start
+            on Monday. Defaults to "day".
+
+    Returns:
+        pd.DataFrame: one row per period with sessions (period_start, time_worked, hours and
+            sessions columns)
+    """
+
+    return summarise_seconds(
+        daily_totals.date.to_numpy(dtype="datetime64[ns]"),
+        daily_totals.seconds.to_numpy(dtype=np.int64),
+        daily_totals.sessions.to_numpy(dtype=np.int64),
+        period,
+    )
+
+
+def read_daily_totals(file_name: Path) -> pd.DataFrame:
+    """Read daily totals file kept next to timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        pd.DataFrame: seconds worked and sessions per day (date, seconds and sessions columns)
+    """
+
+    # Read daily totals (skipping stamp line)
+    daily_totals = pd.read_csv(
+        totals_functions.get_daily_totals_file_name(file_name),
+        skiprows=1,
+        dtype={"date": str, "seconds": np.int64, "sessions": np.int64},
+    )
+    daily_totals["date"] = pd.to_datetime(daily_totals["date"], format="%Y-%m-%d")
+
+    return daily_totals
+
+
+def write_daily_totals(file_name: Path, timesheet: pd.DataFrame):
+    """Calculate daily totals from timesheet and write them to file next to timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file (timesheet must match its current content)
+        timesheet (pd.DataFrame): timesheet with datetime and timedelta columns
+    """
+
+    # Summarise by day
+    daily_summary = summarise_timesheet(timesheet, period="day")
+
+    # Write daily totals
+    totals_functions.write_daily_totals(
+        file_name,
+        zip(
+            daily_summary.period_start.dt.strftime("%Y-%m-%d"),
+            daily_summary.time_worked.dt.total_seconds().astype(np.int64),
+            daily_summary.sessions,
+        ),
+    )
+
+
+def format_summary(summary: pd.DataFrame) -> str:
+    """Format timesheet summary as a table for printing
+
+    Args:
+        summary (pd.DataFrame): summary from summarise_timesheet()
+
+    Returns:
+        str: table with period start (YYYY-mm-dd), time worked (hh:mm) and sessions
+    """
+
+    # Format time worked as hours and minutes (hours can be more than 24)
+    minutes = summary.time_worked.dt.total_seconds().astype(np.int64) // 60
+    formatted = pd.DataFrame(
+        {
+            "period_start": summary.period_start.dt.strftime("%Y-%m-%d"),
+            "time_worked": [
+                f"{hours:02d}:{remainder:02d}"
+                for hours, remainder in zip(minutes // 60, minutes % 60)
+            ],
+            "sessions": summary.sessions,
+        }
+    )
+
+    return formatted.to_string(index=False)
+
+
+def format_occupancy_matrix(occupancy_matrix: pd.DataFrame) -> str:
+    """Format occupancy matrix as a table for printing (one row per time of day bin and one
+    column per day of the week, so 15 minute bins fit on screen)
+
+    Args:
+        occupancy_matrix (pd.DataFrame): occupancy matrix from calculate_occupancy_matrix()
+
+    Returns:
+        str: table with minutes worked in each time of day bin (rows) on each day of the
+            week (columns, Mon to Sun)
+    """
+
+    formatted = occupancy_matrix.T.rename(columns=lambda weekday: weekday[:3])
+    formatted.index.name = "time"
+
+    return formatted.to_string()
@@ -0,0 +1,153 @@
+# Load packages
+from pathlib import Path  # handling file paths
+from concurrent.futures import ProcessPoolExecutor  # summarising timesheets in parallel
+import numpy as np  # storing compact daily totals
+import pandas as pd  # working with data
+
+# Local imports
+from timesheet import storage  # reading timesheet files in other formats
+from timesheet import file_functions  # finding file formats
+from timesheet import stream_functions  # calculating daily totals one chunk at a time
+from timesheet import summary_functions  # summarising hours worked
+from timesheet import totals_functions  # naming and checking daily totals files
+from timesheet import journal_functions  # naming journal files
+
+
+def find_timesheet_files(directory: Path, pattern: str = "*.csv") -> list[Path]:
+    """Find timesheet files in directory (ignoring daily totals and journal files)
+
+    Args:
+        directory (Path): directory containing one timesheet file per person
+        pattern (str, optional): glob pattern matching timesheet files. Defaults to "*.csv".
+
+    Returns:
+        list[Path]: paths to timesheet files (sorted by name)
+    """
+
+    file_names = sorted(Path(directory).glob(pattern))
+
+    # Remove daily totals and journal files kept next to timesheets
+    other_file_names = set()
+    for file_name in file_names:
+        other_file_names.add(totals_functions.get_daily_totals_file_name(file_name))
+        other_file_names.update(
+            journal_functions.get_journal_file_names(file_name).values()
+        )
+
+    return [file_name for file_name in file_names if file_name not in other_file_names]
+
+
+def calculate_compact_daily_totals(file_name: Path) -> tuple:
+    """Calculate seconds worked and sessions per day in timesheet file
+
+    Run in worker processes by summarise_team(), so only small arrays of daily totals are
+    sent back rather than the full timesheet. A CSV timesheet's daily totals file is used
+    if it is current, otherwise daily totals are calculated in memory (CSV timesheets one
+    chunk at a time), so no files are written next to the timesheets scanned.
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: days since 1970-01-01 (int32), seconds
+            worked (int64) and sessions (int32) for each day with sessions
+    """
+
+    # Sum seconds worked and sessions by day
+    if file_functions.get_file_format(file_name) != "csv":
+        daily_totals = stream_functions.calculate_daily_totals(
+            [storage.get_storage(file_name).read()]
+        )
+    elif totals_functions.is_daily_totals_current(file_name):
+        daily_totals = summary_functions.read_daily_totals(file_name)
+    else:
+        daily_totals = stream_functions.calculate_daily_totals(
+            stream_functions.stream_timesheet(file_name)
+        )
+
+    return (
+        daily_totals.date.to_numpy(dtype="datetime64[D]").astype(np.int32),
+        daily_totals.seconds.to_numpy(dtype=np.int64),
+        daily_totals.sessions.to_numpy(dtype=np.int32),
+    )
+
+
+def summarise_team(
+    directory: Path,
+    period: str = "day",
+    n_workers: int = None,
+    chunk_size: int = 1,
+    pattern: str = "*.csv",
+) -> pd.DataFrame:
+    """Summarise hours worked per day, week or month for each timesheet file in directory
+
+    Timesheet files are summarised by day in a pool of worker processes, each returning
+    compact daily totals that are merged and summarised by period at the end.
+
+    Args:
+        directory (Path): directory containing one timesheet file per person
+        period (str, optional): period to summarise over (day, week or month). Defaults to "day".
+        n_workers (int, optional): number of worker processes. Defaults to None (one per CPU).
+            If 1 files are summarised in the current process.
+        chunk_size (int, optional): number of files sent to a worker at a time. Defaults to 1.
+        pattern (str, optional): glob pattern matching timesheet files. Defaults to "*.csv".
+
+    Raises:
+        Exception: if no timesheet files found in directory
+
+    Returns:
+        pd.DataFrame: one row per person and period with sessions (name, period_start,
+            time_worked, hours and sessions columns). Names are timesheet file names
+            without extension.
+    """
+
+    # Find timesheet files
+    file_names = find_timesheet_files(directory, pattern=pattern)
+    if len(file_names) == 0:
+        raise Exception(f"No timesheet files matching {pattern} found in {directory}")
+
+    # Calculate daily totals for each timesheet
+    if n_workers == 1:
+        daily_totals = list(map(calculate_compact_daily_totals, file_names))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            daily_totals = list(
+                executor.map(
+                    calculate_compact_daily_totals, file_names, chunksize=chunk_size
+                )
+            )
+
+    # Summarise each timesheet by period
+    summaries = [
+        summary_functions.summarise_seconds(
+            days.astype("datetime64[D]"), seconds, sessions, period
+        ).assign(name=file_name.stem)
+        for file_name, (days, seconds, sessions) in zip(file_names, daily_totals)
+    ]
+    team_summary = pd.concat(summaries, ignore_index=True)
+
+    return team_summary[["name", "period_start", "time_worked", "hours", "sessions"]]
+
+
+def format_team_summary(team_summary: pd.DataFrame) -> str:
+    """Format team summary as a table of hours worked per period (rows) and person (columns)
+
+    Args:
+        team_summary (pd.DataFrame): team summary from summarise_team()
+
+    Returns:
+        str: table with hours worked by each person and in total for each period
+    """
+
+    # Reshape hours worked into periods by people
+    hours = team_summary.pivot_table(
+        index="period_start",
+        columns="name",
+        values="hours",
+        aggfunc="sum",
+        fill_value=0,
+    )
+    hours["total"] = hours.sum(axis=1)
+    hours.index = hours.index.strftime("%Y-%m-%d")
+
+    return hours.round(2).to_string()
@@ -1,40 +1,88 @@
 # Load packages
 from pathlib import Path  # handling file paths
 import pandas as pd  # working with data
-from datetime import time, datetime  # working with dates and times
-import warnings  # writing warnings
+from datetime import date, datetime, timedelta  # working with dates and times
 
 # Local imports
 from timesheet import data_functions  # general functions for working with data
+from timesheet import file_functions  # appending and patching lines in files
+from timesheet import punch_functions  # checking and formatting start and end times
+from timesheet import storage  # reading and writing timesheet files
+from timesheet import summary_functions  # summarising hours worked
+from timesheet import totals_functions  # checking daily totals
+from timesheet import journal_functions  # locking timesheet file while writing
+from timesheet import parse_functions  # parsing timesheet CSV files
+from timesheet import import_functions  # validating and merging imported sessions
+from timesheet import check_functions  # checking whole timesheet for problems
+from timesheet import stream_functions  # rebuilding daily totals in bounded memory
+from timesheet import partition_functions  # adding times to partitioned timesheets
+from timesheet import profile_functions  # timing phases of reads and checks
+from timesheet import fixed_width_functions  # changing fixed width records in place
+from timesheet import search_functions  # searching notes through notes index
 
 
 class Timesheet:
-    def __init__(self, file_name: str = Path("outputs/timesheet.csv")):
+    def __init__(
+        self,
+        file_name: str = Path("outputs/timesheet.csv"),
+        lazy: bool = False,
+        file_format: str = None,
+    ):
         """Create Timesheet object
 
         Args:
-            file_name (str, optional): path to timesheet file.
-                Defaults to Path("outputs/timesheet.csv").
+            file_name (str, optional): path to timesheet file (or directory of shards for
+                partitioned timesheets). Defaults to Path("outputs/timesheet.csv").
+            lazy (bool, optional): only read the header and last record of the timesheet file,
+                the full timesheet is loaded when the timesheet attribute is first used.
+                Only used for CSV, fixed width and partitioned timesheets. Defaults to False.
+            file_format (str, optional): format of timesheet file (csv, feather, parquet,
+                fixed or partitioned). Defaults to None (partitioned for directories, otherwise format
+                chosen by file extension).
         """
         self.file_name = file_name
+        self.storage = storage.get_storage(file_name, file_format)
+        self.lazy = lazy and (self.storage.supports_append or self.storage.fixed_width)
         self.start_time = None
         self.end_time = None
-        self.read_timesheet()
+        self.last_record = None
+        self.file_stamp = None
+        self._timesheet = None
+        if self.lazy:
+            self.read_timesheet_state()
+        else:
+            self.read_timesheet()
+
+    @property
+    def timesheet(self) -> pd.DataFrame:
+        """Timesheet data, loaded from file on first use if created in lazy mode
+
+        Returns:
+            pd.DataFrame: timesheet data
+        """
+        if self._timesheet is None:
+            self.read_timesheet()
+        return self._timesheet
+
+    @timesheet.setter
+    def timesheet(self, value: pd.DataFrame):
+        self._timesheet = value
 
     def create_timesheet(self):
-        """Creates timesheet CSV file
+        """Creates timesheet file
 
         Timesheet saved to self.file_name (set in __init__)
         """
         # Initialise dataframe
-        self.timesheet = pd.DataFrame(
-            columns=["date", "start_time", "end_time", "time_worked", "notes"]
-        )
+        self.timesheet = storage.create_empty_timesheet()
 
         # Write to file
-        self.timesheet.to_csv(self.file_name, index=False)
+        self.write_timesheet()
         print(f"Created timesheet file at: {self.file_name}")
 
+        # No records yet
+        self.last_record = None
+
     def read_timesheet(self):
         """Read in the timesheet
 
@@ -46,36 +94,83 @@ class Timesheet:
             self.create_timesheet()
 
         # Read in timesheet
-        self.timesheet = pd.read_csv(self.file_name)
+        self.file_stamp = self.read_file_stamp()
+        self.timesheet = self.storage.read()
 
-        # Convert date and time columns to datetime objects
-        self.timesheet["date"] = pd.to_datetime(self.timesheet["date"])
-        self.timesheet["start_time"] = pd.to_datetime(
-            self.timesheet["start_time"], format="%H:%M"
-        )
+        # Keep last record formatted as it is written in file
+        self.last_record = None
+        if self.timesheet.shape[0] > 0:
+            self.last_record = self.format_record(-1)
+
+        # Set current start and end times
+        self.set_current_times()
+
+    def read_timesheet_state(self):
+        """Read the last record of the timesheet without loading the full timesheet
+
+        The file is read backwards from the end, so cost doesn't depend on the size of the timesheet.
+        Timesheet read from self.file_name (set in __init__)
+        """
 
-        # Check if no end time
-        if self.timesheet["end_time"].isnull().all():
-            self.timesheet["end_time"] = pd.to_datetime(self.timesheet["end_time"])
+        # Check timesheet exists
+        if Path.exists(self.file_name) == False:
+            self.create_timesheet()
+
+        # Read last record (kept in manifest for partitioned timesheets)
+        self.file_stamp = self.read_file_stamp()
+        if self.storage.partitioned:
+            self.last_record = partition_functions.read_last_record(self.file_name)
+        elif self.storage.fixed_width:
+            self.last_record = fixed_width_functions.read_last_record(self.file_name)
         else:
-            self.timesheet["end_time"] = pd.to_datetime(
-                self.timesheet["end_time"], format="%H:%M"
-            )
+            self.last_record = punch_functions.read_last_record(self.file_name)
 
-        # Convert timedelta column
-        self.timesheet["time_worked"] = pd.to_timedelta(
-            self.timesheet["time_worked"] + ":00"
-        )
+        # Set current start and end times
+        self.set_current_times()
 
-        # Check if any timesheet data present
-        if self.timesheet.shape[0] > 0:
+    def read_file_stamp(self) -> str:
+        """Read stamp identifying current content of timesheet file (size and modification time)
+
+        Returns:
+            str: stamp (see totals_functions.get_file_stamp() and
+                partition_functions.get_stamp()), None if file doesn't exist
+        """
+
+        if Path.exists(self.file_name) == False:
+            return None
+
+        if self.storage.partitioned:
+            return partition_functions.get_stamp(self.file_name)
+
+        return totals_functions.get_file_stamp(self.file_name)
+
+    def refresh(self):
+        """Re-read timesheet if file changed since it was last read or written in full
+
+        Changes are found by comparing the file's size and modification time, so an unchanged
+        timesheet isn't read again. Lazy timesheets only re-read the last record (the full
+        timesheet is loaded again when next used). Start and end times added through the
+        journal (CSV timesheets) are only re-read if times from other processes were added
+        with them.
+        """
 
-            # Set current start and end times
-            last_row = self.timesheet.iloc[-1:]
-            time = last_row["start_time"].item()
-            self.start_time = None if pd.isnull(time) else time
-            time = last_row["end_time"].item()
-            self.end_time = None if pd.isnull(time) else time
+        # Check if file changed
+        if self.file_stamp != None and self.file_stamp == self.read_file_stamp():
+            return
+
+        # Re-read timesheet
+        if self.lazy:
+            self._timesheet = None
+            self.read_timesheet_state()
+        else:
+            self.read_timesheet()
+
+    def set_current_times(self):
+        """Set current start and end times from the last record of the timesheet"""
+
+        self.start_time, self.end_time = punch_functions.get_current_times(
+            self.last_record
+        )
 
     def add_start_time(self, start_time_string: str = None):
         """Add start time to timesheet
@@ -85,74 +180,184 @@ class Timesheet:
                 Defaults to None (will use current time).
         """
 
-        # Get datetime object for now
-        current_datetime = datetime.now()
-        current_date = current_datetime.date()
+        # Get start time and check it is after current end time
+        start_time = punch_functions.parse_time_string(
+            start_time_string, datetime.now()
+        )
+        punch_functions.check_start_time(start_time, self.end_time)
+
+        # Add date and start time to copy of timesheet (if loaded or rewritten in full)
+        timesheet = None
+        if self._timesheet is not None or not self.supports_punch():
+            new_timesheet_record = {
+                "date": pd.Timestamp(start_time.date()),
+                "start_time": data_functions.convert_time_to_timestamp(start_time),
+                "end_time": pd.Timestamp("nat"),
+                "time_worked": pd.Timedelta(15, "s"),
+                "notes": "",
+            }
+            new_timesheet_record = pd.DataFrame([new_timesheet_record])
+            timesheet = data_functions.concat_timesheets(
+                [self.timesheet, new_timesheet_record]
+            )
 
-        # Get current time
-        start_time = current_datetime
+        # Append new record to file, then change timesheet in memory once written (so a
+        # start time rejected by the file leaves the timesheet unchanged)
+        if not self.append_last_record(start_time, timesheet):
+            self.refresh()
+            return
+        if timesheet is not None:
+            self.timesheet = timesheet
+        self.last_record = punch_functions.create_start_record(start_time)
 
-        # Check if a start time provided
-        if start_time_string != None:
+        # Set current start and end times
+        self.start_time = start_time
+        self.end_time = None
 
-            # Check string format
-            data_functions.check_string_pattern_match(
-                start_time_string, pattern=r"[0-9][0-9]:[0-9][0-9]"
-            )
+    def write_timesheet(self, timesheet: pd.DataFrame = None):
+        """Write timesheet to file
 
-            # Convert to time
-            hours, minutes = map(int, start_time_string.split(":"))
-            start_time = datetime.combine(
-                current_date, time(hour=hours, minute=minutes)
-            )
+        Timesheet written to self.file_name (set in __init__), overwrites current content.
+        Holds the commit lock so changes from other processes aren't written at the same time.
 
-        # Check if a current end_time exists
-        if self.end_time == None:
-            warnings.warn(
-                f"Adding new start time when current end_time is None. (Please review and edit timesheet file)"
-            )
+        Args:
+            timesheet (pd.DataFrame, optional): timesheet to write, kept as the timesheet
+                once written. Defaults to None (current timesheet).
+        """
 
-        # Check current start is after end_time
-        elif self.end_time >= start_time:
-            raise Exception(
-                f"The start_time provided ({start_time}) is not after the current end_time ({self.end_time})"
+        if timesheet is None:
+            timesheet = self.timesheet
+        with journal_functions.commit_lock(self.file_name):
+            self.storage.write(timesheet)
+            self.timesheet = timesheet
+            self.file_stamp = self.read_file_stamp()
+
+    def supports_punch(self) -> bool:
+        """Check if start and end times can be added without rewriting the timesheet file
+
+        Returns:
+            bool: True if storage backend can append (via journal) or change records in place
+        """
+
+        return self.storage.supports_append or self.storage.fixed_width
+
+    def format_record(self, row: int) -> dict:
+        """Format record of loaded timesheet as it is written in file
+
+        Args:
+            row (int): row of record (negative counts back from last record)
+
+        Returns:
+            dict: record with values as written in file
+        """
+
+        record = data_functions.format_datetime_columns_to_strings(
+            self.timesheet.iloc[[row]].copy()
+        )
+
+        return record.iloc[0].fillna("").astype(str).to_dict()
+
+    def format_last_record(self) -> str:
+        """Format last record of timesheet as a CSV line
+
+        Returns:
+            str: last record formatted as it would be written by write_timesheet
+        """
+
+        return file_functions.format_csv_line(self.last_record.values())
+
+    def commit_operation(self, operation: str, operation_time: datetime) -> bool:
+        """Add start or end time to timesheet file via its journal
+
+        If no other changes were made to the file, the timesheet in memory still matches it
+        so won't be re-read by refresh(). Partitioned timesheets only change their latest
+        shard (see partition_functions.commit_operation()) and fixed width timesheets are
+        changed in place (see fixed_width_functions.commit_operation()).
+
+        Args:
+            operation (str): operation (start or end)
+            operation_time (datetime): start or end time
+
+        Returns:
+            bool: True if only this operation changed the file since it was last read (so
+                the timesheet in memory only needs this change), False if it was also
+                changed elsewhere (so needs to be re-read, see refresh())
+        """
+
+        if self.storage.partitioned:
+            new_file_stamp = partition_functions.commit_operation(
+                self.file_name, operation, operation_time, self.file_stamp
+            )
+        elif self.storage.fixed_width:
+            new_file_stamp = fixed_width_functions.commit_operation(
+                self.file_name, operation, operation_time, self.file_stamp
             )
+        else:
+            new_file_stamp = punch_functions.commit_operation(
+                self.file_name, operation, operation_time, self.file_stamp
+            )
+        if new_file_stamp != None:
+            self.file_stamp = new_file_stamp
 
-        # Add date and start time to timesheet
-        new_timesheet_record = {
-            "date": pd.Timestamp(current_date),
-            "start_time": pd.Timestamp(start_time),
-            "end_time": pd.Timestamp("nat"),
-            "time_worked": pd.Timedelta(15, "s"),
-            "notes": "",
-        }
-        new_timesheet_record = pd.DataFrame([new_timesheet_record])
-        self.timesheet = pd.concat([self.timesheet, new_timesheet_record])
-
-        # Reset dataframe index
-        self.timesheet = self.timesheet.reset_index(drop=True)
-
-        # Write updated timesheet to file
-        self.write_timesheet()
+        return new_file_stamp != None
 
-        # Set current start and end times
-        self.start_time = start_time
-        self.end_time = None
+    def append_last_record(
+        self, start_time: datetime = None, timesheet: pd.DataFrame = None
+    ):
+        """Append last record of timesheet to file
 
-    def write_timesheet(self):
-        """Write timesheet to file
+        Start time is added through the timesheet's journal (see
+        punch_functions.commit_operation()), so only the new line is written and processes
+        adding times at the same time don't overwrite each other. Fixed width timesheets
+        append the new line directly. Storage backends that can't append (e.g. Parquet)
+        rewrite the whole timesheet.
+
+        Args:
+            start_time (datetime, optional): start time checked against the timesheet file.
+                Defaults to None (start time of last record).
+            timesheet (pd.DataFrame, optional): timesheet with new record, written by
+                storage backends that can't append. Defaults to None (current timesheet).
 
-        Timesheet written to self.file_name (set in __init__), overwrites current content
+        Returns:
+            bool: False if file was also changed elsewhere (see commit_operation())
         """
 
-        # Create a copy of the dataframe
-        my_timesheet = self.timesheet.copy()
+        if self.supports_punch():
+            if start_time == None:
+                start_time, _ = punch_functions.get_current_times(self.last_record)
+            return self.commit_operation("start", start_time)
 
-        # Format the date and time columns as strings
-        my_timesheet = data_functions.format_datetime_columns_to_strings(my_timesheet)
+        self.write_timesheet(timesheet)
+        return True
 
-        # Write to file
-        my_timesheet.to_csv(self.file_name, index=False)
+    def update_last_record(
+        self, end_time: datetime = None, timesheet: pd.DataFrame = None
+    ):
+        """Rewrite last record of timesheet in file
+
+        End time is added through the timesheet's journal (see
+        punch_functions.commit_operation()), so only the last line is rewritten and processes
+        adding times at the same time don't overwrite each other. Fixed width timesheets
+        only change the end_time and time_worked fields of the last line, in place.
+        Storage backends that can't append (e.g. Parquet) rewrite the whole timesheet.
+
+        Args:
+            end_time (datetime, optional): end time checked against the timesheet file.
+                Defaults to None (end time of last record).
+            timesheet (pd.DataFrame, optional): timesheet with changed record, written by
+                storage backends that can't append. Defaults to None (current timesheet).
+
+        Returns:
+            bool: False if file was also changed elsewhere (see commit_operation())
+        """
+
+        if self.supports_punch():
+            if end_time == None:
+                _, end_time = punch_functions.get_current_times(self.last_record)
+            return self.commit_operation("end", end_time)
+
+        self.write_timesheet(timesheet)
+        return True
 
     def add_end_time(self, end_time_string: str = None):
         """Add end time to timesheet
@@ -162,50 +367,517 @@ class Timesheet:
                 Defaults to None (will use current time).
         """
 
-        # Get datetime object for now
-        current_datetime = datetime.now()
-        current_date = current_datetime.date()
+        # Get end time and check it is after current start time (of a session not ended)
+        end_time = punch_functions.parse_time_string(end_time_string, datetime.now())
+        punch_functions.check_end_time(end_time, self.start_time, self.end_time)
+
+        # Fill in end time and time worked of copy of last record
+        last_record = dict(self.last_record)
+        punch_functions.add_end_time_to_record(last_record, end_time)
+        new_values = [
+            data_functions.convert_time_to_timestamp(end_time),
+            pd.Timedelta(last_record["time_worked"] + ":00"),
+        ]
+
+        # Rewrite last record in file (storage backends that can't append write a changed
+        # copy of the timesheet), then change timesheet in memory once written (so an end
+        # time rejected by the file leaves the timesheet unchanged, and one added along
+        # with changes made elsewhere re-reads the timesheet instead)
+        # Note using .loc here so change is made directly on dataframe rather than on copy/slice
+        # which would be done if used indices/names with [] or .
+        if self.supports_punch():
+            if not self.update_last_record(end_time):
+                self.refresh()
+                return
+            if self._timesheet is not None:
+                self.timesheet.loc[
+                    self.timesheet.index[-1], ["end_time", "time_worked"]
+                ] = new_values
+        else:
+            timesheet = self.timesheet.copy()
+            timesheet.loc[timesheet.index[-1], ["end_time", "time_worked"]] = new_values
+            self.update_last_record(end_time, timesheet)
+        self.last_record = last_record
 
-        # Get current time
-        end_time = current_datetime
+        # Set current start and end times
+        self.start_time = None
+        self.end_time = end_time
 
-        # Check if a end time provided
-        if end_time_string != None:
+    def edit_record(self, row: int, values: dict):
+        """Change fields of one record (e.g. a note or a corrected time)
 
-            # Check string format
-            data_functions.check_string_pattern_match(
-                end_time_string, pattern=r"[0-9][0-9]:[0-9][0-9]"
-            )
+        Values are given as written in the timesheet file (dates YYYY-mm-dd, times hh:mm)
+        and checked by parsing the changed record. Changing a start or end time also
+        changes time_worked (unless it is given). Fixed width timesheets only change the
+        bytes of the fields changed, in place, so any record is changed without reading the
+        rest of the timesheet. Other storage backends rewrite the whole timesheet.
 
-            # Convert to time
-            hours, minutes = map(int, end_time_string.split(":"))
-            end_time = datetime.combine(current_date, time(hour=hours, minute=minutes))
+        Args:
+            row (int): row of record (negative counts back from last record)
+            values (dict): new values keyed by column (e.g. {"notes": "client call"})
+
+        Raises:
+            Exception: if a column isn't in the timesheet, row isn't in the timesheet or a
+                value is too long for its fixed width field
+            parse_functions.TimesheetFormatError: if a value is malformed
+        """
 
-        # Check if a current start_time exists
-        if self.start_time == None:
+        # Check columns
+        unknown_columns = [
+            column
+            for column in values
+            if column not in punch_functions.TIMESHEET_COLUMNS
+        ]
+        if len(unknown_columns) > 0:
             raise Exception(
-                f"Trying to add end time when start time is None (doesn't exist). (Please review and edit timesheet file)"
+                f"Columns provided ({', '.join(unknown_columns)}) aren't in timesheet"
+            )
+        values = {column: str(value) for column, value in values.items()}
+
+        with journal_functions.commit_lock(self.file_name):
+
+            # Add times waiting in journals and re-read timesheet if changed elsewhere
+            if self.storage.partitioned:
+                self.storage.fold_journals()
+            elif self.storage.supports_append:
+                punch_functions.fold_journal(self.file_name)
+            self.refresh()
+
+            # Check row is in timesheet (fixed width timesheets counted from file size)
+            if self.storage.fixed_width and self._timesheet is None:
+                n_records = fixed_width_functions.count_records(
+                    self.file_name,
+                    fixed_width_functions.read_line_width(self.file_name),
+                )
+            else:
+                n_records = self.timesheet.shape[0]
+            if row < -n_records or row >= n_records:
+                raise Exception(
+                    f"Row provided ({row}) isn't in timesheet ({n_records} records)"
+                )
+            row %= n_records
+
+            # Change record as written in file and parse it to check values
+            if self.storage.fixed_width and self._timesheet is None:
+                record = fixed_width_functions.read_record(self.file_name, row)
+            else:
+                record = self.format_record(row)
+            old_note = record["notes"]
+            old_length = len(file_functions.format_csv_line(record.values()).encode())
+            record.update(values)
+            new_record = parse_functions.parse_timesheet_csv(
+                (
+                    file_functions.format_csv_line(punch_functions.TIMESHEET_COLUMNS)
+                    + file_functions.format_csv_line(record.values())
+                ).encode()
             )
 
-        # Check current end is after start_time
-        elif self.start_time >= end_time:
-            raise Exception(
-                f"The end_time provided ({end_time}) is not after the current start_time ({self.start_time})"
+            # Change time worked to match changed start or end time
+            if "time_worked" not in values and (
+                "start_time" in values or "end_time" in values
+            ):
+                values["time_worked"] = punch_functions.format_time_worked(record)
+                record["time_worked"] = values["time_worked"]
+                new_record["time_worked"] = pd.Timedelta(record["time_worked"] + ":00")
+
+            # Check if notes index matches timesheet before it is changed
+            notes_index_current = (
+                self.storage.supports_append or self.storage.fixed_width
+            ) and search_functions.is_notes_index_current(self.file_name)
+
+            # Change fields in place (fixed width) then timesheet in memory (if loaded)
+            if self.storage.fixed_width:
+                fixed_width_functions.patch_record(self.file_name, row, values)
+            if self._timesheet is not None:
+                self.timesheet = data_functions.concat_timesheets(
+                    [
+                        self.timesheet.iloc[:row],
+                        new_record,
+                        self.timesheet.iloc[row + 1 :],
+                    ]
+                )
+
+            # Rewrite whole timesheet for other storage backends
+            if not self.storage.fixed_width:
+                self.storage.write(self.timesheet)
+            self.file_stamp = self.read_file_stamp()
+
+            # Move record between tokens of old and new note in notes index (records after
+            # it in CSV files move by the change in its length)
+            if notes_index_current:
+                length_change = 0
+                if not self.storage.fixed_width:
+                    length_change = (
+                        len(file_functions.format_csv_line(record.values()).encode())
+                        - old_length
+                    )
+                search_functions.update_note(
+                    self.file_name,
+                    row,
+                    old_note,
+                    record["notes"],
+                    fixed_width=self.storage.fixed_width,
+                    length_change=length_change,
+                )
+
+        # Update current start and end times if last record changed
+        if row == n_records - 1:
+            self.last_record = record
+            self.set_current_times()
+
+    def add_records(self, records) -> int:
+        """Add many sessions at once (e.g. to backfill a month) in one validated write
+
+        The whole batch is validated at once (see import_functions): dates and times must be
+        formatted as in the timesheet file, each session must start before it ends, and no
+        session can overlap another new session or one already in the timesheet. If any
+        checks fail nothing is added. Sessions are merged in date order. For CSV timesheets
+        only the file from the first new session's date onwards is rewritten (crash safe, see
+        journal_functions.apply_redo()), and for partitioned timesheets only the shards from
+        the first new session's date onwards.
+
+        Args:
+            records (iterable): records (dicts or dataframe) with date (YYYY-mm-dd),
+                start_time and end_time (hh:mm) and optional notes
+
+        Raises:
+            import_functions.TimesheetImportError: if any records fail validation
+
+        Returns:
+            int: number of sessions added
+        """
+
+        # Validate records
+        if not isinstance(records, pd.DataFrame):
+            records = pd.DataFrame(list(records), dtype=object)
+        new_timesheet = import_functions.convert_records_to_timesheet(records)
+        if new_timesheet.shape[0] == 0:
+            return 0
+
+        with journal_functions.commit_lock(self.file_name):
+
+            # Rewrite shards from first new date (including times waiting in journals)
+            if self.storage.partitioned:
+                self.storage.fold_journals()
+                timesheet_tail = self.storage.read(start_date=new_timesheet.date.min())
+                import_functions.check_overlaps(new_timesheet, timesheet_tail)
+                self.storage.write(
+                    import_functions.merge_timesheets(timesheet_tail, new_timesheet),
+                    remove_other_shards=False,
+                )
+
+            # Rewrite CSV file from first new date (including times waiting in journal)
+            elif self.storage.supports_append:
+                punch_functions.fold_journal(self.file_name)
+                offset, content = file_functions.read_header_and_lines_from(
+                    self.file_name, new_timesheet.date.min().strftime("%Y-%m-%d")
+                )
+                timesheet_tail = parse_functions.parse_timesheet_csv(content)
+                import_functions.check_overlaps(new_timesheet, timesheet_tail)
+                tail = data_functions.format_timesheet_lines(
+                    import_functions.merge_timesheets(timesheet_tail, new_timesheet)
+                )
+                if offset > 0:
+                    with open(self.file_name, "rb") as file:
+                        file.seek(offset - 1)
+                        if file.read(1) != b"\n":
+                            tail = "\n" + tail
+                journal_functions.write_redo(
+                    self.file_name,
+                    offset=offset,
+                    tail=tail,
+                    operation_ids=[],
+                    rejected={},
+                )
+                journal_functions.apply_redo(self.file_name)
+
+            # Rewrite whole timesheet
+            else:
+                import_functions.check_overlaps(new_timesheet, self.timesheet)
+                self.timesheet = import_functions.merge_timesheets(
+                    self.timesheet, new_timesheet
+                )
+                self.storage.write(self.timesheet)
+
+        # Re-read timesheet (full timesheet re-read for CSV files only if already loaded)
+        self.file_stamp = None
+        self.refresh()
+
+        return new_timesheet.shape[0]
+
+    def get_date_keys(self, start_date: date = None, end_date: date = None) -> tuple:
+        """Convert first and last dates into keys as written in file (YYYY-mm-dd)
+
+        Args:
+            start_date (date, optional): first date to include (date or YYYY-mm-dd string).
+                Defaults to None.
+            end_date (date, optional): last date to include (date or YYYY-mm-dd string).
+                Defaults to None.
+
+        Returns:
+            tuple[str, str]: start key and end key (the day after end date), None if date
+                not provided
+        """
+
+        start_key = None
+        if start_date != None:
+            start_key = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+        end_key = None
+        if end_date != None:
+            end_key = (pd.Timestamp(end_date) + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        return start_key, end_key
+
+    def read_range(
+        self, start_date: date = None, end_date: date = None
+    ) -> pd.DataFrame:
+        """Read timesheet records between two dates (inclusive)
+
+        For CSV timesheets (written in date order) the file is binary searched for the first
+        and last matching records, so only those records are read and parsed. Partitioned
+        timesheets only search the shards covering the dates. Other storage backends, and
+        timesheets already loaded in full, filter the full timesheet.
+
+        Args:
+            start_date (date, optional): first date to include (date or YYYY-mm-dd string).
+                Defaults to None (from start of timesheet).
+            end_date (date, optional): last date to include (date or YYYY-mm-dd string).
+                Defaults to None (to end of timesheet).
+
+        Returns:
+            pd.DataFrame: timesheet records between dates
+        """
+
+        # Convert dates to keys as written in file
+        start_key, end_key = self.get_date_keys(start_date, end_date)
+
+        # Read matching records from shards covering dates
+        if self.storage.partitioned and self._timesheet is None:
+            return self.storage.read_range(start_key=start_key, end_key=end_key)
+
+        # Filter full timesheet if it can't be searched (or is already loaded)
+        if not self.storage.supports_append or self._timesheet is not None:
+            in_range = pd.Series(True, index=self.timesheet.index)
+            if start_key != None:
+                in_range &= self.timesheet.date >= pd.Timestamp(start_key)
+            if end_key != None:
+                in_range &= self.timesheet.date < pd.Timestamp(end_key)
+            return self.timesheet[in_range].reset_index(drop=True)
+
+        # Read and parse matching records
+        with profile_functions.phase("read_file") as read_phase:
+            content = file_functions.read_header_and_lines_between(
+                self.file_name, start_key=start_key, end_key=end_key
             )
+            read_phase.count(bytes_read=len(content))
+        with profile_functions.phase("parse") as parse_phase:
+            records = parse_functions.parse_timesheet_csv(content)
+            parse_phase.count(rows=records.shape[0])
+
+        return records
+
+    def search_notes(
+        self, query: str, start_date: date = None, end_date: date = None
+    ) -> pd.DataFrame:
+        """Find records whose notes contain every word of query (case is ignored), e.g.
+        "client migration"
+
+        CSV and fixed width timesheets are searched through a notes index kept next to the
+        timesheet (e.g. outputs/timesheet_notes_index.npz, see search_functions), so only
+        matching records are read and parsed. The index is updated when the timesheet
+        changes (only new records are indexed if the file only changed from its last
+        record onwards) and when notes are edited with edit_record(). Records between dates
+        are found by binary searching the file (records are in date order). Other storage
+        backends search the notes of the timesheet (or records between dates) in memory.
 
-        # Add end_time to timesheet
-        # Note using .loc here so change is made directly on dataframe rather than on copy/slice
-        # which would be done if used indices/names with [] or .
-        self.timesheet.loc[self.timesheet.index[-1], "end_time"] = pd.Timestamp(
-            end_time
+        Args:
+            query (str): words to search for
+            start_date (date, optional): first date to include (date or YYYY-mm-dd string).
+                Defaults to None (from start of timesheet).
+            end_date (date, optional): last date to include (date or YYYY-mm-dd string).
+                Defaults to None (to end of timesheet).
+
+        Raises:
+            Exception: if query has no words
+
+        Returns:
+            pd.DataFrame: matching records
+        """
+
+        # Search notes in memory for storage backends without notes index
+        if not (self.storage.supports_append or self.storage.fixed_width):
+            if start_date != None or end_date != None:
+                records = self.read_range(start_date=start_date, end_date=end_date)
+            else:
+                records = self.timesheet
+            return search_functions.search_timesheet(records, query)
+
+        # Update notes index if timesheet changed
+        notes_index = search_functions.update_notes_index(
+            self.file_name, fixed_width=self.storage.fixed_width
         )
 
-        # Write updated timesheet to file
-        self.write_timesheet()
+        # Find rows between dates (from offsets of first records at or after start and end
+        # keys, binary searched as records are in date order)
+        offsets = notes_index["offsets"]
+        row_range = [0, offsets.shape[0]]
+        for position, key in enumerate(self.get_date_keys(start_date, end_date)):
+            if key != None and offsets.shape[0] > 0:
+                key_offset = file_functions.find_first_line_offset(
+                    self.file_name, key, start_offset=int(offsets[0])
+                )
+                row_range[position] = int(offsets.searchsorted(key_offset))
+
+        # Find rows of matching records in notes index
+        rows = search_functions.find_rows(
+            notes_index, query, start_row=row_range[0], end_row=row_range[1]
+        )
 
-        # Set current start and end times
-        self.start_time = None
-        self.end_time = end_time
+        # Read and parse matching records
+        with profile_functions.phase("search") as search_phase:
+            records = search_functions.read_records(
+                self.file_name, notes_index, rows, fixed_width=self.storage.fixed_width
+            )
+            search_phase.count(rows=records.shape[0])
+
+        return records
+
+    def summarise(self, period: str = "day") -> pd.DataFrame:
+        """Summarise hours worked per day, week or month
+
+        Hours are calculated from the start and end times of each session, sessions without
+        an end time count as zero hours. For CSV timesheets the hours are taken from a daily
+        totals file kept next to the timesheet (e.g. outputs/timesheet_daily_totals.csv),
+        which is updated as start and end times are added and rebuilt if the timesheet
+        file has been changed elsewhere (one chunk at a time if the timesheet isn't loaded,
+        so large files aren't read into memory). Partitioned timesheets keep daily totals
+        for each shard.
+
+        Args:
+            period (str, optional): period to summarise over (day, week or month). Weeks start
+                on Monday. Defaults to "day".
+
+        Returns:
+            pd.DataFrame: one row per period with sessions (period_start, time_worked, hours and
+                sessions columns)
+        """
+
+        # Summarise partitioned timesheets from daily totals of each shard
+        if self.storage.partitioned:
+            return summary_functions.summarise_daily_totals(
+                self.storage.read_daily_totals(), period=period
+            )
+
+        # Summarise timesheets that can't keep daily totals directly
+        if not self.storage.supports_append:
+            return summary_functions.summarise_timesheet(self.timesheet, period=period)
+
+        # Rebuild daily totals file if it doesn't match timesheet file
+        if not totals_functions.is_daily_totals_current(self.file_name):
+            with profile_functions.phase("rebuild_daily_totals"):
+                if self._timesheet is None:
+                    stream_functions.write_daily_totals(self.file_name)
+                else:
+                    summary_functions.write_daily_totals(self.file_name, self.timesheet)
+
+        # Summarise from daily totals
+        daily_totals = summary_functions.read_daily_totals(self.file_name)
+
+        return summary_functions.summarise_daily_totals(daily_totals, period=period)
+
+    def occupancy_matrix(
+        self, resolution: str = "hour", start_date: date = None, end_date: date = None
+    ) -> pd.DataFrame:
+        """Calculate minutes worked in each hour (or 15 minutes) of each day of the week,
+        e.g. to see when work is usually done over a year (see
+        summary_functions.calculate_occupancy_matrix())
+
+        Args:
+            resolution (str, optional): width of time of day bins (hour or 15min).
+                Defaults to "hour".
+            start_date (date, optional): first date to include (date or YYYY-mm-dd string).
+                Defaults to None (from start of timesheet).
+            end_date (date, optional): last date to include (date or YYYY-mm-dd string).
+                Defaults to None (to end of timesheet).
+
+        Returns:
+            pd.DataFrame: minutes worked with one row per day of the week (Monday to Sunday)
+                and one column per time of day bin (labelled by its start, hh:mm)
+        """
+
+        # Read records between dates (only matching records read from CSV timesheets)
+        if start_date != None or end_date != None:
+            records = self.read_range(start_date=start_date, end_date=end_date)
+        else:
+            records = self.timesheet
+
+        with profile_functions.phase("occupancy") as occupancy_phase:
+            occupancy_matrix = summary_functions.calculate_occupancy_matrix(
+                records, resolution=resolution
+            )
+            occupancy_phase.count(rows=records.shape[0])
+
+        return occupancy_matrix
+
+    def validate(
+        self,
+        overnight: bool = False,
+        max_gap: pd.Timedelta = pd.Timedelta(hours=4),
+    ) -> pd.DataFrame:
+        """Check whole timesheet for problems (see check_functions.check_timesheet())
+
+        Finds every overlapping session, open session before the last, session ending
+        before it starts (or crossing midnight), wrong time_worked, row out of date order
+        and gap longer than max_gap between sessions on the same day. Adding start and end
+        times only checks the last record, so problems in older records (e.g. edited by
+        hand) are only found here.
+
+        Args:
+            overnight (bool, optional): treat end times before their start time as being on
+                the next day, for sessions that cross midnight. Defaults to False.
+            max_gap (pd.Timedelta, optional): longest gap expected between sessions on the
+                same day. Defaults to pd.Timedelta(hours=4) (None to not check gaps).
+
+        Returns:
+            pd.DataFrame: one row per problem (row, check and problem columns), empty if no
+                problems found
+        """
+
+        timesheet = self.timesheet
+        with profile_functions.phase("check") as check_phase:
+            report = check_functions.check_timesheet(
+                timesheet, overnight=overnight, max_gap=max_gap
+            )
+            check_phase.count(rows=timesheet.shape[0])
+
+        return report
+
+    def compact(self) -> list[str]:
+        """Merge monthly shards of years before the current year into one shard per year
+        (partitioned timesheets only, see storage.PartitionedStorage.compact())
+
+        Raises:
+            Exception: if timesheet isn't partitioned
+
+        Returns:
+            list[str]: keys of yearly shards written
+        """
+
+        # Check timesheet is partitioned
+        if not self.storage.partitioned:
+            raise Exception(
+                f"Only partitioned timesheets can be compacted ({self.file_name} isn't a directory of shards)"
+            )
+
+        # Rewrite old shards
+        with journal_functions.commit_lock(self.file_name):
+            years = self.storage.compact()
+
+        # Re-read timesheet (full timesheet re-read only if already loaded)
+        self.file_stamp = None
+        self.refresh()
+
+        return years
 
     def reset_timesheet(self):
         """Reset and empty timesheet"""
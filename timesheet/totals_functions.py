@@ -0,0 +1,176 @@
+# Load packages
+from pathlib import Path  # handling file paths
+import os  # getting file sizes and modification times
+
+# Local imports
+from timesheet import file_functions  # appending and patching lines in files
+
+# Note this module only uses the standard library (no pandas) so daily totals can be
+# updated when the command line interface adds start and end times
+
+# Columns in daily totals file
+DAILY_TOTALS_COLUMNS = ["date", "seconds", "sessions"]
+
+
+def get_daily_totals_file_name(file_name: Path) -> Path:
+    """Get path of daily totals file kept next to timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        Path: path to daily totals file (e.g. outputs/timesheet_daily_totals.csv)
+    """
+
+    file_name = Path(file_name)
+
+    return file_name.with_name(f"{file_name.stem}_daily_totals.csv")
+
+
+def get_file_stamp(file_name: Path) -> str:
+    """Get stamp identifying current content of file from its size and modification time
+
+    The stamp has a fixed width so it can be overwritten in place.
+
+    Args:
+        file_name (Path): path to file
+
+    Returns:
+        str: stamp (format: size,modification time in nanoseconds)
+    """
+
+    file_stats = os.stat(file_name)
+
+    return f"{file_stats.st_size:020d},{file_stats.st_mtime_ns:020d}"
+
+
+def is_daily_totals_current(file_name: Path) -> bool:
+    """Check if daily totals file exists and matches current content of timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+
+    Returns:
+        bool: True if daily totals file is up to date
+    """
+
+    # Check files exist
+    totals_file_name = get_daily_totals_file_name(file_name)
+    if not (Path.exists(file_name) and Path.exists(totals_file_name)):
+        return False
+
+    # Compare stamp in daily totals file with timesheet file
+    with open(totals_file_name, "r") as file:
+        stamp = file.readline().rstrip("\n")
+
+    return stamp == get_file_stamp(file_name)
+
+
+def write_daily_totals_stamp(file_name: Path):
+    """Overwrite stamp at start of daily totals file with stamp of timesheet file
+
+    Args:
+        file_name (Path): path to timesheet file
+    """
+
+    with open(get_daily_totals_file_name(file_name), "r+b") as file:
+        file.write(get_file_stamp(file_name).encode())
+
+
+def write_daily_totals(file_name: Path, rows: list[list]):
+    """Write daily totals file for timesheet file (overwriting any current content)
+
+    The first line holds the stamp of the timesheet file the totals were calculated from,
+    followed by one CSV line per day.
+
+    Args:
+        file_name (Path): path to timesheet file
+        rows (list[list]): date (YYYY-mm-dd), seconds worked and number of sessions for
+            each day (in date order)
+    """
+
+    with open(get_daily_totals_file_name(file_name), "w") as file:
+        file.write(get_file_stamp(file_name) + "\n")
+        file.write(file_functions.format_csv_line(DAILY_TOTALS_COLUMNS))
+        for row in rows:
+            file.write(file_functions.format_csv_line(row))
+
+
+def calculate_record_seconds(record: dict) -> int:
+    """Calculate seconds worked in a timesheet record from its start and end times
+
+    Records without an end time, or with an end time that isn't after the start time,
+    count as zero seconds (matching how summaries are calculated).
+
+    Args:
+        record (dict): timesheet record (values as written in file), None if no record
+
+    Returns:
+        int: seconds worked
+    """
+
+    # Check record has start and end times
+    if record is None or record["start_time"] == "" or record["end_time"] == "":
+        return 0
+
+    # Convert times to seconds after midnight
+    start_hours, start_minutes = map(int, record["start_time"].split(":"))
+    end_hours, end_minutes = map(int, record["end_time"].split(":"))
+    seconds = (end_hours - start_hours) * 3600 + (end_minutes - start_minutes) * 60
+
+    return max(seconds, 0)
+
+
+def update_daily_totals(file_name: Path, record: dict, previous_record: dict = None):
+    """Update daily totals after last record of timesheet file was added or changed
+
+    Only the last line of the daily totals file is changed, so cost doesn't depend on the
+    size of the timesheet. Should only be called if the daily totals were current before the
+    timesheet file was changed (see is_daily_totals_current()). If the record doesn't follow
+    on from the last daily total (e.g. it is for an earlier day) the daily totals file is
+    removed (and rebuilt the next time it is used).
+
+    Args:
+        file_name (Path): path to timesheet file
+        record (dict): new or changed last record (values as written in file)
+        previous_record (dict, optional): last record before it was changed. Defaults to
+            None (record was added).
+    """
+
+    # Calculate change in seconds worked and sessions
+    seconds = calculate_record_seconds(record) - calculate_record_seconds(
+        previous_record
+    )
+    sessions = 1 if previous_record is None else 0
+
+    # Read last daily total
+    totals_file_name = get_daily_totals_file_name(file_name)
+    _, last_line = file_functions.read_header_and_last_line(totals_file_name)
+    if last_line == DAILY_TOTALS_COLUMNS:
+        last_line = None
+
+    # Add to last day, add new day, or remove daily totals if record out of order
+    if last_line is not None and last_line[0] == record["date"]:
+        file_functions.replace_last_line(
+            totals_file_name,
+            file_functions.format_csv_line(
+                [
+                    record["date"],
+                    int(last_line[1]) + seconds,
+                    int(last_line[2]) + sessions,
+                ]
+            ),
+        )
+    elif previous_record is None and (
+        last_line is None or last_line[0] < record["date"]
+    ):
+        file_functions.append_line(
+            totals_file_name,
+            file_functions.format_csv_line([record["date"], seconds, sessions]),
+        )
+    else:
+        Path.unlink(totals_file_name)
+        return
+
+    # Record which version of timesheet file totals match
+    write_daily_totals_stamp(file_name)